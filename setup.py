@@ -34,5 +34,7 @@ setup(
     entry_points="""
         [console_scripts]
         trcli=trcli.cli:cli
+        [pytest11]
+        trcli=trcli.pytest_plugin
     """,
 )
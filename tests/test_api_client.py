@@ -1,8 +1,15 @@
+import gzip
+import json
+import time
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
 from trcli.constants import FAULT_MAPPING
 from trcli.cli import Environment
 from trcli.api.api_client import APIClient
+from trcli.api.circuit_breaker import CircuitBreaker
+from trcli.logging.metrics import MetricsCollector
+from trcli.logging.tracing import Tracer
 from requests.exceptions import RequestException, Timeout, ConnectionError
 from tests.helpers.api_client_helpers import (
     TEST_RAIL_URL,
@@ -40,6 +47,46 @@ def api_resources(api_resources_maker):
     yield api_resources_maker()
 
 
+@pytest.fixture(scope="function")
+def gzip_api_client(api_resources_maker):
+    APIClient._gzip_support.clear()
+    api_client = api_resources_maker(retries=0)
+    api_client.gzip_threshold = 100
+    api_client.metrics = MetricsCollector()
+    yield api_client
+    APIClient._gzip_support.clear()
+
+
+@pytest.fixture(scope="function")
+def hedged_api_client(api_resources_maker, mocker):
+    mocker.patch("trcli.api.api_client.HEDGE_MIN_DELAY", 0.05)
+    api_client = api_resources_maker(retries=0)
+    api_client.hedge_percentile = 95
+    api_client.hedge_budget = 100
+    api_client.metrics = MetricsCollector()
+    for _ in range(20):
+        api_client.metrics.record_request("GET", "get_cases/1", 200, 0.01)
+    yield api_client
+
+
+def patch_get(responses):
+    """Patch requests.get to answer the n-th request with the n-th (delay, status code, body) response"""
+    responses = iter(responses)
+
+    def get(**kwargs):
+        delay, status_code, content = next(responses)
+        time.sleep(delay)
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content
+        return response
+
+    return patch("trcli.api.api_client.requests.get", side_effect=get)
+
+
+LARGE_RESULTS_PAYLOAD = {"results": [{"case_id": i, "status_id": 5, "comment": "Traceback " * 20} for i in range(20)]}
+
+
 class TestAPIClient:
     @pytest.mark.api_client
     def test_send_get_status_code_success(self, api_resources, requests_mock):
@@ -455,3 +502,216 @@ class TestAPIClient:
 
         # Verify successful response
         check_response(200, FAKE_PROJECT_DATA, "", response)
+
+    @pytest.mark.api_client
+    def test_requests_are_recorded_in_metrics(self, api_resources_maker, requests_mock, mocker):
+        """Test that every request attempt, retry, 429 wait and transferred bytes are recorded in metrics."""
+        mocker.patch("trcli.api.api_client.sleep")
+        api_client = api_resources_maker(retries=2)
+        api_client.metrics = MetricsCollector()
+        requests_mock.post(
+            create_url("add_results_for_cases/1"),
+            [
+                {"status_code": 429, "headers": {"Retry-After": "2"}, "json": API_RATE_LIMIT_REACHED_ERROR},
+                {"status_code": 200, "json": [{"id": 1}]},
+            ],
+        )
+
+        api_client.send_post("add_results_for_cases/1", {"results": [{"case_id": 1, "status_id": 1}]})
+
+        stats = api_client.metrics.summary()["endpoints"]["add_results_for_cases"]
+        assert stats["count"] == 2
+        assert stats["errors"] == 1
+        assert stats["retries"] == 1
+        assert stats["rate_limit_waits"] == 1
+        assert stats["rate_limit_wait_s"] == 2.0
+        assert stats["bytes_sent"] > 0
+        assert stats["bytes_received"] == len(json.dumps(API_RATE_LIMIT_REACHED_ERROR)) + len(b'[{"id": 1}]')
+
+    @pytest.mark.api_client
+    def test_failed_requests_are_recorded_in_metrics(self, api_resources_maker, requests_mock):
+        """Test that attempts failing without a response are recorded as errors."""
+        api_client = api_resources_maker(retries=1)
+        api_client.metrics = MetricsCollector()
+        requests_mock.get(create_url("get_projects"), exc=Timeout)
+
+        api_client.send_get("get_projects")
+
+        stats = api_client.metrics.summary()["endpoints"]["get_projects"]
+        assert stats["count"] == 2
+        assert stats["errors"] == 2
+        assert stats["retries"] == 1
+
+    @pytest.mark.api_client
+    def test_requests_are_traced_when_enabled(self, api_resources_maker, requests_mock):
+        """Test that each request attempt is recorded as an HTTP span with endpoint and status."""
+        api_client = api_resources_maker()
+        api_client.tracer = Tracer()
+        api_client.tracer.enable()
+        requests_mock.get(create_url("get_cases/1&suite_id=3"), status_code=200, json=[])
+
+        api_client.send_get("get_cases/1&suite_id=3")
+
+        spans = [event for event in api_client.tracer.to_chrome_trace()["traceEvents"] if event["ph"] == "X"]
+        assert len(spans) == 1
+        assert spans[0]["name"] == "GET get_cases"
+        assert spans[0]["cat"] == "http"
+        assert spans[0]["args"]["endpoint"] == "get_cases"
+        assert spans[0]["args"]["status"] == 200
+        assert spans[0]["args"]["attempt"] == 1
+
+    @pytest.mark.api_client
+    def test_large_post_body_is_gzip_compressed(self, gzip_api_client, requests_mock):
+        requests_mock.post(create_url("add_results_for_cases/1"), json=[{"id": 1}])
+
+        response = gzip_api_client.send_post("add_results_for_cases/1", LARGE_RESULTS_PAYLOAD)
+
+        request = requests_mock.last_request
+        assert request.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(request.body)) == LARGE_RESULTS_PAYLOAD
+        check_response(200, [{"id": 1}], "", response)
+        assert gzip_api_client.gzip_supported is True
+        original_size = len(json.dumps(LARGE_RESULTS_PAYLOAD).encode())
+        assert gzip_api_client.metrics.bytes_saved == original_size - len(request.body)
+
+    @pytest.mark.api_client
+    def test_small_post_body_is_not_compressed(self, gzip_api_client, requests_mock):
+        requests_mock.post(create_url("add_results_for_cases/1"), json=[{"id": 1}])
+
+        gzip_api_client.send_post("add_results_for_cases/1", {"results": [{"case_id": 1, "status_id": 1}]})
+
+        assert "Content-Encoding" not in requests_mock.last_request.headers
+        assert gzip_api_client.gzip_supported is None
+        assert gzip_api_client.metrics.bytes_saved == 0
+
+    @pytest.mark.api_client
+    def test_gzip_is_disabled_for_host_on_415(self, gzip_api_client, requests_mock):
+        requests_mock.post(
+            create_url("add_results_for_cases/1"),
+            [
+                {"status_code": 415, "json": {"error": "Unsupported Media Type"}},
+                {"status_code": 200, "json": [{"id": 1}]},
+                {"status_code": 200, "json": [{"id": 2}]},
+            ],
+        )
+
+        response = gzip_api_client.send_post("add_results_for_cases/1", LARGE_RESULTS_PAYLOAD)
+        check_response(200, [{"id": 1}], "", response)
+        assert requests_mock.request_history[0].headers["Content-Encoding"] == "gzip"
+        assert "Content-Encoding" not in requests_mock.request_history[1].headers
+        assert gzip_api_client.gzip_supported is False
+
+        gzip_api_client.send_post("add_results_for_cases/1", LARGE_RESULTS_PAYLOAD)
+        assert requests_mock.call_count == 3
+        assert "Content-Encoding" not in requests_mock.last_request.headers
+
+    @pytest.mark.api_client
+    def test_validation_error_does_not_disable_gzip(self, gzip_api_client, requests_mock):
+        requests_mock.post(create_url("add_results_for_cases/1"), status_code=400, json=INVALID_TEST_CASE_ERROR)
+
+        response = gzip_api_client.send_post("add_results_for_cases/1", LARGE_RESULTS_PAYLOAD)
+
+        assert requests_mock.call_count == 2, "Request should be sent again uncompressed"
+        assert response.status_code == 400
+        assert gzip_api_client.gzip_supported is None
+
+    @pytest.mark.api_client
+    def test_400_is_not_retried_when_gzip_is_supported(self, gzip_api_client, requests_mock):
+        requests_mock.post(
+            create_url("add_results_for_cases/1"),
+            [{"status_code": 200, "json": [{"id": 1}]}, {"status_code": 400, "json": INVALID_TEST_CASE_ERROR}],
+        )
+
+        gzip_api_client.send_post("add_results_for_cases/1", LARGE_RESULTS_PAYLOAD)
+        response = gzip_api_client.send_post("add_results_for_cases/1", LARGE_RESULTS_PAYLOAD)
+
+        assert requests_mock.call_count == 2
+        assert response.status_code == 400
+        assert gzip_api_client.gzip_supported is True
+
+    @pytest.mark.api_client
+    def test_attachment_is_streamed_from_disk(self, api_resources_maker, requests_mock, tmp_path):
+        attachment = tmp_path / "video.mp4"
+        attachment.write_bytes(b"frame" * 1000)
+        bodies = []
+
+        def read_body(request, context):
+            bodies.append(request.body.read())
+            if len(bodies) == 1:
+                context.status_code = 502
+                return {}
+            return {"attachment_id": 1}
+
+        requests_mock.post(create_url("add_attachment_to_result/1"), json=read_body)
+        api_client = api_resources_maker(retries=1)
+        api_client.metrics = MetricsCollector()
+        api_client.upload_chunk_size = 1024
+
+        with open(attachment, "rb") as file, patch("trcli.api.api_client.sleep"), patch(
+            "trcli.api.multipart_stream.choose_boundary", return_value="boundary"
+        ):
+            response = api_client.send_post("add_attachment_to_result/1", files={"attachment": file})
+
+        request = requests_mock.last_request
+        assert response.status_code == 200
+        assert request.headers["Content-Type"] == "multipart/form-data; boundary=boundary"
+        assert int(request.headers["Content-Length"]) == len(bodies[1])
+        assert b"frame" * 1000 in bodies[1]
+        assert bodies[0] == bodies[1], "Retried upload should send the whole file again"
+        assert api_client.upload_budget.in_flight == 0
+        endpoint = api_client.metrics.summary()["endpoints"]["add_attachment_to_result"]
+        assert endpoint["streamed_uploads"] == 1
+        assert endpoint["bytes_sent"] == 2 * len(bodies[1])
+
+    @pytest.mark.api_client
+    def test_slow_get_is_hedged(self, hedged_api_client):
+        with patch_get([(0.5, 200, b'[{"id": 1}]'), (0, 200, b'[{"id": 2}]')]) as requests_get:
+            response = hedged_api_client.send_get("get_cases/1&offset=250")
+
+        assert response.response_text == [{"id": 2}]
+        assert requests_get.call_count == 2
+        endpoint = hedged_api_client.metrics.summary()["endpoints"]["get_cases"]
+        assert (endpoint["hedged_requests"], endpoint["hedges_won"]) == (1, 1)
+
+    @pytest.mark.api_client
+    def test_failed_hedge_waits_for_first_request(self, hedged_api_client):
+        with patch_get([(0.5, 200, b'[{"id": 1}]'), (0, 502, b'{"error": "Bad gateway"}')]):
+            response = hedged_api_client.send_get("get_cases/1")
+
+        assert (response.status_code, response.response_text) == (200, [{"id": 1}])
+        endpoint = hedged_api_client.metrics.summary()["endpoints"]["get_cases"]
+        assert (endpoint["hedged_requests"], endpoint["hedges_won"]) == (1, 0)
+
+    @pytest.mark.api_client
+    def test_losing_request_is_cancelled(self, hedged_api_client, mocker):
+        mocker.patch("trcli.api.api_client.sleep")
+        hedged_api_client.retries = 3
+        hedged_api_client.circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        hedged_api_client.logging_function = logs = mocker.Mock()
+        with patch_get([(0.2, 502, b'{"error": "Bad gateway"}'), (0, 200, b'[{"id": 2}]')]) as requests_get:
+            response = hedged_api_client.send_get("get_cases/1")
+            time.sleep(0.4)
+
+        assert response.response_text == [{"id": 2}]
+        assert requests_get.call_count == 2, "Losing request should not be retried"
+        logs.assert_not_called()
+        assert hedged_api_client.circuit_breaker.failures == 0
+        endpoint = hedged_api_client.metrics.summary()["endpoints"]["get_cases"]
+        assert (endpoint["count"], endpoint["errors"], endpoint["retries"]) == (21, 0, 0)
+
+    @pytest.mark.api_client
+    def test_hedging_is_limited_by_budget(self, hedged_api_client):
+        hedged_api_client.hedge_budget = 0
+        with patch_get([(0.5, 200, b'[{"id": 1}]'), (0, 200, b'[{"id": 2}]')]) as requests_get:
+            response = hedged_api_client.send_get("get_cases/1")
+
+        assert response.response_text == [{"id": 1}]
+        assert requests_get.call_count == 1
+        assert hedged_api_client.metrics.summary()["total_hedged"] == 0
+
+    @pytest.mark.api_client
+    def test_no_hedging_without_latency_samples(self, hedged_api_client):
+        with patch_get([(0.5, 200, b'[{"id": 1}]'), (0, 200, b'[{"id": 2}]')]) as requests_get:
+            hedged_api_client.send_get("get_tests/1")
+
+        assert requests_get.call_count == 1
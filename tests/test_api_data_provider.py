@@ -146,3 +146,59 @@ class TestApiDataProvider:
         assert (
             result == expected_result
         ), f"Expected: {expected_result} but got {result} instead."
+
+    @pytest.mark.data_provider
+    @pytest.mark.parametrize(
+        "list_to_divide, bulk_size, max_bytes, expected_result",
+        [
+            (["a" * 8, "b" * 8, "c" * 8], 10, 24, [["a" * 8, "b" * 8], ["c" * 8]]),
+            (["a" * 8, "b" * 8, "c" * 8], 2, 1000, [["a" * 8, "b" * 8], ["c" * 8]]),
+            (["a" * 30, "b" * 8], 10, 24, [["a" * 30], ["b" * 8]]),
+            (["a" * 8, "b" * 8], 10, None, [["a" * 8, "b" * 8]]),
+            ([], 2, 24, []),
+        ],
+        ids=["byte_limit", "count_limit", "oversized_item", "no_byte_limit", "empty"],
+    )
+    def test_divide_list_into_bulks_with_max_bytes(self, list_to_divide, bulk_size, max_bytes, expected_result):
+        result = ApiDataProvider.divide_list_into_bulks(list_to_divide, bulk_size, max_bytes=max_bytes)
+        assert result == expected_result, f"Expected: {expected_result} but got {result} instead."
+
+    @pytest.mark.data_provider
+    def test_post_results_for_cases_with_max_bytes(self, post_data_provider):
+        """Check results are split into batches limited by body size"""
+        case_updater = [
+            {
+                "case_id": 1234567,
+                "section_id": 12345,
+                "title": "testCase2",
+                "custom_automation_id": "className.testCase2abc",
+            }
+        ]
+        post_data_provider.update_data(case_data=case_updater)
+        batches = post_data_provider.add_results_for_cases(bulk_size=10, max_bytes=1)
+        expected_results = [result for body in post_results_for_cases_body for result in body["results"]]
+        assert [body["results"] for body in batches] == [
+            [result] for result in expected_results
+        ], "Every result should be sent in its own batch"
+
+    @pytest.mark.data_provider
+    def test_post_results_for_selected_cases(self, post_data_provider):
+        """Check only results of the selected cases are returned"""
+        case_updater = [
+            {
+                "case_id": 1234567,
+                "section_id": 12345,
+                "title": "testCase2",
+                "custom_automation_id": "className.testCase2abc",
+            }
+        ]
+        post_data_provider.update_data(case_data=case_updater)
+        all_case_ids = {result["case_id"] for body in post_results_for_cases_body for result in body["results"]}
+
+        selected = post_data_provider.add_results_for_cases(bulk_size=10, case_ids={1234567})
+
+        assert [result["case_id"] for body in selected for result in body["results"]] == [1234567]
+        assert post_data_provider.add_results_for_cases(bulk_size=10, case_ids=all_case_ids - {1234567}) == [
+            {"results": [result for result in body["results"] if result["case_id"] != 1234567]}
+            for body in post_results_for_cases_body
+        ]
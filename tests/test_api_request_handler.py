@@ -1,4 +1,5 @@
 import json
+import threading
 from unittest.mock import patch, mock_open, call
 
 import requests
@@ -9,7 +10,8 @@ from tests.helpers.api_client_helpers import TEST_RAIL_URL, create_url
 from trcli.cli import Environment
 from trcli.api.api_request_handler import ApiRequestHandler, ProjectData
 from trcli.api.api_client import APIClient
-from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.api.result_batch_retry import RejectedResult
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailResult, TestRailSection, TestRailSuite
 from trcli.constants import ProjectErrors, FAULT_MAPPING
 from trcli.data_classes.data_parsers import MatchersParser
 
@@ -37,6 +39,38 @@ def handler_maker():
     return _make_handler
 
 
+ATTACHMENT_RUN_ID = 2
+
+
+@pytest.fixture(scope="function")
+def attachment_handler_maker(requests_mock):
+    """Handler adding one result with attachments per (case_id, attachments), answered with result_ids in order"""
+
+    def _make_handler(results, result_ids):
+        environment = Environment()
+        environment.project = "Test Project"
+        environment.batch_size = 10
+        environment.case_matcher = MatchersParser.AUTO
+        testcases = [
+            TestRailCase(
+                title=f"Case {index}",
+                case_id=case_id,
+                result=TestRailResult(case_id=case_id, status_id=1, attachments=attachments),
+            )
+            for index, (case_id, attachments) in enumerate(results)
+        ]
+        suite = TestRailSuite(
+            name="Suite", suite_id=1, testsections=[TestRailSection(name="Section", testcases=testcases)]
+        )
+        requests_mock.post(
+            create_url(f"add_results_for_cases/{ATTACHMENT_RUN_ID}"),
+            json=[{"id": result_id, "status_id": 1} for result_id in result_ids],
+        )
+        return ApiRequestHandler(environment, APIClient(host_name=TEST_RAIL_URL), suite, verify=False)
+
+    return _make_handler
+
+
 @pytest.fixture(scope="function")
 def api_request_handler(handler_maker):
     handler = handler_maker()
@@ -683,8 +717,9 @@ class TestApiRequestHandler:
         ), "Connection error is expected"
 
     @pytest.mark.api_handler
-    def test_add_results_error(self, api_request_handler: ApiRequestHandler, requests_mock):
+    def test_add_results_error(self, api_request_handler: ApiRequestHandler, requests_mock, mocker):
         run_id = 3
+        mocker.patch("trcli.api.result_batch_retry.sleep")
         requests_mock.post(
             create_url(f"add_results_for_cases/{run_id}"),
             exc=requests.exceptions.ConnectTimeout,
@@ -714,6 +749,158 @@ class TestApiRequestHandler:
         ), "Connection error is expected"
         assert results_added == 0, "Expected 0 resources to be added."
 
+    @pytest.mark.api_handler
+    def test_add_results_adaptive_batching(self, api_request_handler: ApiRequestHandler, requests_mock):
+        run_id = 2
+        api_request_handler.environment.batch_target_latency = 1
+
+        def add_results_response(request, context):
+            return [{"id": 100 + i, "status_id": 5} for i, _ in enumerate(request.json()["results"])]
+
+        add_results_mock = requests_mock.post(create_url(f"add_results_for_cases/{run_id}"), json=add_results_response)
+        requests_mock.post(create_url("add_attachment_to_result/100"), json={"attachment_id": 123})
+
+        with patch("builtins.open", mock_open()):
+            resources_added, error, results_added = api_request_handler.add_results(run_id)
+        assert error == "", "Error occurred in add_results"
+        assert results_added == 1, f"Expected 1 result to be added but got {results_added} instead."
+        assert resources_added == [[{"id": 100, "status_id": 5}]], "Invalid response from add_results"
+        assert add_results_mock.call_count == 1
+
+    @pytest.mark.api_handler
+    def test_add_results_uploads_attachments_while_adding_results(self, handler_maker, requests_mock, tmp_path, mocker):
+        run_id = 2
+        suite = json.loads((Path(__file__).parent / "test_data/json/api_request_handler.json").read_text())
+        for case, case_id in [
+            (suite["testsections"][0]["testcases"][1], 2),
+            (suite["testsections"][1]["testcases"][0], 3),
+        ]:
+            case["case_id"] = case["result"]["case_id"] = case_id
+        json_path = tmp_path / "suite.json"
+        json_path.write_text(json.dumps(suite))
+        api_request_handler = handler_maker(custom_json=json_path)
+        api_request_handler.environment.batch_size = 1
+
+        attachment_uploaded = threading.Event()
+        attachment_uploaded_before_response = []
+
+        def upload_attachment(file_path, result_id, case_id):
+            attachment_uploaded.set()
+            return True, None
+
+        def add_results_response(request, context):
+            result = request.json()["results"][0]
+            if result["case_id"] != 1:
+                # Results without attachments wait until attachments of case 1 are being uploaded
+                attachment_uploaded_before_response.append(attachment_uploaded.wait(timeout=5))
+            return [{"id": 100 + result["case_id"], "status_id": result["status_id"]}]
+
+        requests_mock.post(create_url(f"add_results_for_cases/{run_id}"), json=add_results_response)
+        upload_mock = mocker.patch(
+            "trcli.api.result_handler.ResultHandler._upload_single_attachment", side_effect=upload_attachment
+        )
+
+        resources_added, error, results_added = api_request_handler.add_results(run_id)
+        assert error == "", "Error occurred in add_results"
+        assert results_added == 3
+        assert attachment_uploaded_before_response == [True, True], "Attachments should not wait for all results"
+        upload_mock.assert_has_calls([call("./path1", 101, 1), call("./path2", 101, 1)], any_order=True)
+
+    @pytest.mark.api_handler
+    @pytest.mark.parametrize("target_latency", [None, 1], ids=["fixed", "adaptive"])
+    def test_add_results_bisects_rejected_batch(self, handler_maker, requests_mock, tmp_path, mocker, target_latency):
+        run_id = 2
+        suite = json.loads((Path(__file__).parent / "test_data/json/api_request_handler.json").read_text())
+        for case, case_id in [
+            (suite["testsections"][0]["testcases"][1], 2),
+            (suite["testsections"][1]["testcases"][0], 3),
+        ]:
+            case["case_id"] = case["result"]["case_id"] = case_id
+        json_path = tmp_path / "suite.json"
+        json_path.write_text(json.dumps(suite))
+        api_request_handler = handler_maker(custom_json=json_path)
+        api_request_handler.environment.batch_target_latency = target_latency
+        error = "Field :custom_environment is not a valid value."
+
+        def add_results_response(request, context):
+            results = request.json()["results"]
+            if any(result["case_id"] == 2 for result in results):
+                context.status_code = 400
+                return {"error": error}
+            return [{"id": 100 + result["case_id"], "status_id": result["status_id"]} for result in results]
+
+        add_results_mock = requests_mock.post(create_url(f"add_results_for_cases/{run_id}"), json=add_results_response)
+        upload_mock = mocker.patch(
+            "trcli.api.result_handler.ResultHandler._upload_single_attachment", return_value=(True, None)
+        )
+
+        resources_added, add_error, results_added = api_request_handler.add_results(run_id)
+
+        assert add_error == "", "A rejected result should not fail the upload"
+        assert results_added == 2
+        assert sorted(result["id"] for response in resources_added for result in response) == [101, 103]
+        assert add_results_mock.call_count == 5, "Batch of 3 should be split into [1], [2, 3], then [2], [3]"
+        assert api_request_handler.result_handler.rejected_results == [RejectedResult(2, error)]
+        assert api_request_handler.environment._has_rejected_results is True
+        upload_mock.assert_has_calls([call("./path1", 101, 1), call("./path2", 101, 1)], any_order=True)
+
+    @pytest.mark.api_handler
+    def test_add_results_attachment_preflight(self, handler_maker, requests_mock, tmp_path):
+        run_id = 2
+        attachments = {"screenshot.png": "image", "screenshot_retry.png": "image", "video.mp4": "x" * 100}
+        for name, content in attachments.items():
+            (tmp_path / name).write_text(content)
+        suite = json.loads((Path(__file__).parent / "test_data/json/api_request_handler.json").read_text())
+        suite["testsections"][0]["testcases"][0]["result"]["attachments"] = [
+            str(tmp_path / name) for name in attachments
+        ]
+        json_path = tmp_path / "suite.json"
+        json_path.write_text(json.dumps(suite))
+        api_request_handler = handler_maker(custom_json=json_path)
+        api_request_handler.environment.attachment_max_size = 50
+        requests_mock.post(create_url(f"add_results_for_cases/{run_id}"), json=[{"id": 9, "status_id": 4}])
+        upload_mock = requests_mock.post(create_url("add_attachment_to_result/9"), json={"attachment_id": 123})
+
+        resources_added, error, results_added = api_request_handler.add_results(run_id)
+
+        assert error == ""
+        assert upload_mock.call_count == 1, "Duplicate and oversized attachments should not be uploaded"
+
+    @pytest.mark.api_handler
+    def test_add_results_detached_attachments(self, api_request_handler: ApiRequestHandler, requests_mock, mocker):
+        run_id = 2
+        api_request_handler.environment.detach_attachments = True
+        api_request_handler.environment.password = "secret"
+        requests_mock.post(create_url(f"add_results_for_cases/{run_id}"), json=[{"id": 9, "status_id": 4}])
+        spool = mocker.patch("trcli.api.result_handler.AttachmentSpool")
+        upload_mock = mocker.patch("trcli.api.result_handler.ResultHandler._upload_single_attachment")
+
+        resources_added, error, results_added = api_request_handler.add_results(run_id)
+
+        assert error == "", "Error occurred in add_results"
+        connection, spool_run_id, tasks, max_size = spool.create.call_args[0]
+        assert connection["host"] == api_request_handler.environment.host
+        assert "password" not in connection, "Credentials must not be written to the spool"
+        assert (spool_run_id, tasks) == (run_id, [("./path1", 9, 1), ("./path2", 9, 1)])
+        spool.create.return_value.start.assert_called_once_with({"password": "secret", "key": None, "proxy_user": None})
+        upload_mock.assert_not_called()
+
+    @pytest.mark.api_handler
+    def test_add_results_detached_attachments_fallback(
+        self, api_request_handler: ApiRequestHandler, requests_mock, mocker
+    ):
+        run_id = 2
+        api_request_handler.environment.detach_attachments = True
+        requests_mock.post(create_url(f"add_results_for_cases/{run_id}"), json=[{"id": 9, "status_id": 4}])
+        spool = mocker.patch("trcli.api.result_handler.AttachmentSpool")
+        spool.create.side_effect = OSError("Read-only file system")
+        upload_mock = mocker.patch(
+            "trcli.api.result_handler.ResultHandler._upload_single_attachment", return_value=(True, None)
+        )
+
+        api_request_handler.add_results(run_id)
+        assert upload_mock.call_count == 2, "Attachments should be uploaded in the foreground"
+
     @pytest.mark.api_handler
     def test_add_results_keyboard_interrupt(self, api_request_handler: ApiRequestHandler, requests_mock, mocker):
         run_id = 3
@@ -877,6 +1064,63 @@ class TestApiRequestHandler:
         assert feature_content == expected_feature, "Should return feature content"
         assert error == "", "There should be no error"
 
+    @pytest.mark.api_handler
+    def test_get_cases_by_ids(self, api_request_handler: ApiRequestHandler, requests_mock):
+        """Test cases are taken from the BDD case cache or fetched once per case ID"""
+        cached_case = {"id": 1, "title": "Login", "custom_testrail_bdd_scenario": "Scenario: Login"}
+        api_request_handler._bdd_case_cache["1_2"] = {"login": [cached_case]}
+        requests_mock.get(create_url("get_case/2"), json={"id": 2, "title": "Logout"})
+        requests_mock.get(create_url("get_case/3"), status_code=400, json={"error": "Field :case_id is not valid"})
+
+        cases = api_request_handler.get_cases_by_ids([1, 2, 3, 2])
+
+        assert cases == {
+            1: (cached_case, ""),
+            2: ({"id": 2, "title": "Logout"}, ""),
+            3: ({}, "Field :case_id is not valid"),
+        }
+        requested = sorted(request.query for request in requests_mock.request_history)
+        assert requested == [
+            "/api/v2/get_case/2",
+            "/api/v2/get_case/3",
+        ], "Only cases missing in cache should be fetched"
+
+    @pytest.mark.api_handler
+    def test_get_users_by_emails(self, api_request_handler: ApiRequestHandler, requests_mock, tmp_path):
+        """Test users are resolved case-insensitively from get_users and cached for following runs"""
+        api_request_handler.environment.host = TEST_RAIL_URL
+        users = [{"id": 1, "email": "Alice@example.com"}, {"id": 2, "email": "bob@example.com"}]
+        requests_mock.get(create_url("get_users"), json=users)
+
+        with patch("trcli.api.user_directory.USER_CACHE_DIR", tmp_path):
+            user_ids, error = api_request_handler.get_users_by_emails(["alice@EXAMPLE.com", "carol@example.com"])
+            assert error == ""
+            assert user_ids == {"alice@EXAMPLE.com": 1}, "Unknown users should not be resolved"
+
+            user_ids, error = api_request_handler.get_users_by_emails(["BOB@example.com"])
+            assert user_ids == {"BOB@example.com": 2}
+            assert requests_mock.call_count == 1, "Cached users should be resolved without requests"
+
+    @pytest.mark.api_handler
+    def test_get_users_by_emails_without_permission(
+        self, api_request_handler: ApiRequestHandler, requests_mock, tmp_path
+    ):
+        """Test users are looked up by email if listing users is not permitted"""
+        api_request_handler.environment.host = TEST_RAIL_URL
+        requests_mock.get(create_url("get_users"), status_code=403, json={"error": "No access"})
+        requests_mock.get(create_url("get_user_by_email&email=alice%40example.com"), json={"id": 1})
+        requests_mock.get(
+            create_url("get_user_by_email&email=carol%40example.com"),
+            status_code=400,
+            json={"error": "Field :email is not a valid email address."},
+        )
+
+        with patch("trcli.api.user_directory.USER_CACHE_DIR", tmp_path):
+            user_ids, error = api_request_handler.get_users_by_emails(["alice@example.com", "carol@example.com"])
+
+        assert error == ""
+        assert user_ids == {"alice@example.com": 1}
+
     @pytest.mark.api_handler
     def test_update_run_with_include_all_false_standalone(self, api_request_handler: ApiRequestHandler, requests_mock):
         """Test update_run for standalone run with include_all=false"""
@@ -1362,11 +1606,12 @@ class TestApiRequestHandler:
         assert payload["refs"] == "REF-1", "refs should be preserved"
 
     @pytest.mark.api_handler
-    def test_upload_attachments_413_error(self, api_request_handler: ApiRequestHandler, requests_mock, tmp_path):
+    def test_upload_attachments_413_error(self, attachment_handler_maker, requests_mock, tmp_path):
         """Test that 413 errors (file too large) are properly reported."""
         # Create a temporary test file
         test_file = tmp_path / "large_attachment.jpg"
         test_file.write_text("test content")
+        api_request_handler = attachment_handler_maker([(100, [str(test_file)])], result_ids=[2001])
 
         # Mock add_attachment_to_result endpoint to return 413
         requests_mock.post(
@@ -1375,59 +1620,49 @@ class TestApiRequestHandler:
             text='<!DOCTYPE HTML PUBLIC "-//IETF//DTD HTML 2.0//EN">\n<html><head>\n<title>413 Request Entity Too Large</title>\n</head><body>\n<h1>Request Entity Too Large</h1>\n</body></html>\n',
         )
 
-        # Prepare test data
-        report_results = [{"case_id": 100, "attachments": [str(test_file)]}]
-        request_id_to_result_id = {id(report_results[0]): 2001}
-
-        # Call upload_attachments
-        total_attachments = sum(len(r["attachments"]) for r in report_results)
-        api_request_handler.upload_attachments(report_results, request_id_to_result_id, total_attachments)
+        _, error, _ = api_request_handler.add_results(ATTACHMENT_RUN_ID)
 
         # Verify the request was made (case-insensitive comparison)
+        assert error == ""
         assert requests_mock.last_request.url.lower() == create_url("add_attachment_to_result/2001").lower()
 
     @pytest.mark.api_handler
-    def test_upload_attachments_success(self, api_request_handler: ApiRequestHandler, requests_mock, tmp_path):
+    def test_upload_attachments_success(self, attachment_handler_maker, requests_mock, tmp_path):
         """Test that successful attachment uploads work correctly."""
         # Create a temporary test file
         test_file = tmp_path / "test_attachment.jpg"
         test_file.write_text("test content")
+        api_request_handler = attachment_handler_maker([(100, [str(test_file)])], result_ids=[2001])
 
         # Mock add_attachment_to_result endpoint to return success
         requests_mock.post(create_url("add_attachment_to_result/2001"), status_code=200, json={"attachment_id": 5001})
 
-        # Prepare test data
-        report_results = [{"case_id": 100, "attachments": [str(test_file)]}]
-        request_id_to_result_id = {id(report_results[0]): 2001}
-
-        # Call upload_attachments
-        total_attachments = sum(len(r["attachments"]) for r in report_results)
-        api_request_handler.upload_attachments(report_results, request_id_to_result_id, total_attachments)
+        _, error, _ = api_request_handler.add_results(ATTACHMENT_RUN_ID)
 
         # Verify the request was made (case-insensitive comparison)
+        assert error == ""
         assert requests_mock.last_request.url.lower() == create_url("add_attachment_to_result/2001").lower()
 
     @pytest.mark.api_handler
-    def test_upload_attachments_file_not_found(self, api_request_handler: ApiRequestHandler, requests_mock):
+    def test_upload_attachments_file_not_found(self, attachment_handler_maker, requests_mock):
         """Test that missing attachment files are properly reported."""
         # Prepare test data with non-existent file
-        report_results = [{"case_id": 100, "attachments": ["/path/to/nonexistent/file.jpg"]}]
-        request_id_to_result_id = {id(report_results[0]): 2001}
+        api_request_handler = attachment_handler_maker([(100, ["/path/to/nonexistent/file.jpg"])], result_ids=[2001])
 
-        # Call upload_attachments - should not raise exception
-        total_attachments = sum(len(r["attachments"]) for r in report_results)
-        api_request_handler.upload_attachments(report_results, request_id_to_result_id, total_attachments)
+        # Add results - should not raise exception
+        _, error, _ = api_request_handler.add_results(ATTACHMENT_RUN_ID)
+
+        assert error == ""
+        assert not [req for req in requests_mock.request_history if "add_attachment_to_result" in req.url]
 
     @pytest.mark.api_handler
-    def test_upload_attachments_empty_run_scenario(
-        self, api_request_handler: ApiRequestHandler, requests_mock, tmp_path
-    ):
+    def test_upload_attachments_empty_run_scenario(self, attachment_handler_maker, requests_mock, tmp_path):
         """Test that attachments work correctly when results are added to an empty run.
 
         This test covers the bug fix for issue where TRCLI failed to upload attachments
         when using --run-id with an empty run (created via API with include_all: false
-        and no case_ids). The fix uses request object identity to result_id mapping instead
-        of case_id mapping, which correctly handles duplicate case_ids.
+        and no case_ids). Attachments are matched to the add_results_for_cases response by
+        position instead of by case_id, which correctly handles duplicate case_ids.
         """
         # Create test attachment files
         attachment1 = tmp_path / "screenshot1.png"
@@ -1435,22 +1670,16 @@ class TestApiRequestHandler:
         attachment2 = tmp_path / "screenshot2.png"
         attachment2.write_text("screenshot content 2")
 
+        # Two cases with attachments, result IDs are returned by add_results_for_cases
+        api_request_handler = attachment_handler_maker(
+            [(100, [str(attachment1)]), (101, [str(attachment2)])], result_ids=[5001, 5002]
+        )
+
         # Mock successful attachment uploads
         requests_mock.post(create_url("add_attachment_to_result/5001"), status_code=200, json={"attachment_id": 9001})
         requests_mock.post(create_url("add_attachment_to_result/5002"), status_code=200, json={"attachment_id": 9002})
 
-        # Prepare test data - two cases with attachments
-        report_results = [
-            {"case_id": 100, "attachments": [str(attachment1)]},
-            {"case_id": 101, "attachments": [str(attachment2)]},
-        ]
-
-        # Request object ID to result ID mapping (this is built from add_results_for_cases response)
-        request_id_to_result_id = {id(report_results[0]): 5001, id(report_results[1]): 5002}
-
-        # Call upload_attachments
-        total_attachments = sum(len(r["attachments"]) for r in report_results)
-        api_request_handler.upload_attachments(report_results, request_id_to_result_id, total_attachments)
+        api_request_handler.add_results(ATTACHMENT_RUN_ID)
 
         # Verify both attachments were uploaded correctly
         history = requests_mock.request_history
@@ -1464,7 +1693,7 @@ class TestApiRequestHandler:
 
     @pytest.mark.api_handler
     def test_upload_attachments_duplicate_case_ids_different_results(
-        self, api_request_handler: ApiRequestHandler, requests_mock, tmp_path
+        self, attachment_handler_maker, requests_mock, tmp_path
     ):
         """Test that attachments are uploaded to correct results when same case_id appears multiple times."""
         # Create test attachment files
@@ -1473,26 +1702,17 @@ class TestApiRequestHandler:
         attachment2 = tmp_path / "report2_screenshot.png"
         attachment2.write_text("screenshot from report 2")
 
+        # SAME case_id (123) but different results with different attachments
+        # This simulates what happens when glob pattern processes multiple reports with the same test
+        api_request_handler = attachment_handler_maker(
+            [(123, [str(attachment1)]), (123, [str(attachment2)])], result_ids=[1001, 1002]
+        )
+
         # Mock successful attachment uploads
         requests_mock.post(create_url("add_attachment_to_result/1001"), status_code=200, json={"attachment_id": 9001})
         requests_mock.post(create_url("add_attachment_to_result/1002"), status_code=200, json={"attachment_id": 9002})
 
-        # Prepare test data - SAME case_id (123) but different result objects with different attachments
-        # This simulates what happens when glob pattern processes multiple reports with the same test
-        result1 = {"case_id": 123, "attachments": [str(attachment1)]}
-        result2 = {"case_id": 123, "attachments": [str(attachment2)]}
-        report_results = [result1, result2]
-
-        # Request object ID to result ID mapping
-        # Key insight: We map by object identity, NOT by case_id
-        request_id_to_result_id = {
-            id(result1): 1001,  # First occurrence of case 123
-            id(result2): 1002,  # Second occurrence of case 123
-        }
-
-        # Call upload_attachments
-        total_attachments = sum(len(r["attachments"]) for r in report_results)
-        api_request_handler.upload_attachments(report_results, request_id_to_result_id, total_attachments)
+        api_request_handler.add_results(ATTACHMENT_RUN_ID)
 
         # Verify both attachments were uploaded correctly
         history = requests_mock.request_history
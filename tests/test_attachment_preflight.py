@@ -0,0 +1,114 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from trcli.api import attachment_preflight
+from trcli.api.attachment_preflight import AttachmentPreflight, inspect_attachment
+
+
+@pytest.fixture
+def files(tmp_path):
+    def _write(name, content):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    return _write
+
+
+@pytest.fixture
+def preflight():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield AttachmentPreflight(executor, max_size=10)
+
+
+class TestAttachmentPreflight:
+    @pytest.mark.api_handler
+    def test_inspect_attachment(self, files):
+        info = inspect_attachment(files("log.txt", b"abc"), max_size=10)
+        assert (info.size, info.error) == (3, None)
+        assert info.sha256 == "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+
+        too_large = inspect_attachment(files("video.mp4", b"x" * 11), max_size=10)
+        assert too_large.error == "File size 11 B exceeds 10 B"
+        assert too_large.sha256 is None, "Oversized files should not be hashed"
+
+        missing = inspect_attachment("missing.png", max_size=10)
+        assert (missing.sha256, missing.error) == (None, None), "Missing files are reported by the upload"
+
+    @pytest.mark.api_handler
+    def test_identical_contents_are_uploaded_once_per_result(self, files, preflight):
+        screenshot = files("screenshot.png", b"image")
+        copy = files("screenshot_retry.png", b"image")
+        preflight.inspect([[screenshot, copy], [copy]])
+
+        assert preflight.check(screenshot, 100) == (True, None)
+        preflight.finish(screenshot, 100, uploaded=True)
+        assert preflight.check(copy, 100) == (False, None)
+        assert preflight.check(copy, 101) == (True, None), "Attachments cannot be shared between results"
+        assert (preflight.duplicates, preflight.bytes_saved) == (1, 5)
+
+    @pytest.mark.api_handler
+    def test_copy_is_uploaded_if_first_upload_fails(self, files, preflight):
+        screenshot = files("screenshot.png", b"image")
+        copy = files("screenshot_retry.png", b"image")
+        preflight.inspect([[screenshot, copy]])
+        assert preflight.check(screenshot, 100) == (True, None)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            waiting = executor.submit(preflight.check, copy, 100)
+            time.sleep(0.05)
+            assert not waiting.done(), "The copy should wait for the upload of the first file"
+            preflight.finish(screenshot, 100, uploaded=False)
+
+            assert waiting.result(timeout=5) == (True, None)
+        preflight.finish(copy, 100, uploaded=True)
+        assert preflight.check(screenshot, 100) == (False, None)
+        assert preflight.duplicates == 1
+
+    @pytest.mark.api_handler
+    def test_only_files_of_the_same_size_are_hashed(self, files, preflight):
+        log = files("log.txt", b"abc")
+        copy = files("log_copy.txt", b"abc")
+        other = files("other.txt", b"xyz")
+        screenshot = files("screenshot.png", b"image")
+        with patch.object(attachment_preflight, "hash_file", wraps=attachment_preflight.hash_file) as hash_file:
+            preflight.inspect([[log, screenshot], [copy, other, screenshot]])
+            assert preflight.info(log).sha256 is None, "Files of different sizes cannot be duplicates"
+
+            assert preflight.check(log, 100) == (True, None)
+            assert preflight.check(screenshot, 100) == (True, None)
+            assert preflight.check(copy, 101) == (True, None)
+            preflight.finish(copy, 101, uploaded=True)
+            assert preflight.check(other, 101) == (True, None), "Same size, different contents"
+            assert preflight.check(screenshot, 101) == (True, None)
+
+        assert sorted(call.args[0] for call in hash_file.call_args_list) == sorted([copy, other])
+        assert preflight.duplicates == 0
+
+    @pytest.mark.api_handler
+    def test_oversized_files_are_rejected(self, files, preflight):
+        assert preflight.check(files("video.mp4", b"x" * 11), 100) == (False, "File size 11 B exceeds 10 B")
+        assert preflight.check("missing.png", 100) == (True, None)
+        assert preflight.check("missing.png", 100) == (True, None), "Unreadable files are never duplicates"
+        assert preflight.rejected == 1
+
+    @pytest.mark.api_handler
+    def test_uploaded_contents_are_skipped(self, files, preflight):
+        log = files("log.txt", b"abc")
+        preflight.mark_uploaded(100, inspect_attachment(log).sha256)
+        preflight.inspect([[log, files("log_copy.txt", b"abc")]])
+        assert preflight.check(log, 100) == (False, None)
+
+    @pytest.mark.api_handler
+    def test_files_are_inspected_once(self, files, preflight):
+        log = files("log.txt", b"abc")
+        with patch.object(
+            attachment_preflight, "inspect_attachment", wraps=attachment_preflight.inspect_attachment
+        ) as inspect:
+            preflight.inspect([[log, log]] + [[log]] * 4)
+            for result_id in range(5):
+                preflight.check(log, result_id)
+        inspect.assert_called_once()
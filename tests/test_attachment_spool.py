@@ -0,0 +1,258 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from tests.helpers.api_client_helpers import TEST_RAIL_URL, create_url
+from trcli.api import attachment_preflight, attachment_spool
+from trcli.api.api_client import APIClient
+from trcli.api.attachment_spool import AttachmentSpool
+from trcli.cli import Environment
+from trcli.commands import cmd_attachments
+
+CONNECTION = {"host": TEST_RAIL_URL, "username": "user@example.com", "insecure": False, "timeout": 30}
+
+
+@pytest.fixture
+def spool_dir(tmp_path):
+    with patch.object(attachment_spool, "ATTACHMENT_SPOOL_DIR", tmp_path / "spool"):
+        yield tmp_path / "spool"
+
+
+@pytest.fixture
+def attachments(tmp_path):
+    paths = []
+    for name in ("screenshot.png", "log.txt"):
+        path = tmp_path / name
+        path.write_text(name)
+        paths.append(str(path))
+    return paths
+
+
+def finished_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+class TestAttachmentSpool:
+    @pytest.mark.api_handler
+    def test_create_and_load(self, spool_dir, attachments):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1), ("relative.txt", 101, 2)])
+
+        loaded = AttachmentSpool(spool.path)
+        assert loaded.load()
+        assert loaded.spool_id.startswith("run5-")
+        assert loaded.counts() == {"pending": 2, "uploaded": 0, "duplicate": 0, "failed": 0}
+        assert loaded.tasks[1]["file_path"] == os.path.abspath("relative.txt"), "Paths should be absolute"
+        assert [spool.spool_id for spool in attachment_spool.list_spools()] == [spool.spool_id]
+
+    @pytest.mark.api_handler
+    def test_upload_records_task_status(self, spool_dir, attachments, requests_mock):
+        requests_mock.post(create_url("add_attachment_to_result/100"), json={"attachment_id": 1})
+        requests_mock.post(create_url("add_attachment_to_result/101"), status_code=413, json={"error": "Too large"})
+        tasks = [(attachments[0], 100, 1), (attachments[1], 101, 2), ("missing.png", 100, 1)]
+        spool = AttachmentSpool.create(CONNECTION, 5, tasks)
+
+        counts = spool.upload(APIClient(TEST_RAIL_URL, retries=0), max_workers=2)
+
+        assert counts == {"pending": 0, "uploaded": 1, "duplicate": 0, "failed": 2}
+        loaded = AttachmentSpool(spool.path)
+        loaded.load()
+        assert loaded.state() == AttachmentSpool.FINISHED
+        assert [task["status"] for task in loaded.tasks] == ["uploaded", "failed", "failed"]
+        assert loaded.tasks[2]["error"] == "File not found"
+
+    @pytest.mark.api_handler
+    def test_upload_skips_uploaded_tasks(self, spool_dir, attachments, requests_mock):
+        upload_mock = requests_mock.post(create_url("add_attachment_to_result/100"), json={"attachment_id": 1})
+        spool = AttachmentSpool.create(CONNECTION, 5, [(path, 100, 1) for path in attachments])
+        spool.tasks[0]["status"] = AttachmentSpool.UPLOADED
+
+        spool.upload(APIClient(TEST_RAIL_URL, retries=0), max_workers=2)
+        assert upload_mock.call_count == 1
+
+    @pytest.mark.api_handler
+    def test_upload_runs_preflight_checks(self, spool_dir, attachments, tmp_path, requests_mock):
+        upload_mock = requests_mock.post(create_url("add_attachment_to_result/100"), json={"attachment_id": 1})
+        copy = tmp_path / "screenshot_copy.png"
+        copy.write_text("screenshot.png")
+        large = tmp_path / "video.mp4"
+        large.write_text("x" * 100)
+        tasks = [(attachments[0], 100, 1), (str(copy), 100, 1), (str(large), 100, 1)]
+        spool = AttachmentSpool.create(CONNECTION, 5, tasks, max_size=50)
+        spool.tasks[0]["status"] = AttachmentSpool.UPLOADED
+        spool.tasks[0]["sha256"] = attachment_preflight.inspect_attachment(attachments[0]).sha256
+
+        counts = spool.upload(APIClient(TEST_RAIL_URL, retries=0), max_workers=2)
+
+        assert counts == {"pending": 0, "uploaded": 1, "duplicate": 1, "failed": 1}
+        assert spool.tasks[2]["error"] == "File size 100 B exceeds 50 B"
+        assert upload_mock.call_count == 0, "Resumed upload should not upload contents again"
+
+    @pytest.mark.api_handler
+    def test_state(self, spool_dir, attachments):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)])
+        assert spool.state() == AttachmentSpool.INTERRUPTED, "Spool without background process"
+        spool.data["pid"] = os.getpid()
+        assert spool.state() == AttachmentSpool.RUNNING
+        spool.data["pid"] = finished_pid()
+        assert spool.state() == AttachmentSpool.INTERRUPTED
+        spool.data["finished_at"] = time.time()
+        assert spool.state() == AttachmentSpool.FINISHED
+
+    @pytest.mark.api_handler
+    def test_start_passes_credentials_through_environment(self, spool_dir, attachments):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)])
+        with patch("trcli.api.attachment_spool.subprocess.Popen") as popen:
+            popen.return_value.pid = 4321
+            spool.start({"password": "secret", "key": None, "proxy_user": None})
+        assert spool.data["pid"] == 4321
+
+        args, kwargs = popen.call_args
+        assert args[0] == [sys.executable, "-m", "trcli.api.attachment_spool", str(spool.path)]
+        assert kwargs["env"]["TRCLI_SPOOL_PASSWORD"] == "secret"
+        assert "TRCLI_SPOOL_KEY" not in kwargs["env"]
+        assert "secret" not in spool.path.read_text(), "Credentials must not be written to the spool"
+
+    @pytest.mark.api_handler
+    def test_start_keeps_progress_of_background_process(self, spool_dir, attachments):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)])
+
+        def finish_upload(*args, **kwargs):
+            background = AttachmentSpool(spool.path)
+            background.load()
+            background.tasks[0]["status"] = AttachmentSpool.UPLOADED
+            background.data["finished_at"] = time.time()
+            background.save()
+            return MagicMock(pid=4321)
+
+        with patch("trcli.api.attachment_spool.subprocess.Popen", side_effect=finish_upload):
+            spool.start({"password": "secret", "key": None, "proxy_user": None})
+
+        spool.load()
+        assert spool.state() == AttachmentSpool.FINISHED
+        assert spool.counts()[AttachmentSpool.UPLOADED] == 1
+
+    @pytest.mark.api_handler
+    def test_started_spool_is_running_before_background_process_records_its_pid(self, spool_dir, attachments):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)])
+        spool.data["pid"] = finished_pid()  # Interrupted upload being resumed
+        spool.save()
+        with patch("trcli.api.attachment_spool.subprocess.Popen") as popen:
+            popen.return_value.pid = 4321
+            spool.start({"password": "secret", "key": None, "proxy_user": None})
+
+        reader = AttachmentSpool(spool.path)
+        reader.load()
+        assert reader.data["pid"] is None
+        assert reader.state() == AttachmentSpool.RUNNING
+        with patch.object(attachment_spool.time, "time", return_value=time.time() + attachment_spool.SPOOL_START_GRACE):
+            assert reader.state() == AttachmentSpool.INTERRUPTED, "Background process did not start"
+
+    @pytest.mark.api_handler
+    def test_failed_start_is_not_running(self, spool_dir, attachments):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)])
+        with patch("trcli.api.attachment_spool.subprocess.Popen", side_effect=OSError("No such file")):
+            with pytest.raises(OSError):
+                spool.start({"password": None, "key": None, "proxy_user": None})
+
+        spool.load()
+        assert spool.state() == AttachmentSpool.INTERRUPTED
+
+    @pytest.mark.api_handler
+    def test_expired_spools_are_removed(self, spool_dir, attachments):
+        old = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)])
+        old.data["finished_at"] = time.time() - attachment_spool.ATTACHMENT_SPOOL_MAX_AGE - 1
+        old.save()
+        unfinished = AttachmentSpool.create(CONNECTION, 6, [(attachments[0], 100, 1)])
+        AttachmentSpool.create(CONNECTION, 7, [(attachments[0], 100, 1)])
+
+        assert not old.path.exists()
+        assert unfinished.path.exists()
+
+
+class TestCmdAttachments:
+    def setup_method(self):
+        self.runner = CliRunner()
+        self.environment = Environment(cmd="attachments")
+
+    def make_spool(self, attachments, statuses, finished=True, pid=None):
+        spool = AttachmentSpool.create(CONNECTION, 5, [(attachments[0], 100, 1)] * len(statuses))
+        for task, status in zip(spool.tasks, statuses):
+            task["status"] = status
+            task["error"] = "HTTP 413" if status == AttachmentSpool.FAILED else None
+        spool.data["finished_at"] = time.time() if finished else None
+        spool.data["pid"] = pid
+        spool.save()
+        return spool
+
+    @pytest.mark.cli
+    def test_status(self, spool_dir, attachments):
+        spool = self.make_spool(attachments, ["uploaded", "failed"])
+        with patch.object(self.environment, "log") as log, patch.object(self.environment, "elog") as elog:
+            result = self.runner.invoke(cmd_attachments.status, [], obj=self.environment)
+
+        assert result.exit_code == 0
+        log.assert_any_call(f"{spool.spool_id}: run 5, finished, uploaded 1/2, failed 1")
+        assert "HTTP 413" in elog.call_args[0][0]
+
+    @pytest.mark.cli
+    def test_status_unknown_spool(self, spool_dir):
+        result = self.runner.invoke(cmd_attachments.status, ["--spool-id", "unknown"], obj=self.environment)
+        assert result.exit_code == 1
+
+    @pytest.mark.cli
+    def test_wait_for_running_upload(self, spool_dir, attachments):
+        spool = self.make_spool(attachments, ["pending"], finished=False, pid=os.getpid())
+
+        def finish_upload(seconds):
+            spool.tasks[0]["status"] = AttachmentSpool.UPLOADED
+            spool.data["finished_at"] = time.time()
+            spool.save()
+
+        with patch("trcli.commands.cmd_attachments.time.sleep", side_effect=finish_upload) as sleep:
+            result = self.runner.invoke(cmd_attachments.wait, [], obj=self.environment)
+
+        assert result.exit_code == 0
+        sleep.assert_called_once()
+
+    @pytest.mark.cli
+    def test_wait_fails_for_failed_or_interrupted_uploads(self, spool_dir, attachments):
+        self.make_spool(attachments, ["uploaded", "failed"])
+        self.make_spool(attachments, ["pending"], finished=False, pid=finished_pid())
+
+        result = self.runner.invoke(cmd_attachments.wait, [], obj=self.environment)
+        assert result.exit_code == 1
+
+    @pytest.mark.cli
+    def test_resume_interrupted_upload(self, spool_dir, attachments):
+        self.make_spool(attachments, ["uploaded", "pending"], finished=False, pid=finished_pid())
+        self.make_spool(attachments, ["uploaded"])
+        self.environment.password = "secret"
+
+        with patch.object(AttachmentSpool, "start") as start:
+            result = self.runner.invoke(cmd_attachments.resume, [], obj=self.environment)
+
+        assert result.exit_code == 0
+        start.assert_called_once_with({"password": "secret", "key": None, "proxy_user": None})
+
+    @pytest.mark.cli
+    def test_resume_requires_credentials(self, spool_dir, attachments):
+        self.make_spool(attachments, ["pending"], finished=False, pid=finished_pid())
+        with patch.object(AttachmentSpool, "start") as start:
+            result = self.runner.invoke(cmd_attachments.resume, [], obj=self.environment)
+        assert result.exit_code == 1
+        start.assert_not_called()
+
+    @pytest.mark.cli
+    def test_wait_timeout(self, spool_dir, attachments):
+        self.make_spool(attachments, ["pending"], finished=False, pid=os.getpid())
+
+        result = self.runner.invoke(cmd_attachments.wait, ["--wait-timeout", "0"], obj=self.environment)
+        assert result.exit_code == 1
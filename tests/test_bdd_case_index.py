@@ -0,0 +1,113 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from trcli.api import bdd_case_index
+from trcli.api.api_client import APIClient
+from trcli.api.api_request_handler import ApiRequestHandler
+from trcli.api.bdd_case_index import BddCaseIndex
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+HOST = "https://test.testrail.com"
+BDD_FIELD = "custom_testrail_bdd_scenario"
+
+
+def normalize(name):
+    return name.lower()
+
+
+def make_case(case_id, title, bdd=True, updated_on=1000):
+    return {"id": case_id, "title": title, BDD_FIELD: "Scenario: x" if bdd else None, "updated_on": updated_on}
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    with patch.object(bdd_case_index, "BDD_INDEX_DIR", tmp_path):
+        yield tmp_path
+
+
+class TestBddCaseIndex:
+    @pytest.mark.cucumber_bdd_matching
+    def test_save_and_load(self, index_dir):
+        index = BddCaseIndex(HOST, 1, 2)
+        index.update([make_case(1, "Login"), make_case(2, "Search", bdd=False)], BDD_FIELD, normalize, full_scan=True)
+        index.save()
+
+        loaded = BddCaseIndex(HOST, 1, 2)
+        assert loaded.load()
+        assert not loaded.is_expired()
+        assert loaded.bdd_field_name == BDD_FIELD
+        assert loaded.updated_on == 1000
+        assert list(loaded.feature_names()) == ["login"], "Only BDD cases should be indexed"
+        assert loaded.feature_names()["login"][0]["id"] == 1
+
+    @pytest.mark.cucumber_bdd_matching
+    def test_indexes_are_separated_by_host_project_and_suite(self, index_dir):
+        index = BddCaseIndex(HOST, 1, 2)
+        index.update([make_case(1, "Login")], BDD_FIELD, normalize, full_scan=True)
+        index.save()
+
+        assert not BddCaseIndex(HOST, 1, 3).load()
+        assert not BddCaseIndex(HOST, 2, 2).load()
+        assert not BddCaseIndex("https://other.testrail.com", 1, 2).load()
+
+    @pytest.mark.cucumber_bdd_matching
+    def test_invalid_file_is_ignored(self, index_dir):
+        index = BddCaseIndex(HOST, 1, 2)
+        index.path.write_text("{not json")
+        assert not index.load()
+        index.path.write_text(json.dumps({"version": 0, "host": HOST, "project_id": 1, "suite_id": 2}))
+        assert not index.load()
+
+    @pytest.mark.cucumber_bdd_matching
+    def test_incremental_update(self, index_dir):
+        index = BddCaseIndex(HOST, 1, 2)
+        index.update([make_case(1, "Login"), make_case(2, "Search")], BDD_FIELD, normalize, full_scan=True)
+
+        updated = [make_case(1, "Sign in", updated_on=2000), make_case(2, "Search", bdd=False, updated_on=1500)]
+        index.update(updated + [make_case(3, "Checkout", updated_on=1800)], BDD_FIELD, normalize)
+
+        names = index.feature_names()
+        assert sorted(names) == ["checkout", "sign in"], "Renamed cases should be re-indexed, non-BDD cases removed"
+        assert index.updated_on == 2000
+
+    @pytest.mark.cucumber_bdd_matching
+    def test_expired_index(self, index_dir):
+        index = BddCaseIndex(HOST, 1, 2)
+        assert index.is_expired(), "Index without full scan should be expired"
+        index.update([make_case(1, "Login")], BDD_FIELD, normalize, full_scan=True)
+        assert not index.is_expired()
+        index.full_scan_at = time.time() - bdd_case_index.BDD_INDEX_MAX_AGE
+        assert index.is_expired()
+
+    @pytest.mark.cucumber_bdd_matching
+    def test_api_handler_updates_index_incrementally(self, index_dir):
+        environment = MagicMock()
+        environment.host = HOST
+        environment.bdd_index = True
+        client = MagicMock(spec=APIClient)
+        client.VERSION = "v2"
+
+        def make_handler():
+            return ApiRequestHandler(environment, client, TestRailSuite(name="test", suite_id=2), verify=False)
+
+        all_cases = [make_case(101, "User Login"), make_case(102, "Search", bdd=False)]
+        handler = make_handler()
+        handler._bdd_case_field_name = BDD_FIELD  # Resolved from get_case_fields
+        with patch.object(handler, "_ApiRequestHandler__get_all_cases", return_value=(all_cases, None)):
+            assert handler.find_bdd_case_by_name("User Login", 1, 2)[0] == 101
+
+        handler = make_handler()
+        updated_cases = [make_case(103, "Checkout", updated_on=1200)]
+        with patch.object(handler, "_ApiRequestHandler__get_all_cases") as get_all_cases, patch.object(
+            handler, "_ApiRequestHandler__get_all_entities", return_value=(updated_cases, None)
+        ) as get_all_entities:
+            assert handler.find_bdd_case_by_name("User Login", 1, 2)[0] == 101
+            assert handler.find_bdd_case_by_name("Checkout", 1, 2)[0] == 103
+
+        get_all_cases.assert_not_called()
+        get_all_entities.assert_called_once_with("cases", "get_cases/1&updated_after=999&suite_id=2", entities=[])
+        assert handler._bdd_case_field_name == BDD_FIELD, "BDD field name should be taken from the index"
+        client.send_get.assert_not_called()
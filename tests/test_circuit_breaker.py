@@ -0,0 +1,193 @@
+import pytest
+from requests.exceptions import ConnectionError, ProxyError, SSLError, Timeout
+
+from trcli.api import api_client
+from trcli.api.api_client import APIClient
+from trcli.api.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from trcli.logging.metrics import MetricsCollector
+from tests.helpers.api_client_helpers import TEST_RAIL_URL, create_url
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+
+
+@pytest.fixture
+def make_client(clock, mocker):
+    mocker.patch("trcli.api.api_client.sleep")
+    logs = []
+
+    def _make_client(retries=5):
+        client = APIClient(TEST_RAIL_URL, logging_function=logs.append, retries=retries, circuit_breaker_threshold=3)
+        client.circuit_breaker._clock = clock
+        client.metrics = MetricsCollector()
+        client.logs = logs
+        return client
+
+    yield _make_client
+    CircuitBreaker.reset_all()
+
+
+class TestCircuitBreaker:
+    @pytest.mark.api_client
+    def test_opens_after_consecutive_failures(self, breaker):
+        for failed in (True, True, False, True, True):
+            assert breaker.allow_request()
+            assert breaker.record(failed) is False
+        assert breaker.state == CLOSED
+
+        assert breaker.record(True) is True
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+        assert breaker.retry_in() == 30
+
+    @pytest.mark.api_client
+    def test_single_probe_closes_breaker(self, breaker, clock):
+        for _ in range(3):
+            breaker.record(True)
+        clock.now += 30
+
+        assert breaker.allow_request(), "First request after the reset timeout is the probe"
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow_request(), "Only one probe is sent"
+        breaker.record(False)
+
+        assert (breaker.state, breaker.failures) == (CLOSED, 0)
+        assert breaker.allow_request()
+
+    @pytest.mark.api_client
+    def test_failed_probe_opens_breaker_again(self, breaker, clock):
+        for _ in range(3):
+            breaker.record(True)
+        clock.now += 30
+        breaker.allow_request()
+
+        assert breaker.record(True) is False
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == 30
+
+    @pytest.mark.api_client
+    def test_lost_probe_is_replaced(self, breaker, clock):
+        for _ in range(3):
+            breaker.record(True)
+        clock.now += 30
+        breaker.allow_request()
+        clock.now += 30
+
+        assert breaker.allow_request()
+
+    @pytest.mark.api_client
+    def test_breaker_is_shared_per_host(self):
+        try:
+            breaker = CircuitBreaker.for_host("https://a.io/", 3, 30)
+
+            assert CircuitBreaker.for_host("https://a.io/", 5, 60) is breaker
+            assert CircuitBreaker.for_host("https://b.io/", 3, 30) is not breaker
+        finally:
+            CircuitBreaker.reset_all()
+
+
+class TestAPIClientCircuitBreaker:
+    @pytest.mark.api_client
+    def test_requests_fail_fast_once_host_is_down(self, make_client, requests_mock):
+        requests_mock.get(create_url("get_cases/1"), exc=ConnectionError)
+        client = make_client()
+
+        response = client.send_get("get_cases/1")
+
+        assert requests_mock.call_count == 3, "Retries should stop once the breaker is open"
+        assert response.status_code == -1
+        assert "did not respond to 3 consecutive requests" in response.error_message
+        assert client.logs == [
+            "TestRail instance did not respond to 3 consecutive requests, failing requests without sending them for 30s."
+        ]
+
+        other_client = make_client()
+        response = other_client.send_post("add_results_for_cases/1", {"results": []})
+
+        assert requests_mock.call_count == 3, "Other clients of the host should fail fast too"
+        assert "The next request is sent in 30s" in response.error_message
+
+    @pytest.mark.api_client
+    def test_server_errors_skip_backoff_once_breaker_opens(self, make_client, requests_mock):
+        requests_mock.get(create_url("get_tests/1"), status_code=503, json={"error": "Service Unavailable"})
+        client = make_client()
+
+        client.send_get("get_tests/1")
+
+        assert requests_mock.call_count == 3
+        assert api_client.sleep.call_count == 2, "No backoff should follow the request opening the breaker"
+        assert client.logs[-1].startswith("TestRail instance did not respond")
+
+    @pytest.mark.api_client
+    def test_probe_closes_breaker_when_host_is_back(self, make_client, requests_mock, clock):
+        requests_mock.get(create_url("get_cases/1"), exc=ConnectionError)
+        client = make_client(retries=2)
+        client.send_get("get_cases/1")
+        requests_mock.get(create_url("get_cases/1"), json={"cases": []})
+        clock.now += 30
+
+        response = client.send_get("get_cases/1")
+
+        assert (response.status_code, response.response_text) == (200, {"cases": []})
+        assert client.circuit_breaker.state == CLOSED
+
+    @pytest.mark.api_client
+    def test_client_errors_keep_breaker_closed(self, make_client, requests_mock):
+        requests_mock.get(create_url("get_case/1"), status_code=400, json={"error": "Invalid case"})
+        client = make_client()
+
+        for _ in range(5):
+            client.send_get("get_case/1")
+
+        assert requests_mock.call_count == 5
+        assert client.circuit_breaker.state == CLOSED
+
+    @pytest.mark.api_client
+    @pytest.mark.parametrize("error", [ProxyError, SSLError], ids=["proxy", "ssl"])
+    def test_local_errors_keep_breaker_closed(self, make_client, requests_mock, error):
+        requests_mock.get(create_url("get_case/1"), exc=error)
+        client = make_client()
+
+        for _ in range(5):
+            client.send_get("get_case/1")
+
+        assert client.circuit_breaker.failures == 0
+        assert client.circuit_breaker.state == CLOSED
+
+    @pytest.mark.api_client
+    def test_unreadable_upload_keeps_breaker_closed(self, make_client, tmp_path, mocker):
+        attachment = tmp_path / "screenshot.png"
+        attachment.write_bytes(b"png")
+        mocker.patch("trcli.api.api_client.requests.post", side_effect=OSError("File was removed"))
+        client = make_client()
+
+        for _ in range(5):
+            with attachment.open("rb") as file, pytest.raises(OSError):
+                client.send_post("add_attachment_to_result/1", files={"attachment": file})
+
+        assert client.circuit_breaker.failures == 0
+
+    @pytest.mark.api_client
+    def test_timeouts_open_breaker(self, make_client, requests_mock):
+        requests_mock.get(create_url("get_case/1"), exc=Timeout)
+        client = make_client()
+
+        client.send_get("get_case/1")
+
+        assert requests_mock.call_count == 3
+        assert client.circuit_breaker.state == OPEN
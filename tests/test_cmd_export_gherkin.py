@@ -255,3 +255,23 @@ Feature: Tëst with ūnīcödé 测试
                 assert "ūnīcödé" in content
                 assert "测试" in content
                 assert "🎉" in content
+
+    @pytest.mark.cmd_export_gherkin
+    @patch("trcli.commands.cmd_export_gherkin.ApiRequestHandler")
+    @patch("trcli.commands.cmd_export_gherkin.APIClient")
+    def test_export_gherkin_uses_request_options(self, mock_api_client_class, mock_api_handler_class):
+        """Test that the global request options configure the API client"""
+        mock_api_handler_class.return_value.get_bdd.return_value = (self.sample_feature_content, "")
+        self.environment.circuit_breaker = True
+        self.environment.circuit_breaker_threshold = 5
+        self.environment.circuit_breaker_reset = 30
+        self.environment.hedge_requests = True
+        self.environment.hedge_percentile = 95
+        self.environment.hedge_budget = 10
+
+        result = self.runner.invoke(cmd_export_gherkin.cli, ["--case-id", "456"], obj=self.environment)
+
+        assert result.exit_code == 0
+        client_kwargs = mock_api_client_class.call_args.kwargs
+        assert (client_kwargs["circuit_breaker_threshold"], client_kwargs["circuit_breaker_reset"]) == (5, 30)
+        assert (client_kwargs["hedge_percentile"], client_kwargs["hedge_budget"]) == (95, 10)
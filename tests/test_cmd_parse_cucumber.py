@@ -114,6 +114,9 @@ class TestCmdParseCucumber:
         mock_section.testcases = [mock_case]
         mock_suite.testsections = [mock_section]
         mock_parser.parse_file.return_value = [mock_suite]
+        mock_parser.iter_features.return_value = [
+            {"name": "Test Feature", "elements": [{"type": "scenario", "name": "Test Scenario"}]}
+        ]
 
         # Mock _generate_feature_content to return Gherkin content
         mock_parser._generate_feature_content.return_value = "Feature: Test\n  Scenario: Test\n    Given test step\n"
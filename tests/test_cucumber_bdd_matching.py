@@ -539,6 +539,29 @@ class TestCucumberBDDMatching:
 
         assert test_case is None
 
+    @pytest.mark.cucumber_bdd_matching
+    def test_parse_file_validates_cases_in_bulk(self):
+        """Test BDD matching mode fetches all matched cases at once instead of one get_case per feature"""
+        feature_with_tag = dict(self.sample_feature, tags=[{"name": "@C123"}])
+        feature_by_title = dict(self.sample_feature, name="User Logout")
+        with open(self.temp_file.name, "w") as f:
+            json.dump([feature_with_tag, feature_by_title], f)
+
+        parser = CucumberParser(self.environment)
+        mock_api_handler = self._create_mock_api_handler()
+        mock_api_handler.find_bdd_case_by_name.return_value = (456, None, [])
+        mock_api_handler.get_cases_by_ids.return_value = {
+            123: ({"id": 123, "custom_testrail_bdd_scenario": "Scenario: Test"}, ""),
+            456: ({"id": 456, "custom_testrail_bdd_scenario": "Scenario: Test"}, ""),
+        }
+        parser.set_api_handler(mock_api_handler)
+
+        suites = parser.parse_file(bdd_matching_mode=True, project_id=1, suite_id=2)
+
+        assert [section.testcases[0].case_id for section in suites[0].testsections] == [123, 456]
+        mock_api_handler.get_cases_by_ids.assert_called_once_with([123, 456])
+        mock_api_handler.client.send_get.assert_not_called()
+
     @pytest.mark.cucumber_bdd_matching
     def test_parse_feature_branching_bdd_mode(self):
         """Test _parse_feature branches correctly to BDD matching mode"""
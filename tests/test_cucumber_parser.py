@@ -41,6 +41,31 @@ class TestCucumberParser:
         assert section.name == "User Login"
         assert len(section.testcases) == 2
 
+    @pytest.mark.parse_cucumber
+    def test_cucumber_parser_skips_embeddings(self, environment, sample_cucumber_path, tmp_path):
+        """Test that embeddings do not change parsed results and are not kept in memory"""
+        import json
+
+        features = json.loads(sample_cucumber_path.read_text(encoding="utf-8"))
+        for feature in features:
+            for scenario in feature.get("elements", []):
+                for step in scenario.get("steps", []):
+                    step["embeddings"] = [{"mime_type": "image/png", "data": "iVBORw0KGgo=" * 10000}]
+        report = tmp_path / "cucumber_with_embeddings.json"
+        report.write_text(json.dumps(features), encoding="utf-8")
+
+        expected = CucumberParser(environment).parse_file()
+        environment.file = str(report)
+        parser = CucumberParser(environment)
+        suites = parser.parse_file()
+
+        assert suites[0].testsections == expected[0].testsections
+        assert parser.features_count == len(features)
+        steps = [
+            step for feature in parser.iter_features() for scenario in feature["elements"] for step in scenario["steps"]
+        ]
+        assert steps and all("embeddings" not in step for step in steps)
+
     @pytest.mark.parse_cucumber
     def test_cucumber_parser_scenarios(self, environment):
         """Test that scenarios are parsed correctly"""
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from trcli.readers.json_stream import iter_json_array, NotJsonArrayError
+
+FEATURES = [
+    {
+        "name": 'Feature "quoted" \\ backslash',
+        "elements": [
+            {
+                "type": "scenario",
+                "name": "Login [C1]",
+                "steps": [
+                    {
+                        "name": "step {with} [brackets], commas: and colons",
+                        "result": {"status": "failed", "duration": 1.5e9, "error_message": 'line\n\\"x\\"'},
+                        "embeddings": [{"mime_type": "image/png", "data": "QUJD" * 1000}],
+                    }
+                ],
+                "tags": [],
+            }
+        ],
+    },
+    {"name": "Ünïcode feature", "elements": [], "embeddings": {"nested": ["embeddings", {"embeddings": 1}]}},
+    {"name": "Empty", "elements": [{"type": "background", "steps": [{"embeddings": None, "name": "embeddings"}]}]},
+]
+
+
+def without_embeddings(value):
+    if isinstance(value, dict):
+        return {key: without_embeddings(item) for key, item in value.items() if key != "embeddings"}
+    if isinstance(value, list):
+        return [without_embeddings(item) for item in value]
+    return value
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    def _write(content, indent=None):
+        path = tmp_path / "report.json"
+        path.write_text(content if isinstance(content, str) else json.dumps(content, indent=indent), encoding="utf-8")
+        return path
+
+    return _write
+
+
+class TestJsonStream:
+    @pytest.mark.parse_cucumber
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 1024 * 1024])
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_items_match_json_load(self, json_file, chunk_size, indent):
+        path = json_file(FEATURES, indent=indent)
+        assert list(iter_json_array(path, chunk_size=chunk_size)) == FEATURES
+
+    @pytest.mark.parse_cucumber
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024 * 1024])
+    def test_skipped_keys_are_removed(self, json_file, chunk_size):
+        path = json_file(FEATURES)
+        items = list(iter_json_array(path, skip_keys=("embeddings",), chunk_size=chunk_size))
+        assert items == without_embeddings(FEATURES)
+
+    @pytest.mark.parse_cucumber
+    def test_items_are_read_incrementally(self, json_file):
+        path = json_file(FEATURES)
+        items = iter_json_array(path, chunk_size=16)
+        assert next(items) == FEATURES[0]
+        assert next(items) == FEATURES[1]
+
+    @pytest.mark.parse_cucumber
+    @pytest.mark.parametrize("content, expected", [("[]", []), (" [ ] \n", []), ('[1, "a", null]', [1, "a", None])])
+    def test_simple_arrays(self, json_file, content, expected):
+        assert list(iter_json_array(json_file(content))) == expected
+
+    @pytest.mark.parse_cucumber
+    @pytest.mark.parametrize("content", ['{"name": "feature"}', '"text"', ""])
+    def test_not_an_array(self, json_file, content):
+        with pytest.raises(NotJsonArrayError):
+            list(iter_json_array(json_file(content)))
+
+    @pytest.mark.parse_cucumber
+    @pytest.mark.parametrize(
+        "content",
+        ['[{"name": "feature"}', '[{"name": "feature}]', '[{"name": "feature"} {"name": 2}]', "[1] 2", "[{]"],
+        ids=["unclosed_array", "unterminated_string", "missing_comma", "trailing_data", "invalid_object"],
+    )
+    def test_invalid_json(self, json_file, content):
+        with pytest.raises(ValueError):
+            list(iter_json_array(json_file(content), skip_keys=("embeddings",), chunk_size=4))
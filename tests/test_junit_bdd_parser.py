@@ -453,6 +453,25 @@ class TestBDDJunitParser:
         assert len(sections[0].testcases) == 1  # One BDD test case
         assert sections[0].testcases[0].case_id == 42
 
+    def test_parse_sections_bdd_mode_validates_cases_in_bulk(self, environment, mock_api_validation_success):
+        """Test that BDD mode fetches all feature cases at once instead of one get_case per feature"""
+        test_file = Path(__file__).parent / "test_data" / "XML" / "bdd_valid_testsuite_property.xml"
+        environment.file = str(test_file)
+        parser = JunitParser(environment)
+        mock_api_handler = mock_api_validation_success.api_request_handler
+        case_data = mock_api_handler.client.send_get.return_value.response_text
+        mock_api_handler.get_cases_by_ids.return_value = {42: (case_data, "")}
+
+        from junitparser import JUnitXml
+
+        suite = JUnitXml.fromfile(test_file, parse_func=parser._add_root_element_to_tree)
+
+        sections = parser._parse_sections(suite)
+
+        assert sections[0].testcases[0].case_id == 42
+        mock_api_handler.get_cases_by_ids.assert_called_once_with([42])
+        mock_api_handler.client.send_get.assert_not_called()
+
     def test_parse_sections_standard_mode(self, environment):
         """Test that _parse_sections uses standard mode when BDD not enabled"""
         test_file = Path(__file__).parent / "test_data" / "XML" / "bdd_valid_testcase_names.xml"
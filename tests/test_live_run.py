@@ -0,0 +1,242 @@
+import threading
+
+import pytest
+
+from trcli.api.live_run import LiveRun, LiveRunError
+from trcli.cli import Environment
+from trcli.data_classes.dataclass_testrail import TestRailResult
+from trcli.pytest_plugin import LiveRunReporter
+
+pytest_plugins = ["pytester"]
+
+RUN_ID = 42
+
+
+@pytest.fixture
+def environment():
+    return Environment.from_options(host="https://fake_host.com/", project="Demo", title="Live", silent=True)
+
+
+@pytest.fixture
+def client(mocker):
+    """Fake project client recording the case IDs of every add_results call and the updates of the run"""
+    client = mocker.Mock(run_name="Live")
+    client.resolve_suite.return_value = (1, False)
+    client.create_or_update_test_run.return_value = (RUN_ID, "")
+    api_request_handler = client.api_request_handler
+    api_request_handler.uploads = []
+    api_request_handler.uploaded = threading.Event()
+    api_request_handler.result_handler.rejected_results = []
+
+    def add_results(run_id):
+        suite = api_request_handler.data_provider.suites_input
+        case_ids = [case.case_id for section in suite.testsections for case in section.testcases]
+        api_request_handler.uploads.append(case_ids)
+        api_request_handler.uploaded.set()
+        return [[{"id": case_id} for case_id in case_ids]], "", len(case_ids)
+
+    api_request_handler.add_results.side_effect = add_results
+    api_request_handler.update_run.return_value = ({}, "")
+    api_request_handler.close_run.return_value = ({}, "")
+    mocker.patch("trcli.api.live_run.ProjectBasedClient", return_value=client)
+    return client
+
+
+def result(case_id, status_id=1):
+    return TestRailResult(case_id=case_id, status_id=status_id)
+
+
+class TestLiveRun:
+    @pytest.mark.results_uploader
+    def test_results_are_added_once_batch_is_full(self, environment, client):
+        environment.batch_size = 2
+        live_run = LiveRun(environment, flush_interval=60)
+        assert live_run.open(case_ids=[1, 2, 3]) == RUN_ID
+
+        live_run.add_result(result(1))
+        live_run.add_result(result(2, status_id=5))
+        assert client.api_request_handler.uploaded.wait(timeout=5), "Full batch should be added while testing"
+        live_run.add_result(result(3))
+        assert live_run.close() == RUN_ID
+
+        assert sorted(sum(client.api_request_handler.uploads, [])) == [1, 2, 3]
+        assert live_run.results_added == 3
+        client.api_request_handler.update_run.assert_not_called()
+        client.api_request_handler.close_run.assert_not_called()
+
+    @pytest.mark.results_uploader
+    def test_results_are_added_after_flush_interval(self, environment, client):
+        live_run = LiveRun(environment, flush_interval=0.01)
+        live_run.open(case_ids=[1])
+        live_run.add_result(result(1))
+
+        assert client.api_request_handler.uploaded.wait(timeout=5)
+        live_run.close()
+        assert client.api_request_handler.uploads == [[1]]
+
+    @pytest.mark.results_uploader
+    def test_new_cases_are_added_to_the_run(self, environment, client):
+        with LiveRun(environment) as live_run:
+            live_run.add_result(result(7))
+            live_run.flush()
+            live_run.add_result(result(7, status_id=5))
+            live_run.flush()
+
+        client.api_request_handler.update_run.assert_called_once_with(RUN_ID, "Live")
+        assert client.api_request_handler.uploads == [[7], [7]]
+
+    @pytest.mark.results_uploader
+    def test_run_is_closed_once_all_results_were_added(self, environment, client):
+        environment.close_run = True
+        with LiveRun(environment) as live_run:
+            live_run.add_result(result(1))
+
+        assert client.api_request_handler.uploads == [[1]]
+        client.api_request_handler.close_run.assert_called_once_with(RUN_ID)
+
+    @pytest.mark.results_uploader
+    def test_failed_upload_is_raised_on_close(self, environment, client):
+        client.api_request_handler.add_results.side_effect = lambda run_id: ([], "Connection refused", 0)
+        live_run = LiveRun(environment)
+        live_run.open()
+        live_run.add_result(result(1))
+
+        with pytest.raises(LiveRunError, match="Connection refused"):
+            live_run.close()
+
+    @pytest.mark.results_uploader
+    def test_batch_is_added_again_if_its_cases_were_not_added(self, environment, client):
+        client.api_request_handler.update_run.side_effect = [({}, "Gateway timeout"), ({}, "")]
+        live_run = LiveRun(environment, flush_interval=60)
+        live_run.open(case_ids=[1])
+        live_run.add_result(result(2))
+
+        live_run.flush()
+        assert client.api_request_handler.uploads == []
+        live_run.add_result(result(3))
+
+        assert live_run.close() == RUN_ID
+        assert client.api_request_handler.uploads == [[2, 3]]
+        assert live_run.results_added == 2 and live_run.errors == []
+
+    @pytest.mark.results_uploader
+    def test_results_not_added_on_close_are_errors(self, environment, client):
+        client.api_request_handler.update_run.return_value = ({}, "Gateway timeout")
+        live_run = LiveRun(environment)
+        live_run.open(case_ids=[1])
+        live_run.add_result(result(1))
+        live_run.add_result(result(2))
+
+        with pytest.raises(LiveRunError, match="2 result.s. were not added.*Gateway timeout"):
+            live_run.close()
+        assert client.api_request_handler.uploads == []
+
+    @pytest.mark.results_uploader
+    def test_open_errors_are_raised(self, environment, client):
+        client.resolve_project.side_effect = SystemExit(1)
+        live_run = LiveRun(environment)
+
+        with pytest.raises(LiveRunError):
+            live_run.open()
+        with pytest.raises(LiveRunError):
+            live_run.add_result(result(1))
+        with pytest.raises(ValueError):
+            live_run.add_result(TestRailResult(status_id=1))
+
+    @pytest.mark.cli
+    def test_environment_from_options(self, tmp_path):
+        config = tmp_path / "config.yml"
+        config.write_text("host: https://config_host.com/\nproject: Config\nbatch_size: 10\n")
+
+        environment = Environment.from_options(config=config, project="Demo")
+
+        assert (environment.host, environment.project, environment.batch_size) == (
+            "https://config_host.com/",
+            "Demo",
+            10,
+        )
+        assert environment.timeout == 60, "Option defaults should be applied"
+        with pytest.raises(TypeError):
+            Environment.from_options(hostname="https://fake_host.com/")
+
+
+class TestPytestPlugin:
+    @pytest.mark.results_uploader
+    def test_results_are_added_per_case(self, pytester, mocker):
+        live_run = mocker.patch("trcli.api.live_run.LiveRun").return_value
+        live_run.run_id = RUN_ID
+        live_run.results_added = 4
+        pytester.makepyfile(
+            """
+            import pytest
+
+            @pytest.mark.testrail("C1", "C2")
+            def test_login():
+                pass
+
+            def test_logout_C3():
+                assert False
+
+            @pytest.mark.skip(reason="later")
+            def test_search_C4():
+                pass
+
+            def test_without_case_id():
+                pass
+            """
+        )
+        pytester.makefile(".yml", config="host: https://fake_host.com/\nproject: Demo\ntitle: Live\n")
+
+        outcome = pytester.runpytest_inprocess(
+            "-p", "trcli.pytest_plugin", "--testrail", "--testrail-config=config.yml"
+        )
+
+        outcome.assert_outcomes(passed=2, failed=1, skipped=1)
+        assert sorted(live_run.open.call_args.args[0]) == [1, 2, 3, 4]
+        results = [call.args[0] for call in live_run.add_result.call_args_list]
+        assert [(result.case_id, result.status_id) for result in results] == [(1, 1), (2, 1), (3, 5), (4, 4)]
+        assert "assert False" in results[2].comment
+        live_run.close.assert_called_once()
+        outcome.stdout.fnmatch_lines(["4 result(s) added to run 42*", "1 test(s) without case ID were not uploaded."])
+
+    @pytest.mark.results_uploader
+    def test_results_of_xdist_workers_are_added_by_controller(self, pytester, mocker):
+        live_run = mocker.patch("trcli.api.live_run.LiveRun").return_value
+        live_run.run_id = None
+        live_run.open.side_effect = lambda case_ids: setattr(live_run, "run_id", RUN_ID)
+        pytester.makeconftest(
+            """
+            import pytest
+
+            @pytest.hookimpl(tryfirst=True)
+            def pytest_configure(config):
+                config.workerinput = {"workerid": "gw0"}
+            """
+        )
+        pytester.makepyfile(
+            """
+            def test_login_C1():
+                pass
+
+            def test_without_case_id():
+                pass
+            """
+        )
+        pytester.makefile(".yml", config="host: https://fake_host.com/\nproject: Demo\ntitle: Live\n")
+        options = {"testrail": True, "testrail_config": "config.yml"}
+
+        worker = pytester.inline_run("-p", "trcli.pytest_plugin", "--testrail", "--testrail-config=config.yml")
+        live_run.open.assert_not_called()
+        controller = LiveRunReporter(mocker.Mock(getoption=options.get))
+        for report in worker.getreports("pytest_runtest_logreport"):
+            controller.pytest_runtest_logreport(report)
+
+        live_run.open.assert_called_once()
+        assert [call.args[0].case_id for call in live_run.add_result.call_args_list] == [1]
+        assert controller.tests_without_case_id == 1
+
+    @pytest.mark.results_uploader
+    def test_missing_options(self, pytester):
+        pytester.makepyfile("def test_login_C1(): pass")
+        outcome = pytester.runpytest_inprocess("-p", "trcli.pytest_plugin", "--testrail")
+        outcome.stderr.fnmatch_lines(["*missing TestRail option(s): host, project, title*"])
@@ -0,0 +1,201 @@
+"""
+Unit tests for metrics.py
+
+Tests performance metrics collection including:
+- Endpoint name normalization
+- Latency percentiles
+- Stage timing
+- Request compression savings
+- NDJSON summary and Prometheus textfile output
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from trcli.logging.metrics import MetricsCollector, endpoint_name, format_bytes, percentile
+from trcli.logging.structured_logger import StructuredLogger
+
+
+class TestEndpointName(unittest.TestCase):
+    """Test endpoint name normalization"""
+
+    def test_strips_ids_and_query(self):
+        """Test that ids and query parameters are removed"""
+        self.assertEqual(endpoint_name("get_cases/1&suite_id=2&offset=250"), "get_cases")
+        self.assertEqual(endpoint_name("add_results_for_cases/12"), "add_results_for_cases")
+        self.assertEqual(endpoint_name("get_projects"), "get_projects")
+
+    def test_strips_api_prefix(self):
+        """Test that pagination links with API prefix are normalized"""
+        self.assertEqual(endpoint_name("/api/v2/get_cases/1&suite_id=2&limit=250"), "get_cases")
+
+
+class TestPercentile(unittest.TestCase):
+    """Test nearest-rank percentile calculation"""
+
+    def test_percentiles(self):
+        """Test percentile values for a simple distribution"""
+        samples = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 50.0)
+        self.assertEqual(percentile(samples, 95), 95.0)
+        self.assertEqual(percentile(samples, 99), 99.0)
+
+    def test_empty_samples(self):
+        """Test that empty sample list returns zero"""
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+class TestFormatBytes(unittest.TestCase):
+    """Test human readable byte sizes"""
+
+    def test_units(self):
+        """Test that the largest fitting unit is used"""
+        self.assertEqual(format_bytes(512), "512 B")
+        self.assertEqual(format_bytes(1536), "1.5 KB")
+        self.assertEqual(format_bytes(12 * 1024 * 1024), "12.0 MB")
+        self.assertEqual(format_bytes(3 * 1024**3), "3.0 GB")
+
+
+class TestMetricsCollector(unittest.TestCase):
+    """Test MetricsCollector class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.metrics = MetricsCollector()
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up temp files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _record_sample_requests(self):
+        for duration in (0.1, 0.2, 0.3, 0.4):
+            self.metrics.record_request("GET", "get_cases/1&suite_id=1", 200, duration, 0, 1000)
+        self.metrics.record_request("POST", "add_results_for_cases/5", 429, 0.05, 500, 50)
+        self.metrics.record_retry("add_results_for_cases/5")
+        self.metrics.record_rate_limit_wait("add_results_for_cases/5", 3)
+        self.metrics.record_request("POST", "add_results_for_cases/5", 200, 0.5, 500, 200)
+
+    def test_summary(self):
+        """Test per-endpoint aggregation and totals"""
+        self._record_sample_requests()
+        summary = self.metrics.summary()
+
+        self.assertEqual(summary["total_requests"], 6)
+        self.assertEqual(summary["total_errors"], 1)
+        self.assertEqual(summary["total_retries"], 1)
+        self.assertEqual(summary["rate_limit_wait_s"], 3.0)
+        self.assertEqual(summary["bytes_sent"], 1000)
+        self.assertEqual(summary["bytes_received"], 4250)
+
+        get_cases = summary["endpoints"]["get_cases"]
+        self.assertEqual(get_cases["count"], 4)
+        self.assertEqual(get_cases["latency_ms"]["p50"], 200.0)
+        self.assertEqual(get_cases["latency_ms"]["p99"], 400.0)
+        self.assertEqual(get_cases["latency_ms"]["max"], 400.0)
+
+    def test_stage_timing_accumulates(self):
+        """Test that repeated stages are accumulated"""
+        with self.metrics.stage("results"):
+            pass
+        self.metrics.record_stage("results", 1.5)
+
+        self.assertGreaterEqual(self.metrics.summary()["stages"]["results"], 1.5)
+
+    def test_stage_recorded_on_exception(self):
+        """Test that stage time is recorded when the stage exits with an exception"""
+        with self.assertRaises(SystemExit):
+            with self.metrics.stage("cases"):
+                exit(1)
+
+        self.assertIn("cases", self.metrics.summary()["stages"])
+
+    def test_compression_savings(self):
+        """Test that bytes saved by compression are summed per endpoint and exported"""
+        self.metrics.record_compression("add_results_for_cases/5", 10000, 1500)
+        self.metrics.record_compression("add_results_for_cases/6", 8000, 1000)
+
+        summary = self.metrics.summary()
+        self.assertEqual(self.metrics.bytes_saved, 15500)
+        self.assertEqual(summary["bytes_saved"], 15500)
+        self.assertEqual(summary["endpoints"]["add_results_for_cases"]["compressed_requests"], 2)
+        self.assertIn(
+            'trcli_api_bytes_saved_total{endpoint="add_results_for_cases"} 15500', self.metrics.to_prometheus()
+        )
+
+    def test_upload_throughput(self):
+        """Test that streamed upload throughput is summarized per endpoint and exported"""
+        for size, duration in ((10 * 1024**2, 1.0), (10 * 1024**2, 4.0), (10 * 1024**2, 2.0)):
+            self.metrics.record_upload("add_attachment_to_result/5", size, duration)
+
+        endpoint = self.metrics.summary()["endpoints"]["add_attachment_to_result"]
+        self.assertEqual(endpoint["streamed_uploads"], 3)
+        self.assertEqual(endpoint["upload_throughput_mb_s"], {"p50": 5.0, "min": 2.5, "max": 10.0})
+        content = self.metrics.to_prometheus()
+        self.assertIn(
+            'trcli_api_upload_throughput_bytes_per_second{endpoint="add_attachment_to_result",quantile="0.5"} 5242880',
+            content,
+        )
+        self.assertIn(
+            'trcli_api_upload_throughput_bytes_per_second_count{endpoint="add_attachment_to_result"} 3', content
+        )
+
+    def test_has_data(self):
+        """Test has_data flag and reset"""
+        self.assertFalse(self.metrics.has_data)
+        self._record_sample_requests()
+        self.assertTrue(self.metrics.has_data)
+        self.metrics.reset()
+        self.assertFalse(self.metrics.has_data)
+
+    def test_emit_ndjson(self):
+        """Test that summary is emitted as a single NDJSON line"""
+        self._record_sample_requests()
+        output = StringIO()
+        logger = StructuredLogger("trcli.metrics", output_stream=output)
+
+        self.metrics.emit(logger)
+
+        lines = output.getvalue().strip().split("\n")
+        self.assertEqual(len(lines), 1)
+        entry = json.loads(lines[0])
+        self.assertEqual(entry["message"], "API performance summary")
+        self.assertEqual(entry["total_requests"], 6)
+        self.assertIn("get_cases", entry["endpoints"])
+
+    def test_write_prometheus(self):
+        """Test Prometheus textfile output"""
+        self._record_sample_requests()
+        self.metrics.record_stage("parse", 0.25)
+        file_path = os.path.join(self.temp_dir, "metrics", "trcli.prom")
+
+        error = self.metrics.write_prometheus(file_path)
+
+        self.assertIsNone(error)
+        with open(file_path) as f:
+            content = f.read()
+        self.assertIn("# TYPE trcli_api_requests_total counter", content)
+        self.assertIn('trcli_api_requests_total{endpoint="get_cases"} 4', content)
+        self.assertIn('trcli_api_retries_total{endpoint="add_results_for_cases"} 1', content)
+        self.assertIn('trcli_api_request_duration_seconds{endpoint="get_cases",quantile="0.95"} 0.400000', content)
+        self.assertIn('trcli_api_request_duration_seconds_count{endpoint="get_cases"} 4', content)
+        self.assertIn('trcli_stage_duration_seconds{stage="parse"} 0.25', content)
+        self.assertEqual(os.listdir(os.path.dirname(file_path)), ["trcli.prom"])
+
+    def test_write_prometheus_error(self):
+        """Test that write errors are returned instead of raised"""
+        blocker = os.path.join(self.temp_dir, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+
+        error = self.metrics.write_prometheus(os.path.join(blocker, "trcli.prom"))
+
+        self.assertIn("Could not write metrics file", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
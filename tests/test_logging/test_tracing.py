@@ -0,0 +1,118 @@
+"""
+Unit tests for tracing.py
+
+Tests span recording including:
+- Disabled tracer overhead
+- Stage nesting and parent attribution
+- Spans recorded from worker threads
+- Chrome trace file output
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from trcli.logging.metrics import MetricsCollector
+from trcli.logging.tracing import Tracer, get_tracer
+
+
+class TestTracer(unittest.TestCase):
+    """Test Tracer class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tracer = Tracer()
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up temp files and global tracer state"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        get_tracer().reset()
+
+    def _spans(self):
+        return [event for event in self.tracer.to_chrome_trace()["traceEvents"] if event["ph"] == "X"]
+
+    def test_disabled_tracer_records_nothing(self):
+        """Test that spans are not recorded until tracing is enabled"""
+        with self.tracer.span("results"):
+            self.tracer.add_span("GET get_cases", "http", self.tracer.now(), 0.1)
+
+        self.assertEqual(self._spans(), [])
+
+    def test_http_span_is_child_of_stage(self):
+        """Test that spans recorded inside a stage get the stage as parent"""
+        self.tracer.enable()
+        with self.tracer.span("sections"):
+            start = self.tracer.now()
+            self.tracer.add_span("POST add_section", "http", start, 0.01, endpoint="add_section", status=200)
+
+        http_span, stage_span = sorted(self._spans(), key=lambda event: event["cat"])
+        self.assertEqual(stage_span["name"], "sections")
+        self.assertEqual(stage_span["cat"], "stage")
+        self.assertNotIn("parent_id", stage_span["args"])
+        self.assertEqual(http_span["args"]["parent_id"], stage_span["args"]["span_id"])
+        self.assertEqual(http_span["args"]["status"], 200)
+        self.assertEqual(http_span["args"]["thread_id"], threading.get_ident())
+        self.assertEqual(http_span["dur"], 10000.0)
+
+    def test_worker_thread_spans_attributed_to_open_stage(self):
+        """Test that spans from worker threads get the currently open stage as parent"""
+        self.tracer.enable()
+        with self.tracer.span("results"):
+            stage_id = self.tracer.current_stage_id
+            worker = threading.Thread(
+                target=lambda: self.tracer.add_span("POST add_results_for_cases", "http", self.tracer.now(), 0.01)
+            )
+            worker.start()
+            worker.join()
+
+        http_span = [span for span in self._spans() if span["cat"] == "http"][0]
+        self.assertEqual(http_span["args"]["parent_id"], stage_id)
+        self.assertNotEqual(http_span["tid"], threading.get_ident())
+
+    def test_metrics_stage_records_span(self):
+        """Test that metrics stages are recorded as trace spans"""
+        tracer = get_tracer()
+        tracer.enable()
+        metrics = MetricsCollector()
+
+        with metrics.stage("run"):
+            pass
+
+        stage_spans = [e for e in tracer.to_chrome_trace()["traceEvents"] if e.get("cat") == "stage"]
+        self.assertEqual([span["name"] for span in stage_spans], ["run"])
+        self.assertIn("run", metrics.summary()["stages"])
+
+    def test_write_chrome_trace(self):
+        """Test trace file output including thread name metadata"""
+        self.tracer.enable()
+        with self.tracer.span("parse"):
+            pass
+        file_path = os.path.join(self.temp_dir, "out", "trace.json")
+
+        error = self.tracer.write(file_path)
+
+        self.assertIsNone(error)
+        with open(file_path) as f:
+            trace = json.load(f)
+        self.assertEqual(trace["displayTimeUnit"], "ms")
+        phases = [event["ph"] for event in trace["traceEvents"]]
+        self.assertEqual(phases, ["M", "X"])
+        self.assertEqual(trace["traceEvents"][0]["args"]["name"], threading.current_thread().name)
+
+    def test_write_error(self):
+        """Test that write errors are returned instead of raised"""
+        blocker = os.path.join(self.temp_dir, "blocker")
+        with open(blocker, "w") as f:
+            f.write("")
+
+        error = self.tracer.write(os.path.join(blocker, "trace.json"))
+
+        self.assertIn("Could not write trace file", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from trcli.api.multipart_stream import ByteBudget, MultipartFileStream
+
+BOUNDARY = "0123456789abcdef"
+
+
+@pytest.fixture
+def attachment(tmp_path):
+    path = tmp_path / "screenshot.png"
+    path.write_bytes(bytes(range(256)) * 40)
+    return path
+
+
+def encoded_by_requests(path) -> bytes:
+    with open(path, "rb") as file, patch("urllib3.filepost.choose_boundary", return_value=BOUNDARY):
+        return requests.Request("POST", "http://localhost", files={"attachment": file}).prepare().body
+
+
+class TestMultipartFileStream:
+    @pytest.mark.api_client
+    def test_body_matches_requests_encoding(self, attachment):
+        with open(attachment, "rb") as file:
+            stream = MultipartFileStream("attachment", file, chunk_size=1000, boundary=BOUNDARY)
+            body = b"".join(iter(lambda: stream.read(333), b""))
+
+        assert body == encoded_by_requests(attachment)
+        assert len(stream) == len(body)
+        assert stream.content_type == f"multipart/form-data; boundary={BOUNDARY}"
+
+    @pytest.mark.api_client
+    def test_read_all_and_iterate(self, attachment):
+        with open(attachment, "rb") as file:
+            assert MultipartFileStream("attachment", file, boundary=BOUNDARY).read() == encoded_by_requests(attachment)
+            file.seek(0)
+            stream = MultipartFileStream("attachment", file, chunk_size=4096, boundary=BOUNDARY)
+            assert b"".join(stream) == encoded_by_requests(attachment)
+
+    @pytest.mark.api_client
+    def test_truncated_file(self, attachment):
+        with open(attachment, "rb") as file:
+            stream = MultipartFileStream("attachment", file, chunk_size=1000)
+            attachment.write_bytes(b"short")
+            with pytest.raises(IOError):
+                stream.read()
+
+    @pytest.mark.api_client
+    def test_budget_is_shared_by_streams(self, attachment):
+        budget = ByteBudget(3000)
+        peak = []
+
+        def send():
+            with open(attachment, "rb") as file:
+                stream = MultipartFileStream("attachment", file, budget, chunk_size=1000)
+                try:
+                    while stream.read(500):
+                        peak.append(budget.in_flight)
+                        time.sleep(0.001)
+                finally:
+                    stream.close()
+
+        threads = [threading.Thread(target=send) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) <= 3000
+        assert budget.in_flight == 0, "Closed streams should release the budget"
+
+    @pytest.mark.api_client
+    def test_chunk_larger_than_budget(self, attachment):
+        budget = ByteBudget(100)
+        with open(attachment, "rb") as file:
+            stream = MultipartFileStream("attachment", file, budget, chunk_size=1000)
+            assert len(stream.read()) == len(stream)
+            stream.close()
+        assert budget.in_flight == 0
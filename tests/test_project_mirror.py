@@ -0,0 +1,201 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from trcli.api import project_mirror
+from trcli.api.api_client import APIClient
+from trcli.api.api_request_handler import ApiRequestHandler
+from trcli.api.project_mirror import ProjectMirror
+from trcli.api.record_projection import CASE_PROJECTION, Projection
+from trcli.cli import Environment
+from trcli.commands import cmd_mirror
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+HOST = "https://test.testrail.com"
+
+
+def make_case(case_id, title, suite_id=2, updated_on=1000, **fields):
+    return {"id": case_id, "title": title, "suite_id": suite_id, "section_id": 5, "updated_on": updated_on, **fields}
+
+
+class FakeCasesApi:
+    """Cases of a suite with the get_cases listings used by the mirror, counting the listings"""
+
+    def __init__(self, cases):
+        self.cases = cases
+        self.calls = []
+
+    def fetch_all(self):
+        self.calls.append("all")
+        return list(self.cases), ""
+
+    def fetch_updated_after(self, updated_after):
+        self.calls.append(updated_after)
+        return [case for case in self.cases if case["updated_on"] >= updated_after], ""
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    with patch.object(project_mirror, "MIRROR_PATH", tmp_path / "mirror.db"):
+        yield ProjectMirror(HOST)
+
+
+class TestProjectMirror:
+    @pytest.mark.api_handler
+    def test_cases_are_synced_incrementally(self, mirror):
+        api = FakeCasesApi([make_case(1, "Login"), make_case(2, "Search")])
+        cases, error_message = mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after)
+        assert (len(cases), error_message) == (2, "")
+
+        api.cases = [make_case(1, "Sign in", updated_on=2000), make_case(2, "Search"), make_case(3, "Cart", 3, 1500)]
+        cases, _ = mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after)
+
+        assert api.calls == ["all", 1000]
+        assert [(case["id"], case["title"]) for case in cases] == [(1, "Sign in"), (2, "Search")]
+        assert [case["id"] for case in mirror.find_cases(1, 3)[0]] == [3], "Moved case should change its suite"
+
+    @pytest.mark.api_handler
+    def test_expired_mirror_is_listed_again(self, mirror):
+        api = FakeCasesApi([make_case(1, "Login"), make_case(2, "Search")])
+        mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after)
+        api.cases = [make_case(1, "Login")]
+
+        with patch.object(project_mirror.time, "time", return_value=time.time() + project_mirror.MIRROR_MAX_AGE):
+            cases, _ = mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after)
+
+        assert api.calls == ["all", "all"]
+        assert [case["id"] for case in cases] == [1], "Deleted cases should be removed by a full listing"
+
+    @pytest.mark.api_handler
+    def test_find_cases(self, mirror):
+        cases = [
+            make_case(1, "Login 100%", priority_id=3, custom_automation_id="tests.test_login"),
+            make_case(2, "Login_failed", priority_id=4, custom_case_automation_id="tests.test_login_failed"),
+            make_case(3, "Search", priority_id=3),
+        ]
+        api = FakeCasesApi(cases)
+        mirror.sync_cases(1, None, api.fetch_all, api.fetch_updated_after)
+
+        def ids(**filters):
+            found, total = mirror.find_cases(1, **filters)
+            return [case["id"] for case in found], total
+
+        assert ids(automation_id="tests.test_login_failed") == ([2], 1)
+        assert ids(title="Search") == ([3], 1)
+        assert ids(title_contains="login") == ([1, 2], 2)
+        assert ids(title_contains="100%") == ([1], 1)
+        assert ids(title_contains="n_f") == ([2], 1)
+        assert ids(priority_ids=[3]) == ([1, 3], 2)
+        assert ids(offset=1, limit=1) == ([2], 3)
+        assert mirror.find_cases(1)[0][0] == cases[0], "Cases should be returned as listed by TestRail"
+        assert mirror.find_cases(2) == ([], 0)
+
+    @pytest.mark.api_handler
+    def test_projected_cases_are_read_from_columns(self, mirror):
+        api = FakeCasesApi(
+            [make_case(1, "Login", template_id=1, custom_automation_id="tests.test_login"), make_case(2, "Search")]
+        )
+        mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after)
+
+        with patch.object(project_mirror.json, "loads") as loads:
+            cases, _ = mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after, projection=CASE_PROJECTION)
+
+        loads.assert_not_called()
+        assert all(isinstance(case, CASE_PROJECTION.record_type) for case in cases)
+        assert cases[0] == CASE_PROJECTION.project_one(api.cases[0])
+        assert "template_id" not in cases[1], "Null columns should be missing fields"
+        with pytest.raises(ValueError):
+            mirror.find_cases(1, 2, projection=Projection("cases", ("id", "custom_preconds")))
+
+    @pytest.mark.api_handler
+    def test_status_and_clear(self, mirror):
+        mirror.sync_entities("projects", lambda: ([{"id": 1, "name": "Demo"}], ""))
+        mirror.sync_entities("sections", lambda: ([{"id": 5, "name": "Login", "suite_id": 2}], ""), 1, 2)
+        mirror.sync_entities("sections", lambda: ([{"id": 6, "name": "Search", "suite_id": 2}], ""), 1, 2)
+
+        status = {(sync["entity"], sync["project_id"], sync["suite_id"]): sync["count"] for sync in mirror.status()}
+        assert status == {("projects", None, None): 1, ("sections", 1, 2): 1}
+        assert ProjectMirror("https://other.testrail.com").status() == []
+
+        mirror.clear()
+        assert mirror.status() == []
+
+    @pytest.mark.api_handler
+    def test_unusable_mirror_falls_back_to_testrail(self, tmp_path):
+        mirror = ProjectMirror(HOST, tmp_path)  # A directory is no SQLite database
+        api = FakeCasesApi([make_case(1, "Login")])
+
+        assert mirror.sync_cases(1, 2, api.fetch_all, api.fetch_updated_after) == ([make_case(1, "Login")], "")
+        assert mirror.sync_entities("projects", lambda: ([{"id": 1}], "")) == ([{"id": 1}], "")
+
+    @pytest.mark.api_handler
+    def test_api_handler_reads_cases_from_mirror(self, mirror):
+        environment = MagicMock()
+        environment.host = HOST
+        environment.mirror = True
+        client = MagicMock(spec=APIClient)
+        client.VERSION = "/api/v2/"
+        listed = [make_case(1, "Login"), make_case(2, "Sign up")]
+
+        def make_handler():
+            return ApiRequestHandler(environment, client, TestRailSuite(name="test", suite_id=2), verify=False)
+
+        with patch.object(ApiRequestHandler, "_ApiRequestHandler__get_all_entities", return_value=(listed, "")):
+            assert make_handler().sync_mirror(1, 2) == ({"suites": 1, "sections": 2, "cases": 2}, "")
+        with patch.object(
+            ApiRequestHandler, "_ApiRequestHandler__get_all_entities", return_value=([], "")
+        ) as get_all_entities:
+            response, error_message = make_handler().get_mirrored_cases(1, 2, filter_text="i", limit=1)
+
+        get_all_entities.assert_called_once_with("cases", "get_cases/1&updated_after=999&suite_id=2", entities=[])
+        assert error_message == ""
+        assert [case["id"] for case in response["cases"]] == [1]
+        assert response["_links"]["next"] == "/api/v2/get_cases/1&suite_id=2&limit=1&offset=1"
+
+    @pytest.mark.api_handler
+    def test_cases_are_filtered_without_usable_mirror(self, tmp_path):
+        environment = MagicMock()
+        environment.host = HOST
+        environment.mirror = True
+        client = MagicMock(spec=APIClient)
+        client.VERSION = "/api/v2/"
+        listed = [make_case(3, "Login failed", priority_id=2), make_case(1, "Login"), make_case(2, "Search")]
+        with patch.object(project_mirror, "MIRROR_PATH", tmp_path):  # A directory is no SQLite database
+            handler = ApiRequestHandler(environment, client, TestRailSuite(name="test", suite_id=2), verify=False)
+        with patch.object(ApiRequestHandler, "_ApiRequestHandler__get_all_entities", return_value=(listed, "")):
+            response, error_message = handler.get_mirrored_cases(1, 2, filter_text="LOGIN", limit=1)
+            prioritized, _ = handler.get_mirrored_cases(1, 2, priority_id="2")
+
+        assert error_message == ""
+        assert [case["id"] for case in response["cases"]] == [1]
+        assert response["cases"][0] == make_case(1, "Login"), "Cases should be returned as listed by TestRail"
+        assert response["_links"]["next"] == "/api/v2/get_cases/1&suite_id=2&limit=1&offset=1"
+        assert [case["id"] for case in prioritized["cases"]] == [3]
+
+
+class TestCmdMirror:
+    @pytest.mark.cli
+    def test_sync(self, mirror):
+        environment = Environment(cmd="mirror")
+        environment.host = HOST
+        with patch("trcli.commands.cmd_mirror.ProjectBasedClient") as project_client, patch.object(
+            environment, "set_parameters"
+        ), patch.object(environment, "check_for_required_parameters"), patch.object(environment, "log") as log:
+            api_request_handler = project_client.return_value.api_request_handler
+            api_request_handler.sync_mirror.return_value = ({"suites": 2, "sections": 7, "cases": 90}, "")
+            result = CliRunner().invoke(cmd_mirror.cli, ["sync", "--suite-id", "3"], obj=environment)
+
+        assert result.exit_code == 0
+        assert environment.mirror is True
+        api_request_handler.sync_mirror.assert_called_once_with(project_client.return_value.project.project_id, 3)
+        assert "Synced 2 suite(s), 7 section(s) and 90 case(s)" in log.call_args.args[0]
+
+    @pytest.mark.cli
+    def test_status_without_host(self):
+        environment = Environment(cmd="mirror")
+        with patch.object(environment, "set_parameters"):
+            result = CliRunner().invoke(cmd_mirror.cli, ["status"], obj=environment)
+
+        assert result.exit_code == 1
@@ -0,0 +1,122 @@
+import sys
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from trcli.api.api_client import APIClient, APIClientResult
+from trcli.api.api_request_handler import ApiRequestHandler
+from trcli.api.record_projection import CASE_PROJECTION, Projection
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+
+def make_case(case_id, **fields):
+    return {
+        "id": case_id,
+        "suite_id": 2,
+        "section_id": 5,
+        "template_id": 1,
+        "title": f"Case {case_id}",
+        "custom_automation_id": f"tests.test_{case_id}",
+        "custom_steps_separated": [{"content": "Open the login page" * 20, "expected": "Page is shown" * 20}],
+        "custom_preconds": "<p>Logged out</p>" * 50,
+        "labels": [{"id": 1, "title": "smoke"}],
+        **fields,
+    }
+
+
+@pytest.fixture
+def handler():
+    environment = MagicMock()
+    environment.mirror = None
+    environment.parallel_pagination = False
+    client = MagicMock(spec=APIClient)
+    client.VERSION = "/api/v2/"
+    pages = {
+        None: {"cases": [make_case(1), make_case(2)], "_links": {"next": "/api/v2/get_cases/1&limit=250&offset=250"}},
+        "250": {"cases": [make_case(3)], "_links": {"next": None}},
+    }
+
+    def send_get(link):
+        offset = link.split("offset=")[1].split("&")[0] if "offset=" in link else None
+        if offset not in pages:
+            time.sleep(0.01)  # Pages past the end complete after the last page with cases
+        return APIClientResult(200, pages.get(offset, {"cases": []}), "")
+
+    client.send_get.side_effect = send_get
+    return ApiRequestHandler(environment, client, TestRailSuite(name="test", suite_id=2), verify=False)
+
+
+class TestRecordProjection:
+    @pytest.mark.api_handler
+    def test_records_behave_like_read_only_dicts(self):
+        record = CASE_PROJECTION.project_one(make_case(1, template_id=None, custom_case_automation_id="a.b"))
+
+        assert record["id"] == 1
+        assert record.get("template_id", 3) is None
+        assert record.get("labels") is None
+        assert "custom_preconds" not in record and "title" in record
+        assert record == {
+            k: v
+            for k, v in make_case(1, template_id=None, custom_case_automation_id="a.b").items()
+            if k in CASE_PROJECTION.fields
+        }
+        with pytest.raises(KeyError):
+            record["custom_preconds"]
+        with pytest.raises(AttributeError):
+            record.labels = []
+
+    @pytest.mark.api_handler
+    def test_missing_fields_are_missing_from_records(self):
+        record = CASE_PROJECTION.project_one({"id": 1, "title": "Login"})
+
+        assert dict(record) == {"id": 1, "title": "Login"}
+        assert len(record) == 2
+        with pytest.raises(KeyError):
+            record["section_id"]
+
+    @pytest.mark.api_handler
+    def test_records_are_smaller_than_dicts(self):
+        case = make_case(1)
+        record = CASE_PROJECTION.project_one(case)
+
+        assert sys.getsizeof(record) < sys.getsizeof(case) / 2
+
+    @pytest.mark.api_handler
+    def test_invalid_fields(self):
+        with pytest.raises(ValueError):
+            Projection("cases", ("id", "custom-field"))
+
+
+class TestProjectedCaseListing:
+    @pytest.mark.api_handler
+    def test_cases_are_projected_page_by_page(self, handler):
+        cases, error_message = handler._ApiRequestHandler__get_all_cases(1, 2)
+
+        assert error_message == ""
+        assert [case["id"] for case in cases] == [1, 2, 3]
+        assert all(isinstance(case, CASE_PROJECTION.record_type) for case in cases)
+        assert "custom_steps_separated" not in cases[0]
+
+    @pytest.mark.api_handler
+    def test_parallel_pages_are_projected(self, handler):
+        handler.environment.parallel_pagination = True
+        cases, error_message = handler._ApiRequestHandler__get_all_cases(1, 2)
+
+        assert [case["id"] for case in cases] == [1, 2, 3]
+        assert all(isinstance(case, CASE_PROJECTION.record_type) for case in cases)
+
+    @pytest.mark.api_handler
+    def test_full_payloads_on_request(self, handler):
+        cases, error_message = handler._ApiRequestHandler__get_all_cases(1, 2, full=True)
+
+        assert cases == [make_case(1), make_case(2), make_case(3)]
+
+    @pytest.mark.api_handler
+    def test_cases_by_label_keep_their_labels(self, handler):
+        handler.label_manager.get_labels = MagicMock(return_value=({"labels": [{"id": 1, "title": "smoke"}]}, ""))
+
+        cases, error_message = handler.get_cases_by_label(1, 2, label_title="smoke")
+
+        assert error_message == ""
+        assert [case["labels"] for case in cases] == [[{"id": 1, "title": "smoke"}]] * 3
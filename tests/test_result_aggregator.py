@@ -0,0 +1,69 @@
+import pytest
+
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailResult, TestRailSection, TestRailSuite
+from trcli.data_providers.api_data_provider import ApiDataProvider
+from trcli.data_providers.result_aggregator import aggregate_results
+
+EXECUTIONS = [
+    {"case_id": 1, "status_id": 5, "comment": "Timeout", "elapsed": "3s", "attachments": ["a.png"], "defects": "BUG-1"},
+    {"case_id": 2, "status_id": 1, "comment": "", "elapsed": "1s", "attachments": []},
+    {"case_id": 1, "status_id": 4, "comment": "Skipped", "elapsed": "1s", "attachments": []},
+    {
+        "case_id": 1,
+        "status_id": 1,
+        "comment": "",
+        "elapsed": "2s",
+        "attachments": ["a.png", "b.png"],
+        "defects": "BUG-2",
+    },
+]
+
+
+class TestAggregateResults:
+    @pytest.mark.data_provider
+    @pytest.mark.parametrize("mode", [None, "unknown"])
+    def test_disabled(self, mode):
+        assert aggregate_results(EXECUTIONS, mode) == EXECUTIONS
+
+    @pytest.mark.data_provider
+    def test_last_wins(self):
+        assert aggregate_results(EXECUTIONS, "last") == [EXECUTIONS[3], EXECUTIONS[1]]
+
+    @pytest.mark.data_provider
+    def test_worst_wins(self):
+        assert aggregate_results(EXECUTIONS, "worst") == [EXECUTIONS[0], EXECUTIONS[1]]
+
+    @pytest.mark.data_provider
+    def test_merge(self):
+        merged, single = aggregate_results(EXECUTIONS, "merge")
+
+        assert single is EXECUTIONS[1]
+        assert merged["status_id"] == 1, "Merged result should have the status of the last execution"
+        assert merged["elapsed"] == "6s"
+        assert merged["attachments"] == ["a.png", "b.png"]
+        assert merged["defects"] == "BUG-1,BUG-2"
+        assert merged["comment"] == (
+            "Executed 3 times: 1 failed, 1 retest, 1 passed.\n\n"
+            "Attempt 1/3 (failed):\nTimeout\n\n"
+            "Attempt 2/3 (retest):\nSkipped\n\n"
+            "Attempt 3/3 (passed)"
+        )
+        assert EXECUTIONS[3]["comment"] == "", "Input results should not be modified"
+
+
+class TestApiDataProviderAggregation:
+    @pytest.mark.data_provider
+    def test_failures_are_assigned_after_aggregation(self):
+        cases = [
+            TestRailCase("test_login", case_id=1, result=TestRailResult(case_id=1, status_id=5)),
+            TestRailCase("test_login", case_id=1, result=TestRailResult(case_id=1, status_id=5)),
+            TestRailCase("test_logout", case_id=2, result=TestRailResult(case_id=2, status_id=5)),
+        ]
+        suite = TestRailSuite("Suite", testsections=[TestRailSection("Section", testcases=cases)])
+        data_provider = ApiDataProvider(suite, result_aggregation="last")
+
+        (results,) = data_provider.results_for_cases(user_ids=[10, 20])
+
+        assert [(result["case_id"], result["assignedto_id"]) for result in results] == [(1, 10), (2, 20)]
+        assert data_provider._aggregated_count == 1
+        assert data_provider._total_failed_count == 2
@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from trcli.api.api_client import APIClientResult
+from trcli.api.result_batch_retry import RejectedResult, ResultBatchRetrier
+
+INVALID_FIELD = "Field :custom_environment is not a valid value."
+
+
+def batch(*case_ids):
+    return {"results": [{"case_id": case_id, "status_id": 1} for case_id in case_ids]}
+
+
+class FakeServer:
+    """Rejects batches containing bad case ids, fails the first `transient_failures` requests with 503"""
+
+    def __init__(self, bad_case_ids=(), transient_failures=0, status_code=400):
+        self.bad_case_ids = set(bad_case_ids)
+        self.transient_failures = transient_failures
+        self.status_code = status_code
+        self.requests = []
+
+    def send(self, body):
+        case_ids = [result["case_id"] for result in body["results"]]
+        self.requests.append(case_ids)
+        if self.transient_failures:
+            self.transient_failures -= 1
+            return APIClientResult(503, {}, "Service unavailable")
+        if self.bad_case_ids.intersection(case_ids):
+            return APIClientResult(self.status_code, {"error": INVALID_FIELD}, INVALID_FIELD)
+        return APIClientResult(200, [{"id": 100 + case_id} for case_id in case_ids], "")
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+def recover(server, executor, body, **kwargs):
+    added = []
+    retrier = ResultBatchRetrier(
+        server.send,
+        executor,
+        on_success=lambda body, response: added.extend(result["case_id"] for result in body["results"]),
+        verbose_logging_function=lambda message: None,
+        **kwargs,
+    )
+    handled = retrier.recover(body, server.send(body))
+    return retrier, handled, retrier.wait(), sorted(added)
+
+
+class TestResultBatchRetrier:
+    @pytest.mark.results_uploader
+    def test_bisect_isolates_rejected_results(self, executor):
+        server = FakeServer(bad_case_ids={3, 6})
+        retrier, handled, error, added = recover(server, executor, batch(1, 2, 3, 4, 5, 6, 7, 8))
+
+        assert handled
+        assert error == ""
+        assert added == [1, 2, 4, 5, 7, 8]
+        assert sorted(retrier.rejected, key=lambda rejected: rejected.case_id) == [
+            RejectedResult(3, INVALID_FIELD),
+            RejectedResult(6, INVALID_FIELD),
+        ]
+
+    @pytest.mark.results_uploader
+    def test_transient_failure_is_retried_with_backoff(self, executor):
+        server = FakeServer(transient_failures=2)
+        with patch("trcli.api.result_batch_retry.sleep") as sleep:
+            retrier, handled, error, added = recover(server, executor, batch(1, 2))
+
+        assert (handled, error, added) == (True, "", [1, 2])
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 2]
+        assert server.requests == [[1, 2]] * 3, "Transient failures should resend the whole batch"
+
+    @pytest.mark.results_uploader
+    def test_transient_failure_retries_are_limited(self, executor):
+        server = FakeServer(transient_failures=5)
+        with patch("trcli.api.result_batch_retry.sleep"):
+            retrier, handled, error, added = recover(server, executor, batch(1, 2), max_retries=2)
+
+        assert (handled, error, added) == (True, "Service unavailable", [])
+        assert len(server.requests) == 3
+
+    @pytest.mark.results_uploader
+    def test_unrecoverable_error(self, executor):
+        server = FakeServer(bad_case_ids={1}, status_code=403)
+        retrier, handled, error, added = recover(server, executor, batch(1, 2))
+
+        assert not handled
+        assert server.requests == [[1, 2]]
+
+    @pytest.mark.results_uploader
+    def test_too_many_rejected_results_fail_the_upload(self, executor):
+        server = FakeServer(bad_case_ids=set(range(8)))
+        retrier, handled, error, added = recover(server, executor, batch(*range(8)), max_rejected=2)
+
+        assert error == INVALID_FIELD
+        assert len(retrier.rejected) == 3
@@ -0,0 +1,70 @@
+import pytest
+
+from trcli.api.result_batcher import AdaptiveResultBatcher
+from trcli.data_providers.api_data_provider import json_size
+
+
+def make_results(amount, comment_size=10):
+    return [{"case_id": 1000 + i, "status_id": 1, "comment": "x" * comment_size} for i in range(amount)]
+
+
+def drain(batcher):
+    batches = []
+    while (batch := batcher.next_batch()) is not None:
+        batches.append(batch)
+    return batches
+
+
+class TestAdaptiveResultBatcher:
+    @pytest.mark.api_handler
+    def test_initial_batches_use_initial_size(self):
+        batcher = AdaptiveResultBatcher([make_results(25)], 10, target_latency=1)
+        sizes = [len(batch["results"]) for batch in drain(batcher)]
+        assert sizes == [10, 10, 5], "Batches sent before any response should use the initial size"
+        assert batcher.total == 25
+
+    @pytest.mark.api_handler
+    def test_groups_are_not_mixed(self):
+        without_rating = make_results(3)
+        with_rating = [dict(result, quality_rating=5) for result in make_results(2)]
+        batcher = AdaptiveResultBatcher([without_rating, with_rating], 10, target_latency=1)
+        batches = [batch["results"] for batch in drain(batcher)]
+        assert batches == [without_rating, with_rating], "Each group should be sent in separate batches"
+
+    @pytest.mark.api_handler
+    def test_batches_respect_max_bytes(self):
+        results = make_results(10, comment_size=100)
+        max_bytes = json_size(results[0]) * 3
+        batcher = AdaptiveResultBatcher([results], 10, target_latency=1, max_bytes=max_bytes)
+        sizes = [len(batch["results"]) for batch in drain(batcher)]
+        assert sizes == [3, 3, 3, 1], "Batches should not exceed max_bytes"
+
+    @pytest.mark.api_handler
+    def test_fast_responses_grow_batches(self):
+        batcher = AdaptiveResultBatcher([make_results(1000)], 10, target_latency=1)
+        sizes = []
+        while (batch := batcher.next_batch()) is not None:
+            sizes.append(len(batch["results"]))
+            batcher.record(batch, 0.01)
+        assert sizes[:4] == [10, 20, 40, 80], "Batch size should double at most per response"
+        assert max(sizes) <= 500, "Batch size should not exceed the maximum"
+
+    @pytest.mark.api_handler
+    def test_slow_responses_shrink_batches(self):
+        batcher = AdaptiveResultBatcher([make_results(100)], 40, target_latency=1)
+        batch = batcher.next_batch()
+        batcher.record(batch, 10)
+        assert len(batcher.next_batch()["results"]) == 20, "Batch size should be halved at most per response"
+        batcher.record(batcher.next_batch(), 10)
+        assert len(batcher.next_batch()["results"]) >= 1
+
+    @pytest.mark.api_handler
+    def test_batches_converge_to_target_latency(self):
+        results = make_results(2000)
+        batcher = AdaptiveResultBatcher([results], 10, target_latency=1)
+        seconds_per_result = 0.01
+        sizes = []
+        while (batch := batcher.next_batch()) is not None:
+            sizes.append(len(batch["results"]))
+            batcher.record(batch, len(batch["results"]) * seconds_per_result)
+        assert sizes[-2] == 100, "Batch size should converge to results processed within target latency"
@@ -0,0 +1,94 @@
+import pytest
+
+from trcli.api.api_client import APIClientResult
+from trcli.api.result_handler import ResultHandler
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailResult, TestRailSection, TestRailSuite
+from trcli.data_providers.api_data_provider import ApiDataProvider
+from trcli.data_providers.result_delta import latest_results_by_case, parse_timespan, remove_unchanged_results
+
+TESTS = [{"id": 101, "case_id": 1}, {"id": 102, "case_id": 2}, {"id": 103, "case_id": 3}]
+RUN_RESULTS = [
+    {"id": 11, "test_id": 101, "status_id": 5, "comment": "Timeout", "elapsed": "1m 5s", "defects": "BUG-1, BUG-2"},
+    {"id": 12, "test_id": 102, "status_id": 5, "comment": "Timeout", "elapsed": None, "custom_browser": 2},
+    {"id": 15, "test_id": 101, "status_id": 1, "comment": "Passed\r\n", "elapsed": "1m 5s", "defects": None},
+    {"id": 13, "test_id": 999, "status_id": 1},
+]
+
+
+class TestResultDelta:
+    @pytest.mark.data_provider
+    @pytest.mark.parametrize(
+        "timespan, seconds",
+        [("65s", 65), ("1m 5s", 65), ("0.25s", 0.25), ("1h 2m", 3720), (None, None), ("soon", None), ("5", None)],
+    )
+    def test_parse_timespan(self, timespan, seconds):
+        assert parse_timespan(timespan) == seconds
+
+    @pytest.mark.data_provider
+    def test_latest_result_of_each_case(self):
+        latest = latest_results_by_case(TESTS, RUN_RESULTS)
+
+        assert {case_id: result["id"] for case_id, result in latest.items()} == {1: 15, 2: 12}
+
+    @pytest.mark.data_provider
+    def test_only_changed_results_remain(self):
+        latest = latest_results_by_case(TESTS, RUN_RESULTS)
+        results = [
+            {"case_id": 1, "status_id": 1, "comment": "Passed", "elapsed": "65s", "attachments": ["a.png"]},
+            {"case_id": 2, "status_id": 5, "comment": "Timeout", "custom_browser": "2", "assignedto_id": 7},
+            {"case_id": 2, "status_id": 5, "comment": "Timeout", "custom_browser": "3"},
+            {"case_id": 1, "status_id": 1, "comment": "Passed", "elapsed": "66s"},
+            {"case_id": 1, "status_id": 1, "comment": "Passed", "elapsed": "65s", "defects": "BUG-3"},
+            {"case_id": 3, "status_id": 1},
+        ]
+
+        assert remove_unchanged_results(results, latest) == results[2:]
+
+    @pytest.mark.data_provider
+    def test_failures_are_assigned_for_changed_results_only(self):
+        cases = [
+            TestRailCase("test_login", case_id=1, result=TestRailResult(case_id=1, status_id=5, comment="Timeout")),
+            TestRailCase("test_logout", case_id=2, result=TestRailResult(case_id=2, status_id=5, comment="Crash")),
+        ]
+        data_provider = ApiDataProvider(
+            TestRailSuite("Suite", testsections=[TestRailSection("Section", testcases=cases)])
+        )
+        latest = {1: {"id": 11, "status_id": 5, "comment": "Timeout"}, 2: {"id": 12, "status_id": 5, "comment": ""}}
+
+        (bodies,) = data_provider.results_for_cases(user_ids=[7], latest_results=latest)
+
+        assert [(body["case_id"], body["assignedto_id"]) for body in bodies] == [(2, 7)]
+        assert data_provider._unchanged_count == 1
+        assert data_provider._assigned_count == 1
+
+
+class TestResultHandlerLatestResults:
+    @pytest.mark.results_uploader
+    def test_all_pages_of_results_are_fetched(self, mocker):
+        client = mocker.Mock()
+        client.send_get.side_effect = [
+            APIClientResult(200, {"results": RUN_RESULTS[:2], "_links": {"next": "/api/v2/...&offset=2"}}, ""),
+            APIClientResult(200, {"results": RUN_RESULTS[2:], "_links": {"next": None}}, ""),
+        ]
+        result_handler = ResultHandler(
+            client, mocker.Mock(), mocker.Mock(), lambda run_id: (TESTS, ""), handle_futures_callback=None
+        )
+
+        latest, error_message = result_handler.get_latest_results_for_run(5)
+
+        assert error_message == ""
+        assert {case_id: result["id"] for case_id, result in latest.items()} == {1: 15, 2: 12}
+        assert [call.args[0] for call in client.send_get.call_args_list] == [
+            "get_results_for_run/5&offset=0&limit=250",
+            "get_results_for_run/5&offset=2&limit=250",
+        ]
+
+    @pytest.mark.results_uploader
+    def test_errors_are_returned(self, mocker):
+        client = mocker.Mock()
+        client.send_get.return_value = APIClientResult(403, {}, "No access to the run")
+        result_handler = ResultHandler(
+            client, mocker.Mock(), mocker.Mock(), lambda run_id: (TESTS, ""), handle_futures_callback=None
+        )
+
+        assert result_handler.get_latest_results_for_run(5) == ({}, "No access to the run")
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from tests.helpers.results_uploader_helper import (
@@ -22,6 +24,12 @@ from trcli.api.results_uploader import ResultsUploader
 from trcli.constants import FAULT_MAPPING, PROMPT_MESSAGES, SuiteModes
 from trcli.constants import ProjectErrors
 from trcli.data_classes.data_parsers import MatchersParser
+from trcli.data_classes.dataclass_testrail import (
+    TestRailCase,
+    TestRailResult,
+    TestRailSection,
+    TestRailSuite,
+)
 from trcli.readers.junit_xml import JunitParser
 
 
@@ -377,6 +385,24 @@ class TestResultsUploader:
         """The purpose of this test is to check that proper warning will be printed when duplicated case
         names will be detected in result file."""
 
+    @pytest.mark.results_uploader
+    def test_validate_and_store_user_ids(self, result_uploader_data_provider):
+        environment, api_request_handler, results_uploader = result_uploader_data_provider
+        environment.assign_failed_to = "alice@example.com, Bob@example.com, carol@example.com"
+        results_uploader.api_request_handler.get_users_by_emails.return_value = (
+            {"alice@example.com": 1, "Bob@example.com": 2},
+            "",
+        )
+
+        results_uploader._validate_and_store_user_ids()
+
+        results_uploader.api_request_handler.get_users_by_emails.assert_called_once_with(
+            ["alice@example.com", "Bob@example.com", "carol@example.com"]
+        )
+        assert environment._validated_user_ids == [1, 2]
+        assert environment._has_invalid_users is True
+        environment.elog.assert_called_with("Error: User not found: carol@example.com")
+
     def test_rollback_changes_empty_changelist(self, result_uploader_data_provider):
         """The purpose of this test is to check that rollback
         will not give unexpected results on empty changelist"""
@@ -453,3 +479,64 @@ class TestResultsUploader:
         assert (
             results_uploader.rollback_changes(suite_id, False, [1, 2], [1, 2], 2) == expected_result
         ), "Revert process not completed as expected in test."
+
+    @pytest.fixture(scope="function")
+    def pipelined_uploader(self, result_uploader_data_provider, mocker):
+        """Uploader with one matched and one missing case, case creation waits for the results of the matched case"""
+        environment, api_request_handler, results_uploader = result_uploader_data_provider
+        environment.auto_creation_response = True
+        environment.update_existing_cases = "no"
+        environment.run_include_all = False
+        environment.close_run = False
+        get_project_id_mocker(results_uploader=results_uploader, project_id=10, error_message="", failing=True)
+        upload_results_inner_functions_mocker(results_uploader=results_uploader, mocker=mocker, failing_functions=[])
+        api_request_handler_delete_mocker(results_uploader=results_uploader, mocker=mocker, failing_functions=[])
+        handler = results_uploader.api_request_handler
+        handler.check_automation_id_field.return_value = None
+        handler.check_missing_test_cases_ids.return_value = (True, "")
+        matched = TestRailCase(title="Login", case_id=1, result=TestRailResult(case_id=1, status_id=1))
+        missing = TestRailCase(title="Logout", result=TestRailResult(status_id=5))
+        handler.suites_data_from_provider = TestRailSuite(
+            name="Suite", suite_id=10, testsections=[TestRailSection(name="Auth", testcases=[matched, missing])]
+        )
+        results_uploader.add_missing_sections.return_value = ([{"section_id": 5}], 1)
+        matched_results_added = threading.Event()
+        calls = []
+
+        def add_missing_test_cases():
+            matched_results_added.wait(timeout=5)
+            calls.append("add_cases")
+            missing.case_id = 2
+            return [{"case_id": 2, "section_id": 5, "title": "Logout"}], 1
+
+        def add_results(run_id, case_ids=None):
+            calls.append(("add_results", run_id, case_ids))
+            matched_results_added.set()
+            return [[{"id": 1}]], "", len(case_ids)
+
+        results_uploader.add_missing_test_cases.side_effect = add_missing_test_cases
+        handler.add_results.side_effect = add_results
+        handler.update_run.side_effect = lambda *args, **kwargs: calls.append("update_run") or ({}, "")
+        yield environment, results_uploader, calls
+
+    @pytest.mark.results_uploader
+    def test_results_of_matched_cases_are_added_while_cases_are_created(self, pipelined_uploader):
+        environment, results_uploader, calls = pipelined_uploader
+
+        results_uploader.upload_results()
+
+        assert calls == [("add_results", 100, {1}), "add_cases", "update_run", ("add_results", 100, {2})]
+        assert results_uploader.api_request_handler.add_run.call_count == 1
+        assert environment.log.call_args_list[-1][0][0].startswith("Submitted 2 test results")
+
+    @pytest.mark.results_uploader
+    def test_failed_case_creation_rolls_back_pipelined_run(self, pipelined_uploader):
+        environment, results_uploader, calls = pipelined_uploader
+        results_uploader.add_missing_test_cases.side_effect = None
+        results_uploader.add_missing_test_cases.return_value = ([], -1)
+
+        with pytest.raises(SystemExit):
+            results_uploader.upload_results()
+
+        results_uploader.api_request_handler.delete_run.assert_called_once_with(100)
+        assert "update_run" not in calls
@@ -0,0 +1,217 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from trcli.api.shard_coordinator import (
+    ATTEMPT_ATTACHMENT,
+    CASES_ATTACHMENT,
+    DONE_ATTACHMENT,
+    READY_ATTACHMENT,
+    ShardCoordinator,
+)
+from trcli.cli import Environment
+from trcli.commands.cmd_parse_junit import _check_shard_options
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailSection, TestRailSuite
+
+RUN_ID = 7
+MARKER = "trcli shard key: build-1"
+
+
+class FakeRunHandler:
+    """Runs and run attachments kept in memory, like the TestRail instance shared by the shards"""
+
+    def __init__(self, runs=None):
+        self.runs = runs or []
+        self.attachments = []
+        self.case_ids = []
+
+    def get_runs(self, project_id, offset=0, is_completed=None, created_after=None):
+        return {"runs": self.runs[offset:], "_links": {"next": None}}, ""
+
+    def add_run_attachment(self, run_id, name, content):
+        self.attachments.append({"id": len(self.attachments) + 1, "name": name, "content": json.loads(content)})
+        return {"attachment_id": len(self.attachments)}, ""
+
+    def get_run_attachments(self, run_id):
+        return [{"id": attachment["id"], "name": attachment["name"]} for attachment in self.attachments], ""
+
+    def get_attachment(self, attachment_id):
+        return self.attachments[attachment_id - 1]["content"], ""
+
+    def get_run_case_ids(self, run_id):
+        return self.case_ids, ""
+
+    def publish(self, name, content):
+        self.add_run_attachment(RUN_ID, name, json.dumps(content).encode())
+
+
+@pytest.fixture
+def uploader(mocker):
+    environment = Environment()
+    environment.shard_key, environment.shard_count, environment.shard_timeout = "build-1", 3, 5
+    environment.silent = True
+    uploader = mocker.Mock(environment=environment, run_name="Sharded")
+    uploader.create_or_update_test_run.return_value = (RUN_ID, "")
+    api_request_handler = uploader.api_request_handler
+    api_request_handler.run_handler = FakeRunHandler()
+    api_request_handler.data_provider.run_description = "nightly"
+    api_request_handler.suites_data_from_provider = TestRailSuite(
+        name="Suite",
+        testsections=[
+            TestRailSection(
+                name="Login", testcases=[TestRailCase(title="a", case_id=2), TestRailCase(title="b", case_id=1)]
+            )
+        ],
+    )
+    api_request_handler.update_run.return_value = ({}, "")
+    api_request_handler.close_run.return_value = ({}, "")
+    return uploader
+
+
+def wait_for_attachment(run_handler, name):
+    deadline = time.monotonic() + 5
+    while name not in [attachment["name"] for attachment in run_handler.attachments]:
+        assert time.monotonic() < deadline, f"{name} was not published"
+        time.sleep(0.01)
+
+
+def coordinator_of(uploader, index):
+    uploader.environment.shard_index = index
+    return ShardCoordinator(uploader, interval=0.01)
+
+
+class TestShardCoordinator:
+    @pytest.mark.results_uploader
+    def test_first_shard_creates_run_with_cases_of_all_shards(self, uploader):
+        run_handler = uploader.api_request_handler.run_handler
+        run_handler.publish(CASES_ATTACHMENT.format(attempt="a1", index=2), {"case_ids": [3, 4], "execution_id": "e2"})
+        run_handler.publish(CASES_ATTACHMENT.format(attempt="a1", index=3), {"case_ids": [1, 5], "execution_id": "e3"})
+        coordinator = coordinator_of(uploader, 1)
+        coordinator.execution_id = "a1"
+
+        assert coordinator.join_run() == (RUN_ID, "")
+
+        assert uploader.api_request_handler.data_provider.run_description == f"nightly\n{MARKER}"
+        uploader.api_request_handler.update_run.assert_called_once_with(RUN_ID, "Sharded", case_ids=[1, 2, 3, 4, 5])
+        names = [attachment["name"] for attachment in run_handler.attachments]
+        assert names[2:] == [
+            "trcli-shard-attempt-a1.json",
+            "trcli-shard-a1-1-cases.json",
+            "trcli-shard-a1-ready.json",
+        ]
+        assert run_handler.attachments[-1]["content"] == {
+            "shard_count": 3,
+            "executions": {"1": "a1", "2": "e2", "3": "e3"},
+        }
+        assert uploader.environment.run_id == RUN_ID
+
+    @pytest.mark.results_uploader
+    def test_first_shard_reuses_run_of_shard_key(self, uploader):
+        uploader.api_request_handler.run_handler.runs = [
+            {"id": 9, "description": "trcli shard key: build-2"},
+            {"id": RUN_ID, "description": f"nightly\n{MARKER}"},
+        ]
+        uploader.api_request_handler.run_handler.case_ids = [1, 2]
+        uploader.environment.shard_count = 1
+
+        coordinator_of(uploader, 1).join_run()
+
+        assert uploader.environment.run_id == RUN_ID, "Existing run should be updated"
+        uploader.api_request_handler.update_run.assert_not_called()
+
+    @pytest.mark.results_uploader
+    def test_first_shard_ignores_cases_of_earlier_execution(self, uploader):
+        uploader.environment.shard_timeout = 0.05
+        run_handler = uploader.api_request_handler.run_handler
+        run_handler.runs = [{"id": RUN_ID, "description": MARKER}]
+        for index in (2, 3):
+            run_handler.publish(CASES_ATTACHMENT.format(attempt="old", index=index), {"case_ids": [index]})
+
+        with pytest.raises(SystemExit):
+            coordinator_of(uploader, 1).join_run()
+
+        uploader.api_request_handler.update_run.assert_not_called()
+
+    @pytest.mark.results_uploader
+    def test_shard_waits_for_earlier_shards_before_creating_cases(self, uploader):
+        run_handler = uploader.api_request_handler.run_handler
+        run_handler.runs = [{"id": RUN_ID, "description": MARKER}]
+        run_handler.publish(ATTEMPT_ATTACHMENT.format(attempt="a1"), {})
+        run_handler.publish(CASES_ATTACHMENT.format(attempt="a1", index=1), {"case_ids": [1]})
+        run_handler.publish(CASES_ATTACHMENT.format(attempt="a1", index=2), {"case_ids": [2]})
+        coordinator = coordinator_of(uploader, 3)
+
+        coordinator.wait_for_turn()
+        uploader.api_request_handler.clear_cases_cache.assert_called_once()
+
+        run_handler.publish(READY_ATTACHMENT.format(attempt="a1"), {"executions": {"3": coordinator.execution_id}})
+        assert coordinator.join_run() == (RUN_ID, "")
+        assert run_handler.attachments[-1]["name"] == "trcli-shard-a1-3-cases.json"
+        assert run_handler.attachments[-1]["content"]["execution_id"] == coordinator.execution_id
+        uploader.create_or_update_test_run.assert_not_called()
+
+    @pytest.mark.results_uploader
+    def test_shard_waits_for_attempt_of_its_execution(self, uploader):
+        run_handler = uploader.api_request_handler.run_handler
+        run_handler.runs = [{"id": RUN_ID, "description": MARKER}]
+        run_handler.publish(ATTEMPT_ATTACHMENT.format(attempt="old"), {})
+        run_handler.publish(READY_ATTACHMENT.format(attempt="old"), {"executions": {"2": "earlier"}})
+        coordinator = coordinator_of(uploader, 2)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            joined = executor.submit(coordinator.join_run)
+            wait_for_attachment(run_handler, "trcli-shard-old-2-cases.json")
+            assert not joined.done(), "Ready attachment of an earlier execution should be ignored"
+            run_handler.publish(ATTEMPT_ATTACHMENT.format(attempt="a1"), {})
+            wait_for_attachment(run_handler, "trcli-shard-a1-2-cases.json")
+            run_handler.publish(READY_ATTACHMENT.format(attempt="a1"), {"executions": {"2": coordinator.execution_id}})
+
+            assert joined.result(timeout=5) == (RUN_ID, "")
+        assert coordinator.attempt == "a1"
+
+    @pytest.mark.results_uploader
+    def test_waiting_times_out(self, uploader):
+        uploader.environment.shard_timeout = 0.05
+
+        with pytest.raises(SystemExit):
+            coordinator_of(uploader, 2).join_run()
+
+    @pytest.mark.results_uploader
+    def test_first_shard_closes_run_once_all_shards_are_done(self, uploader):
+        uploader.environment.close_run = True
+        run_handler = uploader.api_request_handler.run_handler
+        coordinator = coordinator_of(uploader, 1)
+        coordinator.run_id, coordinator.attempt = RUN_ID, "a1"
+
+        run_handler.publish(DONE_ATTACHMENT.format(attempt="old", index=2), {})
+        run_handler.publish(DONE_ATTACHMENT.format(attempt="a1", index=2), {})
+        run_handler.publish(DONE_ATTACHMENT.format(attempt="a1", index=3), {})
+        assert coordinator.finish() == ""
+        uploader.api_request_handler.close_run.assert_called_once_with(RUN_ID)
+
+        uploader.environment.shard_index = 2
+        follower = ShardCoordinator(uploader)
+        follower.attempt = "a1"
+        assert follower.finish() == ""
+        assert run_handler.attachments[-1]["name"] == "trcli-shard-a1-2-done.json"
+
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"shard_key": "build-1", "shard_index": 1},
+            {"shard_key": "build-1", "shard_index": 4, "shard_count": 3},
+            {"shard_key": "build-1", "shard_index": 1, "shard_count": 3, "plan_id": 5},
+        ],
+        ids=["incomplete", "index_out_of_range", "plan_id"],
+    )
+    def test_invalid_shard_options(self, options):
+        environment = Environment()
+        environment.silent = True
+        for option, value in options.items():
+            setattr(environment, option, value)
+
+        with pytest.raises(SystemExit):
+            _check_shard_options(environment)
@@ -0,0 +1,161 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from trcli.api.api_cache import RequestCache
+from trcli.api.api_client import APIClient
+from trcli.api.api_request_handler import ApiRequestHandler
+from trcli.api.single_flight import SingleFlight
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.logging.metrics import MetricsCollector
+from tests.helpers.api_client_helpers import TEST_RAIL_URL
+
+THREADS = 8
+
+
+def run_concurrently(call, threads=THREADS):
+    """Start all calls at the same moment and return their results"""
+    barrier = threading.Barrier(threads)
+
+    def start():
+        barrier.wait()
+        return call()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return [future.result() for future in [executor.submit(start) for _ in range(threads)]]
+
+
+class SlowCall:
+    """Call taking long enough for all concurrent callers to arrive while it runs"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(0.1)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestSingleFlight:
+    @pytest.mark.api_client
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        call = SlowCall(result={"id": 1})
+
+        results = run_concurrently(lambda: flights.do("get_case/1", call))
+
+        assert call.calls == 1
+        assert all(result == {"id": 1} for result, _ in results)
+        assert sorted(shared for _, shared in results) == [False] + [True] * (THREADS - 1)
+        assert flights.in_flight() == 0
+
+    @pytest.mark.api_client
+    def test_errors_are_raised_to_all_callers(self):
+        flights = SingleFlight()
+        call = SlowCall(error=ValueError("Invalid response"))
+
+        def do():
+            with pytest.raises(ValueError):
+                flights.do("get_case/1", call)
+
+        run_concurrently(do)
+
+        assert call.calls == 1
+        assert flights.in_flight() == 0
+
+    @pytest.mark.api_client
+    def test_shared_results_are_copied_for_every_caller(self):
+        flights = SingleFlight()
+        call = SlowCall(result={"id": 1})
+
+        results = run_concurrently(lambda: flights.do("get_case/1", call, copy=dict))
+
+        assert all(result == {"id": 1} and result is not call.result for result, _ in results)
+        assert len({id(result) for result, _ in results}) == THREADS
+        result, _ = flights.do("get_case/1", call, copy=dict)
+        assert result is call.result, "Unshared results should not be copied"
+
+    @pytest.mark.api_client
+    def test_keys_and_sequential_calls_are_not_coalesced(self):
+        flights = SingleFlight()
+
+        assert flights.do("get_case/1", lambda: 1) == (1, False)
+        assert flights.do("get_case/1", lambda: 2) == (2, False)
+        assert flights.do("get_case/1", lambda: flights.do("get_case/2", lambda: 3)[0]) == (3, False)
+
+    @pytest.mark.api_client
+    def test_nested_calls_of_the_same_key_do_not_wait_for_themselves(self):
+        flights = SingleFlight()
+
+        assert flights.do("get_case/1", lambda: flights.do("get_case/1", lambda: 1)) == ((1, False), False)
+
+
+class TestCoalescedRequests:
+    @pytest.mark.api_client
+    def test_cache_fetches_once_for_concurrent_misses(self):
+        cache = RequestCache()
+        fetch = SlowCall(result=([{"id": 1}], ""))
+
+        results = run_concurrently(lambda: cache.get_or_fetch("get_cases/1", fetch, (1, 2)))
+
+        assert fetch.calls == 1
+        assert results == [([{"id": 1}], "")] * THREADS
+        assert cache.get("get_cases/1", (1, 2)) == ([{"id": 1}], "")
+
+    @pytest.mark.api_client
+    def test_cache_errors_are_shared_but_not_cached(self):
+        cache = RequestCache()
+        fetch = SlowCall(result=([], "No access"))
+
+        assert run_concurrently(lambda: cache.get_or_fetch("get_cases/1", fetch)) == [([], "No access")] * THREADS
+        assert fetch.calls == 1
+        cache.get_or_fetch("get_cases/1", fetch)
+        assert fetch.calls == 2
+
+    @pytest.mark.api_client
+    def test_identical_gets_are_sent_once(self):
+        client = APIClient(TEST_RAIL_URL, retries=0)
+        client.metrics = MetricsCollector()
+
+        def get(**kwargs):
+            time.sleep(0.1)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{"id": 1, "title": "Login"}'
+            return response
+
+        with patch("trcli.api.api_client.requests.get", side_effect=get) as requests_get:
+            results = run_concurrently(lambda: client.send_get("get_case/1"))
+
+        assert requests_get.call_count == 1
+        assert all(result.response_text == {"id": 1, "title": "Login"} for result in results)
+        assert len({id(result.response_text) for result in results}) == THREADS, "Responses should be copies"
+        summary = client.metrics.summary()
+        assert (summary["total_requests"], summary["total_coalesced"]) == (1, THREADS - 1)
+
+    @pytest.mark.api_handler
+    def test_bdd_case_cache_is_built_once(self):
+        environment = MagicMock()
+        environment.mirror = None
+        client = MagicMock(spec=APIClient)
+        client.VERSION = "/api/v2/"
+        handler = ApiRequestHandler(environment, client, TestRailSuite(name="test", suite_id=2), verify=False)
+
+        def build(project_id, suite_id):
+            time.sleep(0.1)
+            handler._bdd_case_cache[f"{project_id}_{suite_id}"] = {"login": [{"id": 7}]}
+
+        with patch.object(handler, "_build_bdd_case_cache", side_effect=build) as build_cache:
+            results = run_concurrently(lambda: handler.find_bdd_case_by_name("Login", 1, 2))
+
+        assert build_cache.call_count == 1
+        assert results == [(7, None, [])] * THREADS
@@ -0,0 +1,123 @@
+import io
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from trcli.cli import Environment
+from trcli.data_classes.data_parsers import MatchersParser
+from trcli.readers.cucumber_json import CucumberParser
+from trcli.readers.file_parser import read_ahead
+from trcli.readers.json_stream import iter_json_array
+from trcli.readers.junit_xml import JunitParser
+from trcli.readers.robot_xml import RobotParser
+
+TEST_DATA = Path(__file__).parent / "test_data"
+
+
+def report(*suites):
+    testsuites = "".join(
+        f'<testsuite name="{name}">'
+        + "".join(f'<testcase classname="{name}" name="test_{index}"/>' for index in range(cases))
+        + "</testsuite>"
+        for name, cases in suites
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><testsuites name="root">{testsuites}</testsuites>'.encode()
+
+
+@pytest.fixture
+def stdin(monkeypatch):
+    def _pipe(data: bytes):
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(data)))
+
+    return _pipe
+
+
+@pytest.fixture
+def environment():
+    environment = Environment()
+    environment.file = "-"
+    environment.case_matcher = MatchersParser.AUTO
+    environment.special_parser = "junit"
+    environment.suite_name = None
+    return environment
+
+
+def without_times(suites):
+    for suite in suites:
+        suite.name = suite.source = None
+    return [asdict(suite) for suite in suites]
+
+
+class TestStdinInput:
+    @pytest.mark.parse_junit
+    def test_junit_report_from_stdin(self, environment, stdin, freezer):
+        freezer.move_to("2020-05-20 01:00:00")
+        stdin((TEST_DATA / "XML/root.xml").read_bytes())
+        from_stdin = JunitParser(environment).parse_file()
+        environment.file = TEST_DATA / "XML/root.xml"
+        from_file = JunitParser(environment).parse_file()
+
+        assert without_times(from_stdin) == without_times(from_file)
+
+    @pytest.mark.parse_junit
+    def test_junit_report_is_parsed_in_chunks(self, environment, stdin):
+        stdin(report(("Login", 2), ("Logout", 1), ("Search", 3), ("Profile", 1)))
+
+        chunks = list(JunitParser(environment).iter_chunks(max_cases=3))
+
+        assert [[section.name for section in suites[0].testsections] for suites in chunks] == [
+            ["Login", "Logout"],
+            ["Search"],
+            ["Profile"],
+        ]
+        assert all(suites[0].name == "root" for suites in chunks)
+
+    @pytest.mark.parse_junit
+    @pytest.mark.parametrize(
+        "data, sections",
+        [
+            (report(), [[]]),
+            (b'<testsuite name="Login"><testcase classname="Login" name="test"/></testsuite>', [["Login"]]),
+        ],
+        ids=["empty report", "testsuite root"],
+    )
+    def test_junit_report_as_single_chunk(self, environment, stdin, data, sections):
+        stdin(data)
+        chunks = list(JunitParser(environment).iter_chunks(max_cases=1))
+        assert [[section.name for section in suites[0].testsections] for suites in chunks] == sections
+
+    @pytest.mark.parse_robot
+    def test_robot_report_from_stdin(self, environment, stdin):
+        stdin((TEST_DATA / "XML/robotframework_simple_RF70.xml").read_bytes())
+        suites = RobotParser(environment).parse_file()
+
+        assert suites[0].name == "stdin"
+        assert sum(len(section.testcases) for section in suites[0].testsections) > 0
+
+    @pytest.mark.parse_cucumber
+    def test_cucumber_report_from_stdin_is_read_once(self, environment, stdin):
+        stdin((TEST_DATA / "CUCUMBER/sample_cucumber.json").read_bytes())
+        parser = CucumberParser(environment)
+
+        features = list(parser.iter_features())
+        assert features and list(parser.iter_features()) == features, "Features should be kept for later passes"
+        assert parser.parse_file()[0].testsections[0].name == "User Login"
+
+    @pytest.mark.parse_cucumber
+    def test_json_array_from_stream(self):
+        stream = io.StringIO('[{"name": "a", "embeddings": ["..."]}, {"name": "b"}]')
+        assert list(iter_json_array(stream, skip_keys=("embeddings",), chunk_size=4)) == [{"name": "a"}, {"name": "b"}]
+        assert not stream.closed
+
+    @pytest.mark.parse_junit
+    def test_read_ahead(self):
+        def items():
+            yield 1
+            yield 2
+            raise ValueError("invalid report")
+
+        results = read_ahead(items())
+        assert [next(results), next(results)] == [1, 2]
+        with pytest.raises(ValueError):
+            next(results)
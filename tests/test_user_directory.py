@@ -0,0 +1,56 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from trcli.api import user_directory
+from trcli.api.user_directory import UserDirectory
+
+HOST = "https://test.testrail.com"
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    with patch.object(user_directory, "USER_CACHE_DIR", tmp_path):
+        yield tmp_path
+
+
+class TestUserDirectory:
+    @pytest.mark.api_handler
+    def test_lookup_is_case_insensitive(self, cache_dir):
+        directory = UserDirectory(HOST)
+        directory.add_users([{"id": 1, "email": "John.Doe@Example.com"}, {"id": 2, "email": None}])
+        assert directory.get("john.doe@example.com") == 1
+        assert directory.get(" JOHN.DOE@EXAMPLE.COM ") == 1
+        assert len(directory) == 1, "Users without email should be skipped"
+
+    @pytest.mark.api_handler
+    def test_save_and_load(self, cache_dir):
+        directory = UserDirectory(HOST)
+        directory.add("qa@example.com", 5)
+        directory.save()
+
+        loaded = UserDirectory(HOST)
+        assert loaded.load()
+        assert loaded.get("QA@example.com") == 5
+        assert not UserDirectory("https://other.testrail.com").load(), "Cache should be separated by host"
+
+    @pytest.mark.api_handler
+    def test_expired_users_are_not_loaded(self, cache_dir):
+        directory = UserDirectory(HOST)
+        directory.add("old@example.com", 1)
+        directory.add("new@example.com", 2)
+        directory._users["old@example.com"]["cached_at"] = time.time() - user_directory.USER_CACHE_TTL
+        directory.save()
+
+        loaded = UserDirectory(HOST)
+        loaded.load()
+        assert loaded.get("old@example.com") is None
+        assert loaded.get("new@example.com") == 2
+
+    @pytest.mark.api_handler
+    def test_invalid_cache_is_ignored(self, cache_dir):
+        directory = UserDirectory(HOST)
+        directory.path.write_text("{not json")
+        assert not directory.load()
+        assert len(directory) == 0
@@ -0,0 +1,148 @@
+import os
+import threading
+from xml.etree.ElementTree import ParseError
+
+import pytest
+
+from trcli.api.watch_uploader import WatchUploader
+from trcli.cli import Environment
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+RUN_ID = 42
+
+
+@pytest.fixture
+def environment():
+    environment = Environment()
+    environment.host = "https://fake_host.com/"
+    environment.silent = True
+    environment.close_run = False
+    environment.auto_close_run = False
+    return environment
+
+
+@pytest.fixture
+def uploads(mocker, environment):
+    """Records (suite name, run ID, close run) of every upload and closed runs, the first upload creates run 42"""
+    uploads = []
+    closed_runs = []
+
+    def close_run(run_id):
+        closed_runs.append(run_id)
+        return {}, ""
+
+    def create_uploader(environment, suite, exit_on_rejected=True):
+        uploader = mocker.Mock(last_run_id=None, case_update_results={"updated_cases": [suite.name]})
+
+        def upload_results():
+            uploads.append((suite.name, environment.run_id, environment.close_run))
+            uploader.last_run_id = environment.run_id or RUN_ID
+
+        uploader.upload_results.side_effect = upload_results
+        uploader.api_request_handler.close_run.side_effect = close_run
+        return uploader
+
+    mocker.patch("trcli.api.incremental_uploader.ResultsUploader", side_effect=create_uploader)
+    return uploads, closed_runs
+
+
+def write_report(directory, name, mtime, content="<testsuites/>"):
+    path = directory / name
+    path.write_text(content)
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def parse_report(path):
+    if "</testsuites>" not in path.read_text() and "<testsuites/>" not in path.read_text():
+        raise ParseError("no element found")
+    return [TestRailSuite(name=path.stem)]
+
+
+def watcher(environment, directory, **kwargs):
+    return WatchUploader(environment, directory, parse_file=parse_report, parse_errors=(ParseError,), **kwargs)
+
+
+class TestWatchUploader:
+    @pytest.mark.results_uploader
+    def test_files_are_added_to_one_run(self, environment, uploads, tmp_path):
+        uploads, _ = uploads
+        write_report(tmp_path, "spec_b.xml", 2_000_000_000)
+        write_report(tmp_path, "spec_a.xml", 1_000_000_000)
+        write_report(tmp_path, "notes.txt", 1_000_000_000)
+        (tmp_path / "trcli.done").touch()
+
+        watch_uploader = watcher(environment, tmp_path)
+        run_id = watch_uploader.watch()
+
+        assert run_id == RUN_ID
+        assert uploads == [("spec_a", None, False), ("spec_b", RUN_ID, False)], "Files should be uploaded in order"
+        assert watch_uploader.case_update_results == {"updated_cases": ["spec_a", "spec_b"]}
+
+    @pytest.mark.results_uploader
+    def test_file_is_uploaded_once_completely_written(self, environment, uploads, tmp_path):
+        uploads, _ = uploads
+        watch_uploader = watcher(environment, tmp_path)
+        path = write_report(tmp_path, "spec.xml", 1_000_000_000, "<testsuites>")
+
+        assert watch_uploader._ready_files(final=False) == []
+        write_report(tmp_path, "spec.xml", 2_000_000_000, "<testsuites><testsuite>")
+        assert watch_uploader._ready_files(final=False) == [], "File is still being written"
+        assert watch_uploader._ready_files(final=False) == [path]
+
+        watch_uploader._upload_file(path, final=False)
+        assert uploads == [], "Incomplete file should be retried once it changes"
+        assert watch_uploader._ready_files(final=False) == []
+
+        write_report(tmp_path, "spec.xml", 3_000_000_000, "<testsuites></testsuites>")
+        watch_uploader._ready_files(final=False)
+        for ready in watch_uploader._ready_files(final=False):
+            watch_uploader._upload_file(ready, final=False)
+        assert [upload[0] for upload in uploads] == ["spec"]
+        assert watch_uploader._ready_files(final=False) == [], "Uploaded files should not be uploaded again"
+
+    @pytest.mark.results_uploader
+    def test_invalid_file_fails_after_upload(self, environment, uploads, tmp_path):
+        uploads, _ = uploads
+        write_report(tmp_path, "broken.xml", 1_000_000_000, "<testsuites>")
+        write_report(tmp_path, "spec.xml", 2_000_000_000)
+        (tmp_path / "trcli.done").touch()
+
+        with pytest.raises(SystemExit) as exception:
+            watcher(environment, tmp_path).watch()
+
+        assert exception.value.code == 1
+        assert [upload[0] for upload in uploads] == ["spec"]
+
+    @pytest.mark.results_uploader
+    def test_run_is_closed_once_at_the_end(self, environment, uploads, tmp_path):
+        uploads, closed_runs = uploads
+        environment.close_run = True
+        write_report(tmp_path, "spec_a.xml", 1_000_000_000)
+        write_report(tmp_path, "spec_b.xml", 2_000_000_000)
+        (tmp_path / "trcli.done").touch()
+
+        watcher(environment, tmp_path).watch()
+
+        assert [upload[2] for upload in uploads] == [False, False], "Run should not be closed after each file"
+        assert closed_runs == [RUN_ID]
+        assert environment.close_run is True
+
+    @pytest.mark.results_uploader
+    def test_stop_finishes_the_upload(self, environment, uploads, tmp_path):
+        uploads, _ = uploads
+        watch_uploader = watcher(environment, tmp_path, interval=0.01)
+        thread = threading.Thread(target=watch_uploader.watch)
+        thread.start()
+        write_report(tmp_path, "spec.xml", 1_000_000_000)
+        watch_uploader.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert [upload[0] for upload in uploads] == ["spec"], "Remaining files should be uploaded when stopped"
+
+    @pytest.mark.results_uploader
+    def test_missing_directory(self, environment, tmp_path):
+        with pytest.raises(SystemExit) as exception:
+            watcher(environment, tmp_path / "missing").watch()
+        assert exception.value.code == 1
@@ -0,0 +1,430 @@
+"""
+Performance benchmarks for TRCLI
+
+Runs upload scenarios against the in-process mock TestRail server using
+synthetic reports and records throughput, per-stage wall time, request counts
+and peak RSS. Every scenario runs trcli in a child process, so memory figures
+are not affected by the benchmark harness or the mock server.
+
+Results are appended to a JSON lines history file and compared with the
+previous run of the same scenario and size, so regressions are caught before
+release (the process exits with code 1 when a regression is detected).
+
+Scenarios:
+    parse_junit, parse_robot, parse_cucumber - parse only, no network
+    parse_cucumber_embeddings - parse only, every failed step has a 256 KB screenshot embedding
+    match         - all cases exist in TestRail, matched by automation_id
+    create_cases  - all cases are missing and created (-y)
+    results       - results upload with case ids in test names (--case-matcher name)
+    results_adaptive - same as results with adaptive batching (--batch-target-latency)
+    results_gzip  - same as results with gzip compressed request bodies (--gzip-requests)
+    attachments   - every result is failed and has attachments
+    attachments_large - LARGE_ATTACHMENT_RESULTS results share a LARGE_ATTACHMENT_MB attachment
+                    (uploads are streamed from disk, peak RSS should not grow with the attachment size)
+
+Usage:
+    python -m tests_perf.benchmark --cases 1000 10000
+    python -m tests_perf.benchmark --scenario results --cases 100000 --latency-ms 20 --rate-limit-every 200
+    python -m tests_perf.benchmark --history tests_perf/history.jsonl --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from functools import partial
+from pathlib import Path
+
+from beartype.typing import List, Dict, Optional, Callable, Tuple
+
+from tests_perf.mock_testrail import MockTestRail
+from tests_perf.report_generator import generate_junit, generate_robot, generate_cucumber
+
+REPO_ROOT = Path(__file__).parent.parent
+PROJECT_NAME = "Perf Project"
+RSS_SAMPLE_INTERVAL = 0.05
+DEFAULT_THRESHOLD = 0.2
+ADAPTIVE_TARGET_LATENCY = 1.0
+EMBEDDING_KB = 256
+LARGE_ATTACHMENT_MB = 64
+LARGE_ATTACHMENT_RESULTS = 10
+
+TRCLI_ENTRYPOINT = "import sys; sys.argv[0] = 'trcli'; from trcli.cli import cli; cli()"
+PARSE_ENTRYPOINT = "from tests_perf.benchmark import parse_only; parse_only()"
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    cases: int
+    wall_s: float
+    stage_s: float
+    throughput: float
+    peak_rss_mb: float
+    exit_code: int
+    requests: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+    rss_mb_over_time: List[Tuple[float, float]] = field(default_factory=list)
+    server: Dict[str, int] = field(default_factory=dict)
+    timestamp: str = ""
+    version: str = ""
+
+
+@dataclass
+class Scenario:
+    """
+    :param name: scenario name
+    :param stage: metrics stage used to calculate throughput (None - whole command wall time)
+    :param prepare: callable(work_dir, cases, server) returning the command arguments
+    """
+
+    name: str
+    stage: Optional[str]
+    prepare: Callable[[str, int, Optional[MockTestRail]], List[str]]
+    needs_server: bool = True
+
+
+def _trcli_args(server: MockTestRail, metrics_file: str, *args) -> List[str]:
+    return [
+        "-y",
+        "-h",
+        server.url,
+        "-u",
+        "perf@example.com",
+        "-p",
+        "password",
+        "--project",
+        PROJECT_NAME,
+        "--metrics-file",
+        metrics_file,
+        *args,
+    ]
+
+
+def _prepare_parse(generator, file_name: str, parser_format: str):
+    def prepare(work_dir: str, cases: int, server: Optional[MockTestRail]) -> List[str]:
+        report = os.path.join(work_dir, file_name)
+        generator(report, cases)
+        return ["-c", PARSE_ENTRYPOINT, parser_format, report]
+
+    return prepare
+
+
+def _prepare_match(work_dir: str, cases: int, server: MockTestRail) -> List[str]:
+    report = os.path.join(work_dir, "junit.xml")
+    generate_junit(report, cases)
+    server.seed(cases)
+    return _trcli_args(server, os.path.join(work_dir, "metrics.prom"), "parse_junit", "-f", report, "--title", "perf")
+
+
+def _prepare_create_cases(work_dir: str, cases: int, server: MockTestRail) -> List[str]:
+    report = os.path.join(work_dir, "junit.xml")
+    generate_junit(report, cases)
+    return _trcli_args(server, os.path.join(work_dir, "metrics.prom"), "parse_junit", "-f", report, "--title", "perf")
+
+
+def _prepare_results(work_dir: str, cases: int, server: MockTestRail, *options) -> List[str]:
+    report = os.path.join(work_dir, "junit.xml")
+    generate_junit(report, cases, case_ids=True, comment_size=2048)
+    server.seed(cases, case_ids=True)
+    return _trcli_args(
+        server,
+        os.path.join(work_dir, "metrics.prom"),
+        *options,
+        "parse_junit",
+        "-f",
+        report,
+        "--title",
+        "perf",
+        "--case-matcher",
+        "name",
+    )
+
+
+def _prepare_results_adaptive(work_dir: str, cases: int, server: MockTestRail) -> List[str]:
+    return _prepare_results(work_dir, cases, server, "--batch-target-latency", str(ADAPTIVE_TARGET_LATENCY))
+
+
+def _prepare_results_gzip(work_dir: str, cases: int, server: MockTestRail) -> List[str]:
+    return _prepare_results(work_dir, cases, server, "--gzip-requests")
+
+
+def _prepare_attachments(
+    work_dir: str, cases: int, server: MockTestRail, size_kb: int = 256, failure_rate: float = 1.0
+) -> List[str]:
+    attachment = os.path.join(work_dir, "screenshot.png")
+    with open(attachment, "wb") as f:
+        for _ in range(0, size_kb, 1024):
+            f.write(os.urandom(min(1024, size_kb) * 1024))
+    report = os.path.join(work_dir, "junit.xml")
+    generate_junit(report, cases, failure_rate=failure_rate, case_ids=True, attachments=[attachment])
+    server.seed(cases, case_ids=True)
+    return _trcli_args(
+        server,
+        os.path.join(work_dir, "metrics.prom"),
+        "parse_junit",
+        "-f",
+        report,
+        "--title",
+        "perf",
+        "--case-matcher",
+        "name",
+    )
+
+
+def _prepare_attachments_large(work_dir: str, cases: int, server: MockTestRail) -> List[str]:
+    failure_rate = min(1.0, LARGE_ATTACHMENT_RESULTS / cases)
+    return _prepare_attachments(work_dir, cases, server, LARGE_ATTACHMENT_MB * 1024, failure_rate)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("parse_junit", None, _prepare_parse(generate_junit, "junit.xml", "junit"), needs_server=False),
+        Scenario("parse_robot", None, _prepare_parse(generate_robot, "output.xml", "robot"), needs_server=False),
+        Scenario(
+            "parse_cucumber", None, _prepare_parse(generate_cucumber, "cucumber.json", "cucumber"), needs_server=False
+        ),
+        Scenario(
+            "parse_cucumber_embeddings",
+            None,
+            _prepare_parse(partial(generate_cucumber, embedding_kb=EMBEDDING_KB), "cucumber.json", "cucumber"),
+            needs_server=False,
+        ),
+        Scenario("match", "match", _prepare_match),
+        Scenario("create_cases", "cases", _prepare_create_cases),
+        Scenario("results", "results", _prepare_results),
+        Scenario("results_adaptive", "results", _prepare_results_adaptive),
+        Scenario("results_gzip", "results", _prepare_results_gzip),
+        Scenario("attachments", "attachments", _prepare_attachments),
+        Scenario("attachments_large", "attachments", _prepare_attachments_large),
+    ]
+}
+
+
+def parse_only():
+    """Child process entrypoint parsing a report without uploading it (argv: format, file)"""
+    from trcli.cli import Environment
+    from trcli.data_classes.data_parsers import MatchersParser
+    from trcli.readers.cucumber_json import CucumberParser
+    from trcli.readers.junit_xml import JunitParser
+    from trcli.readers.robot_xml import RobotParser
+
+    parser_format, report = sys.argv[1:3]
+    environment = Environment(cmd=f"parse_{parser_format}")
+    environment.file = report
+    environment.case_matcher = MatchersParser.AUTO
+    environment.special_parser = "junit"
+    environment.silent = True
+    parser_class = {"junit": JunitParser, "robot": RobotParser, "cucumber": CucumberParser}[parser_format]
+    suites = parser_class(environment).parse_file()
+    cases = sum(len(section.testcases) for suite in suites for section in suite.testsections)
+    print(f"Parsed {cases} test cases.")
+
+
+def _read_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (IOError, OSError, ValueError):
+        pass
+    return None
+
+
+def _run_child(args: List[str], work_dir: str) -> Tuple[int, float, float, List[Tuple[float, float]], str]:
+    """Runs the child process, returns (exit_code, wall_s, peak_rss_mb, rss_samples, output)"""
+    samples = []
+    output_file = os.path.join(work_dir, "output.log")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(REPO_ROOT), os.environ.get("PYTHONPATH", "")]))
+    start = time.perf_counter()
+    with open(output_file, "w") as output:
+        process = subprocess.Popen(
+            [sys.executable, *args], cwd=work_dir, stdout=output, stderr=subprocess.STDOUT, env=env
+        )
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(RSS_SAMPLE_INTERVAL):
+                rss = _read_rss_mb(process.pid)
+                if rss is not None:
+                    samples.append((round(time.perf_counter() - start, 3), round(rss, 1)))
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is reported in KB on Linux and in bytes on macOS
+            peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            process.wait()
+            peak_rss_mb = max((rss for _, rss in samples), default=0.0)
+        wall_s = time.perf_counter() - start
+        done.set()
+        sampler.join()
+    with open(output_file) as f:
+        return process.returncode, wall_s, peak_rss_mb, samples, f.read()
+
+
+def _read_prometheus_metrics(metrics_file: str) -> Tuple[Dict[str, float], int]:
+    """Reads stage durations and total request count from the trcli metrics file"""
+    stages, requests = {}, 0
+    if not os.path.exists(metrics_file):
+        return stages, requests
+    with open(metrics_file) as f:
+        for line in f:
+            if line.startswith('trcli_stage_duration_seconds{stage="'):
+                name = line.split('"')[1]
+                stages[name] = float(line.split()[-1])
+            elif line.startswith("trcli_api_requests_total{"):
+                requests += int(line.split()[-1])
+    return stages, requests
+
+
+def _downsample(samples: List[Tuple[float, float]], max_points: int = 100) -> List[Tuple[float, float]]:
+    step = max(1, len(samples) // max_points)
+    return samples[::step]
+
+
+def run_scenario(
+    scenario: Scenario,
+    cases: int,
+    latency_ms: float = 0,
+    latency_ms_per_kb: float = 0,
+    rate_limit_every: int = 0,
+    page_size: int = 250,
+    verbose: bool = False,
+) -> BenchmarkResult:
+    """Runs a single scenario and returns its result"""
+    from trcli import __version__
+
+    with tempfile.TemporaryDirectory(prefix=f"trcli-perf-{scenario.name}-") as work_dir:
+        server = None
+        if scenario.needs_server:
+            server = MockTestRail(
+                latency_ms=latency_ms,
+                latency_ms_per_kb=latency_ms_per_kb,
+                rate_limit_every=rate_limit_every,
+                retry_after="0.1",
+                page_size=page_size,
+            ).start()
+        try:
+            args = scenario.prepare(work_dir, cases, server)
+            if scenario.needs_server:
+                args = ["-c", TRCLI_ENTRYPOINT, *args]
+            exit_code, wall_s, peak_rss_mb, samples, output = _run_child(args, work_dir)
+        finally:
+            if server:
+                server.stop()
+        if verbose or exit_code != 0:
+            print(output[-3000:])
+        stages, requests = _read_prometheus_metrics(os.path.join(work_dir, "metrics.prom"))
+
+    stage_s = stages.get(scenario.stage, 0.0) if scenario.stage else wall_s
+    return BenchmarkResult(
+        scenario=scenario.name,
+        cases=cases,
+        wall_s=round(wall_s, 3),
+        stage_s=round(stage_s, 3),
+        throughput=round(cases / stage_s, 1) if stage_s else 0.0,
+        peak_rss_mb=round(peak_rss_mb, 1),
+        exit_code=exit_code,
+        requests=requests,
+        stages=stages,
+        rss_mb_over_time=_downsample(samples),
+        server=(
+            {"requests": sum(server.request_counts.values()), "rate_limited": server.rate_limited} if server else {}
+        ),
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        version=__version__,
+    )
+
+
+def load_history(history_file: str) -> List[Dict]:
+    if not history_file or not os.path.exists(history_file):
+        return []
+    with open(history_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(result: BenchmarkResult, history: List[Dict], threshold: float) -> List[str]:
+    """Compares result with the latest history entry of the same scenario and size"""
+    previous = next(
+        (
+            entry
+            for entry in reversed(history)
+            if entry["scenario"] == result.scenario and entry["cases"] == result.cases
+        ),
+        None,
+    )
+    if previous is None:
+        return []
+    regressions = []
+    if previous["throughput"] and result.throughput < previous["throughput"] * (1 - threshold):
+        regressions.append(
+            f"{result.scenario} ({result.cases} cases): throughput {result.throughput}/s "
+            f"vs {previous['throughput']}/s ({previous['version']})"
+        )
+    if previous["peak_rss_mb"] and result.peak_rss_mb > previous["peak_rss_mb"] * (1 + threshold):
+        regressions.append(
+            f"{result.scenario} ({result.cases} cases): peak RSS {result.peak_rss_mb} MB "
+            f"vs {previous['peak_rss_mb']} MB ({previous['version']})"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run TRCLI performance benchmarks.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario(s) to run.")
+    parser.add_argument("--cases", type=int, nargs="+", default=[1000], help="Report size(s).")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mock server latency per request.")
+    parser.add_argument("--latency-ms-per-kb", type=float, default=0, help="Mock server latency per KB of body.")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every N-th request with 429.")
+    parser.add_argument("--page-size", type=int, default=250, help="Mock server page size.")
+    parser.add_argument("--history", help="JSON lines file results are appended to and compared with.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed regression ratio.")
+    parser.add_argument("--verbose", action="store_true", help="Print trcli output.")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    regressions = []
+    failed = False
+    print(f"{'scenario':<27}{'cases':>9}{'wall s':>9}{'stage s':>9}{'cases/s':>11}{'requests':>10}{'peak MB':>9}")
+    for name in args.scenario or list(SCENARIOS):
+        for cases in args.cases:
+            result = run_scenario(
+                SCENARIOS[name],
+                cases,
+                latency_ms=args.latency_ms,
+                latency_ms_per_kb=args.latency_ms_per_kb,
+                rate_limit_every=args.rate_limit_every,
+                page_size=args.page_size,
+                verbose=args.verbose,
+            )
+            print(
+                f"{result.scenario:<27}{result.cases:>9}{result.wall_s:>9.2f}{result.stage_s:>9.2f}"
+                f"{result.throughput:>11.1f}{result.requests:>10}{result.peak_rss_mb:>9.1f}"
+            )
+            if result.exit_code != 0:
+                failed = True
+                continue
+            regressions.extend(find_regressions(result, history, args.threshold))
+            if args.history:
+                with open(args.history, "a") as f:
+                    f.write(json.dumps(asdict(result)) + "\n")
+
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if failed or regressions:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
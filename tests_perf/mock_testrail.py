@@ -0,0 +1,504 @@
+"""
+In-process mock TestRail API for performance benchmarks
+
+Implements the subset of the TestRail API v2 used by the upload commands
+(projects, suites, sections, cases, runs, tests, results, attachments, users)
+on top of an in-memory store. The server runs in a background thread and
+supports:
+
+- configurable latency (fixed + per KB of request body) to simulate slow instances
+- paginated bulk endpoints with a configurable page size
+- 429 (Too Many Requests) injection with Retry-After header
+- chunked and gzip encoded request bodies
+
+Usage:
+    with MockTestRail(latency_ms=20, rate_limit_every=100) as server:
+        server.seed(cases=10000)
+        # trcli -h server.url ...
+        print(server.request_counts)
+
+    # Standalone
+    python -m tests_perf.mock_testrail --port 8080 --latency-ms 20 --seed-cases 10000
+"""
+
+import argparse
+import gzip
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from beartype.typing import Dict, List, Tuple, Optional, Any
+
+from tests_perf.report_generator import iter_cases, automation_id, case_name, section_name, DEFAULT_CASES_PER_SECTION
+
+API_PREFIX = "/api/v2/"
+
+
+class MockTestRail:
+    """
+    Mock TestRail server with in-memory state.
+
+    :param latency_ms: fixed latency added to every request
+    :param latency_ms_per_kb: additional latency per KB of request body (simulates slow uploads/processing)
+    :param page_size: page size of paginated bulk endpoints
+    :param rate_limit_every: every N-th request is answered with 429 (0 disables injection)
+    :param retry_after: Retry-After header value for injected 429 responses
+    :param max_body_bytes: requests with larger bodies are rejected with 413 (0 disables the limit)
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        latency_ms_per_kb: float = 0,
+        page_size: int = 250,
+        rate_limit_every: int = 0,
+        retry_after: str = "1",
+        max_body_bytes: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_ms_per_kb = latency_ms_per_kb
+        self.page_size = page_size
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.max_body_bytes = max_body_bytes
+        self.request_counts = Counter()
+        self.bytes_received = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._requests = itertools.count(1)
+        self._ids = itertools.count(1)
+        self.projects: Dict[int, Dict] = {}
+        self.suites: Dict[int, Dict] = {}
+        self.sections: Dict[int, Dict] = {}
+        self.cases: Dict[int, Dict] = {}
+        self.runs: Dict[int, Dict] = {}
+        self.tests: Dict[int, Dict] = {}
+        self.results: Dict[int, Dict] = {}
+        self.attachments: Dict[int, Dict] = {}
+        self._tests_by_case: Dict[Tuple[int, int], Dict] = {}
+        self._listings: Dict[str, Dict[int, List[Dict]]] = {}
+        self.users = [{"id": 1, "name": "Perf User", "email": "perf@example.com", "is_active": True}]
+        self.project_id = self._add("projects", {"name": "Perf Project", "suite_mode": 1, "is_completed": False})
+        self.suite_id = self._add("suites", {"name": "Master", "project_id": self.project_id})
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "MockTestRail":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-testrail", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockTestRail":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _add(self, store: str, entity: Dict) -> int:
+        entity_id = next(self._ids)
+        entity["id"] = entity_id
+        getattr(self, store)[entity_id] = entity
+        self._listings.pop(store, None)
+        return entity_id
+
+    def _listing(self, store: str, key: str, value: int) -> List[Dict]:
+        """Entities of the store filtered by key (cached until the store changes)"""
+        listings = self._listings.setdefault(store, {})
+        if value not in listings:
+            listings[value] = [e for e in getattr(self, store).values() if e.get(key) == value]
+        return listings[value]
+
+    def seed(self, cases: int, cases_per_section: int = DEFAULT_CASES_PER_SECTION, case_ids: bool = False):
+        """
+        Create sections and cases matching a report generated with the same parameters.
+
+        :param case_ids: case ids are assigned from 1 to cases (matching [C<id>] names in reports)
+        """
+        with self._lock:
+            sections = {}
+            for section_index, case_index, number in iter_cases(cases, cases_per_section):
+                if section_index not in sections:
+                    sections[section_index] = self._add(
+                        "sections", {"name": section_name(section_index), "suite_id": self.suite_id, "parent_id": None}
+                    )
+                case = {
+                    "title": case_name(case_index),
+                    "section_id": sections[section_index],
+                    "suite_id": self.suite_id,
+                    "template_id": 1,
+                    "custom_automation_id": automation_id(section_index, case_index),
+                    "updated_on": int(time.time()),
+                }
+                if case_ids:
+                    case["id"] = number
+                    self.cases[number] = case
+                else:
+                    self._add("cases", case)
+            if case_ids:
+                # keep generated ids clear of seeded case ids
+                self._ids = itertools.count(max(cases, next(self._ids)) + 1)
+            self._listings.clear()
+
+    # --- request handling ---
+
+    def handle(self, method: str, query: str, body: bytes, headers) -> Tuple[int, Any, Dict[str, str]]:
+        request_number = next(self._requests)
+        delay = self.latency_ms + self.latency_ms_per_kb * len(body) / 1024
+        if delay:
+            time.sleep(delay / 1000)
+        endpoint, ids, params = self._parse_query(query)
+        with self._lock:
+            self.request_counts[endpoint] += 1
+            self.bytes_received += len(body)
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            self.rate_limited += 1
+            return 429, {"error": "API Rate Limit Exceeded"}, {"Retry-After": self.retry_after}
+        if self.max_body_bytes and len(body) > self.max_body_bytes:
+            return 413, {"error": "Request Entity Too Large"}, {}
+        payload = {}
+        if method == "POST" and "multipart/form-data" in headers.get("Content-Type", ""):
+            payload = self._parse_multipart(body)
+        elif method == "POST" and body:
+            if headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return 400, {"error": "Invalid JSON body"}, {}
+        handler = getattr(self, f"_{method.lower()}_{endpoint}", None)
+        if handler is None:
+            return 404, {"error": f"Unknown method '{endpoint}'"}, {}
+        with self._lock:
+            status, response = handler(ids, params, payload)
+        return status, response, {}
+
+    @staticmethod
+    def _parse_query(query: str) -> Tuple[str, List[int], Dict[str, str]]:
+        query = unquote(query)
+        if query.startswith(API_PREFIX):
+            query = query[len(API_PREFIX) :]
+        path, *pairs = query.split("&")
+        endpoint, *ids = path.split("/")
+        params = dict(pair.split("=", 1) for pair in pairs if "=" in pair)
+        return endpoint, [int(i) for i in ids if i.isdigit()], params
+
+    def _page(self, entity: str, endpoint: str, items: List[Dict], params: Dict[str, str]) -> Dict:
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", self.page_size)) or self.page_size
+        limit = min(limit, self.page_size)
+        page = items[offset : offset + limit]
+        next_link = None
+        if offset + limit < len(items):
+            query = "&".join(f"{k}={v}" for k, v in params.items() if k not in ("offset", "limit"))
+            next_link = f"{API_PREFIX}{endpoint}{'&' + query if query else ''}&limit={limit}&offset={offset + limit}"
+        return {
+            "offset": offset,
+            "limit": limit,
+            "size": len(page),
+            "_links": {"next": next_link, "prev": None},
+            entity: page,
+        }
+
+    # --- GET endpoints ---
+
+    def _get_get_projects(self, ids, params, payload):
+        return 200, self._page("projects", "get_projects", list(self.projects.values()), params)
+
+    def _get_get_project(self, ids, params, payload):
+        return self._get_entity(self.projects, ids)
+
+    def _get_get_suites(self, ids, params, payload):
+        return 200, [s for s in self.suites.values() if s["project_id"] == ids[0]]
+
+    def _get_get_suite(self, ids, params, payload):
+        return self._get_entity(self.suites, ids)
+
+    def _get_get_sections(self, ids, params, payload):
+        suite_id = int(params.get("suite_id", self.suite_id))
+        sections = self._listing("sections", "suite_id", suite_id)
+        return 200, self._page("sections", f"get_sections/{ids[0]}", sections, params)
+
+    def _get_get_cases(self, ids, params, payload):
+        suite_id = int(params.get("suite_id", self.suite_id))
+        cases = self._listing("cases", "suite_id", suite_id)
+        if "section_id" in params:
+            cases = [c for c in cases if c["section_id"] == int(params["section_id"])]
+        if "updated_after" in params:
+            cases = [c for c in cases if c["updated_on"] > int(params["updated_after"])]
+        return 200, self._page("cases", f"get_cases/{ids[0]}", cases, params)
+
+    def _get_get_case(self, ids, params, payload):
+        return self._get_entity(self.cases, ids)
+
+    def _get_get_run(self, ids, params, payload):
+        return self._get_entity(self.runs, ids)
+
+    def _get_get_runs(self, ids, params, payload):
+        runs = [r for r in self.runs.values() if r["project_id"] == ids[0]]
+        if "is_completed" in params:
+            runs = [r for r in runs if r["is_completed"] == bool(int(params["is_completed"]))]
+        if "created_after" in params:
+            runs = [r for r in runs if r["created_on"] > int(params["created_after"])]
+        return 200, self._page("runs", f"get_runs/{ids[0]}", runs, params)
+
+    def _get_get_attachments_for_run(self, ids, params, payload):
+        attachments = [
+            {"id": a["id"], "name": a["name"], "created_on": a["created_on"]}
+            for a in self.attachments.values()
+            if a.get("run_id") == ids[0]
+        ]
+        return 200, self._page("attachments", f"get_attachments_for_run/{ids[0]}", attachments, params)
+
+    def _get_get_attachment(self, ids, params, payload):
+        status, attachment = self._get_entity(self.attachments, ids)
+        return (status, json.loads(attachment["content"])) if status == 200 else (status, attachment)
+
+    def _get_get_tests(self, ids, params, payload):
+        tests = self._listing("tests", "run_id", ids[0])
+        return 200, self._page("tests", f"get_tests/{ids[0]}", tests, params)
+
+    def _get_get_results_for_run(self, ids, params, payload):
+        test_ids = {t["id"] for t in self._listing("tests", "run_id", ids[0])}
+        results = [r for r in self.results.values() if r["test_id"] in test_ids]
+        return 200, self._page("results", f"get_results_for_run/{ids[0]}", results, params)
+
+    def _get_get_users(self, ids, params, payload):
+        return 200, self._page("users", "get_users", self.users, params)
+
+    def _get_get_user_by_email(self, ids, params, payload):
+        user = next((u for u in self.users if u["email"].lower() == params.get("email", "").lower()), None)
+        if user is None:
+            return 400, {"error": "Field :email is not a valid user."}
+        return 200, user
+
+    def _get_get_case_fields(self, ids, params, payload):
+        return 200, [
+            {
+                "id": 1,
+                "system_name": "custom_automation_id",
+                "type_id": 1,
+                "is_active": True,
+                "configs": [{"context": {"is_global": True, "project_ids": None}}],
+            }
+        ]
+
+    def _get_get_result_fields(self, ids, params, payload):
+        return 200, []
+
+    def _get_get_statuses(self, ids, params, payload):
+        return 200, [{"id": 1, "name": "passed"}, {"id": 5, "name": "failed"}]
+
+    def _get_get_templates(self, ids, params, payload):
+        return 200, [{"id": 1, "name": "Test Case (Text)", "is_default": True}]
+
+    # --- POST endpoints ---
+
+    def _post_add_section(self, ids, params, payload):
+        section = {"suite_id": payload.get("suite_id", self.suite_id), "parent_id": payload.get("parent_id"), **payload}
+        self._add("sections", section)
+        return 200, section
+
+    def _post_delete_section(self, ids, params, payload):
+        self.sections.pop(ids[0], None)
+        self._listings.pop("sections", None)
+        return 200, {}
+
+    def _post_add_case(self, ids, params, payload):
+        section = self.sections.get(ids[0])
+        if section is None:
+            return 400, {"error": "Field :section_id is not a valid section."}
+        case = {
+            "template_id": 1,
+            **payload,
+            "section_id": ids[0],
+            "suite_id": section["suite_id"],
+            "updated_on": int(time.time()),
+        }
+        self._add("cases", case)
+        return 200, case
+
+    def _post_update_case(self, ids, params, payload):
+        status, case = self._get_entity(self.cases, ids)
+        if status == 200:
+            case.update(payload, updated_on=int(time.time()))
+        return status, case
+
+    def _post_delete_cases(self, ids, params, payload):
+        for case_id in payload.get("case_ids", []):
+            self.cases.pop(case_id, None)
+        self._listings.pop("cases", None)
+        return 200, {}
+
+    def _post_add_run(self, ids, params, payload):
+        run = {
+            "project_id": ids[0],
+            "suite_id": payload.get("suite_id", self.suite_id),
+            "plan_id": None,
+            "config_ids": [],
+            "is_completed": False,
+            "created_on": int(time.time()),
+        }
+        run.update(payload)
+        run_id = self._add("runs", run)
+        run["url"] = f"{self.url}index.php?/runs/view/{run_id}"
+        self._add_tests(run)
+        return 200, run
+
+    def _post_update_run(self, ids, params, payload):
+        status, run = self._get_entity(self.runs, ids)
+        if status == 200:
+            run.update(payload)
+            self._add_tests(run)
+        return status, run
+
+    def _post_close_run(self, ids, params, payload):
+        status, run = self._get_entity(self.runs, ids)
+        if status == 200:
+            run["is_completed"] = True
+        return status, run
+
+    def _post_add_results_for_cases(self, ids, params, payload):
+        run_id = ids[0]
+        responses = []
+        for result in payload.get("results", []):
+            test = self._tests_by_case.get((run_id, result.get("case_id")))
+            if test is None:
+                return 400, {"error": f"Field :results cannot be added, no test for case {result.get('case_id')}"}
+            stored = {k: v for k, v in result.items() if k != "case_id"}
+            stored["test_id"] = test["id"]
+            self._add("results", stored)
+            responses.append(stored)
+        return 200, responses
+
+    def _post_add_attachment_to_result(self, ids, params, payload):
+        if ids[0] not in self.results:
+            return 400, {"error": "Field :result_id is not a valid result."}
+        attachment_id = self._add("attachments", {"result_id": ids[0]})
+        return 200, {"attachment_id": attachment_id}
+
+    def _post_add_attachment_to_run(self, ids, params, payload):
+        if ids[0] not in self.runs:
+            return 400, {"error": "Field :run_id is not a valid test run."}
+        attachment_id = self._add("attachments", {"run_id": ids[0], "created_on": int(time.time()), **payload})
+        return 200, {"attachment_id": attachment_id}
+
+    # --- helpers ---
+
+    @staticmethod
+    def _parse_multipart(body: bytes) -> Dict:
+        """File name and content of the file field of a multipart body"""
+        headers, _, content = body.partition(b"\r\n\r\n")
+        name = re.search(rb'filename="([^"]*)"', headers)
+        content = content[: content.rfind(b"\r\n--")]
+        return {"name": name.group(1).decode() if name else None, "content": content}
+
+    @staticmethod
+    def _get_entity(store: Dict[int, Dict], ids: List[int]):
+        entity = store.get(ids[0]) if ids else None
+        if entity is None:
+            return 400, {"error": "Field :id is not a valid ID."}
+        return 200, entity
+
+    def _add_tests(self, run: Dict):
+        if run.get("include_all", True):
+            case_ids = [c["id"] for c in self._listing("cases", "suite_id", run["suite_id"])]
+        else:
+            case_ids = run.get("case_ids", [])
+        for case_id in case_ids:
+            if (run["id"], case_id) not in self._tests_by_case:
+                test = {"run_id": run["id"], "case_id": case_id, "status_id": 3}
+                self._add("tests", test)
+                self._tests_by_case[(run["id"], case_id)] = test
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self, method: str):
+        body = self._read_body()
+        query = self.path.split("?", 1)[1] if "?" in self.path else ""
+        status, response, headers = self.server.mock.handle(method, query, body, self.headers)
+        data = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run mock TestRail API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-ms-per-kb", type=float, default=0)
+    parser.add_argument("--page-size", type=int, default=250)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--retry-after", default="1")
+    parser.add_argument("--seed-cases", type=int, default=0)
+    parser.add_argument("--case-ids", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = MockTestRail(
+        latency_ms=args.latency_ms,
+        latency_ms_per_kb=args.latency_ms_per_kb,
+        page_size=args.page_size,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        host=args.host,
+        port=args.port,
+    )
+    if args.seed_cases:
+        server.seed(args.seed_cases, case_ids=args.case_ids)
+    print(f"Mock TestRail listening on {server.url} (project 'Perf Project')")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
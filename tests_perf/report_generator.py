@@ -0,0 +1,263 @@
+"""
+Synthetic report generator for performance benchmarks
+
+Generates JUnit XML, Robot Framework XML and Cucumber JSON reports of any size
+(1k - 1M cases). Reports are written incrementally so memory usage stays flat
+regardless of the number of generated cases.
+
+Generated test names are deterministic, so the mock TestRail server can be seeded
+with matching cases (see automation_id() and MockTestRail.seed()).
+
+Usage:
+    python -m tests_perf.report_generator junit --cases 100000 --output junit.xml
+    python -m tests_perf.report_generator robot --cases 10000 --output output.xml --case-ids
+    python -m tests_perf.report_generator cucumber --cases 5000 --output cucumber.json --embedding-kb 64
+"""
+
+import argparse
+import base64
+import json
+import random
+from xml.sax.saxutils import escape, quoteattr
+
+from beartype.typing import Iterator, Tuple, List, Optional
+
+DEFAULT_CASES_PER_SECTION = 100
+DEFAULT_FAILURE_RATE = 0.1
+DEFAULT_SEED = 1
+
+
+def section_name(section_index: int) -> str:
+    return f"perf.module_{section_index}"
+
+
+def case_name(case_index: int) -> str:
+    return f"test_{case_index}"
+
+
+def automation_id(section_index: int, case_index: int) -> str:
+    """Automation id assigned by the JUnit parser to the generated test case"""
+    return f"{section_name(section_index)}.{case_name(case_index)}"
+
+
+def iter_cases(cases: int, cases_per_section: int = DEFAULT_CASES_PER_SECTION) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yields (section_index, case_index, case_number) for every generated case.
+    case_number is 1-based and is used as TestRail case id when case ids are requested.
+    """
+    for number in range(1, cases + 1):
+        yield (number - 1) // cases_per_section, number, number
+
+
+def _failure_message(rng: random.Random, comment_size: int) -> str:
+    trace = "\n".join(f'  File "perf/module.py", line {rng.randint(1, 999)}, in step_{i}' for i in range(10))
+    message = f"AssertionError: expected value {rng.randint(0, 100)}\nTraceback (most recent call last):\n{trace}"
+    if comment_size > len(message):
+        message += "\n" + "x" * (comment_size - len(message))
+    return message
+
+
+def generate_junit(
+    output: str,
+    cases: int,
+    cases_per_section: int = DEFAULT_CASES_PER_SECTION,
+    failure_rate: float = DEFAULT_FAILURE_RATE,
+    case_ids: bool = False,
+    attachments: Optional[List[str]] = None,
+    comment_size: int = 0,
+    seed: int = DEFAULT_SEED,
+):
+    """
+    Generate JUnit XML report
+
+    :param output: destination file
+    :param cases: number of test cases
+    :param cases_per_section: number of test cases per testsuite (TestRail section)
+    :param failure_rate: ratio of failed test cases (0-1)
+    :param case_ids: prefix test names with [C<id>] (for --case-matcher name)
+    :param attachments: files attached (testrail_attachment property) to every failed case
+    :param comment_size: minimal size in bytes of the failure message
+    :param seed: random seed
+    """
+    rng = random.Random(seed)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="perf">\n')
+        current_section = None
+        for section_index, case_index, number in iter_cases(cases, cases_per_section):
+            if section_index != current_section:
+                if current_section is not None:
+                    f.write("  </testsuite>\n")
+                f.write(f"  <testsuite name={quoteattr(section_name(section_index))}>\n")
+                current_section = section_index
+            name = f"[C{number}] {case_name(case_index)}" if case_ids else case_name(case_index)
+            f.write(
+                f"    <testcase classname={quoteattr(section_name(section_index))} name={quoteattr(name)}"
+                f' time="{rng.uniform(0.001, 5):.3f}">\n'
+            )
+            if rng.random() < failure_rate:
+                message = _failure_message(rng, comment_size)
+                f.write(f'      <failure message="failed">{escape(message)}</failure>\n')
+                if attachments:
+                    f.write("      <properties>\n")
+                    for attachment in attachments:
+                        f.write(f'        <property name="testrail_attachment" value={quoteattr(attachment)}/>\n')
+                    f.write("      </properties>\n")
+            f.write("    </testcase>\n")
+        if current_section is not None:
+            f.write("  </testsuite>\n")
+        f.write("</testsuites>\n")
+
+
+def generate_robot(
+    output: str,
+    cases: int,
+    cases_per_section: int = DEFAULT_CASES_PER_SECTION,
+    failure_rate: float = DEFAULT_FAILURE_RATE,
+    case_ids: bool = False,
+    attachments: Optional[List[str]] = None,
+    comment_size: int = 0,
+    seed: int = DEFAULT_SEED,
+):
+    """
+    Generate Robot Framework (RF 7.0 schema) output XML report
+
+    Parameters are the same as for generate_junit().
+    """
+    rng = random.Random(seed)
+    timestamp = "2024-01-01T00:00:00.000000"
+    with open(output, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<robot generator="Rebot 7.0" generated="2024-01-01T00:00:00" rpa="false" schemaversion="5">\n')
+        f.write('<suite id="s1" name="perf">\n')
+        current_section = None
+        for section_index, case_index, number in iter_cases(cases, cases_per_section):
+            if section_index != current_section:
+                if current_section is not None:
+                    f.write("</suite>\n")
+                f.write(f'<suite id="s1-s{section_index + 1}" name="module_{section_index}">\n')
+                current_section = section_index
+            name = f"[C{number}] {case_name(case_index)}" if case_ids else case_name(case_index)
+            failed = rng.random() < failure_rate
+            status = "FAIL" if failed else "PASS"
+            elapsed = f"{rng.uniform(0.001, 5):.6f}"
+            f.write(f'<test id="s1-s{section_index + 1}-t{case_index}" name={quoteattr(name)}>\n')
+            f.write(f'<kw name="Step"><status status="{status}" start="{timestamp}" elapsed="{elapsed}"/></kw>\n')
+            if failed and attachments:
+                doc = "\n".join(f"- testrail_attachment: {attachment}" for attachment in attachments)
+                f.write(f"<doc>{escape(doc)}</doc>\n")
+            message = escape(_failure_message(rng, comment_size)) if failed else ""
+            f.write(f'<status status="{status}" start="{timestamp}" elapsed="{elapsed}">{message}</status>\n')
+            f.write("</test>\n")
+        if current_section is not None:
+            f.write("</suite>\n")
+        f.write(f'<status status="PASS" start="{timestamp}" elapsed="1.0"/>\n</suite>\n</robot>\n')
+
+
+def generate_cucumber(
+    output: str,
+    cases: int,
+    cases_per_section: int = DEFAULT_CASES_PER_SECTION,
+    failure_rate: float = DEFAULT_FAILURE_RATE,
+    steps: int = 5,
+    embedding_kb: int = 0,
+    seed: int = DEFAULT_SEED,
+):
+    """
+    Generate Cucumber JSON report (one feature per section, one scenario per case)
+
+    :param embedding_kb: size of a screenshot embedding added to every failed step (0 disables embeddings)
+    """
+    rng = random.Random(seed)
+    embedding = base64.b64encode(b"\0" * embedding_kb * 1024).decode() if embedding_kb else None
+    with open(output, "w", encoding="utf-8") as f:
+        f.write("[")
+        current_section = None
+        first_scenario = True
+        for section_index, case_index, number in iter_cases(cases, cases_per_section):
+            if section_index != current_section:
+                if current_section is not None:
+                    f.write("]},")
+                feature = {
+                    "uri": f"features/module_{section_index}.feature",
+                    "id": f"module-{section_index}",
+                    "keyword": "Feature",
+                    "name": f"Module {section_index}",
+                    "line": 1,
+                    "tags": [],
+                }
+                f.write(json.dumps(feature)[:-1] + ', "elements": [')
+                current_section = section_index
+                first_scenario = True
+            failed = rng.random() < failure_rate
+            scenario_steps = []
+            for step_index in range(steps):
+                step_failed = failed and step_index == steps - 1
+                step = {
+                    "keyword": "Then " if step_index == steps - 1 else "Given ",
+                    "name": f"step {step_index}",
+                    "line": step_index + 3,
+                    "result": {
+                        "status": "failed" if step_failed else "passed",
+                        "duration": rng.randint(1_000_000, 1_000_000_000),
+                    },
+                }
+                if step_failed:
+                    step["result"]["error_message"] = _failure_message(rng, 0)
+                    if embedding:
+                        step["embeddings"] = [{"mime_type": "image/png", "data": embedding}]
+                scenario_steps.append(step)
+            scenario = {
+                "id": f"module-{section_index};{case_name(case_index)}",
+                "keyword": "Scenario",
+                "name": case_name(case_index),
+                "line": 2,
+                "type": "scenario",
+                "tags": [{"name": f"@C{number}", "line": 1}],
+                "steps": scenario_steps,
+            }
+            f.write(("" if first_scenario else ",") + json.dumps(scenario))
+            first_scenario = False
+        if current_section is not None:
+            f.write("]}")
+        f.write("]\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic test reports for benchmarks.")
+    parser.add_argument("format", choices=["junit", "robot", "cucumber"])
+    parser.add_argument("--cases", type=int, required=True, help="Number of test cases.")
+    parser.add_argument("--output", required=True, help="Output file.")
+    parser.add_argument("--cases-per-section", type=int, default=DEFAULT_CASES_PER_SECTION)
+    parser.add_argument("--failure-rate", type=float, default=DEFAULT_FAILURE_RATE)
+    parser.add_argument("--case-ids", action="store_true", help="Add [C<id>] to test names (JUnit/Robot).")
+    parser.add_argument("--attachment", action="append", help="Attachment added to failed cases (JUnit/Robot).")
+    parser.add_argument("--comment-size", type=int, default=0, help="Minimal failure message size in bytes.")
+    parser.add_argument("--embedding-kb", type=int, default=0, help="Embedding size for failed steps (Cucumber).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    if args.format == "cucumber":
+        generate_cucumber(
+            args.output,
+            args.cases,
+            args.cases_per_section,
+            args.failure_rate,
+            embedding_kb=args.embedding_kb,
+            seed=args.seed,
+        )
+    else:
+        generate = generate_junit if args.format == "junit" else generate_robot
+        generate(
+            args.output,
+            args.cases,
+            args.cases_per_section,
+            args.failure_rate,
+            case_ids=args.case_ids,
+            attachments=args.attachment,
+            comment_size=args.comment_size,
+            seed=args.seed,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pytest
+import requests
+
+from tests_perf.benchmark import SCENARIOS, LARGE_ATTACHMENT_MB, run_scenario, find_regressions, BenchmarkResult
+from tests_perf.mock_testrail import MockTestRail
+from tests_perf.report_generator import generate_junit, generate_robot, generate_cucumber, automation_id
+from trcli.cli import Environment
+from trcli.data_classes.data_parsers import MatchersParser
+from trcli.readers.cucumber_json import CucumberParser
+from trcli.readers.junit_xml import JunitParser
+from trcli.readers.robot_xml import RobotParser
+
+
+def _parse(parser_class, report):
+    environment = Environment()
+    environment.file = report
+    environment.case_matcher = MatchersParser.AUTO
+    environment.special_parser = "junit"
+    environment.silent = True
+    return parser_class(environment).parse_file()
+
+
+class TestReportGenerator:
+    @pytest.mark.perf
+    @pytest.mark.parametrize(
+        "generator, parser_class, file_name",
+        [
+            (generate_junit, JunitParser, "junit.xml"),
+            (generate_robot, RobotParser, "output.xml"),
+            (generate_cucumber, CucumberParser, "cucumber.json"),
+        ],
+        ids=["junit", "robot", "cucumber"],
+    )
+    def test_generated_reports_are_parsed(self, generator, parser_class, file_name, tmp_path):
+        report = str(tmp_path / file_name)
+        generator(report, 250, cases_per_section=100)
+
+        suites = _parse(parser_class, report)
+
+        sections = [section for suite in suites for section in suite.testsections]
+        assert len(sections) == 3
+        assert sum(len(section.testcases) for section in sections) == 250
+
+    @pytest.mark.perf
+    def test_automation_ids_match_seeded_cases(self, tmp_path):
+        report = str(tmp_path / "junit.xml")
+        generate_junit(report, 10)
+
+        suites = _parse(JunitParser, report)
+
+        assert suites[0].testsections[0].testcases[0].custom_automation_id == automation_id(0, 1)
+
+
+class TestMockTestRail:
+    @pytest.mark.perf
+    def test_pagination(self):
+        with MockTestRail(page_size=100) as server:
+            server.seed(250)
+            url = f"{server.url}index.php?/api/v2/get_cases/{server.project_id}&suite_id={server.suite_id}"
+            cases = []
+            while url:
+                page = requests.get(url).json()
+                cases += page["cases"]
+                next_link = page["_links"]["next"]
+                url = f"{server.url}index.php?{next_link}" if next_link else None
+
+        assert len(cases) == 250
+
+    @pytest.mark.perf
+    def test_rate_limit_injection(self):
+        with MockTestRail(rate_limit_every=2, retry_after="3") as server:
+            url = f"{server.url}index.php?/api/v2/get_projects"
+            first, second = requests.get(url), requests.get(url)
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert second.headers["Retry-After"] == "3"
+        assert server.rate_limited == 1
+
+
+class TestBenchmark:
+    @pytest.mark.perf
+    @pytest.mark.parametrize("scenario", ["parse_junit", "results", "results_adaptive"])
+    def test_scenario_runs(self, scenario):
+        result = run_scenario(SCENARIOS[scenario], 100, rate_limit_every=3)
+
+        assert result.exit_code == 0
+        assert result.throughput > 0
+        assert result.peak_rss_mb > 0
+        if SCENARIOS[scenario].needs_server:
+            assert result.stages["results"] > 0
+            assert result.requests > 0
+            assert result.server["rate_limited"] > 0
+
+    @pytest.mark.perf
+    def test_large_attachments_are_streamed(self):
+        result = run_scenario(SCENARIOS["attachments_large"], 20)
+
+        assert result.exit_code == 0
+        assert result.stages["attachments"] > 0
+        # Buffering whole files would hold one attachment per upload worker in memory
+        assert result.peak_rss_mb < 2 * LARGE_ATTACHMENT_MB
+
+    @pytest.mark.perf
+    def test_find_regressions(self):
+        result = BenchmarkResult("results", 1000, 10, 5, throughput=100, peak_rss_mb=200, exit_code=0)
+        history = [
+            {"scenario": "results", "cases": 1000, "throughput": 200, "peak_rss_mb": 100, "version": "1.0"},
+            {"scenario": "results", "cases": 10, "throughput": 1, "peak_rss_mb": 1, "version": "1.0"},
+        ]
+
+        regressions = find_regressions(result, history, threshold=0.2)
+
+        assert len(regressions) == 2
+        assert find_regressions(result, history[1:], threshold=0.2) == []
@@ -5,7 +5,7 @@ This module provides a session-scoped caching mechanism for API responses
 to reduce redundant API calls and improve performance.
 
 The cache is designed to be:
-- Thread-safe
+- Thread-safe, concurrent fetches of the same entry are made once
 - Session-scoped (per ApiRequestHandler instance)
 - Backwards compatible (transparent to existing code)
 - Memory-efficient (uses LRU eviction)
@@ -16,6 +16,8 @@ from typing import Any, Tuple, Optional, Callable
 from threading import Lock
 from beartype.typing import List, Dict
 
+from trcli.api.single_flight import SingleFlight
+
 
 class RequestCache:
     """
@@ -44,6 +46,7 @@ class RequestCache:
         self._lock = Lock()
         self._hit_count = 0
         self._miss_count = 0
+        self._flights = SingleFlight()
 
     def _make_cache_key(self, endpoint: str, params: Optional[Tuple] = None) -> str:
         """
@@ -154,6 +157,9 @@ class RequestCache:
         It transparently handles cache hits/misses and maintains the same
         return signature as the original fetch functions.
 
+        Threads missing the same entry at the same time wait for the first
+        thread's fetch and share its result, fetch_func is called once.
+
         Args:
             endpoint: API endpoint
             fetch_func: Function to call if cache miss (should return (data, error))
@@ -170,13 +176,22 @@ class RequestCache:
                 return cached
 
         # Cache miss or force refresh - fetch fresh data
-        result = fetch_func()
-
-        # Only cache successful responses (no error)
-        data, error = result
-        if not error:
-            self.set(endpoint, result, params)
-
+        def fetch():
+            if not force_refresh:
+                # Another thread may have fetched the entry since the cache was checked
+                with self._lock:
+                    cached = self._cache.get(self._make_cache_key(endpoint, params))
+                if cached is not None:
+                    return cached
+            result = fetch_func()
+
+            # Only cache successful responses (no error)
+            data, error = result
+            if not error:
+                self.set(endpoint, result, params)
+            return result
+
+        result, _ = self._flights.do(self._make_cache_key(endpoint, params), fetch)
         return result
 
     def get_stats(self) -> Dict[str, int]:
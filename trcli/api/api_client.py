@@ -1,12 +1,17 @@
+import gzip
 import json
+import threading
 from pathlib import Path
 import platform
 import os
 import base64
+import copy
+import io
+import queue
 
 import requests
-from beartype.typing import Union, Callable, Dict, List
-from time import sleep
+from beartype.typing import Union, Callable, Dict, List, Optional, Tuple
+from time import sleep, perf_counter
 from base64 import b64encode
 
 import urllib3
@@ -14,8 +19,24 @@ from urllib.parse import urlparse
 from requests.auth import HTTPBasicAuth
 from json import JSONDecodeError
 from requests.exceptions import RequestException, Timeout, ConnectionError, ProxyError, SSLError, InvalidProxyURL
+from trcli.api.circuit_breaker import CircuitBreaker
+from trcli.api.multipart_stream import ByteBudget, MultipartFileStream
+from trcli.api.single_flight import SingleFlight
 from trcli.constants import FAULT_MAPPING
-from trcli.settings import DEFAULT_API_CALL_TIMEOUT, DEFAULT_API_CALL_RETRIES
+from trcli.logging.metrics import get_metrics, endpoint_name
+from trcli.logging.tracing import get_tracer
+from trcli.settings import (
+    DEFAULT_API_CALL_TIMEOUT,
+    DEFAULT_API_CALL_RETRIES,
+    DEFAULT_GZIP_LEVEL,
+    DEFAULT_HEDGE_BUDGET,
+    HEDGE_LATENCY_WINDOW,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    ATTACHMENT_CHUNK_SIZE,
+    ATTACHMENT_INFLIGHT_BYTES,
+    DEFAULT_CIRCUIT_BREAKER_RESET,
+)
 from dataclasses import dataclass
 
 
@@ -41,6 +62,10 @@ class APIClient:
     SUFFIX_API_V2_VERSION = f"{PREFIX}{VERSION}"
     RETRY_ON = [429, 500, 502, 503, 504]  # Added 503 Service Unavailable and 504 Gateway Timeout
     USER_AGENT = "TRCLI"
+    GZIP_FALLBACK_ON = [400, 415]
+    # Gzip request body support detected per host (shared by all clients of the process)
+    _gzip_support: Dict[str, bool] = {}
+    _gzip_support_lock = threading.Lock()
 
     def __init__(
         self,
@@ -54,6 +79,14 @@ class APIClient:
         proxy_user: str = None,
         noproxy: str = None,
         uploader_metadata: str = None,
+        gzip_threshold: int = None,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        upload_chunk_size: int = ATTACHMENT_CHUNK_SIZE,
+        upload_inflight_bytes: int = ATTACHMENT_INFLIGHT_BYTES,
+        hedge_percentile: float = None,
+        hedge_budget: float = DEFAULT_HEDGE_BUDGET,
+        circuit_breaker_threshold: int = None,
+        circuit_breaker_reset: float = DEFAULT_CIRCUIT_BREAKER_RESET,
     ):
         self.username = ""
         self.password = ""
@@ -68,10 +101,32 @@ class APIClient:
         self.proxy_user = proxy_user
         self.noproxy = noproxy.split(",") if noproxy else []
         self.uploader_metadata = uploader_metadata
+        self.gzip_threshold = gzip_threshold
+        self.gzip_level = gzip_level
+        self.upload_chunk_size = upload_chunk_size
+        # File data buffered by all concurrent streamed uploads of this client
+        self.upload_budget = ByteBudget(upload_inflight_bytes)
+        # Identical GET requests sent concurrently share one request
+        self.get_flights = SingleFlight()
+        # GET requests slower than this latency percentile of their endpoint are hedged (None disables hedging)
+        self.hedge_percentile = hedge_percentile
+        # Maximum hedged requests in percent of all GET requests
+        self.hedge_budget = hedge_budget
+        self._hedge_lock = threading.Lock()
+        self._get_count = 0
+        self._hedge_count = 0
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
 
         if not host_name.endswith("/"):
             host_name = host_name + "/"
         self.__url = host_name + self.SUFFIX_API_V2_VERSION
+        # Requests to an unresponsive host fail fast (None disables the circuit breaker)
+        self.circuit_breaker = (
+            CircuitBreaker.for_host(self.__url, circuit_breaker_threshold, circuit_breaker_reset)
+            if circuit_breaker_threshold
+            else None
+        )
         if not verify:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -82,8 +137,77 @@ class APIClient:
             * got status code 429 in a response from host
             * timeout occurred
             * connection error occurred
+        A request for the same uri already in flight is waited for instead of sending another one, every caller
+        of a shared response gets a copy of its own.
         """
-        return self.__send_request("GET", uri, None)
+        result, shared = self.get_flights.do(
+            uri,
+            lambda: self.__send_get(uri),
+            lambda result: APIClientResult(
+                result.status_code, copy.deepcopy(result.response_text), result.error_message
+            ),
+        )
+        if shared:
+            self.metrics.record_coalesced(uri)
+        return result
+
+    def __send_get(self, uri: str) -> APIClientResult:
+        """
+        Sends GET request, hedged if hedging is enabled (hedge_percentile):
+        when no response arrived within the latency percentile of the endpoint, a duplicate request is sent
+        and the first successful response is returned. The slower request is cancelled: it is left to finish in
+        the background but not retried, and its outcome is neither recorded in the metrics nor in the circuit
+        breaker. Hedged requests are limited to hedge_budget percent of all GET requests.
+        """
+        with self._hedge_lock:
+            self._get_count += 1
+        delay = self.__hedge_delay(uri)
+        if delay is None:
+            return self.__send_request("GET", uri, None)
+
+        responses = queue.Queue()
+        cancelled = threading.Event()
+
+        def send(hedged: bool):
+            try:
+                responses.put((hedged, self.__send_request("GET", uri, None, cancelled=cancelled)))
+            except BaseException as e:
+                responses.put((hedged, e))
+
+        threading.Thread(target=send, args=(False,), daemon=True).start()
+        try:
+            hedged, result = responses.get(timeout=delay)
+        except queue.Empty:
+            if not self.__take_hedge():
+                hedged, result = responses.get()
+            else:
+                self.verbose_logging_function(f"No response to GET {uri} after {delay:.1f}s, sending hedged request")
+                threading.Thread(target=send, args=(True,), daemon=True).start()
+                hedged, result = responses.get()
+                if APIClient.__is_failed(result):
+                    hedged, result = responses.get()
+                cancelled.set()
+                self.metrics.record_hedge(uri, won=hedged)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def __hedge_delay(self, uri: str) -> Optional[float]:
+        if self.hedge_percentile is None:
+            return None
+        latency = self.metrics.latency_percentile(uri, self.hedge_percentile, HEDGE_MIN_SAMPLES, HEDGE_LATENCY_WINDOW)
+        return None if latency is None else max(latency, HEDGE_MIN_DELAY)
+
+    def __take_hedge(self) -> bool:
+        with self._hedge_lock:
+            if (self._hedge_count + 1) * 100 > self.hedge_budget * self._get_count:
+                return False
+            self._hedge_count += 1
+            return True
+
+    @staticmethod
+    def __is_failed(result) -> bool:
+        return isinstance(result, BaseException) or result.status_code == -1 or result.status_code >= 500
 
     def send_post(
         self, uri: str, payload: dict = None, files: Dict[str, Path] = None, as_form_data: bool = False
@@ -94,12 +218,77 @@ class APIClient:
             * got status code 429 in a response from host
             * timeout occurred
             * connection error occurred
+        A single file opened in binary mode is streamed from disk in upload_chunk_size chunks instead of
+        being loaded into memory, all streamed uploads of the client buffer upload_inflight_bytes at most.
+        JSON payloads of at least gzip_threshold bytes are sent gzip compressed (when gzip_threshold is set).
+        If the host rejects a compressed body with one of GZIP_FALLBACK_ON status codes, the request is sent
+        again uncompressed and compression is disabled for the host.
         """
-        return self.__send_request("POST", uri, payload, files, as_form_data)
+        compressed = None
+        if files is None and not as_form_data:
+            compressed = self.__compress_payload(payload)
+        if compressed is None:
+            return self.__send_request("POST", uri, payload, files, as_form_data)
+
+        original_size, gzip_body = compressed
+        result = self.__send_request("POST", uri, payload, gzip_body=gzip_body)
+        if result.status_code in self.GZIP_FALLBACK_ON and self.gzip_supported is not True:
+            self.verbose_logging_function(
+                f"Compressed request body rejected with status code {result.status_code}, sending uncompressed."
+            )
+            fallback_result = self.__send_request("POST", uri, payload)
+            # 400 may be a validation error, so it only disables compression if the uncompressed body was accepted
+            if result.status_code == 415 or 200 <= fallback_result.status_code < 300:
+                if self.__set_gzip_supported(False) is not False:
+                    self.logging_function("Gzip request bodies are not supported by the TestRail instance.")
+            return fallback_result
+        if 200 <= result.status_code < 300:
+            self.__set_gzip_supported(True)
+            self.metrics.record_compression(uri, original_size, len(gzip_body))
+        return result
+
+    @property
+    def gzip_supported(self) -> Optional[bool]:
+        """True/False if host support for gzip request bodies was detected, None if unknown"""
+        with APIClient._gzip_support_lock:
+            return APIClient._gzip_support.get(self.__url)
+
+    def __set_gzip_supported(self, supported: bool) -> Optional[bool]:
+        """Stores detected gzip support of the host and returns the previous value"""
+        with APIClient._gzip_support_lock:
+            previous = APIClient._gzip_support.get(self.__url)
+            APIClient._gzip_support[self.__url] = supported
+        return previous
+
+    def __compress_payload(self, payload) -> Optional[Tuple[int, bytes]]:
+        """Returns (original size, gzip body) or None if payload should be sent uncompressed"""
+        if self.gzip_threshold is None or payload is None or self.gzip_supported is False:
+            return None
+        try:
+            body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        except (TypeError, ValueError):
+            return None
+        if len(body) < self.gzip_threshold:
+            return None
+        gzip_body = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        if len(gzip_body) >= len(body):
+            return None
+        return len(body), gzip_body
 
     def __send_request(
-        self, method: str, uri: str, payload: dict, files: Dict[str, Path] = None, as_form_data: bool = False
+        self,
+        method: str,
+        uri: str,
+        payload: dict,
+        files: Dict[str, Path] = None,
+        as_form_data: bool = False,
+        gzip_body: bytes = None,
+        cancelled: threading.Event = None,
     ) -> APIClientResult:
+        """
+        Sends the request with retries. Once cancelled is set (the response is not needed anymore, e.g. the other
+        request of a hedged GET won) no further attempt is made and attempts are not recorded.
+        """
         status_code = -1
         response_text = ""
         error_message = ""
@@ -113,8 +302,24 @@ class APIClient:
             headers["Content-Type"] = "application/json"
         verbose_log_message = ""
         proxies = self._get_proxies_for_request(url)
+        stream_file = APIClient._get_streamable_file(files, payload)
         for i in range(self.retries + 1):
+            if self.__is_cancelled(cancelled):
+                break
             error_message = ""
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+                status_code = -1
+                response_text = ""
+                error_message = FAULT_MAPPING["host_unavailable"].format(
+                    failures=self.circuit_breaker.failures, retry_in=self.circuit_breaker.retry_in()
+                )
+                break
+            if i > 0:
+                self.metrics.record_retry(uri)
+            response = None
+            stream = None
+            request_duration = None
+            request_start = perf_counter()
             try:
                 verbose_log_message = APIClient.format_request_for_vlog(
                     method=method, url=url, payload=payload, headers=headers
@@ -128,11 +333,20 @@ class APIClient:
                         "verify": self.verify,
                         "proxies": proxies,
                     }
-                    if files:
+                    if stream_file:
+                        field_name, file, position = stream_file
+                        file.seek(position)
+                        stream = MultipartFileStream(field_name, file, self.upload_budget, self.upload_chunk_size)
+                        request_kwargs["data"] = stream
+                        request_kwargs["headers"] = {**headers, "Content-Type": stream.content_type}
+                    elif files:
                         request_kwargs["files"] = files
                         request_kwargs["data"] = payload if payload else {}
                     elif as_form_data:
                         request_kwargs["data"] = payload
+                    elif gzip_body is not None:
+                        request_kwargs["data"] = gzip_body
+                        request_kwargs["headers"] = {**headers, "Content-Encoding": "gzip"}
                     else:
                         request_kwargs["json"] = payload
 
@@ -147,6 +361,7 @@ class APIClient:
                         headers=headers,
                         proxies=proxies,
                     )
+                request_duration = perf_counter() - request_start
             except InvalidProxyURL:
                 error_message = FAULT_MAPPING["proxy_invalid_configuration"]
                 self.verbose_logging_function(verbose_log_message)
@@ -161,10 +376,12 @@ class APIClient:
                 break
             except Timeout:
                 error_message = FAULT_MAPPING["no_response_from_host"]
+                self.__record_host_health(failed=True, cancelled=cancelled)
                 self.verbose_logging_function(verbose_log_message)
                 continue
             except ConnectionError:
                 error_message = FAULT_MAPPING["connection_error"]
+                self.__record_host_health(failed=True, cancelled=cancelled)
                 self.verbose_logging_function(verbose_log_message)
                 continue
             except RequestException as e:
@@ -173,10 +390,19 @@ class APIClient:
                 break
             else:
                 status_code = response.status_code
-                if status_code == 429:
+                self.__record_host_health(failed=status_code >= 500, cancelled=cancelled)
+                # A cancelled request is not retried, so it does not wait to be retried either
+                is_cancelled = self.__is_cancelled(cancelled)
+                if status_code == 429 and not is_cancelled:
                     retry_time = float(response.headers["Retry-After"])
+                    self.metrics.record_rate_limit_wait(uri, retry_time)
                     sleep(retry_time)
-                elif status_code in [500, 502, 503, 504] and i < self.retries:
+                elif (
+                    status_code in [500, 502, 503, 504]
+                    and i < self.retries
+                    and not is_cancelled
+                    and not self.__host_unavailable()
+                ):
                     backoff_time = min(2**i, 30)  # Exponential backoff capped at 30 seconds
                     self.logging_function(
                         f"Server error {status_code}, retrying in {backoff_time}s (attempt {i+1}/{self.retries})..."
@@ -206,6 +432,17 @@ class APIClient:
                 verbose_log_message = verbose_log_message + APIClient.format_response_for_vlog(
                     response.status_code, response_text
                 )
+            finally:
+                # Proxy, SSL and local errors (e.g. reading the uploaded file) say nothing about the health of
+                # the host, only timeouts, connection errors and server errors are recorded as its failures
+                if stream is not None:
+                    stream.close()
+                    if response is not None and 200 <= response.status_code < 300:
+                        self.metrics.record_upload(uri, len(stream), request_duration)
+                if not self.__is_cancelled(cancelled):
+                    self.__record_attempt(
+                        method, uri, response, request_start, request_duration or perf_counter() - request_start, i + 1
+                    )
             if verbose_log_message:
                 self.verbose_logging_function(verbose_log_message)
 
@@ -214,6 +451,71 @@ class APIClient:
 
         return APIClientResult(status_code, response_text, error_message)
 
+    @staticmethod
+    def __is_cancelled(cancelled: Optional[threading.Event]) -> bool:
+        return cancelled is not None and cancelled.is_set()
+
+    def __record_host_health(self, failed: bool, cancelled: threading.Event = None):
+        if self.__is_cancelled(cancelled):
+            return
+        if self.circuit_breaker is not None and self.circuit_breaker.record(failed):
+            self.logging_function(
+                f"TestRail instance did not respond to {self.circuit_breaker.failures} consecutive requests, "
+                f"failing requests without sending them for {self.circuit_breaker.reset_timeout:.0f}s."
+            )
+
+    def __host_unavailable(self) -> bool:
+        return self.circuit_breaker is not None and self.circuit_breaker.retry_in() > 0
+
+    def __record_attempt(self, method: str, uri: str, response, start: float, duration: float, attempt: int):
+        """Records a single request attempt in the metrics collector and as a trace span"""
+        status_code = -1
+        if response is None:
+            self.metrics.record_request(method, uri, status_code, duration)
+        else:
+            status_code = response.status_code
+            self.metrics.record_request(
+                method,
+                uri,
+                status_code,
+                duration,
+                APIClient._get_body_size(getattr(response.request, "body", None)),
+                APIClient._get_body_size(response.content),
+            )
+        if self.tracer.enabled:
+            endpoint = endpoint_name(uri)
+            self.tracer.add_span(
+                f"{method} {endpoint}", "http", start, duration, endpoint=endpoint, status=status_code, attempt=attempt
+            )
+
+    @staticmethod
+    def _get_streamable_file(files: Optional[dict], payload) -> Optional[Tuple[str, io.IOBase, int]]:
+        """
+        Returns (field name, file, start position) if files is a single file on disk opened in binary mode
+        and there are no other form fields, None if the request has to be encoded by requests.
+        """
+        if not files or payload or len(files) != 1:
+            return None
+        field_name, file = next(iter(files.items()))
+        if not isinstance(file, (io.BufferedIOBase, io.RawIOBase)):
+            return None
+        try:
+            os.fstat(file.fileno())
+            return field_name, file, file.tell()
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _get_body_size(body) -> int:
+        """Returns size of request/response body in bytes, 0 if it cannot be determined (e.g. streamed body)"""
+        if isinstance(body, MultipartFileStream):
+            return len(body)
+        if isinstance(body, (bytes, bytearray)):
+            return len(body)
+        if isinstance(body, str):
+            return len(body.encode("utf-8"))
+        return 0
+
     def __get_proxy_headers(self) -> Dict[str, str]:
         """
         Returns headers for proxy authentication using Basic Authentication if proxy_user is provided.
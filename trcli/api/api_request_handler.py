@@ -1,7 +1,8 @@
 import os
+import sqlite3
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from beartype.typing import List, Union, Tuple, Dict, Optional
+from beartype.typing import List, Union, Tuple, Dict, Optional, Set
 
 from trcli.api.api_client import APIClient, APIClientResult
 from trcli.api.api_response_verify import ApiResponseVerify
@@ -14,6 +15,11 @@ from trcli.api.section_handler import SectionHandler
 from trcli.api.result_handler import ResultHandler
 from trcli.api.run_handler import RunHandler
 from trcli.api.bdd_handler import BddHandler
+from trcli.api.bdd_case_index import BddCaseIndex
+from trcli.api.project_mirror import ProjectMirror
+from trcli.api.record_projection import CASE_PROJECTION, Projection
+from trcli.api.single_flight import SingleFlight
+from trcli.api.user_directory import UserDirectory
 from trcli.api.case_handler import CaseHandler
 from trcli.api.plan_handler import PlanHandler
 from trcli.api.milestone_handler import MilestoneHandler
@@ -36,6 +42,8 @@ from trcli.settings import (
     MAX_WORKERS_ADD_CASE,
     ENABLE_PARALLEL_PAGINATION,
     MAX_WORKERS_PARALLEL_PAGINATION,
+    MAX_WORKERS_GET_CASE,
+    MAX_WORKERS_GET_USER,
 )
 
 
@@ -58,11 +66,14 @@ class ApiRequestHandler:
             environment.run_description,
             environment.result_fields,
             environment.section_id,
+            environment.aggregate_results,
         )
         self.suites_data_from_provider = self.data_provider.suites_input
         self.response_verifier = ApiResponseVerify(verify)
         # Initialize session-scoped cache for API responses
         self._cache = RequestCache(max_size=512)
+        # With --mirror, listed projects, suites, sections and cases are kept in a local SQLite mirror
+        self._mirror = ProjectMirror(environment.host) if getattr(environment, "mirror", None) is True else None
         # Initialize specialized managers
         self.label_manager = LabelManager(api_client, environment)
         self.reference_manager = ReferenceManager(api_client, environment)
@@ -100,6 +111,8 @@ class ApiRequestHandler:
         # BDD case cache for feature name matching (shared by CucumberParser and JunitParser)
         # Structure: {"{project_id}_{suite_id}": {normalized_name: [case_dict, case_dict, ...]}}
         self._bdd_case_cache = {}
+        # Concurrent lookups of a suite not cached yet build its cache once
+        self._bdd_case_cache_flights = SingleFlight()
 
         # Cache for resolved BDD field names (resolved from TestRail API)
         self._bdd_case_field_name = None  # BDD Scenarios field (type_id=13)
@@ -228,6 +241,88 @@ class ApiRequestHandler:
             validate_case_ids_callback=self.__validate_case_ids_exist,
         )
 
+    def clear_cases_cache(self):
+        """Forget cached sections and cases, e.g. after another process added cases to the suite"""
+        self._cache.invalidate_pattern("get_sections/")
+        self._cache.invalidate_pattern("get_cases/")
+
+    def sync_mirror(self, project_id: int, suite_id: int = None) -> Tuple[Dict[str, int], str]:
+        """
+        Sync the suites of a project with the local mirror (--mirror), with their sections and cases
+        :param project_id: project_id
+        :param suite_id: only sync the sections and cases of this suite (default: all suites)
+        :returns: Tuple with the number of synced suites, sections and cases and error string.
+        """
+        suites, error_message = self.__get_all_suites(project_id)
+        if error_message:
+            return {}, error_message
+        suite_ids = [suite_id] if suite_id else [suite["id"] for suite in suites]
+        counts = {"suites": len(suite_ids), "sections": 0, "cases": 0}
+        for suite_id in suite_ids:
+            sections, error_message = self.__get_all_sections(project_id, suite_id)
+            if error_message:
+                return counts, error_message
+            cases, error_message = self.__get_all_cases(project_id, suite_id)
+            if error_message:
+                return counts, error_message
+            counts["sections"] += len(sections)
+            counts["cases"] += len(cases)
+        return counts, ""
+
+    def get_mirrored_cases(
+        self,
+        project_id: int,
+        suite_id: int = None,
+        priority_id: str = None,
+        filter_text: str = None,
+        limit: int = 250,
+        offset: int = 0,
+    ) -> Tuple[dict, str]:
+        """
+        Sync the cases of a suite with the local mirror (--mirror) and query them like get_cases
+        :param project_id: project_id
+        :param suite_id: Optional suite ID filter
+        :param priority_id: Optional priority ID filter (comma-separated for multiple)
+        :param filter_text: Optional text search filter (case title)
+        :param limit: Maximum number of cases to return (default: 250)
+        :param offset: Offset for pagination (default: 0)
+        :returns: Tuple with paginated response dict (like get_cases) and error string.
+        """
+        _, error_message = self.__get_all_cases(project_id, suite_id)
+        if error_message:
+            return {}, error_message
+        try:
+            priority_ids = [int(priority.strip()) for priority in priority_id.split(",")] if priority_id else None
+        except ValueError:
+            return {}, f"Invalid priority ID filter: {priority_id}"
+        try:
+            cases, total = self._mirror.find_cases(
+                project_id, suite_id, title_contains=filter_text, priority_ids=priority_ids, offset=offset, limit=limit
+            )
+        except (sqlite3.Error, OSError):
+            # The mirror cannot be read, the cases listed from TestRail are filtered instead
+            all_cases, error_message = self.__get_all_cases(project_id, suite_id, full=True)
+            if error_message:
+                return {}, error_message
+            matching = [
+                case
+                for case in sorted(all_cases, key=lambda case: case["id"])
+                if (not filter_text or filter_text.lower() in (case.get("title") or "").lower())
+                and (not priority_ids or case.get("priority_id") in priority_ids)
+            ]
+            cases, total = matching[offset : offset + limit], len(matching)
+        next_link = None
+        if offset + limit < total:
+            suite_filter = f"&suite_id={suite_id}" if suite_id else ""
+            next_link = f"{self.suffix}get_cases/{project_id}{suite_filter}&limit={limit}&offset={offset + limit}"
+        return {
+            "offset": offset,
+            "limit": limit,
+            "size": len(cases),
+            "_links": {"next": next_link, "prev": None},
+            "cases": cases,
+        }, ""
+
     def add_cases(self) -> Tuple[List[dict], str]:
         return self.case_handler.add_cases()
 
@@ -298,13 +393,8 @@ class ApiRequestHandler:
     ) -> Tuple[bool, str, List[str], List[str], List[str]]:
         return self.case_handler.update_existing_case_references(case_id, junit_refs, case_fields, strategy)
 
-    def upload_attachments(
-        self, report_results: List[Dict], request_id_to_result_id: Dict[int, int], total_attachments: int
-    ):
-        return self.result_handler.upload_attachments(report_results, request_id_to_result_id, total_attachments)
-
-    def add_results(self, run_id: int) -> Tuple[List, str, int]:
-        return self.result_handler.add_results(run_id)
+    def add_results(self, run_id: int, case_ids: Optional[Set[int]] = None) -> Tuple[List, str, int]:
+        return self.result_handler.add_results(run_id, case_ids)
 
     def get_results(self, test_id: int, offset: int = 0, limit: int = 250) -> Tuple[List[Dict], str]:
         """
@@ -370,7 +460,19 @@ class ApiRequestHandler:
             result_id, status_id, comment, version, elapsed, defects, assignedto_id, custom_fields
         )
 
-    def handle_futures(self, futures, action_string, progress_bar) -> Tuple[list, str]:
+    def handle_futures(self, futures, action_string, progress_bar, on_response=None, on_error=None) -> Tuple[list, str]:
+        """
+        Collects responses of submitted requests, cancelling the remaining ones on the first error.
+
+        :param futures: dictionary of futures and request bodies
+        :param action_string: name of the action (add_results responses are returned in request order)
+        :param progress_bar: progress bar updated for every successful response
+        :param on_response: optional callable called with request body and response of every successful
+            add_results request as soon as it arrives
+        :param on_error: optional callable called with request body and response of every failed request,
+            returning True if it recovers from the failure (the remaining requests are then not cancelled)
+        :returns: Tuple with list of responses and error string.
+        """
         responses_by_request = {} if action_string == "add_results" else None
         responses = []
         error_message = ""
@@ -382,6 +484,8 @@ class ApiRequestHandler:
                     if action_string == "add_results":
                         responses_by_request[id(arguments)] = response
                         progress_bar.update(len(arguments["results"]))
+                        if on_response is not None:
+                            on_response(arguments, response)
                     else:
                         responses.append(response)
                         if action_string == "add_case":
@@ -393,6 +497,8 @@ class ApiRequestHandler:
                             self.__cancel_running_futures(futures, action_string)
                             break
                         progress_bar.update(1)
+                elif on_error is not None and on_error(arguments, response):
+                    continue
                 else:
                     error_message = response.error_message
                     self.environment.log(f"\nError during {action_string}. Trying to cancel scheduled tasks.")
@@ -485,6 +591,44 @@ class ApiRequestHandler:
                 return None, f"User not found: {email}"
             return None, f"API error (status {response.status_code}) when validating user: {email}"
 
+    def get_users_by_emails(self, emails: List[str]) -> Tuple[Dict[str, int], str]:
+        """
+        Resolves user emails to user IDs (case-insensitive).
+
+        Users are looked up in the user directory cached in ~/.trcli first. Remaining users are
+        looked up in the list of all users (get_users) or, if listing users is not permitted,
+        with concurrent get_user_by_email requests. Found users are added to the cache.
+
+        :param emails: User emails to resolve
+        :returns: Tuple with dictionary mapping found emails (as given) to user IDs and error message
+        """
+        directory = UserDirectory(self.environment.host)
+        directory.load()
+        user_ids = {email: directory.get(email) for email in emails}
+        missing = [email for email, user_id in user_ids.items() if user_id is None]
+        if not missing:
+            self.environment.vlog(f"Resolved {len(emails)} user(s) from user cache")
+            return user_ids, ""
+
+        users, error_message = self.__get_all_entities("users", "get_users", entities=[])
+        if not error_message:
+            self.environment.vlog(f"Loaded {len(users)} user(s) with get_users")
+            directory.add_users(users)
+        else:
+            self.environment.vlog(f"Unable to list users ({error_message}), looking up {len(missing)} user(s) by email")
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS_GET_USER) as executor:
+                futures = {executor.submit(self.get_user_by_email, email): email for email in missing}
+                for future in as_completed(futures):
+                    user_id, error_message = future.result()
+                    if user_id is not None:
+                        directory.add(futures[future], user_id)
+                    elif "User not found" not in error_message:
+                        return {}, error_message
+        directory.save()
+
+        user_ids = {email: directory.get(email) for email in emails}
+        return {email: user_id for email, user_id in user_ids.items() if user_id is not None}, ""
+
     def _add_case_and_update_data(self, case: TestRailCase) -> APIClientResult:
         return self.case_handler._add_case_and_update_data(case)
 
@@ -493,21 +637,48 @@ class ApiRequestHandler:
         for future in futures:
             future.cancel()
 
-    def __get_all_cases(self, project_id=None, suite_id=None) -> Tuple[List[dict], str]:
+    def __get_all_cases(self, project_id=None, suite_id=None, full=False) -> Tuple[List[dict], str]:
         """
         Get all cases from all pages (with caching)
+        Cases are projected on the fields of CASE_PROJECTION unless the full payloads are asked for.
         """
         cache_key = f"get_cases/{project_id}"
-        params = (project_id, suite_id)
+        params = (project_id, suite_id, full)
+        projection = None if full else CASE_PROJECTION
 
-        def fetch():
+        def fetch_all(projection=projection):
             if suite_id is None:
-                return self.__get_all_entities("cases", f"get_cases/{project_id}", entities=[])
+                link = f"get_cases/{project_id}"
             else:
-                return self.__get_all_entities("cases", f"get_cases/{project_id}&suite_id={suite_id}", entities=[])
+                link = f"get_cases/{project_id}&suite_id={suite_id}"
+            return self.__get_all_entities("cases", link, entities=[], projection=projection)
+
+        def fetch():
+            if self._mirror is None:
+                return fetch_all()
+            # The mirror stores the full payloads, projected cases are read from the columns of their fields
+            return self._mirror.sync_cases(
+                project_id,
+                suite_id,
+                lambda: fetch_all(projection=None),
+                lambda updated_after: self.__get_all_cases_updated_after(project_id, suite_id, updated_after),
+                projection=projection,
+            )
 
         return self._cache.get_or_fetch(cache_key, fetch, params)
 
+    def __get_all_cases_updated_after(
+        self, project_id: int, suite_id: int, updated_after: int
+    ) -> Tuple[List[dict], str]:
+        """
+        Get all cases updated after a timestamp from all pages (not cached)
+        Cases updated in the same second are included.
+        """
+        link = f"get_cases/{project_id}&updated_after={updated_after - 1}"
+        if suite_id is not None:
+            link += f"&suite_id={suite_id}"
+        return self.__get_all_entities("cases", link, entities=[])
+
     def __get_all_sections(self, project_id=None, suite_id=None) -> Tuple[List[dict], str]:
         """
         Get all sections from all pages (with caching)
@@ -516,7 +687,14 @@ class ApiRequestHandler:
         params = (project_id, suite_id)
 
         def fetch():
-            return self.__get_all_entities("sections", f"get_sections/{project_id}&suite_id={suite_id}", entities=[])
+            return self.__sync_with_mirror(
+                "sections",
+                lambda: self.__get_all_entities(
+                    "sections", f"get_sections/{project_id}&suite_id={suite_id}", entities=[]
+                ),
+                project_id,
+                suite_id,
+            )
 
         return self._cache.get_or_fetch(cache_key, fetch, params)
 
@@ -540,7 +718,9 @@ class ApiRequestHandler:
         params = None
 
         def fetch():
-            return self.__get_all_entities("projects", f"get_projects", entities=[])
+            return self.__sync_with_mirror(
+                "projects", lambda: self.__get_all_entities("projects", f"get_projects", entities=[])
+            )
 
         return self._cache.get_or_fetch(cache_key, fetch, params)
 
@@ -552,11 +732,23 @@ class ApiRequestHandler:
         params = (project_id,)
 
         def fetch():
-            return self.__get_all_entities("suites", f"get_suites/{project_id}", entities=[])
+            return self.__sync_with_mirror(
+                "suites", lambda: self.__get_all_entities("suites", f"get_suites/{project_id}", entities=[]), project_id
+            )
 
         return self._cache.get_or_fetch(cache_key, fetch, params)
 
-    def __get_all_entities(self, entity: str, link=None, entities=[]) -> Tuple[List[Dict], str]:
+    def __sync_with_mirror(self, entity: str, fetch_all, project_id=None, suite_id=None) -> Tuple[List[dict], str]:
+        """
+        List all entities, with --mirror the listed entities replace the mirrored ones
+        """
+        if self._mirror is None:
+            return fetch_all()
+        return self._mirror.sync_entities(entity, fetch_all, project_id, suite_id)
+
+    def __get_all_entities(
+        self, entity: str, link=None, entities=[], projection: Projection = None
+    ) -> Tuple[List[Dict], str]:
         """
         Get all entities from all pages if number of entities is too big to return in single response.
         Function using next page field in API response.
@@ -564,13 +756,15 @@ class ApiRequestHandler:
 
         If ENABLE_PARALLEL_PAGINATION is True or --parallel-pagination flag is set,
         will use parallel fetching for better performance.
+
+        With a projection every page is projected as soon as it is read, so full payloads are not kept.
         """
         # Check if parallel pagination is enabled (CLI flag takes precedence)
         parallel_enabled = getattr(self.environment, "parallel_pagination", False) or ENABLE_PARALLEL_PAGINATION
 
         # Use parallel pagination if enabled and this is the first call (entities is empty)
         if parallel_enabled and not entities:
-            return self.__get_all_entities_parallel(entity, link)
+            return self.__get_all_entities_parallel(entity, link, projection)
 
         # Otherwise use sequential pagination (original implementation)
         if link.startswith(self.suffix):
@@ -579,28 +773,31 @@ class ApiRequestHandler:
         if not response.error_message:
             # Endpoints without pagination (legacy)
             if isinstance(response.response_text, list):
-                return response.response_text, response.error_message
+                return self.__project(response.response_text, projection), response.error_message
             # Check if response is a string (JSON parse failed)
             if isinstance(response.response_text, str):
                 error_msg = FAULT_MAPPING["invalid_api_response"].format(error_details=response.response_text[:200])
                 return [], error_msg
             # Endpoints with pagination
-            entities = entities + response.response_text[entity]
+            entities = entities + self.__project(response.response_text[entity], projection)
             if response.response_text["_links"]["next"] is not None:
                 next_link = response.response_text["_links"]["next"].replace("limit=0", "limit=250")
-                return self.__get_all_entities(entity, link=next_link, entities=entities)
+                return self.__get_all_entities(entity, link=next_link, entities=entities, projection=projection)
             else:
                 return entities, response.error_message
         else:
             return [], response.error_message
 
-    def __get_all_entities_parallel(self, entity: str, link: str) -> Tuple[List[Dict], str]:
+    def __get_all_entities_parallel(
+        self, entity: str, link: str, projection: Projection = None
+    ) -> Tuple[List[Dict], str]:
         """
         Parallel version of __get_all_entities for faster pagination.
         Fetches multiple pages concurrently using ThreadPoolExecutor.
 
         :param entity: Entity type (cases, sections, etc.)
         :param link: Initial API link
+        :param projection: Optional projection applied to every page
         :returns: Tuple of (all entities list, error message)
         """
         fetch_start_time = time.time()
@@ -617,14 +814,14 @@ class ApiRequestHandler:
 
         # Handle non-paginated responses (legacy endpoints)
         if isinstance(response.response_text, list):
-            return response.response_text, response.error_message
+            return self.__project(response.response_text, projection), response.error_message
 
         if isinstance(response.response_text, str):
             error_msg = FAULT_MAPPING["invalid_api_response"].format(error_details=response.response_text[:200])
             return [], error_msg
 
         # Collect first page results
-        all_entities = response.response_text[entity]
+        all_entities = self.__project(response.response_text[entity], projection)
         first_page_count = len(all_entities)
 
         # Check if there are more pages
@@ -678,7 +875,7 @@ class ApiRequestHandler:
                 # Return empty list if this page has no data (we've reached the end)
                 if not page_data:
                     return [], None
-                return page_data, None
+                return self.__project(page_data, projection), None
             else:
                 return None, "Invalid response format"
 
@@ -789,7 +986,7 @@ class ApiRequestHandler:
         if error_message:
             self.environment.elog(f"Parallel fetch failed after {fetch_time:.1f}s, falling back to sequential...")
             # Fall back to sequential fetch
-            return self.__get_all_entities_sequential(entity, link, [])
+            return self.__get_all_entities_sequential(entity, link, [], projection)
 
         self.environment.log(
             f"Parallel fetch completed: {len(all_entities)} {entity} in {fetch_time:.1f}s "
@@ -798,7 +995,9 @@ class ApiRequestHandler:
 
         return all_entities, ""
 
-    def __get_all_entities_sequential(self, entity: str, link: str, entities: List[Dict]) -> Tuple[List[Dict], str]:
+    def __get_all_entities_sequential(
+        self, entity: str, link: str, entities: List[Dict], projection: Projection = None
+    ) -> Tuple[List[Dict], str]:
         """
         Sequential fallback for __get_all_entities (original implementation).
         This is kept separate for fallback purposes.
@@ -808,19 +1007,25 @@ class ApiRequestHandler:
         response = self.client.send_get(link)
         if not response.error_message:
             if isinstance(response.response_text, list):
-                return response.response_text, response.error_message
+                return self.__project(response.response_text, projection), response.error_message
             if isinstance(response.response_text, str):
                 error_msg = FAULT_MAPPING["invalid_api_response"].format(error_details=response.response_text[:200])
                 return [], error_msg
-            entities = entities + response.response_text[entity]
+            entities = entities + self.__project(response.response_text[entity], projection)
             if response.response_text["_links"]["next"] is not None:
                 next_link = response.response_text["_links"]["next"].replace("limit=0", "limit=250")
-                return self.__get_all_entities_sequential(entity, link=next_link, entities=entities)
+                return self.__get_all_entities_sequential(
+                    entity, link=next_link, entities=entities, projection=projection
+                )
             else:
                 return entities, response.error_message
         else:
             return [], response.error_message
 
+    @staticmethod
+    def __project(entities: List[Dict], projection: Optional[Projection]) -> List[Dict]:
+        return entities if projection is None else projection.project(entities)
+
     def __validate_case_ids_exist(self, suite_id: int, case_ids: List[int]) -> set:
         """
         Validate that case IDs exist in TestRail without fetching all cases.
@@ -898,7 +1103,12 @@ class ApiRequestHandler:
         self, project_id: int, suite_id: int = None, label_ids: List[int] = None, label_title: str = None
     ) -> Tuple[List[dict], str]:
         return self.label_manager.get_cases_by_label(
-            project_id, suite_id, label_ids, label_title, get_all_cases_callback=self.__get_all_cases
+            project_id,
+            suite_id,
+            label_ids,
+            label_title,
+            # Matching cases are listed with their labels
+            get_all_cases_callback=lambda project_id, suite_id: self.__get_all_cases(project_id, suite_id, full=True),
         )
 
     def add_labels_to_tests(
@@ -998,7 +1208,10 @@ class ApiRequestHandler:
         # Build cache if not already cached for this project/suite
         cache_key = f"{project_id}_{suite_id}"
         if cache_key not in self._bdd_case_cache:
-            error = self._build_bdd_case_cache(project_id, suite_id)
+            error, _ = self._bdd_case_cache_flights.do(
+                cache_key,
+                lambda: None if cache_key in self._bdd_case_cache else self._build_bdd_case_cache(project_id, suite_id),
+            )
             if error:
                 return None, error, []
 
@@ -1039,8 +1252,30 @@ class ApiRequestHandler:
 
         self.environment.vlog(f"Building BDD case cache for project {project_id}, suite {suite_id}...")
 
-        # Fetch all cases for this suite
-        all_cases, error = self.__get_all_cases(project_id, suite_id)
+        # With --bdd-index only cases updated since the previous run are fetched
+        index = None
+        if getattr(self.environment, "bdd_index", None) is True:
+            index = BddCaseIndex(self.environment.host, project_id, suite_id)
+            if not index.load() or index.is_expired():
+                self.environment.vlog("BDD case index not found or expired, fetching all cases")
+            else:
+                self.environment.vlog(f"Loaded BDD case index with {len(index)} BDD case(s) from {index.path}")
+                if self._bdd_case_field_name is None:
+                    self._bdd_case_field_name = index.bdd_field_name
+                updated_cases, error = self.__get_all_cases_updated_after(project_id, suite_id, index.updated_on)
+                if error:
+                    return f"Error fetching cases for cache: {error}"
+                index.update(updated_cases, self.get_bdd_case_field_name(), self._normalize_feature_name)
+                index.save()
+                self._bdd_case_cache[cache_key] = index.feature_names()
+                self.environment.vlog(
+                    f"Updated BDD case index with {len(updated_cases)} changed case(s), "
+                    f"cached {len(self._bdd_case_cache[cache_key])} unique feature name(s)"
+                )
+                return None
+
+        # Fetch all cases for this suite, cached cases are returned by get_cases_by_ids
+        all_cases, error = self.__get_all_cases(project_id, suite_id, full=True)
 
         if error:
             return f"Error fetching cases for cache: {error}"
@@ -1048,6 +1283,10 @@ class ApiRequestHandler:
         # Resolve BDD case field name dynamically
         bdd_field_name = self.get_bdd_case_field_name()
 
+        if index is not None:
+            index.update(all_cases, bdd_field_name, self._normalize_feature_name, full_scan=True)
+            index.save()
+
         # Filter to BDD cases only (have BDD scenarios field with content)
         bdd_cases = [case for case in all_cases if case.get(bdd_field_name)]
 
@@ -1070,6 +1309,50 @@ class ApiRequestHandler:
 
         return None
 
+    def get_cases_by_ids(self, case_ids: List[int]) -> Dict[int, Tuple[dict, str]]:
+        """
+        Fetch test cases by ID in a single concurrent pass.
+
+        Cases already present in the BDD case cache (see find_bdd_case_by_name) are taken
+        from the cache, remaining cases are fetched with concurrent get_case requests.
+
+        Args:
+            case_ids: TestRail case IDs (duplicates are fetched once)
+
+        Returns:
+            Dictionary mapping every requested case ID to a tuple of (case_data, error_message)
+        """
+        cached_cases = {
+            case.get("id"): case
+            for cache in self._bdd_case_cache.values()
+            for cases in cache.values()
+            for case in cases
+        }
+        results = {case_id: (cached_cases[case_id], "") for case_id in case_ids if case_id in cached_cases}
+        missing_ids = list(dict.fromkeys(case_id for case_id in case_ids if case_id not in results))
+        if not missing_ids:
+            return results
+
+        self.environment.vlog(
+            f"Fetching {len(missing_ids)} case(s) with {MAX_WORKERS_GET_CASE} workers "
+            f"({len(results)} found in BDD case cache)"
+        )
+
+        def get_case(case_id: int) -> Tuple[dict, str]:
+            response = self.client.send_get(f"get_case/{case_id}")
+            if response.error_message or not response.response_text:
+                return {}, response.error_message or "Case not found"
+            return response.response_text, ""
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS_GET_CASE) as executor:
+            futures = {executor.submit(get_case, case_id): case_id for case_id in missing_ids}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = {}, str(e)
+        return results
+
     @staticmethod
     def _normalize_feature_name(name: str) -> str:
         """
@@ -0,0 +1,246 @@
+"""
+Attachment Pre-flight Module
+
+Checks attachment files before they are uploaded:
+- every file is stat'ed once, in parallel, no matter how many results reference it
+- files are only hashed (SHA-256) if another attachment of the same result has the same size, so the contents
+  of most files are only read by the upload
+- files larger than the configured limit are rejected without a network call
+- identical contents attached to the same result are uploaded only once (a copy waits for the upload of the
+  first one and is uploaded itself if that upload fails)
+- contents already uploaded to a result (e.g. before a background upload was resumed) are skipped
+
+TestRail attachments belong to a single result (add_attachment_to_result) and the API cannot link an
+uploaded attachment to another result, so identical contents are only collapsed per result.
+"""
+
+import hashlib
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, replace
+
+from beartype.typing import Dict, Iterable, List, Optional, Tuple
+
+from trcli.logging.metrics import format_bytes
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class AttachmentInfo:
+    """
+    Result of inspecting an attachment file (size is None if the file could not be stat'ed,
+    sha256 is None if the file was not hashed or could not be read)
+    """
+
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    error: Optional[str] = None
+
+
+def inspect_attachment(file_path: str, max_size: Optional[int] = None, hash_contents: bool = True) -> AttachmentInfo:
+    """
+    Stat and hash an attachment file.
+
+    Args:
+        file_path: Attachment file path
+        max_size: Maximum file size in bytes (None for no limit)
+        hash_contents: False to only stat the file
+
+    Returns:
+        AttachmentInfo with size and content hash, or with an error if the file is too large
+
+    Note:
+        Files that cannot be read are not rejected here, the upload reports them.
+    """
+    try:
+        size = os.stat(file_path).st_size
+    except OSError:
+        return AttachmentInfo()
+    if max_size is not None and size > max_size:
+        return AttachmentInfo(size=size, error=f"File size {format_bytes(size)} exceeds {format_bytes(max_size)}")
+    if not hash_contents:
+        return AttachmentInfo(size=size)
+    return AttachmentInfo(size=size, sha256=hash_file(file_path))
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """SHA-256 of the file contents (None if the file cannot be read)"""
+    sha256 = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+    except OSError:
+        return None
+    return sha256.hexdigest()
+
+
+class _Claim:
+    """Upload of contents to a result, waited on by the copies of the contents"""
+
+    def __init__(self, uploaded: bool = False):
+        self.done = threading.Event()
+        self.uploaded = uploaded
+        if uploaded:
+            self.done.set()
+
+
+class AttachmentPreflight:
+    """
+    Pre-flight checks shared by all attachment uploads of a run. Thread-safe.
+
+    Example:
+        preflight = AttachmentPreflight(executor, max_size=256 * 1024 * 1024)
+        preflight.inspect(attachment_paths_of_each_result)  # Starts stat/hash in the background
+        ...
+        upload, error = preflight.check(file_path, result_id)
+        if upload:
+            uploaded = <upload file_path to result_id>
+            preflight.finish(file_path, result_id, uploaded)
+    """
+
+    def __init__(self, executor: Executor, max_size: Optional[int] = None):
+        """
+        Initialize pre-flight checks.
+
+        Args:
+            executor: Executor running stat/hash of inspected files
+            max_size: Maximum attachment size in bytes (None for no limit)
+        """
+        self.max_size = max_size
+        self.rejected = 0
+        self.duplicates = 0
+        self.bytes_saved = 0
+        self._executor = executor
+        self._inspections: Dict[str, List[Future]] = {}
+        self._infos: Dict[str, AttachmentInfo] = {}
+        self._claims: Dict[Tuple[int, str], _Claim] = {}
+        self._lock = threading.Lock()
+
+    def inspect(self, results_file_paths: Iterable[Iterable[str]]) -> None:
+        """
+        Start inspecting the attachments of results. Each file is only stat'ed once, files are only hashed if
+        another attachment of the same result has the same size (only those can be duplicates).
+
+        Args:
+            results_file_paths: Attachment file paths of each result
+        """
+        with self._lock:
+            for file_paths in results_file_paths:
+                keys = [os.path.abspath(file_path) for file_path in file_paths]
+                if not keys:
+                    continue
+                inspection = self._executor.submit(self._inspect_result, keys)
+                for key in keys:
+                    self._inspections.setdefault(key, []).append(inspection)
+
+    def _inspect_result(self, keys: List[str]) -> None:
+        infos = []
+        for key in keys:
+            with self._lock:
+                info = self._infos.get(key)
+            if info is None:
+                info = inspect_attachment(key, self.max_size, hash_contents=False)
+                with self._lock:
+                    info = self._infos.setdefault(key, info)
+            infos.append(info)
+        sizes = Counter(info.size for info in infos if info.size is not None and not info.error)
+        for key, info in zip(keys, infos):
+            if info.size is None or info.error or sizes[info.size] < 2 or info.sha256 is not None:
+                continue
+            sha256 = hash_file(key)
+            with self._lock:
+                self._infos[key] = replace(self._infos[key], sha256=sha256)
+
+    def info(self, file_path: str) -> AttachmentInfo:
+        """
+        Get the inspection result of a file, waiting for its inspection. Files that were not inspected
+        are only stat'ed.
+
+        Args:
+            file_path: Attachment file path
+
+        Returns:
+            AttachmentInfo of the file
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            inspections = list(self._inspections.get(key, []))
+        if not inspections:
+            return inspect_attachment(file_path, self.max_size, hash_contents=False)
+        for inspection in inspections:
+            inspection.result()
+        with self._lock:
+            return self._infos[key]
+
+    def mark_uploaded(self, result_id: int, sha256: str) -> None:
+        """
+        Record contents already uploaded to a result, so they are not uploaded again.
+
+        Args:
+            result_id: TestRail result ID
+            sha256: Content hash of the uploaded attachment
+        """
+        with self._lock:
+            self._claims[(result_id, sha256)] = _Claim(uploaded=True)
+
+    def check(self, file_path: str, result_id: int) -> Tuple[bool, Optional[str]]:
+        """
+        Decide whether a file should be uploaded to a result.
+
+        If identical contents are being uploaded to the result, waits for that upload: the file is skipped
+        if it succeeded and uploaded otherwise.
+
+        Args:
+            file_path: Attachment file path
+            result_id: TestRail result ID
+
+        Returns:
+            Tuple of (upload, error): error is set if the file was rejected, upload is False for
+            rejected files and contents already uploaded to the result (files that were not
+            hashed are always uploaded). The outcome of an upload has to be reported with finish().
+        """
+        info = self.info(file_path)
+        if info.error:
+            with self._lock:
+                self.rejected += 1
+            return False, info.error
+        if info.sha256 is None:
+            return True, None
+        key = (result_id, info.sha256)
+        while True:
+            with self._lock:
+                claim = self._claims.get(key)
+                if claim is None:
+                    self._claims[key] = _Claim()
+                    return True, None
+                if claim.uploaded:
+                    self.duplicates += 1
+                    self.bytes_saved += info.size
+                    return False, None
+            claim.done.wait()
+
+    def finish(self, file_path: str, result_id: int, uploaded: bool) -> None:
+        """
+        Report the outcome of an upload allowed by check().
+
+        Args:
+            file_path: Attachment file path
+            result_id: TestRail result ID
+            uploaded: True if the upload succeeded, copies of the contents are uploaded otherwise
+        """
+        sha256 = self.info(file_path).sha256
+        if sha256 is None:
+            return
+        with self._lock:
+            claim = self._claims.get((result_id, sha256))
+            if claim is None or claim.done.is_set():
+                return
+            if uploaded:
+                claim.uploaded = True
+            else:
+                del self._claims[(result_id, sha256)]
+        claim.done.set()
@@ -0,0 +1,458 @@
+"""
+Attachment Spool Module
+
+Detached attachment uploads (--detach-attachments). Instead of blocking the command until
+every attachment is uploaded, the upload tasks (file, result ID, case ID) are written to a
+spool file in ~/.trcli/attachments and uploaded by a background process that keeps running
+after trcli exits:
+
+    python -m trcli.api.attachment_spool <spool file>
+
+The background process records the state of every task in the spool file, so the upload can
+be checked on or joined later with `trcli attachments status` and `trcli attachments wait`.
+Credentials are handed to the background process through environment variables and are never
+written to the spool file.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from beartype.typing import Dict, List, Optional, Tuple
+
+from trcli.api.attachment_preflight import AttachmentPreflight
+from trcli.settings import MAX_WORKERS_ATTACHMENT_PREFLIGHT
+
+ATTACHMENT_SPOOL_DIR = Path.home() / ".trcli" / "attachments"
+ATTACHMENT_SPOOL_MAX_AGE = 7 * 86400  # Finished spools are removed after 7 days
+ATTACHMENT_SPOOL_VERSION = 1
+SPOOL_SAVE_INTERVAL = 1.0  # Minimum seconds between progress writes of the background process
+# Seconds a started background process may take to record its pid before its spool counts as interrupted
+SPOOL_START_GRACE = 30.0
+# Environment variables handing secrets to the background process
+CREDENTIAL_ENV_VARS = {
+    "password": "TRCLI_SPOOL_PASSWORD",
+    "key": "TRCLI_SPOOL_KEY",
+    "proxy_user": "TRCLI_SPOOL_PROXY_USER",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentSpool:
+    """
+    Attachment upload tasks of a single run stored on disk.
+
+    Example:
+        spool = AttachmentSpool.create(connection, run_id=1, tasks=[("shot.png", 100, 1)])
+        spool.start(credentials)  # Uploads in a background process
+        ...
+        spool.load()
+        print(spool.state(), spool.counts())
+    """
+
+    PENDING = "pending"
+    UPLOADED = "uploaded"
+    DUPLICATE = "duplicate"  # Same contents were already uploaded to the result
+    FAILED = "failed"
+
+    RUNNING = "running"
+    FINISHED = "finished"
+    INTERRUPTED = "interrupted"
+
+    def __init__(self, path: Path):
+        """
+        Initialize a spool stored in path (call load() to read it).
+
+        Args:
+            path: Spool file path
+        """
+        self.path = Path(path)
+        self.data: Dict = {}
+
+    @property
+    def spool_id(self) -> str:
+        return self.path.stem
+
+    @property
+    def tasks(self) -> List[dict]:
+        return self.data.get("tasks", [])
+
+    @property
+    def log_path(self) -> Path:
+        return self.path.with_suffix(".log")
+
+    @classmethod
+    def create(
+        cls,
+        connection: Dict,
+        run_id: int,
+        tasks: List[tuple],
+        max_size: Optional[int] = None,
+        spool_dir: Optional[Path] = None,
+    ) -> "AttachmentSpool":
+        """
+        Write a new spool file.
+
+        Args:
+            connection: TestRail connection settings without secrets (host, username, insecure, timeout,
+                proxy, noproxy)
+            run_id: Run the results belong to
+            tasks: Upload tasks as (file_path, result_id, case_id) tuples
+            max_size: Maximum attachment size in bytes (None for no limit)
+            spool_dir: Directory of spool files (default: ATTACHMENT_SPOOL_DIR)
+
+        Returns:
+            Created spool
+
+        Raises:
+            OSError: If the spool file cannot be written
+        """
+        spool_dir = Path(spool_dir or ATTACHMENT_SPOOL_DIR)
+        remove_expired_spools(spool_dir)
+        created_at = time.time()
+        key = f"{connection.get('host')}|{run_id}|{os.getpid()}|{created_at}"
+        spool_id = f"run{run_id}-{int(created_at)}-{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+        spool = cls(spool_dir / f"{spool_id}.json")
+        spool.data = {
+            "version": ATTACHMENT_SPOOL_VERSION,
+            "connection": connection,
+            "run_id": run_id,
+            "max_size": max_size,
+            "created_at": created_at,
+            "pid": None,
+            "started_at": None,
+            "finished_at": None,
+            "tasks": [
+                {
+                    "file_path": os.path.abspath(file_path),
+                    "result_id": result_id,
+                    "case_id": case_id,
+                    "status": cls.PENDING,
+                    "error": None,
+                    "sha256": None,
+                }
+                for file_path, result_id, case_id in tasks
+            ],
+        }
+        spool.save(raise_errors=True)
+        return spool
+
+    def load(self) -> bool:
+        """
+        Read the spool file.
+
+        Returns:
+            True if a valid spool was loaded, False otherwise
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != ATTACHMENT_SPOOL_VERSION or not isinstance(data.get("tasks"), list):
+                logger.debug(f"Attachment spool {self.path} has an unsupported format, ignoring it")
+                return False
+            self.data = data
+            return True
+        except (json.JSONDecodeError, TypeError, IOError, OSError) as e:
+            logger.debug(f"Failed to read attachment spool: {e}")
+            return False
+
+    def save(self, raise_errors: bool = False) -> None:
+        """
+        Write the spool file.
+
+        Args:
+            raise_errors: Raise OSError instead of logging failures
+
+        Note:
+            The file is replaced atomically, so readers never see a partially written spool.
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.path)
+        except (IOError, OSError) as e:
+            if raise_errors:
+                raise
+            logger.debug(f"Failed to save attachment spool: {e}")
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count tasks by status.
+
+        Returns:
+            Dictionary with the number of pending, uploaded, duplicate and failed tasks
+        """
+        counts = {self.PENDING: 0, self.UPLOADED: 0, self.DUPLICATE: 0, self.FAILED: 0}
+        for task in self.tasks:
+            counts[task["status"]] = counts.get(task["status"], 0) + 1
+        return counts
+
+    def state(self) -> str:
+        """
+        Get the state of the background upload.
+
+        A background process that was started but did not record its pid yet (it is still starting up)
+        counts as running for SPOOL_START_GRACE seconds.
+
+        Returns:
+            RUNNING, FINISHED or INTERRUPTED (the background process exited before finishing)
+        """
+        if self.data.get("finished_at"):
+            return self.FINISHED
+        pid = self.data.get("pid")
+        if pid:
+            return self.RUNNING if _is_process_alive(pid) else self.INTERRUPTED
+        started_at = self.data.get("started_at")
+        if started_at and time.time() - started_at < SPOOL_START_GRACE:
+            return self.RUNNING
+        return self.INTERRUPTED
+
+    def start(self, credentials: Dict[str, Optional[str]]) -> None:
+        """
+        Start the background process uploading the pending tasks.
+
+        Args:
+            credentials: Secrets (password, key, proxy_user) passed through CREDENTIAL_ENV_VARS
+
+        Raises:
+            OSError: If the spool cannot be written or the background process cannot be started
+        """
+        # Readers see the upload as running until the background process records its pid
+        self.data["pid"] = None
+        self.data["started_at"] = time.time()
+        self.save(raise_errors=True)
+        env = dict(os.environ)
+        for name, env_var in CREDENTIAL_ENV_VARS.items():
+            env.pop(env_var, None)
+            if credentials.get(name):
+                env[env_var] = credentials[name]
+        popen_kwargs = {}
+        if os.name == "nt":
+            popen_kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            popen_kwargs["start_new_session"] = True
+        try:
+            with open(self.log_path, "ab") as log_file:
+                process = subprocess.Popen(
+                    [sys.executable, "-m", "trcli.api.attachment_spool", str(self.path)],
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    close_fds=True,
+                    **popen_kwargs,
+                )
+        except OSError:
+            self.data["started_at"] = None
+            self.save()
+            raise
+        # The background process records its pid itself, saving this copy would overwrite its progress
+        self.data["pid"] = process.pid
+
+    def upload(self, client, max_workers: int) -> Dict[str, int]:
+        """
+        Upload the pending tasks and record their status (run by the background process).
+
+        Files are checked by AttachmentPreflight first: missing and oversized files fail without a
+        network call, and contents already uploaded to the same result (also by a previous, interrupted
+        background process) are skipped.
+
+        Args:
+            client: APIClient used for add_attachment_to_result requests
+            max_workers: Number of concurrent uploads
+
+        Returns:
+            Task counts by status after the upload
+        """
+        pending = [task for task in self.tasks if task["status"] == self.PENDING]
+        lock = threading.Lock()
+        last_save = time.monotonic()
+        self.data["pid"] = os.getpid()
+        self.save()
+        if pending:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS_ATTACHMENT_PREFLIGHT) as preflight_executor:
+                preflight = AttachmentPreflight(preflight_executor, self.data.get("max_size"))
+                # Attachments uploaded by an interrupted process are compared with the pending ones of their result
+                pending_results = {task["result_id"] for task in pending}
+                results_file_paths = {}
+                for task in self.tasks:
+                    if task["status"] in (self.PENDING, self.UPLOADED) and task["result_id"] in pending_results:
+                        results_file_paths.setdefault(task["result_id"], []).append(task["file_path"])
+                preflight.inspect(results_file_paths.values())
+                for task in self.tasks:
+                    if task["status"] == self.UPLOADED and task["result_id"] in pending_results:
+                        sha256 = task.get("sha256") or preflight.info(task["file_path"]).sha256
+                        if sha256:
+                            preflight.mark_uploaded(task["result_id"], sha256)
+
+                def process(task: dict) -> Tuple[str, Optional[str]]:
+                    upload, error = preflight.check(task["file_path"], task["result_id"])
+                    task["sha256"] = preflight.info(task["file_path"]).sha256
+                    if error:
+                        return self.FAILED, error
+                    if not upload:
+                        return self.DUPLICATE, None
+                    uploaded = False
+                    try:
+                        error = upload_attachment(client, task)
+                        uploaded = error is None
+                    finally:
+                        # Copies of the file waiting for this upload are uploaded if it failed
+                        preflight.finish(task["file_path"], task["result_id"], uploaded)
+                    return (self.FAILED, error) if error else (self.UPLOADED, None)
+
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                    futures = {executor.submit(process, task): task for task in pending}
+                    for future in as_completed(futures):
+                        task = futures[future]
+                        status, error = future.result()
+                        with lock:
+                            task["status"] = status
+                            task["error"] = error
+                            if time.monotonic() - last_save >= SPOOL_SAVE_INTERVAL:
+                                self.save()
+                                last_save = time.monotonic()
+        self.data["finished_at"] = time.time()
+        self.save()
+        return self.counts()
+
+
+def upload_attachment(client, task: dict) -> Optional[str]:
+    """
+    Upload a single spooled attachment.
+
+    Args:
+        client: APIClient
+        task: Spool task with file_path and result_id
+
+    Returns:
+        Error message or None if the attachment was uploaded
+    """
+    try:
+        with open(task["file_path"], "rb") as file:
+            response = client.send_post(f"add_attachment_to_result/{task['result_id']}", files={"attachment": file})
+    except FileNotFoundError:
+        return "File not found"
+    except Exception as e:
+        return str(e)
+    if response.status_code != 200:
+        return response.error_message or f"HTTP {response.status_code}"
+    return None
+
+
+def list_spools(spool_dir: Optional[Path] = None) -> List[AttachmentSpool]:
+    """
+    Load all spools, oldest first.
+
+    Args:
+        spool_dir: Directory of spool files (default: ATTACHMENT_SPOOL_DIR)
+
+    Returns:
+        Valid spools sorted by creation time
+    """
+    spool_dir = Path(spool_dir or ATTACHMENT_SPOOL_DIR)
+    spools = []
+    if spool_dir.is_dir():
+        for path in spool_dir.glob("*.json"):
+            spool = AttachmentSpool(path)
+            if spool.load():
+                spools.append(spool)
+    return sorted(spools, key=lambda spool: spool.data.get("created_at", 0))
+
+
+def remove_expired_spools(spool_dir: Optional[Path] = None) -> None:
+    """
+    Remove spools (and their logs) finished more than ATTACHMENT_SPOOL_MAX_AGE ago.
+
+    Args:
+        spool_dir: Directory of spool files (default: ATTACHMENT_SPOOL_DIR)
+    """
+    now = time.time()
+    for spool in list_spools(spool_dir):
+        finished_at = spool.data.get("finished_at")
+        if finished_at and now - finished_at > ATTACHMENT_SPOOL_MAX_AGE:
+            for path in (spool.path, spool.log_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+def _is_process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    if os.name == "nt":
+        # Signal 0 is not supported on Windows, assume the process is still running
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def main(spool_path: str) -> int:
+    """
+    Entry point of the background upload process.
+
+    Args:
+        spool_path: Spool file created by AttachmentSpool.create()
+
+    Returns:
+        Process exit code (1 if the spool could not be read or any upload failed)
+    """
+    import trcli
+    from trcli.api.api_client import APIClient
+    from trcli.settings import MAX_WORKERS_ADD_ATTACHMENTS
+
+    spool = AttachmentSpool(Path(spool_path))
+    if not spool.load():
+        print(f"Unable to read attachment spool {spool_path}", file=sys.stderr)
+        return 1
+    connection = spool.data["connection"]
+
+    def log(message: str, **kwargs):
+        print(message, flush=True)
+
+    client_kwargs = {
+        "verbose_logging_function": lambda *args, **kwargs: None,
+        "logging_function": log,
+        "verify": not connection.get("insecure"),
+        "proxy": connection.get("proxy"),
+        "proxy_user": os.environ.get(CREDENTIAL_ENV_VARS["proxy_user"]),
+        "noproxy": connection.get("noproxy"),
+        "uploader_metadata": APIClient.build_uploader_metadata(version=trcli.__version__),
+    }
+    if connection.get("timeout"):
+        client_kwargs["timeout"] = connection["timeout"]
+    client = APIClient(connection["host"], **client_kwargs)
+    client.username = connection.get("username")
+    client.password = os.environ.get(CREDENTIAL_ENV_VARS["password"])
+    client.api_key = os.environ.get(CREDENTIAL_ENV_VARS["key"])
+
+    log(f"Uploading {len(spool.tasks)} attachment(s) for run {spool.data['run_id']}.")
+    counts = spool.upload(client, MAX_WORKERS_ADD_ATTACHMENTS)
+    for task in spool.tasks:
+        if task["status"] == AttachmentSpool.FAILED:
+            log(f"Failed to upload attachment '{task['file_path']}' for case {task['case_id']}: {task['error']}")
+    log(
+        f"Uploaded {counts[AttachmentSpool.UPLOADED]}/{len(spool.tasks)} attachment(s), "
+        f"skipped {counts[AttachmentSpool.DUPLICATE]} duplicate(s)."
+    )
+    return 1 if counts[AttachmentSpool.FAILED] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1]))
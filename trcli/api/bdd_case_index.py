@@ -0,0 +1,176 @@
+"""
+BDD Case Index Module
+
+Persists the normalized feature name -> BDD case mapping used for feature name matching
+(see ApiRequestHandler.find_bdd_case_by_name()) in ~/.trcli/bdd_index, one file per
+host/project/suite. Following runs only fetch cases updated since the previous run
+(get_cases with updated_after) instead of listing the whole suite.
+
+Deleted cases are not returned by updated_after, so the whole suite is listed again
+once the index is older than BDD_INDEX_MAX_AGE.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from beartype.typing import Callable, Dict, List, Optional
+
+BDD_INDEX_DIR = Path.home() / ".trcli" / "bdd_index"
+BDD_INDEX_MAX_AGE = 86400  # 24 hours in seconds
+BDD_INDEX_VERSION = 1
+INDEXED_CASE_FIELDS = ("id", "title", "section_id", "suite_id", "template_id", "updated_on")
+
+logger = logging.getLogger(__name__)
+
+
+class BddCaseIndex:
+    """
+    On-disk index of BDD cases of a single TestRail suite.
+
+    Example:
+        index = BddCaseIndex("https://example.testrail.io", project_id=1, suite_id=2)
+        if index.load() and not index.is_expired():
+            cases = <get_cases updated after index.updated_on>
+        else:
+            cases = <all cases of the suite>
+        index.update(cases, bdd_field_name, normalize, full_scan=...)
+        index.save()
+        feature_names = index.feature_names()
+    """
+
+    def __init__(self, host: str, project_id: int, suite_id: Optional[int], index_dir: Optional[Path] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            host: TestRail host the cases belong to
+            project_id: TestRail project ID
+            suite_id: TestRail suite ID
+            index_dir: Directory of index files (default: BDD_INDEX_DIR)
+        """
+        self.host = host
+        self.project_id = project_id
+        self.suite_id = suite_id
+        key = f"{host}|{project_id}|{suite_id}"
+        self.path = Path(index_dir or BDD_INDEX_DIR) / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+        self.bdd_field_name: Optional[str] = None
+        self.updated_on: Optional[int] = None  # Latest updated_on of fetched cases (TestRail server time)
+        self.full_scan_at: Optional[float] = None  # Local time the whole suite was last listed
+        self._cases: Dict[int, dict] = {}
+        self._names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    def load(self) -> bool:
+        """
+        Read the index from disk.
+
+        Returns:
+            True if a valid index for this host/project/suite was loaded, False otherwise
+        """
+        try:
+            if not self.path.exists():
+                return False
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != BDD_INDEX_VERSION or [
+                data.get("host"),
+                data.get("project_id"),
+                data.get("suite_id"),
+            ] != [self.host, self.project_id, self.suite_id]:
+                logger.debug(f"BDD case index {self.path} does not match, ignoring it")
+                return False
+            self.bdd_field_name = data["bdd_field_name"]
+            self.updated_on = data["updated_on"]
+            self.full_scan_at = data["full_scan_at"]
+            self._cases = {entry["case"]["id"]: entry["case"] for entry in data["cases"]}
+            self._names = {entry["case"]["id"]: entry["name"] for entry in data["cases"]}
+            return True
+        except (json.JSONDecodeError, KeyError, TypeError, IOError, OSError) as e:
+            logger.debug(f"Failed to read BDD case index: {e}")
+            return False
+
+    def save(self) -> None:
+        """
+        Write the index to disk.
+
+        Note:
+            The file is replaced atomically. Failures are logged but not raised.
+        """
+        data = {
+            "version": BDD_INDEX_VERSION,
+            "host": self.host,
+            "project_id": self.project_id,
+            "suite_id": self.suite_id,
+            "bdd_field_name": self.bdd_field_name,
+            "updated_on": self.updated_on,
+            "full_scan_at": self.full_scan_at,
+            "cases": [{"name": self._names[case_id], "case": case} for case_id, case in self._cases.items()],
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+            logger.debug(f"BDD case index saved to {self.path}")
+        except (IOError, OSError) as e:
+            logger.debug(f"Failed to save BDD case index: {e}")
+
+    def is_expired(self) -> bool:
+        """
+        Check if the whole suite needs to be listed again.
+
+        Returns:
+            True if the index was never filled by a full scan or the scan is older than BDD_INDEX_MAX_AGE
+        """
+        if self.full_scan_at is None or self.updated_on is None or not self.bdd_field_name:
+            return True
+        return time.time() - self.full_scan_at >= BDD_INDEX_MAX_AGE
+
+    def update(
+        self, cases: List[dict], bdd_field_name: str, normalize: Callable[[str], str], full_scan: bool = False
+    ) -> None:
+        """
+        Add, update or remove fetched cases.
+
+        Args:
+            cases: Cases returned by get_cases (all cases of the suite or cases updated since updated_on)
+            bdd_field_name: BDD Scenarios case field, cases without content in it are not BDD cases
+            normalize: Function normalizing case titles to feature names
+            full_scan: True if cases contain the whole suite (replaces the indexed cases)
+        """
+        if full_scan:
+            self._cases, self._names = {}, {}
+            self.full_scan_at = time.time()
+        self.bdd_field_name = bdd_field_name
+        for case in cases:
+            case_id = case.get("id")
+            if case.get("updated_on"):
+                self.updated_on = max(self.updated_on or 0, case["updated_on"])
+            if not case.get(bdd_field_name):
+                # Not a BDD case (anymore)
+                self._cases.pop(case_id, None)
+                self._names.pop(case_id, None)
+                continue
+            indexed_case = {field: case.get(field) for field in INDEXED_CASE_FIELDS}
+            indexed_case[bdd_field_name] = case[bdd_field_name]
+            self._cases[case_id] = indexed_case
+            self._names[case_id] = normalize(case.get("title", ""))
+
+    def feature_names(self) -> Dict[str, List[dict]]:
+        """
+        Build the feature name lookup.
+
+        Returns:
+            Dictionary mapping normalized feature names to lists of matching BDD cases
+        """
+        names: Dict[str, List[dict]] = {}
+        for case_id, case in self._cases.items():
+            names.setdefault(self._names[case_id], []).append(case)
+        return names
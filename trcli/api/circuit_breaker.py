@@ -0,0 +1,131 @@
+"""
+Circuit Breaker Module
+
+Fails requests fast while a TestRail host is down (--circuit-breaker). Without it every worker thread retries each
+of its requests with backoff on its own, so an upload with 20 threads takes many minutes to fail. The breaker is
+shared by all API clients of a host in the process:
+- closed: requests are sent, consecutive failures (no response or a 5xx response) are counted
+- open: after failure_threshold consecutive failures requests fail without being sent for reset_timeout seconds
+- half-open: after reset_timeout a single request is sent as probe, it closes the breaker if the host answers and
+  opens it again otherwise, other requests keep failing fast while the probe is in flight
+"""
+
+import threading
+import time
+
+from beartype.typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive failure counting circuit breaker of a host.
+
+    Example:
+        breaker = CircuitBreaker.for_host("https://example.testrail.io/", 5, 30)
+        if breaker.allow_request():
+            response = send()
+            breaker.record(failed=response is None)
+    """
+
+    _breakers: Dict[str, "CircuitBreaker"] = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_threshold: Consecutive failures opening the breaker
+            reset_timeout: Seconds requests fail fast before a probe request is sent
+            clock: Monotonic clock in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+
+    @classmethod
+    def for_host(cls, host: str, failure_threshold: int, reset_timeout: float) -> "CircuitBreaker":
+        """Circuit breaker shared by all clients of the host, created with the settings of the first client"""
+        with cls._breakers_lock:
+            if host not in cls._breakers:
+                cls._breakers[host] = cls(failure_threshold, reset_timeout)
+            return cls._breakers[host]
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    @property
+    def failures(self) -> int:
+        with self._lock:
+            return self._failures
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe request is allowed (0 if requests are allowed)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow_request(self) -> bool:
+        """
+        Check if a request may be sent. While the breaker is half-open only the probe request is allowed.
+        A probe without recorded outcome for reset_timeout seconds is replaced by a new probe.
+
+        Returns:
+            True if the request may be sent, its outcome has to be recorded with record()
+        """
+        with self._lock:
+            now = self._clock()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and now - self._opened_at < self.reset_timeout:
+                return False
+            if self._state == HALF_OPEN and now - self._probe_started_at < self.reset_timeout:
+                return False
+            self._state = HALF_OPEN
+            self._probe_started_at = now
+            return True
+
+    def record(self, failed: bool) -> bool:
+        """
+        Record the outcome of an allowed request.
+
+        Args:
+            failed: True if the host did not answer or answered with a server error
+
+        Returns:
+            True if the breaker opened because of this failure
+        """
+        with self._lock:
+            if not failed:
+                self._state = CLOSED
+                self._failures = 0
+                self._probe_started_at = None
+                return False
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                opened = self._state == CLOSED
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_started_at = None
+                return opened
+            return False
+
+    @classmethod
+    def reset_all(cls):
+        """
+        Forget the breakers of all hosts.
+
+        Useful for testing.
+        """
+        with cls._breakers_lock:
+            cls._breakers.clear()
@@ -0,0 +1,79 @@
+"""
+Incremental Uploader Module
+
+Uploads results in several parts (report files of a watched directory, chunks of a report read
+from stdin) to one test run, while the tests are still producing them:
+- the first part creates the test run (or updates the run given with --run-id), all later
+  parts add their results to the same run
+- the run is closed (--close-run) once, after the last part
+- invalid users and rejected results fail the command after all parts were uploaded
+"""
+
+from beartype.typing import List, Optional
+
+from trcli.api.results_uploader import ResultsUploader
+from trcli.cli import Environment
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+
+class IncrementalUploader:
+    """
+    Uploads parts of the results to one test run.
+
+    Example:
+        with IncrementalUploader(environment) as uploader:
+            for suites in parts:
+                uploader.upload(suites)
+        run_id = uploader.finish()
+    """
+
+    def __init__(self, environment: Environment):
+        self.environment = environment
+        self.last_run_id = None
+        self.case_update_results = {}
+        self._close_run = None
+        self._auto_close_run = None
+
+    def __enter__(self):
+        # Closing the run is deferred until all parts were uploaded
+        self._close_run, self._auto_close_run = self.environment.close_run, self.environment.auto_close_run
+        self.environment.close_run = self.environment.auto_close_run = False
+        return self
+
+    def __exit__(self, *exc_info):
+        self.environment.close_run, self.environment.auto_close_run = self._close_run, self._auto_close_run
+
+    def upload(self, suites: List[TestRailSuite]):
+        """Upload the results of one part, exits with result code 1 if the upload fails"""
+        for suite in suites:
+            # Invalid users and rejected results fail the command in finish()
+            result_uploader = ResultsUploader(environment=self.environment, suite=suite, exit_on_rejected=False)
+            result_uploader.upload_results()
+            if result_uploader.last_run_id and not self.environment.run_id:
+                # Later parts are added to the run created by the first upload
+                self.environment.run_id = result_uploader.last_run_id
+            self.last_run_id = result_uploader.last_run_id or self.last_run_id
+            for key, cases in (getattr(result_uploader, "case_update_results", None) or {}).items():
+                self.case_update_results.setdefault(key, []).extend(cases)
+
+    def finish(self, failed: bool = False) -> Optional[int]:
+        """
+        Close the run (--close-run) after all parts were uploaded.
+        Exits with result code 1 if failed is set or results were rejected.
+
+        Returns:
+            ID of the run the results were added to
+        """
+        if self.last_run_id and (self._close_run or self._auto_close_run):
+            result_uploader = ResultsUploader(environment=self.environment, suite=TestRailSuite(name="incremental"))
+            self.environment.log("Closing test run. ", new_line=False)
+            _, error_message = result_uploader.api_request_handler.close_run(self.last_run_id)
+            if error_message:
+                self.environment.elog("\n" + error_message)
+                exit(1)
+            self.environment.log("Run closed successfully.")
+        has_invalid = getattr(self.environment, "_has_invalid_users", False) is True
+        has_rejected = getattr(self.environment, "_has_rejected_results", False) is True
+        if failed or has_invalid or has_rejected:
+            exit(1)
+        return self.last_run_id
@@ -0,0 +1,250 @@
+"""
+Live Run Module
+
+Uploads results to a test run while the tests are running, without writing a report file first.
+Meant for using trcli as a library (see also the pytest plugin in trcli.pytest_plugin):
+- open() resolves the project and suite and creates the test run (or updates the run given with run_id)
+- add_result() queues a result, a background thread adds the queued results to the run once a batch
+  (--batch-size) is full or LIVE_RUN_FLUSH_INTERVAL seconds passed
+- cases that are not part of the run yet are added to it before their results, a batch whose cases could not be
+  added is kept and added with the next batch (results still not added when the run is closed are errors)
+- close() adds the remaining results and closes the run (close_run)
+Results are matched to existing cases by case ID only, cases are never created.
+"""
+
+import threading
+
+from beartype.typing import Dict, Iterable, List, Optional, Set
+
+from trcli.api.project_based_client import ProjectBasedClient
+from trcli.cli import Environment
+from trcli.constants import FAULT_MAPPING
+from trcli.data_classes.dataclass_testrail import TestRailCase, TestRailResult, TestRailSection, TestRailSuite
+from trcli.settings import DEFAULT_BATCH_SIZE, LIVE_RUN_FLUSH_INTERVAL
+
+
+class LiveRunError(Exception):
+    """Raised when the run cannot be opened or results could not be added to it"""
+
+
+class LiveRun:
+    """
+    Adds results to a test run as the tests complete.
+
+    Example:
+        environment = Environment.from_options(host=..., project="Demo", username=..., key=..., title="Nightly")
+        with LiveRun(environment) as live_run:
+            live_run.add_result(TestRailResult(case_id=123, status_id=1))
+        print(live_run.run_id)
+    """
+
+    def __init__(self, environment: Environment, flush_interval: float = LIVE_RUN_FLUSH_INTERVAL):
+        """
+        Initialize the live run.
+
+        Args:
+            environment: Environment with the TestRail connection and run options (see Environment.from_options)
+            flush_interval: Seconds after which queued results are added even if the batch is not full
+        """
+        self.environment = environment
+        self.flush_interval = flush_interval
+        self.batch_size = environment.batch_size or DEFAULT_BATCH_SIZE
+        self.run_id: Optional[int] = None
+        self.results_added = 0
+        self.rejected_results: List[Dict] = []
+        self.errors: List[str] = []
+        self._client: Optional[ProjectBasedClient] = None
+        self._suite_id: Optional[int] = None
+        self._run_case_ids: Set[int] = set()
+        self._pending: List[TestRailResult] = []
+        self._queued = 0
+        self._processed = 0
+        self._flush_requested = False
+        self._closing = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self, case_ids: Iterable[int] = ()) -> int:
+        """
+        Create the test run (or update the run given with run_id) and start adding results.
+
+        Args:
+            case_ids: IDs of the cases expected to get results, they are added to the run up front
+
+        Returns:
+            ID of the run
+
+        Raises:
+            LiveRunError: if the project, suite or run could not be resolved
+        """
+        if self._thread is not None:
+            return self.run_id
+        environment = self.environment
+        case_ids = sorted(set(case_ids))
+        if environment.auto_creation_response is None:
+            # Never prompt, a suite that does not exist is not created
+            environment.auto_creation_response = False
+        # The run is closed in close(), after all results were added
+        auto_close_run, environment.auto_close_run = environment.auto_close_run, False
+        try:
+            self._client = ProjectBasedClient(environment, self._suite(case_ids=case_ids))
+            self._client.resolve_project()
+            self._suite_id, _ = self._client.resolve_suite()
+            run_id, error_message = self._client.create_or_update_test_run()
+        except SystemExit:
+            # The command line helpers log the error and exit
+            raise LiveRunError(FAULT_MAPPING["live_run_not_opened"])
+        finally:
+            environment.auto_close_run = auto_close_run
+        if error_message:
+            raise LiveRunError(error_message)
+
+        self.run_id = run_id
+        self._run_case_ids.update(case_ids)
+        self._closing = False
+        self._thread = threading.Thread(target=self._upload_loop, name="trcli-live-run", daemon=True)
+        self._thread.start()
+        return run_id
+
+    def add_result(self, result: TestRailResult):
+        """
+        Queue a result, it is added to the run by the background thread.
+
+        Raises:
+            LiveRunError: if the run is not open
+            ValueError: if the result has no case ID
+        """
+        if result.case_id is None:
+            raise ValueError(FAULT_MAPPING["live_run_missing_case_id"])
+        with self._condition:
+            if self._thread is None or self._closing:
+                raise LiveRunError(FAULT_MAPPING["live_run_not_open"])
+            self._pending.append(result)
+            self._queued += 1
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self):
+        """Wait until all queued results were added to the run"""
+        with self._condition:
+            if self._thread is None:
+                return
+            target = self._queued
+            self._flush_requested = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._processed >= target)
+
+    def close(self) -> Optional[int]:
+        """
+        Add the remaining results, stop the background thread and close the run (close_run).
+
+        Returns:
+            ID of the run
+
+        Raises:
+            LiveRunError: if results could not be added or the run could not be closed
+        """
+        if self._thread is None:
+            return self.run_id
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        if self.environment.close_run or self.environment.auto_close_run:
+            _, error_message = self._client.api_request_handler.close_run(self.run_id)
+            if error_message:
+                self.errors.append(error_message)
+        if self.errors:
+            raise LiveRunError("\n".join(self.errors))
+        return self.run_id
+
+    def _upload_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closing or self._flush_requested or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                results, self._pending = self._pending, []
+                self._flush_requested = False
+                closing = self._closing
+            retry = False
+            if results:
+                try:
+                    retry = not self._add_results(results, final=closing)
+                except Exception as exception:
+                    # Keep going, the tests should not be interrupted by a failed upload
+                    self._log_error(f"Unable to add results: {exception}")
+            with self._condition:
+                # flush() waits for this attempt only, results to retry are queued again
+                self._processed += len(results)
+                if retry:
+                    self._pending[:0] = results
+                    self._queued += len(results)
+                self._condition.notify_all()
+            if closing:
+                return
+
+    def _add_results(self, results: List[TestRailResult], final: bool = False) -> bool:
+        """
+        Add a batch of results to the run, adding their cases to the run first.
+
+        Args:
+            results: Results of the batch
+            final: True if no further batch follows (the run is being closed)
+
+        Returns:
+            False if the batch has to be added again, as its cases could not be added to the run
+        """
+        api_request_handler = self._client.api_request_handler
+        suite = self._suite(results=results)
+        # The request handler builds its request bodies from the suite of the data provider
+        api_request_handler.data_provider.suites_input = suite
+        api_request_handler.suites_data_from_provider = suite
+
+        new_case_ids = {result.case_id for result in results} - self._run_case_ids
+        if new_case_ids and not self.environment.run_include_all:
+            # Cases of the batch are merged into the cases of the run
+            _, error_message = api_request_handler.update_run(self.run_id, self._client.run_name)
+            if error_message and final:
+                self._log_error(
+                    FAULT_MAPPING["live_run_results_not_added"].format(count=len(results), error_message=error_message)
+                )
+                return True
+            if error_message:
+                self.environment.elog(
+                    FAULT_MAPPING["live_run_cases_not_added"].format(count=len(results), error_message=error_message)
+                )
+                return False
+            self._run_case_ids.update(new_case_ids)
+
+        responses, error_message, _ = api_request_handler.add_results(self.run_id)
+        self.results_added += sum(len(response) for response in responses)
+        self.rejected_results.extend(api_request_handler.result_handler.rejected_results)
+        if error_message:
+            self._log_error(error_message)
+        return True
+
+    def _suite(self, case_ids: Iterable[int] = (), results: Iterable[TestRailResult] = ()) -> TestRailSuite:
+        """Suite with one case per case ID and result, as expected by the request handler"""
+        testcases = [TestRailCase(title=f"C{case_id}", case_id=case_id) for case_id in case_ids]
+        testcases += [
+            TestRailCase(title=f"C{result.case_id}", case_id=result.case_id, result=result) for result in results
+        ]
+        return TestRailSuite(
+            name=self.environment.suite_name or self.environment.title or "trcli",
+            suite_id=self._suite_id or self.environment.suite_id,
+            testsections=[TestRailSection(name="live run", testcases=testcases)],
+        )
+
+    def _log_error(self, error_message: str):
+        self.errors.append(error_message)
+        self.environment.elog(error_message)
@@ -0,0 +1,165 @@
+"""
+Streamed multipart request bodies
+
+requests builds multipart/form-data bodies (files=...) in memory, so every concurrent upload of a
+200 MB attachment holds the whole file in memory. MultipartFileStream produces the same body
+incrementally from the open file while it is being sent, and a ByteBudget shared by all uploads of
+an APIClient bounds the amount of file data buffered at any time across all upload threads.
+"""
+
+import os
+import threading
+
+from beartype.typing import BinaryIO, Iterator, Optional
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+
+from trcli.settings import ATTACHMENT_CHUNK_SIZE
+
+
+class ByteBudget:
+    """
+    Limits the number of bytes held by all streams together. Thread-safe.
+
+    acquire() blocks until the requested bytes fit into the budget. Requests larger than the
+    whole budget are reduced to it, so a single stream can always make progress.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        with self._condition:
+            return self._in_flight
+
+    def acquire(self, size: int) -> int:
+        """
+        Waits until size bytes are available and reserves them.
+
+        :param size: number of bytes to reserve
+        :returns: number of bytes reserved (pass it to release())
+        """
+        size = min(size, self.limit)
+        with self._condition:
+            while self._in_flight + size > self.limit:
+                self._condition.wait()
+            self._in_flight += size
+        return size
+
+    def release(self, size: int):
+        with self._condition:
+            self._in_flight -= size
+            self._condition.notify_all()
+
+
+class MultipartFileStream:
+    """
+    multipart/form-data body with a single file field, read from disk in chunks while it is sent.
+
+    The body is byte for byte what requests sends for files={field_name: file}. Its length is known
+    upfront, so the request is sent with Content-Length (not chunked). File data is read in chunks of
+    chunk_size; the memory of a chunk is reserved in budget until the chunk was handed to the
+    connection and the next chunk is requested.
+
+    Example:
+        with open("video.mp4", "rb") as file:
+            body = MultipartFileStream("attachment", file, budget)
+            try:
+                requests.post(url, data=body, headers={"Content-Type": body.content_type})
+            finally:
+                body.close()
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        file: BinaryIO,
+        budget: Optional[ByteBudget] = None,
+        chunk_size: int = ATTACHMENT_CHUNK_SIZE,
+        boundary: Optional[str] = None,
+    ):
+        """
+        :param field_name: form field name
+        :param file: file opened in binary mode, sent from its current position to the end
+        :param budget: budget shared by concurrent streams (None - no limit)
+        :param chunk_size: number of bytes read from the file at once
+        :param boundary: multipart boundary (random by default)
+        """
+        boundary = boundary or choose_boundary()
+        name = getattr(file, "name", None)
+        filename = os.path.basename(name) if isinstance(name, str) and name[:1] != "<" else field_name
+        field = RequestField(name=field_name, data=b"", filename=filename)
+        field.make_multipart()
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.file_size = os.fstat(file.fileno()).st_size - file.tell()
+        self._head = f"--{boundary}\r\n".encode("latin-1") + field.render_headers().encode("utf-8")
+        self._tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        self._file = file
+        self._budget = budget
+        self._chunk_size = chunk_size
+        self._position = 0  # Position in the whole body
+        self._file_read = 0
+        self._buffer = memoryview(b"")
+        self._reserved = 0
+
+    def __len__(self) -> int:
+        return len(self._head) + self.file_size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            data = self.read(self._chunk_size)
+            if not data:
+                return
+            yield data
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Returns the next size bytes of the body (the rest of the body if size is negative).
+
+        :raises IOError: if the file was truncated while it was being sent
+        """
+        if size is None or size < 0:
+            size = len(self) - self._position
+        parts = []
+        while size > 0 and self._position < len(self):
+            head_end = len(self._head)
+            file_end = head_end + self.file_size
+            if self._position < head_end:
+                data = self._head[self._position : self._position + size]
+            elif self._position < file_end:
+                if not self._buffer:
+                    self._read_chunk()
+                data = bytes(self._buffer[:size])
+                self._buffer = self._buffer[len(data) :]
+            else:
+                offset = self._position - file_end
+                data = self._tail[offset : offset + size]
+            parts.append(data)
+            self._position += len(data)
+            size -= len(data)
+        return b"".join(parts)
+
+    def _read_chunk(self):
+        """Replaces the consumed chunk (already handed to the connection) with the next one"""
+        self._release()
+        size = min(self._chunk_size, self.file_size - self._file_read)
+        if self._budget:
+            self._reserved = self._budget.acquire(size)
+        data = self._file.read(size)
+        if len(data) < size:
+            raise IOError(f"{getattr(self._file, 'name', 'File')} was truncated while it was being uploaded.")
+        self._file_read += len(data)
+        self._buffer = memoryview(data)
+
+    def _release(self):
+        self._buffer = memoryview(b"")
+        if self._budget and self._reserved:
+            self._budget.release(self._reserved)
+        self._reserved = 0
+
+    def close(self):
+        """Releases the budget held by the stream (the file itself is not closed)"""
+        self._release()
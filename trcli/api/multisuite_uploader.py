@@ -16,6 +16,7 @@ from trcli.api.project_based_client import ProjectBasedClient
 from trcli.cli import Environment
 from trcli.constants import FAULT_MAPPING
 from trcli.data_classes.dataclass_testrail import TestRailSuite, TestRailCase
+from trcli.logging.metrics import get_metrics, format_bytes
 
 
 class MultisuiteUploader(ProjectBasedClient):
@@ -51,11 +52,13 @@ class MultisuiteUploader(ProjectBasedClient):
         7. Upload attachments
         """
         start = time.time()
+        metrics = get_metrics()
 
         self.environment.log("Multisuite mode: Preparing cross-suite test plan...")
 
         # Step 1: Resolve project
-        self.resolve_project()
+        with metrics.stage("resolve_project"):
+            self.resolve_project()
 
         # Step 2: Collect all case IDs and validate they exist
         all_case_ids = self._collect_all_case_ids()
@@ -67,14 +70,16 @@ class MultisuiteUploader(ProjectBasedClient):
 
         # Step 3: Fetch suite_id for each case (concurrent for performance)
         self.environment.log("Fetching suite information for all cases...")
-        case_suite_mapping = self._fetch_suite_ids_for_cases(all_case_ids)
+        with metrics.stage("match"):
+            case_suite_mapping = self._fetch_suite_ids_for_cases(all_case_ids)
 
         if not case_suite_mapping:
             self.environment.elog("Failed to fetch suite information for any cases.")
             exit(1)
 
         # Step 4: Validate single project and filter cross-project cases
-        valid_case_suite_mapping, skipped_count = self._validate_single_project(case_suite_mapping)
+        with metrics.stage("match"):
+            valid_case_suite_mapping, skipped_count = self._validate_single_project(case_suite_mapping)
 
         if skipped_count > 0:
             self.environment.log(f"Filtered out {skipped_count} cross-project case(s).")
@@ -88,13 +93,14 @@ class MultisuiteUploader(ProjectBasedClient):
         self.environment.log(f"Grouped cases into {len(suite_groups)} suite(s).")
 
         # Step 6: Create or update test plan
-        if self.environment.plan_id:
-            # Existing plan mode - add runs to existing plan
-            run_mapping, error = self._update_existing_plan(self.environment.plan_id, suite_groups)
-            plan_id = self.environment.plan_id
-        else:
-            # New plan mode - create new plan with runs
-            plan_id, run_mapping, error = self._create_test_plan(suite_groups)
+        with metrics.stage("run"):
+            if self.environment.plan_id:
+                # Existing plan mode - add runs to existing plan
+                run_mapping, error = self._update_existing_plan(self.environment.plan_id, suite_groups)
+                plan_id = self.environment.plan_id
+            else:
+                # New plan mode - create new plan with runs
+                plan_id, run_mapping, error = self._create_test_plan(suite_groups)
 
         if error:
             self.environment.elog(FAULT_MAPPING["multisuite_plan_creation_failed"].format(error_message=error))
@@ -112,6 +118,8 @@ class MultisuiteUploader(ProjectBasedClient):
         self.environment.log(
             f"Uploaded {total_results} result(s) across {len(run_mapping)} run(s) in {stop - start:.1f} secs."
         )
+        if metrics.bytes_saved:
+            self.environment.log(f"Request compression saved {format_bytes(metrics.bytes_saved)}.")
 
     def _collect_all_case_ids(self) -> Set[int]:
         """
@@ -9,6 +9,35 @@ from trcli.data_classes.dataclass_testrail import TestRailSuite
 import trcli
 
 
+def api_client_kwargs(environment: Environment) -> dict:
+    """
+    Keyword arguments of APIClient taken from environment (logging, proxy, timeout and the request options
+    --gzip-requests, --hedge-requests and --circuit-breaker). Every command creating an APIClient uses them.
+    """
+    client_kwargs = {
+        "verbose_logging_function": environment.vlog,
+        "logging_function": environment.log,
+        "verify": not environment.insecure,
+        "proxy": environment.proxy,  # Will be None if --proxy is not defined
+        "proxy_user": environment.proxy_user,
+        "noproxy": environment.noproxy,  # Will be None if --noproxy is not defined
+        "uploader_metadata": APIClient.build_uploader_metadata(version=trcli.__version__),
+    }
+
+    if environment.timeout:
+        client_kwargs["timeout"] = environment.timeout
+    if environment.gzip_requests:
+        client_kwargs["gzip_threshold"] = environment.gzip_threshold
+        client_kwargs["gzip_level"] = environment.gzip_level
+    if getattr(environment, "hedge_requests", None) is True:
+        client_kwargs["hedge_percentile"] = environment.hedge_percentile
+        client_kwargs["hedge_budget"] = environment.hedge_budget
+    if getattr(environment, "circuit_breaker", None) is True:
+        client_kwargs["circuit_breaker_threshold"] = environment.circuit_breaker_threshold
+        client_kwargs["circuit_breaker_reset"] = environment.circuit_breaker_reset
+    return client_kwargs
+
+
 class ProjectBasedClient:
     """
     Class to be used to interact with the TestRail Api at a project level.
@@ -32,30 +61,7 @@ class ProjectBasedClient:
         """
         Instantiate api client with needed attributes taken from environment.
         """
-        verbose_logging_function = self.environment.vlog
-        logging_function = self.environment.log
-        proxy = self.environment.proxy  # Will be None if --proxy is not defined
-        noproxy = self.environment.noproxy  # Will be None if --noproxy is not defined
-        proxy_user = self.environment.proxy_user
-
-        # Generate uploader metadata
-        uploader_metadata = APIClient.build_uploader_metadata(version=trcli.__version__)
-
-        # Build client configuration
-        client_kwargs = {
-            "verbose_logging_function": verbose_logging_function,
-            "logging_function": logging_function,
-            "verify": not self.environment.insecure,
-            "proxy": proxy,
-            "proxy_user": proxy_user,
-            "noproxy": noproxy,
-            "uploader_metadata": uploader_metadata,
-        }
-
-        if self.environment.timeout:
-            client_kwargs["timeout"] = self.environment.timeout
-
-        api_client = APIClient(self.environment.host, **client_kwargs)
+        api_client = APIClient(self.environment.host, **api_client_kwargs(self.environment))
         api_client.username = self.environment.username
         api_client.password = self.environment.password
         api_client.api_key = self.environment.key
@@ -0,0 +1,372 @@
+"""
+Project Mirror Module
+
+Keeps a local SQLite copy of the projects, suites, sections and cases of TestRail instances in
+~/.trcli/mirror.db (global --mirror option, 'trcli mirror sync'). Case matching, labels, section checks and
+'cases list' read the mirrored cases instead of listing the whole suite on every run:
+- cases are synced incrementally, only cases updated since the previous sync are fetched (get_cases with
+  updated_after); deleted cases are not returned by updated_after, so the whole suite is listed again once
+  the last full listing is older than MIRROR_MAX_AGE
+- projects, suites and sections have no updated_after filter, they are listed completely on every sync and
+  replace the mirrored rows
+- the fields of CASE_PROJECTION are stored in columns of their own, matching reads these columns only and never
+  decodes the full payloads, which are kept for listings that need them (e.g. BDD feature matching)
+
+The mirror is a cache only, errors of the database are logged and the entities are fetched from TestRail.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+from beartype.typing import Callable, Dict, List, Optional, Tuple, Union
+
+from trcli.api.record_projection import ProjectedRecord, Projection
+from trcli.constants import OLD_SYSTEM_NAME_AUTOMATION_ID, UPDATED_SYSTEM_NAME_AUTOMATION_ID
+
+MIRROR_PATH = Path.home() / ".trcli" / "mirror.db"
+MIRROR_MAX_AGE = 86400  # 24 hours in seconds
+MIRROR_VERSION = 2
+MIRROR_LOCK_TIMEOUT = 30  # Seconds to wait for another process writing to the mirror
+# suite_id of syncs without suite (single suite projects, cases of all suites)
+ALL_SUITES = 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    host TEXT, id INTEGER, name TEXT, data TEXT, PRIMARY KEY (host, id)
+);
+CREATE TABLE IF NOT EXISTS suites (
+    host TEXT, id INTEGER, project_id INTEGER, name TEXT, data TEXT, PRIMARY KEY (host, id)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    host TEXT, id INTEGER, project_id INTEGER, suite_id INTEGER, name TEXT, data TEXT, PRIMARY KEY (host, id)
+);
+CREATE TABLE IF NOT EXISTS cases (
+    host TEXT, id INTEGER, project_id INTEGER, suite_id INTEGER, section_id INTEGER, template_id INTEGER, title TEXT,
+    custom_automation_id TEXT, custom_case_automation_id TEXT, automation_id TEXT, priority_id INTEGER,
+    updated_on INTEGER, data TEXT, PRIMARY KEY (host, id)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    host TEXT, entity TEXT, project_id INTEGER, suite_id INTEGER, updated_on INTEGER, full_scan_at REAL,
+    synced_at REAL, PRIMARY KEY (host, entity, project_id, suite_id)
+);
+CREATE INDEX IF NOT EXISTS suites_project ON suites (host, project_id);
+CREATE INDEX IF NOT EXISTS sections_suite ON sections (host, project_id, suite_id);
+CREATE INDEX IF NOT EXISTS cases_suite ON cases (host, project_id, suite_id);
+"""
+
+# Columns of the mirrored entities besides host, id and data, with the function reading them from an entity
+COLUMNS: Dict[str, Dict[str, Callable]] = {
+    "projects": {"name": lambda entity, scope: entity.get("name")},
+    "suites": {
+        "project_id": lambda entity, scope: scope[0],
+        "name": lambda entity, scope: entity.get("name"),
+    },
+    "sections": {
+        "project_id": lambda entity, scope: scope[0],
+        "suite_id": lambda entity, scope: entity.get("suite_id") or scope[1],
+        "name": lambda entity, scope: entity.get("name"),
+    },
+    "cases": {
+        "project_id": lambda entity, scope: scope[0],
+        "suite_id": lambda entity, scope: entity.get("suite_id") or scope[1],
+        "section_id": lambda entity, scope: entity.get("section_id"),
+        "template_id": lambda entity, scope: entity.get("template_id"),
+        "title": lambda entity, scope: entity.get("title"),
+        OLD_SYSTEM_NAME_AUTOMATION_ID: lambda entity, scope: entity.get(OLD_SYSTEM_NAME_AUTOMATION_ID),
+        UPDATED_SYSTEM_NAME_AUTOMATION_ID: lambda entity, scope: entity.get(UPDATED_SYSTEM_NAME_AUTOMATION_ID),
+        "automation_id": lambda entity, scope: entity.get(OLD_SYSTEM_NAME_AUTOMATION_ID)
+        or entity.get(UPDATED_SYSTEM_NAME_AUTOMATION_ID),
+        "priority_id": lambda entity, scope: entity.get("priority_id"),
+        "updated_on": lambda entity, scope: entity.get("updated_on"),
+    },
+}
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectMirror:
+    """
+    Local SQLite mirror of the projects, suites, sections and cases of one TestRail instance.
+
+    Example:
+        mirror = ProjectMirror("https://example.testrail.io")
+        cases, error = mirror.sync_cases(project_id, suite_id, fetch_all, fetch_updated_after)
+        cases, total = mirror.find_cases(project_id, suite_id, automation_id="tests.test_login")
+    """
+
+    def __init__(self, host: str, path: Optional[Path] = None):
+        """
+        Initialize the mirror, the database is created on first use.
+
+        Args:
+            host: TestRail host the entities belong to
+            path: SQLite database file (default: MIRROR_PATH)
+        """
+        self.host = host
+        self.path = Path(path or MIRROR_PATH)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def sync_cases(
+        self,
+        project_id: int,
+        suite_id: Optional[int],
+        fetch_all: Callable[[], Tuple[List[dict], str]],
+        fetch_updated_after: Callable[[int], Tuple[List[dict], str]],
+        projection: Optional[Projection] = None,
+    ) -> Tuple[List[dict], str]:
+        """
+        Sync the cases of a suite and return them from the mirror.
+
+        Args:
+            project_id: TestRail project ID
+            suite_id: TestRail suite ID, None for the cases of all suites
+            fetch_all: Function listing all cases of the suite (full payloads)
+            fetch_updated_after: Function listing the cases updated after a timestamp (full payloads)
+            projection: Return projected records instead of the full payloads (see find_cases)
+
+        Returns:
+            Tuple with all cases of the suite and an error message
+        """
+        scope = (project_id, suite_id or ALL_SUITES)
+        try:
+            sync = self._sync_state("cases", scope)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Project mirror {self.path} is not available: {e}")
+            return self._project(*fetch_all(), projection)
+        full_scan = sync is None or sync["updated_on"] is None or time.time() - sync["full_scan_at"] >= MIRROR_MAX_AGE
+        cases, error_message = fetch_all() if full_scan else fetch_updated_after(sync["updated_on"])
+        if error_message:
+            return [], error_message
+        try:
+            self._store("cases", scope, cases, full_scan=full_scan)
+            mirrored_cases, _ = self.find_cases(project_id, suite_id, projection=projection)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Failed to update project mirror {self.path}: {e}")
+            # Updated cases only are not the whole suite
+            return self._project(*((cases, "") if full_scan else fetch_all()), projection)
+        logger.debug(f"Synced {len(cases)} case(s) of project {project_id}, suite {suite_id} (full scan: {full_scan})")
+        return mirrored_cases, ""
+
+    def sync_entities(
+        self,
+        entity: str,
+        fetch_all: Callable[[], Tuple[List[dict], str]],
+        project_id: Optional[int] = None,
+        suite_id: Optional[int] = None,
+    ) -> Tuple[List[dict], str]:
+        """
+        List all projects, suites of a project or sections of a suite and replace them in the mirror.
+
+        Args:
+            entity: projects, suites or sections
+            fetch_all: Function listing all entities
+            project_id: TestRail project ID (suites and sections)
+            suite_id: TestRail suite ID (sections), None for the sections of all suites
+
+        Returns:
+            Tuple with the fetched entities and an error message
+        """
+        entities, error_message = fetch_all()
+        if error_message:
+            return entities, error_message
+        try:
+            self._store(entity, (project_id or 0, suite_id or ALL_SUITES), entities, full_scan=True)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Failed to update project mirror {self.path}: {e}")
+        return entities, ""
+
+    def find_cases(
+        self,
+        project_id: int,
+        suite_id: Optional[int] = None,
+        automation_id: Optional[str] = None,
+        title: Optional[str] = None,
+        title_contains: Optional[str] = None,
+        priority_ids: Optional[List[int]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        projection: Optional[Projection] = None,
+    ) -> Tuple[List[dict], int]:
+        """
+        Query the mirrored cases of a project (ordered by case ID).
+
+        Projected cases are read from the columns of their fields without decoding the full payloads. Fields that
+        are null are missing from their records.
+
+        Args:
+            project_id: TestRail project ID
+            suite_id: Only cases of this suite
+            automation_id: Only cases with this automation ID
+            title: Only cases with this title
+            title_contains: Only cases with a title containing this text (case-insensitive)
+            priority_ids: Only cases with one of these priorities
+            offset: Number of matching cases to skip
+            limit: Maximum number of cases to return (all if None)
+            projection: Return records of these fields instead of the full payloads, all fields have to be columns
+                of the cases table (e.g. CASE_PROJECTION)
+
+        Returns:
+            Tuple with the matching cases (as returned by TestRail or projected) and the number of all matching cases
+
+        Raises:
+            ValueError: If a field of the projection is not stored in a column
+        """
+        if projection is not None:
+            unknown = [field for field in projection.fields if field != "id" and field not in COLUMNS["cases"]]
+            if unknown:
+                raise ValueError(f"Fields are not mirrored in columns: {', '.join(unknown)}")
+        conditions, params = ["host = ?", "project_id = ?"], [self.host, project_id]
+        for column, value in (("suite_id", suite_id), ("automation_id", automation_id), ("title", title)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if title_contains:
+            conditions.append("title LIKE ? ESCAPE '\\'")
+            escaped = title_contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        if priority_ids:
+            conditions.append(f"priority_id IN ({', '.join('?' * len(priority_ids))})")
+            params.extend(priority_ids)
+        where = " AND ".join(conditions)
+        columns = "data" if projection is None else ", ".join(projection.fields)
+        with self._connect() as connection:
+            (total,) = connection.execute(f"SELECT COUNT(*) FROM cases WHERE {where}", params).fetchone()
+            rows = connection.execute(
+                f"SELECT {columns} FROM cases WHERE {where} ORDER BY id LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset],
+            ).fetchall()
+        if projection is None:
+            return [json.loads(data) for (data,) in rows], total
+        return [
+            projection.project_one({field: value for field, value in zip(projection.fields, row) if value is not None})
+            for row in rows
+        ], total
+
+    def status(self) -> List[Dict]:
+        """
+        Mirrored entities of this host.
+
+        Returns:
+            One dictionary per synced entity and scope with entity, project_id, suite_id, count and synced_at
+        """
+        with self._connect() as connection:
+            syncs = connection.execute(
+                "SELECT entity, project_id, suite_id, synced_at FROM syncs WHERE host = ? "
+                "ORDER BY entity, project_id, suite_id",
+                (self.host,),
+            ).fetchall()
+            status = []
+            for entity, project_id, suite_id, synced_at in syncs:
+                where, params = self._scope_condition(entity, (project_id, suite_id))
+                (count,) = connection.execute(f"SELECT COUNT(*) FROM {entity} WHERE {where}", params).fetchone()
+                status.append(
+                    {
+                        "entity": entity,
+                        "project_id": project_id or None,
+                        "suite_id": suite_id or None,
+                        "count": count,
+                        "synced_at": synced_at,
+                    }
+                )
+        return status
+
+    def clear(self) -> None:
+        """Remove all mirrored entities of this host"""
+        with self._connect() as connection:
+            for table in ("projects", "suites", "sections", "cases", "syncs"):
+                connection.execute(f"DELETE FROM {table} WHERE host = ?", (self.host,))
+
+    @staticmethod
+    def _project(
+        cases: List[dict], error_message: str, projection: Optional[Projection]
+    ) -> Tuple[List[Union[dict, ProjectedRecord]], str]:
+        """Project cases fetched from TestRail when the mirror cannot be used"""
+        return (cases if projection is None else projection.project(cases)), error_message
+
+    def _sync_state(self, entity: str, scope: Tuple[int, int]) -> Optional[Dict]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT updated_on, full_scan_at FROM syncs WHERE host = ? AND entity = ? AND project_id = ? "
+                "AND suite_id = ?",
+                (self.host, entity, *scope),
+            ).fetchone()
+        return {"updated_on": row[0], "full_scan_at": row[1]} if row else None
+
+    def _store(self, entity: str, scope: Tuple[int, int], entities: List[dict], full_scan: bool) -> None:
+        """Insert or update fetched entities, a full scan replaces all entities of the scope"""
+        columns = COLUMNS[entity]
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            if full_scan:
+                where, params = self._scope_condition(entity, scope)
+                connection.execute(f"DELETE FROM {entity} WHERE {where}", params)
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {entity} (host, id, {', '.join(columns)}, data) "
+                f"VALUES (?, ?, {', '.join('?' * len(columns))}, ?)",
+                [
+                    (self.host, item["id"], *(column(item, scope) for column in columns.values()), json.dumps(item))
+                    for item in entities
+                ],
+            )
+            updated_on = max((item.get("updated_on") or 0 for item in entities), default=0) or None
+            connection.execute(
+                "INSERT INTO syncs (host, entity, project_id, suite_id, updated_on, full_scan_at, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (host, entity, project_id, suite_id) DO UPDATE SET "
+                "updated_on = NULLIF(MAX(COALESCE(updated_on, 0), COALESCE(excluded.updated_on, 0)), 0), "
+                "full_scan_at = COALESCE(excluded.full_scan_at, full_scan_at), synced_at = excluded.synced_at",
+                (self.host, entity, *scope, updated_on, now if full_scan else None, now),
+            )
+
+    def _scope_condition(self, entity: str, scope: Tuple[int, int]) -> Tuple[str, list]:
+        """SQL condition selecting the entities of a sync scope"""
+        project_id, suite_id = scope
+        conditions, params = ["host = ?"], [self.host]
+        if entity != "projects":
+            conditions.append("project_id = ?")
+            params.append(project_id)
+        if entity in ("sections", "cases") and suite_id != ALL_SUITES:
+            conditions.append("suite_id = ?")
+            params.append(suite_id)
+        return " AND ".join(conditions), params
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection committing on leaving its context, the schema is created with the first connection"""
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(self.path, timeout=MIRROR_LOCK_TIMEOUT)) as connection:
+                version = connection.execute("PRAGMA user_version").fetchone()[0]
+                if version != MIRROR_VERSION:
+                    # Tables of other versions are dropped, the mirror is filled again by the next sync
+                    for table in ("projects", "suites", "sections", "cases", "syncs"):
+                        connection.execute(f"DROP TABLE IF EXISTS {table}")
+                    connection.execute(f"PRAGMA user_version = {MIRROR_VERSION}")
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.executescript(SCHEMA)
+                connection.commit()
+            self._initialized = True
+        return _Connection(self.path)
+
+
+class _Connection:
+    """sqlite3 connection that is committed and closed (not only committed) when leaving its context"""
+
+    def __init__(self, path: Path):
+        self.connection = sqlite3.connect(path, timeout=MIRROR_LOCK_TIMEOUT)
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.connection.commit()
+            else:
+                self.connection.rollback()
+        finally:
+            self.connection.close()
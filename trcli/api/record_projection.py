@@ -0,0 +1,99 @@
+"""
+Record Projection Module
+
+Keeps only the fields callers need of listed entities. Case listings are fetched page by page and held for the
+whole session, yet matching a report to its cases only reads a handful of fields. Every custom field and rich-text
+step of a case is dropped while its page is read, the remaining fields are stored in the slots of a compact record.
+
+Records are read-only mappings: code reading cases with case["id"], case.get("title") or "labels" in case works
+unchanged. Fields missing from the listed entity are missing from the record too, as they would be in the dict.
+"""
+
+from collections.abc import Mapping
+
+from beartype.typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from trcli.constants import OLD_SYSTEM_NAME_AUTOMATION_ID, UPDATED_SYSTEM_NAME_AUTOMATION_ID
+
+
+class ProjectedRecord(Mapping):
+    """Read-only mapping of the projected fields of an entity, values are stored in slots"""
+
+    __slots__ = ()
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.__slots__:
+            raise KeyError(field)
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self.__slots__ if hasattr(self, field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+class Projection:
+    """
+    Projection of listed entities on a fixed set of fields.
+
+    Example:
+        projection = Projection("cases", ("id", "title"))
+        records = projection.project(response["cases"])
+    """
+
+    def __init__(self, entity: str, fields: Tuple[str, ...]):
+        """
+        Args:
+            entity: Name of the projected entities (e.g. "cases"), names the record type
+            fields: Fields to keep, every field has to be a valid identifier
+        """
+        invalid = [field for field in fields if not field.isidentifier()]
+        if invalid:
+            raise ValueError(f"Fields can not be projected: {', '.join(invalid)}")
+        self.entity = entity
+        self.fields = tuple(dict.fromkeys(fields))
+        self.record_type = type(f"Projected{entity.title()}", (ProjectedRecord,), {"__slots__": self.fields})
+
+    def project(self, entities: Iterable[Dict]) -> List[ProjectedRecord]:
+        """
+        Project listed entities, dropping every other field.
+
+        Args:
+            entities: Entities as returned by TestRail (dicts) or already projected records
+
+        Returns:
+            One record per entity, in the original order
+        """
+        return [self.project_one(entity) for entity in entities]
+
+    def project_one(self, entity: Dict) -> ProjectedRecord:
+        record = self.record_type()
+        for field in self.fields:
+            if field in entity:
+                setattr(record, field, entity[field])
+        return record
+
+
+# Fields read by the case matchers and label commands from listed cases
+CASE_PROJECTION = Projection(
+    "cases",
+    (
+        "id",
+        "suite_id",
+        "section_id",
+        "template_id",
+        "title",
+        OLD_SYSTEM_NAME_AUTOMATION_ID,
+        UPDATED_SYSTEM_NAME_AUTOMATION_ID,
+    ),
+)
@@ -0,0 +1,167 @@
+"""
+Result Batch Retry Module
+
+Recovers add_results_for_cases batches that failed, so a single bad result does not
+cancel the whole upload:
+- batches failing with a transient error (connection error, timeout, 429, 5xx) are sent
+  again with exponential backoff, after the retries of the API client were used up
+- batches rejected by validation (400) are split in half, recursively, until the
+  rejected results are isolated; all other results of the batch are added
+- any other error (e.g. 401, 403) is not recoverable and still fails the upload
+
+Recovered batches are sent on the executor of the regular batches, so the remaining
+batches keep being posted while a failed batch is bisected.
+"""
+
+from concurrent.futures import Executor, Future, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from time import sleep
+
+from beartype.typing import Callable, Dict, List, Optional, Tuple
+
+from trcli.api.api_client import APIClientResult
+from trcli.settings import ADD_RESULTS_BATCH_RETRIES, MAX_REJECTED_RESULTS
+
+TRANSIENT_STATUS_CODES = (-1, 429, 500, 502, 503, 504)
+VALIDATION_STATUS_CODES = (400,)
+MAX_RETRY_BACKOFF = 30
+
+
+@dataclass
+class RejectedResult:
+    """Result rejected by TestRail validation"""
+
+    case_id: Optional[int]
+    error: str
+
+
+class ResultBatchRetrier:
+    """
+    Retries and bisects failed result batches.
+
+    recover() is called with every failed batch. It returns False for errors that cannot be
+    recovered (the caller should fail the upload as before), otherwise it schedules the batch
+    (or its halves) on the executor. wait() collects the scheduled requests, recovering their
+    failures in turn, and calls on_success for every batch that was added.
+
+    recover() and wait() must be called from the thread collecting the responses.
+
+    Example:
+        retrier = ResultBatchRetrier(send_batch, executor, on_success=upload_batch_attachments)
+        for future in as_completed(futures):
+            response = future.result()
+            if response.error_message and not retrier.recover(futures[future], response):
+                error_message = response.error_message
+                break
+        error_message = error_message or retrier.wait()
+        report(retrier.rejected)
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[Dict], APIClientResult],
+        executor: Executor,
+        on_success: Optional[Callable[[Dict, APIClientResult], None]] = None,
+        verbose_logging_function: Callable = print,
+        max_retries: int = ADD_RESULTS_BATCH_RETRIES,
+        max_rejected: int = MAX_REJECTED_RESULTS,
+    ):
+        """
+        Initialize the retrier.
+
+        Args:
+            send_batch: Sends a batch body and returns the response
+            executor: Executor running the recovery requests
+            on_success: Called with (batch, response) for every recovered batch that was added
+            verbose_logging_function: Logs recovery steps
+            max_retries: Number of times a batch failing with a transient error is sent again
+            max_rejected: Maximum number of rejected results, more rejections fail the upload
+                (e.g. a validation error caused by the run rather than by single results)
+        """
+        self.rejected: List[RejectedResult] = []
+        self.recovered: List[Tuple[Dict, APIClientResult]] = []
+        self._send_batch = send_batch
+        self._executor = executor
+        self._on_success = on_success
+        self._vlog = verbose_logging_function
+        self._max_retries = max_retries
+        self._max_rejected = max_rejected
+        self._pending: Dict[Future, Tuple[Dict, int]] = {}
+        self._stopped = False
+
+    def recover(self, body: Dict, response: APIClientResult, attempt: int = 0) -> bool:
+        """
+        Schedule recovery of a failed batch.
+
+        Args:
+            body: Request body of the failed batch
+            response: Failed response
+            attempt: Number of times the batch was already retried
+
+        Returns:
+            True if the failure was handled (the batch is retried, split or its result rejected)
+        """
+        if self._stopped:
+            return False
+        results = body["results"]
+        if response.status_code in VALIDATION_STATUS_CODES:
+            if len(results) > 1:
+                middle = len(results) // 2
+                self._vlog(f"Batch of {len(results)} results rejected ({response.error_message}), splitting it.")
+                self._submit({**body, "results": results[:middle]})
+                self._submit({**body, "results": results[middle:]})
+                return True
+            self.rejected.append(RejectedResult(results[0].get("case_id"), response.error_message))
+            if len(self.rejected) > self._max_rejected:
+                self._vlog(f"More than {self._max_rejected} results rejected, stopping the upload.")
+                self._stopped = True
+                return False
+            return True
+        if response.status_code in TRANSIENT_STATUS_CODES and attempt < self._max_retries:
+            delay = min(2**attempt, MAX_RETRY_BACKOFF)
+            self._vlog(
+                f"Batch of {len(results)} results failed ({response.error_message}), "
+                f"retrying in {delay}s (attempt {attempt + 1}/{self._max_retries})."
+            )
+            self._submit(body, attempt + 1, delay)
+            return True
+        return False
+
+    def stop(self):
+        """Stop recovering failed batches (the upload failed), scheduled requests are still collected"""
+        self._stopped = True
+
+    def wait(self) -> str:
+        """
+        Wait for all scheduled recovery requests.
+
+        Returns:
+            Error message of the first failure that could not be recovered, empty string otherwise
+        """
+        error_message = ""
+        try:
+            while self._pending:
+                done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    body, attempt = self._pending.pop(future)
+                    response = future.result()
+                    if not response.error_message:
+                        self.recovered.append((body, response))
+                        if self._on_success is not None:
+                            self._on_success(body, response)
+                    elif not self.recover(body, response, attempt):
+                        error_message = error_message or response.error_message
+                        self._stopped = True
+        except KeyboardInterrupt:
+            for future in self._pending:
+                future.cancel()
+            raise KeyboardInterrupt
+        return error_message
+
+    def _submit(self, body: Dict, attempt: int = 0, delay: float = 0):
+        self._pending[self._executor.submit(self._send, body, delay)] = (body, attempt)
+
+    def _send(self, body: Dict, delay: float) -> APIClientResult:
+        if delay:
+            sleep(delay)
+        return self._send_batch(body)
@@ -0,0 +1,118 @@
+"""
+Adaptive Result Batcher Module
+
+Splits result bodies into add_results_for_cases batches on demand, so the size of
+the next batch can follow the response times observed for previous batches.
+
+Batches are sized by JSON body bytes rather than by result count: a batch of passed
+results without comments is a fraction of the size of a batch of failed results with
+long stack traces and step results, and the request latency follows the body size.
+"""
+
+from beartype.typing import List, Dict, Optional
+
+from trcli.data_providers.api_data_provider import json_size
+from trcli.settings import MAX_ADAPTIVE_BATCH_SIZE
+
+MIN_DURATION = 0.001
+
+
+class AdaptiveResultBatcher:
+    """
+    Builds result batches targeting a per-request latency and a maximum body size.
+
+    The first batches contain initial_size results. Each completed batch updates the byte
+    budget of the following batches to the amount of data the server processed within
+    target_latency, changing it at most by a factor of 2 per completed batch. Batches never
+    exceed max_bytes (except a single result bigger than max_bytes) or max_size results.
+
+    Results from different groups are never mixed in the same batch (see
+    ApiDataProvider.results_for_cases()).
+
+    The batcher is not thread-safe; batches should be requested and recorded from the
+    thread submitting the requests.
+
+    Example:
+        batcher = AdaptiveResultBatcher(data_provider.results_for_cases(), 50, target_latency=5)
+        while (batch := batcher.next_batch()) is not None:
+            start = time.perf_counter()
+            client.send_post(f"add_results_for_cases/{run_id}", batch)
+            batcher.record(batch, time.perf_counter() - start)
+    """
+
+    def __init__(
+        self,
+        groups: List[List[Dict]],
+        initial_size: int,
+        target_latency: float,
+        max_bytes: Optional[int] = None,
+        max_size: int = MAX_ADAPTIVE_BATCH_SIZE,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            groups: Result bodies grouped by batches they can be sent in
+            initial_size: Number of results in batches sent before any response was received
+            target_latency: Desired duration of a single request in seconds
+            max_bytes: Maximum size of the JSON body of a batch (None - unlimited)
+            max_size: Maximum number of results in a batch
+        """
+        self.target_latency = target_latency
+        self.max_bytes = max_bytes
+        self.max_size = max_size
+        self.initial_size = max(1, min(initial_size, max_size))
+        self.target_bytes: Optional[int] = None
+        self.total = sum(len(group) for group in groups)
+        self.batch_sizes: List[int] = []
+        self._groups = [group for group in groups if group]
+        self._position = 0
+        self._batch_bytes: Dict[int, int] = {}
+
+    def next_batch(self) -> Optional[Dict]:
+        """
+        Build the next batch.
+
+        Returns:
+            Request body ({"results": [...]}) or None if all results were batched
+        """
+        if not self._groups:
+            return None
+        group = self._groups[0]
+        size_limit = self.initial_size if self.target_bytes is None else self.max_size
+        byte_limit = min(filter(None, [self.target_bytes, self.max_bytes]), default=None)
+
+        results, batch_bytes = [], 0
+        while self._position < len(group) and len(results) < size_limit:
+            item_bytes = json_size(group[self._position])
+            if results and byte_limit and batch_bytes + item_bytes > byte_limit:
+                break
+            results.append(group[self._position])
+            batch_bytes += item_bytes
+            self._position += 1
+
+        if self._position >= len(group):
+            self._groups.pop(0)
+            self._position = 0
+        body = {"results": results}
+        self._batch_bytes[id(body)] = batch_bytes
+        self.batch_sizes.append(len(results))
+        return body
+
+    def record(self, batch: Dict, duration: float):
+        """
+        Adjust the size of the following batches to the response time of a sent batch.
+
+        Args:
+            batch: Request body returned by next_batch()
+            duration: Time in seconds it took to send the batch and receive the response
+        """
+        batch_bytes = self._batch_bytes.pop(id(batch), None)
+        if not batch_bytes:
+            return
+        ideal_bytes = batch_bytes * self.target_latency / max(duration, MIN_DURATION)
+        current = self.target_bytes or batch_bytes
+        target_bytes = min(max(ideal_bytes, current / 2), current * 2)
+        if self.max_bytes:
+            target_bytes = min(target_bytes, self.max_bytes)
+        self.target_bytes = max(1, int(target_bytes))
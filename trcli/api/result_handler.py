@@ -10,14 +10,21 @@ It manages all test result operations including:
 
 import os
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from beartype.typing import List, Tuple, Dict
-
-from trcli.api.api_client import APIClient
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from time import perf_counter
+from beartype.typing import Callable, List, Tuple, Dict, Optional, Set
+
+from trcli.api.api_client import APIClient, APIClientResult
+from trcli.api.attachment_preflight import AttachmentPreflight
+from trcli.api.attachment_spool import AttachmentSpool
+from trcli.api.result_batch_retry import RejectedResult, ResultBatchRetrier
+from trcli.api.result_batcher import AdaptiveResultBatcher
 from trcli.cli import Environment
 from trcli.constants import FAULT_MAPPING
 from trcli.data_providers.api_data_provider import ApiDataProvider
-from trcli.settings import MAX_WORKERS_ADD_RESULTS
+from trcli.data_providers.result_delta import latest_results_by_case
+from trcli.logging.metrics import format_bytes, get_metrics
+from trcli.settings import MAX_WORKERS_ADD_RESULTS, MAX_WORKERS_ADD_ATTACHMENTS, MAX_WORKERS_ATTACHMENT_PREFLIGHT
 
 
 class ResultHandler:
@@ -45,6 +52,8 @@ class ResultHandler:
         self.data_provider = data_provider
         self.__get_all_tests_in_run = get_all_tests_in_run_callback
         self.handle_futures = handle_futures_callback
+        # Results rejected by TestRail validation during the last add_results call
+        self.rejected_results: List[RejectedResult] = []
 
     def _upload_single_attachment(self, file_path: str, result_id: int, case_id: int) -> Tuple[bool, str]:
         """
@@ -83,45 +92,45 @@ class ResultHandler:
             file_name = os.path.basename(file_path) if os.path.exists(file_path) else file_path
             return False, f"{file_name} (case {case_id})"
 
-    def upload_attachments(
-        self, report_results: List[Dict], request_id_to_result_id: Dict[int, int], total_attachments: int
-    ):
+    def __upload_checked_attachment(
+        self, preflight: AttachmentPreflight, file_path: str, result_id: int, case_id: int
+    ) -> Tuple[bool, str]:
+        """
+        Upload a single attachment file unless it is rejected by pre-flight checks or its contents
+        were already uploaded to the result.
+
+        :param preflight: pre-flight checks shared by all attachments of the run
+        :param file_path: Path to the attachment file
+        :param result_id: TestRail result ID to attach to
+        :param case_id: TestRail case ID (for error messages)
+        :return: Tuple of (success, error_message)
+        """
+        upload, error = preflight.check(file_path, result_id)
+        if error:
+            self.environment.elog(f"Skipping attachment '{os.path.basename(file_path)}' for case {case_id}: {error}")
+            return False, None
+        if not upload:
+            return True, None
+        success = False
+        try:
+            success, error = self._upload_single_attachment(file_path, result_id, case_id)
+        finally:
+            preflight.finish(file_path, result_id, success)
+        return success, error
+
+    def __wait_for_attachment_uploads(self, future_to_task: Dict, total_attachments: int, results_count: int):
         """
-        Upload attachments to test results concurrently.
+        Wait for submitted attachment uploads, reporting progress and failed uploads.
 
-        :param report_results: List of test results with attachments from report
-        :param request_id_to_result_id: Mapping from request object id to result_id
+        :param future_to_task: Mapping from upload future to (file_path, case_id)
         :param total_attachments: Total number of attachments to upload
+        :param results_count: Number of test results with attachments
         """
         failed_uploads = []
         uploaded_count = 0
         count_lock = threading.Lock()
 
-        # Prepare list of upload tasks
-        upload_tasks = []
-        for report_result in report_results:
-            case_id = report_result["case_id"]
-            # Use object identity to find the correct result_id for THIS specific result
-            result_id = request_id_to_result_id.get(id(report_result))
-
-            if result_id is None:
-                self.environment.elog(f"Unable to find result_id for case {case_id}, skipping attachments.")
-                continue
-
-            for file_path in report_result.get("attachments"):
-                upload_tasks.append((file_path, result_id, case_id))
-
-        if not upload_tasks:
-            return
-
-        # Use ThreadPoolExecutor for concurrent uploads
-        with ThreadPoolExecutor(max_workers=min(10, len(upload_tasks))) as executor:
-            # Submit all upload tasks
-            future_to_task = {
-                executor.submit(self._upload_single_attachment, file_path, result_id, case_id): (file_path, case_id)
-                for file_path, result_id, case_id in upload_tasks
-            }
-
+        try:
             # Process completed uploads
             for future in as_completed(future_to_task):
                 file_path, case_id = future_to_task[future]
@@ -140,7 +149,7 @@ class ResultHandler:
 
                         # Update progress in place (overwrite the line)
                         self.environment.log(
-                            f"\rUploading {uploaded_count}/{total_attachments} for {len(report_results)} test results.",
+                            f"\rUploading {uploaded_count}/{total_attachments} for {results_count} test results.",
                             new_line=False,
                         )
 
@@ -149,6 +158,10 @@ class ResultHandler:
                         file_name = os.path.basename(file_path) if os.path.exists(file_path) else file_path
                         self.environment.elog(f"Error uploading attachment '{file_name}' for case {case_id}: {ex}")
                         failed_uploads.append(f"{file_name} (case {case_id})")
+        except KeyboardInterrupt:
+            for future in future_to_task:
+                future.cancel()
+            raise KeyboardInterrupt
 
         # Print newline after progress is complete
         self.environment.log("")
@@ -157,65 +170,162 @@ class ResultHandler:
         if failed_uploads:
             self.environment.log(f"\nWarning: {len(failed_uploads)} attachment(s) failed to upload.")
 
-    def add_results(self, run_id: int) -> Tuple[List, str, int]:
+    def add_results(self, run_id: int, case_ids: Optional[Set[int]] = None) -> Tuple[List, str, int]:
         """
         Adds one or more new test results.
 
         :param run_id: run id
+        :param case_ids: only add the results of these cases (default: all cases with case ID)
         :returns: Tuple with dict created resources, error string, and results count.
         """
         responses = []
         error_message = ""
+        self.rejected_results = []
         # Get pre-validated user IDs if available
         user_ids = getattr(self.environment, "_validated_user_ids", [])
 
-        add_results_data_chunks = self.data_provider.add_results_for_cases(self.environment.batch_size, user_ids)
+        metrics = get_metrics()
+        latest_results = None
+        if getattr(self.environment, "skip_unchanged_results", None) is True:
+            with metrics.stage("latest_results"):
+                latest_results, error_message = self.get_latest_results_for_run(run_id)
+            if error_message:
+                return responses, error_message, 0
+
+        max_bytes = self.environment.batch_max_bytes
+        target_latency = self.environment.batch_target_latency
+        batcher = None
+        if target_latency:
+            groups = self.data_provider.results_for_cases(user_ids, latest_results, case_ids)
+            batcher = AdaptiveResultBatcher(
+                groups, self.environment.batch_size, target_latency=target_latency, max_bytes=max_bytes
+            )
+            results_amount = batcher.total
+            results = [result for group in groups for result in group]
+        else:
+            add_results_data_chunks = self.data_provider.add_results_for_cases(
+                self.environment.batch_size,
+                user_ids,
+                max_bytes=max_bytes,
+                latest_results=latest_results,
+                case_ids=case_ids,
+            )
+            results_amount = sum([len(results["results"]) for results in add_results_data_chunks])
+            results = [result for chunk in add_results_data_chunks for result in chunk["results"]]
         # Get assigned count from data provider
         assigned_count = getattr(self.data_provider, "_assigned_count", 0)
-
-        results_amount = sum([len(results["results"]) for results in add_results_data_chunks])
-
-        with self.environment.get_progress_bar(results_amount=results_amount, prefix="Adding results") as progress_bar:
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS_ADD_RESULTS) as executor:
-                futures = {
-                    executor.submit(self.client.send_post, f"add_results_for_cases/{run_id}", body): body
-                    for body in add_results_data_chunks
-                }
-                responses, error_message = self.handle_futures(
-                    futures=futures,
-                    action_string="add_results",
-                    progress_bar=progress_bar,
-                )
-            if error_message:
-                # When error_message is present we cannot be sure that responses contains all added items.
-                # Iterate through futures to get all responses from done tasks (not cancelled)
-                responses = ResultHandler.retrieve_results_after_cancelling(futures)
-        responses = [response.response_text for response in responses]
-
-        # Build request to result_id mapping based on order correspondence
-        # TestRail API preserves order, so we can match requests to responses
-        # Use id() to uniquely identify each request result object (handles duplicate case_ids)
-        request_id_to_result_id = {}
-        for request_body, response_results in zip(add_results_data_chunks, responses):
-            # Match request result objects to response result_ids by order
-            for request_result, response_result in zip(request_body["results"], response_results):
+        aggregated_count = getattr(self.data_provider, "_aggregated_count", 0)
+        if aggregated_count:
+            self.environment.log(
+                f"Aggregated repeated executions ({self.environment.aggregate_results}): "
+                f"{aggregated_count} fewer result(s) to upload."
+            )
+        if latest_results is not None:
+            unchanged_count = getattr(self.data_provider, "_unchanged_count", 0)
+            self.environment.log(f"Skipped {unchanged_count} unchanged result(s) already added to run {run_id}.")
+
+        # Attachments of a batch are uploaded as soon as the batch's result IDs are returned,
+        # while the remaining batches are still being sent
+        attachment_futures = {}
+        results_with_attachments = 0
+        # With --detach-attachments, upload tasks are collected and handed to a background process
+        detach_attachments = getattr(self.environment, "detach_attachments", None) is True
+        if detach_attachments and self.environment.close_run:
+            self.environment.vlog("Uploading attachments in the foreground because the run will be closed.")
+            detach_attachments = False
+        detached_tasks = []
+
+        def upload_batch_attachments(body: Dict, response: APIClientResult):
+            nonlocal results_with_attachments
+            # TestRail API preserves order, so request results are matched to response results by position
+            for request_result, response_result in zip(body["results"], response.response_text):
+                if not request_result["attachments"]:
+                    continue
+                results_with_attachments += 1
+                case_id = request_result["case_id"]
                 result_id = response_result.get("id")
-                if result_id:
-                    # Use object identity to uniquely map each request to its API response
-                    request_id_to_result_id[id(request_result)] = result_id
-
-        report_results_w_attachments = []
-        for results_data_chunk in add_results_data_chunks:
-            for test_result in results_data_chunk["results"]:
-                if test_result["attachments"]:
-                    report_results_w_attachments.append(test_result)
-        if report_results_w_attachments:
-            attachments_count = 0
-            for result in report_results_w_attachments:
-                attachments_count += len(result["attachments"])
-            self.upload_attachments(report_results_w_attachments, request_id_to_result_id, attachments_count)
-        else:
-            self.environment.log(f"No attachments found to upload.")
+                if not result_id:
+                    self.environment.elog(f"Unable to find result_id for case {case_id}, skipping attachments.")
+                    continue
+                for file_path in request_result["attachments"]:
+                    if detach_attachments:
+                        detached_tasks.append((file_path, result_id, case_id))
+                        continue
+                    future = attachment_executor.submit(
+                        self.__upload_checked_attachment, preflight, file_path, result_id, case_id
+                    )
+                    attachment_futures[future] = (file_path, case_id)
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS_ATTACHMENT_PREFLIGHT) as preflight_executor, ThreadPoolExecutor(
+            max_workers=MAX_WORKERS_ADD_ATTACHMENTS
+        ) as attachment_executor:
+            preflight = AttachmentPreflight(preflight_executor, self.environment.attachment_max_size)
+            if not detach_attachments:
+                # Stat all attachments (and hash possible duplicates) while the results are being added
+                preflight.inspect(result.get("attachments") or [] for result in results)
+            try:
+                with metrics.stage("results"), self.environment.get_progress_bar(
+                    results_amount=results_amount, prefix="Adding results"
+                ) as progress_bar:
+                    if batcher:
+                        add_results_data_chunks, responses, error_message = self.__add_results_adaptive(
+                            run_id, batcher, progress_bar, on_response=upload_batch_attachments
+                        )
+                    else:
+                        with ThreadPoolExecutor(max_workers=MAX_WORKERS_ADD_RESULTS) as executor:
+                            retrier = self.__create_batch_retrier(
+                                run_id, executor, progress_bar, upload_batch_attachments
+                            )
+                            futures = {
+                                executor.submit(self.client.send_post, f"add_results_for_cases/{run_id}", body): body
+                                for body in add_results_data_chunks
+                            }
+                            responses, error_message = self.handle_futures(
+                                futures=futures,
+                                action_string="add_results",
+                                progress_bar=progress_bar,
+                                on_response=upload_batch_attachments,
+                                on_error=retrier.recover,
+                            )
+                            if error_message:
+                                retrier.stop()
+                            recovery_error = retrier.wait()
+                            error_message = error_message or recovery_error
+                        if error_message:
+                            # When error_message is present we cannot be sure that responses contains all added items.
+                            # Iterate through futures to get all responses from done tasks (not cancelled)
+                            responses = ResultHandler.retrieve_results_after_cancelling(futures)
+                        responses += [response for _, response in retrier.recovered]
+                        self.rejected_results = retrier.rejected
+            except KeyboardInterrupt:
+                for future in attachment_futures:
+                    future.cancel()
+                raise KeyboardInterrupt
+            responses = [response.response_text for response in responses]
+            if self.rejected_results:
+                self.__report_rejected_results()
+
+            if detached_tasks and not self.__start_detached_attachment_upload(run_id, detached_tasks):
+                # Upload in the foreground if the background process cannot be started
+                for file_path, result_id, case_id in detached_tasks:
+                    future = attachment_executor.submit(
+                        self.__upload_checked_attachment, preflight, file_path, result_id, case_id
+                    )
+                    attachment_futures[future] = (file_path, case_id)
+            if attachment_futures:
+                with metrics.stage("attachments"):
+                    self.__wait_for_attachment_uploads(
+                        attachment_futures, len(attachment_futures), results_with_attachments
+                    )
+                if preflight.rejected:
+                    self.environment.log(f"Warning: {preflight.rejected} attachment(s) skipped by pre-flight checks.")
+                if preflight.duplicates:
+                    self.environment.log(
+                        f"Skipped {preflight.duplicates} duplicate attachment(s) "
+                        f"({format_bytes(preflight.bytes_saved)} not uploaded)."
+                    )
+            elif not detached_tasks:
+                self.environment.log(f"No attachments found to upload.")
 
         # Log assignment results if assignment was performed
         if user_ids:
@@ -227,6 +337,146 @@ class ResultHandler:
 
         return responses, error_message, progress_bar.n
 
+    def __create_batch_retrier(
+        self, run_id: int, executor: ThreadPoolExecutor, progress_bar, on_response: Callable = None
+    ) -> ResultBatchRetrier:
+        """
+        Create a retrier recovering failed result batches on the executor sending the batches.
+
+        :param run_id: run id
+        :param executor: executor sending the result batches
+        :param progress_bar: progress bar updated with the number of recovered results
+        :param on_response: called with (batch, response) for every recovered batch
+        """
+
+        def on_success(body: Dict, response: APIClientResult):
+            progress_bar.update(len(body["results"]))
+            if on_response:
+                on_response(body, response)
+
+        return ResultBatchRetrier(
+            lambda body: self.client.send_post(f"add_results_for_cases/{run_id}", body),
+            executor,
+            on_success=on_success,
+            verbose_logging_function=self.environment.vlog,
+        )
+
+    def __report_rejected_results(self):
+        """Log results rejected by TestRail, the upload exits with an error after all other results were added"""
+        self.environment._has_rejected_results = True
+        self.environment.elog(f"\n{len(self.rejected_results)} result(s) rejected by TestRail:")
+        for rejected in self.rejected_results:
+            self.environment.elog(f"  Result for case C{rejected.case_id}: {rejected.error}")
+
+    def __start_detached_attachment_upload(self, run_id: int, tasks: List[tuple]) -> bool:
+        """
+        Hand attachment upload tasks to a background process (see trcli.api.attachment_spool).
+
+        :param run_id: run id
+        :param tasks: upload tasks as (file_path, result_id, case_id) tuples
+        :returns: True if the background upload was started.
+        """
+        connection = {
+            "host": self.environment.host,
+            "username": self.environment.username,
+            "insecure": self.environment.insecure,
+            "timeout": self.environment.timeout,
+            "proxy": self.environment.proxy,
+            "noproxy": self.environment.noproxy,
+        }
+        credentials = {
+            "password": self.environment.password,
+            "key": self.environment.key,
+            "proxy_user": self.environment.proxy_user,
+        }
+        try:
+            spool = AttachmentSpool.create(connection, run_id, tasks, self.environment.attachment_max_size)
+            spool.start(credentials)
+        except OSError as e:
+            self.environment.elog(f"Unable to start background attachment upload: {e}")
+            return False
+        self.environment.log(
+            f"Uploading {len(tasks)} attachment(s) in the background (spool: {spool.spool_id}). "
+            f"Run 'trcli attachments wait' to wait for the upload."
+        )
+        return True
+
+    def __add_results_adaptive(
+        self, run_id: int, batcher: AdaptiveResultBatcher, progress_bar, on_response: Callable = None
+    ) -> Tuple[List[Dict], List[APIClientResult], str]:
+        """
+        Send result batches built by the adaptive batcher.
+
+        At most MAX_WORKERS_ADD_RESULTS batches are in flight. The next batch is built when a
+        response arrives, so its size follows the latest observed response times.
+
+        :param run_id: run id
+        :param batcher: batcher providing result batches
+        :param progress_bar: progress bar updated with the number of added results
+        :param on_response: called with (batch, response) for every successfully sent batch
+        :returns: Tuple with sent batches, their responses (in the same order) and error string.
+        """
+        sent_batches = []
+        responses_by_batch = {}
+        error_message = ""
+        futures = {}
+
+        def post_batch(body: Dict) -> Tuple[APIClientResult, float]:
+            start = perf_counter()
+            response = self.client.send_post(f"add_results_for_cases/{run_id}", body)
+            return response, perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS_ADD_RESULTS) as executor:
+            retrier = self.__create_batch_retrier(run_id, executor, progress_bar, on_response)
+            try:
+                while True:
+                    while not error_message and len(futures) < MAX_WORKERS_ADD_RESULTS:
+                        body = batcher.next_batch()
+                        if body is None:
+                            break
+                        sent_batches.append(body)
+                        futures[executor.submit(post_batch, body)] = body
+                    if not futures:
+                        break
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        body = futures.pop(future)
+                        response, duration = future.result()
+                        if response.error_message:
+                            if retrier.recover(body, response):
+                                continue
+                            if not error_message:
+                                error_message = response.error_message
+                                self.environment.log("\nError during add_results. Waiting for sent batches.")
+                                retrier.stop()
+                            continue
+                        batcher.record(body, duration)
+                        responses_by_batch[id(body)] = response
+                        progress_bar.update(len(body["results"]))
+                        if on_response:
+                            on_response(body, response)
+                recovery_error = retrier.wait()
+                error_message = error_message or recovery_error
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                raise KeyboardInterrupt
+        self.rejected_results = retrier.rejected
+        if not error_message:
+            progress_bar.set_postfix_str(s="Done.")
+        if batcher.batch_sizes:
+            self.environment.vlog(
+                f"Adaptive batching: {len(batcher.batch_sizes)} batches, "
+                f"{min(batcher.batch_sizes)}-{max(batcher.batch_sizes)} results per batch."
+            )
+
+        sent_batches = [body for body in sent_batches if id(body) in responses_by_batch]
+        responses = [responses_by_batch[id(body)] for body in sent_batches]
+        for body, response in retrier.recovered:
+            sent_batches.append(body)
+            responses.append(response)
+        return sent_batches, responses, error_message
+
     def get_results(self, test_id: int, offset: int = 0, limit: int = 250) -> Tuple[List[Dict], str]:
         """
         Get test results for a specific test.
@@ -287,6 +537,33 @@ class ResultHandler:
 
         return results, None
 
+    def get_latest_results_for_run(self, run_id: int) -> Tuple[Dict[int, Dict], str]:
+        """
+        Get the latest result of each case of a run, from all pages of its tests and results.
+
+        :param run_id: TestRail run ID
+        :returns: Tuple of (latest result by case ID, error_message)
+        """
+        tests, error_message = self.__get_all_tests_in_run(run_id)
+        if error_message:
+            return {}, error_message
+        results = []
+        offset = 0
+        while True:
+            response = self.client.send_get(f"get_results_for_run/{run_id}&offset={offset}&limit=250")
+            if response.error_message:
+                return {}, response.error_message
+            if isinstance(response.response_text, list):
+                # Older TestRail versions do not paginate results
+                results = response.response_text
+                break
+            page = response.response_text.get("results", [])
+            results.extend(page)
+            if not page or not (response.response_text.get("_links") or {}).get("next"):
+                break
+            offset += len(page)
+        return latest_results_by_case(tests, results), ""
+
     def get_results_for_case(
         self, run_id: int, case_id: int, offset: int = 0, limit: int = 250
     ) -> Tuple[List[Dict], str]:
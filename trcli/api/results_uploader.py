@@ -1,11 +1,15 @@
 import time
-from beartype.typing import Tuple, Callable, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+
+from beartype.typing import Tuple, Callable, List, Dict, Set
 
 from trcli.api.project_based_client import ProjectBasedClient
+from trcli.api.shard_coordinator import ShardCoordinator
 from trcli.cli import Environment
 from trcli.constants import PROMPT_MESSAGES, FAULT_MAPPING, SuiteModes
 from trcli.constants import RevertMessages
 from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.logging.metrics import get_metrics, format_bytes
 
 
 class ResultsUploader(ProjectBasedClient):
@@ -14,9 +18,12 @@ class ResultsUploader(ProjectBasedClient):
     Initialized with environment object and result file parser object (any parser derived from FileParser).
     """
 
-    def __init__(self, environment: Environment, suite: TestRailSuite, skip_run: bool = False):
+    def __init__(
+        self, environment: Environment, suite: TestRailSuite, skip_run: bool = False, exit_on_rejected: bool = True
+    ):
         super().__init__(environment, suite)
         self.skip_run = skip_run
+        self.exit_on_rejected = exit_on_rejected
         self.last_run_id = None
         if hasattr(self.environment, "special_parser") and self.environment.special_parser == "saucectl":
             self.run_name += f" ({suite.name})"
@@ -30,18 +37,22 @@ class ResultsUploader(ProjectBasedClient):
         """
         start = time.time()
         results_amount = None
+        metrics = get_metrics()
 
         # Validate user emails early if --assign is specified
         try:
             assign_value = getattr(self.environment, "assign_failed_to", None)
             if assign_value is not None and str(assign_value).strip():
-                self._validate_and_store_user_ids()
+                with metrics.stage("assign_users"):
+                    self._validate_and_store_user_ids()
         except (AttributeError, TypeError):
             # Skip validation if there are any issues with the assign_failed_to attribute
             pass
 
-        self.resolve_project()
-        suite_id, suite_added = self.resolve_suite()
+        with metrics.stage("resolve_project"):
+            self.resolve_project()
+        with metrics.stage("resolve_suite"):
+            suite_id, suite_added = self.resolve_suite()
 
         # Check if all test cases already have case_id set (BDD mode or pre-existing cases)
         # Note: In BDD mode, case_id can be -1 (marker for auto-creation) or a real ID
@@ -59,9 +70,10 @@ class ResultsUploader(ProjectBasedClient):
         # Skip this check if all cases already have IDs (BDD mode)
         missing_test_cases = False
         if not all_cases_have_ids:
-            missing_test_cases, error_message = self.api_request_handler.check_missing_test_cases_ids(
-                self.project.project_id
-            )
+            with metrics.stage("match"):
+                missing_test_cases, error_message = self.api_request_handler.check_missing_test_cases_ids(
+                    self.project.project_id
+                )
             if error_message:
                 self.environment.elog(
                     FAULT_MAPPING["error_checking_missing_item"].format(
@@ -69,10 +81,29 @@ class ResultsUploader(ProjectBasedClient):
                     )
                 )
 
+        # Parallel shards create missing cases one after the other, reusing the cases created by earlier shards
+        coordinator = ShardCoordinator(self) if isinstance(getattr(self.environment, "shard_key", None), str) else None
+        if coordinator and missing_test_cases and self.environment.auto_creation_response:
+            coordinator.wait_for_turn()
+            missing_test_cases, _ = self.api_request_handler.check_missing_test_cases_ids(self.project.project_id)
+
+        # Results of matched cases are added while the missing cases are created: the run is created with the
+        # matched cases, the created cases are added to it afterwards and their results are added last
+        pipelined = (
+            bool(missing_test_cases)
+            and bool(self.environment.auto_creation_response)
+            and not self.skip_run
+            and coordinator is None
+            and getattr(self.environment, "update_existing_cases", None) != "yes"
+            and any(case_id > 0 for case_id in self._case_ids())
+        )
+        matched_case_ids = None
+
         added_sections = None
         added_test_cases = None
         if self.environment.auto_creation_response and not all_cases_have_ids:
-            added_sections, result_code = self.add_missing_sections(self.project.project_id)
+            with metrics.stage("sections"):
+                added_sections, result_code = self.add_missing_sections(self.project.project_id)
             if result_code == -1:
                 revert_logs = self.rollback_changes(
                     suite_id=suite_id, suite_added=suite_added, added_sections=added_sections
@@ -86,7 +117,12 @@ class ResultsUploader(ProjectBasedClient):
                 if use_ai_evaluation:
                     self._apply_ai_evaluation_template()
 
-                added_test_cases, result_code = self.add_missing_test_cases()
+                if pipelined:
+                    # Cases are created once the run exists
+                    matched_case_ids = self._case_ids()
+                    result_code = 1
+                else:
+                    added_test_cases, result_code = self._add_missing_test_cases_stage()
             else:
                 result_code = 1
             if result_code == -1:
@@ -105,35 +141,16 @@ class ResultsUploader(ProjectBasedClient):
                 self.environment.log(f"Submitted {len(added_test_cases)} test cases in {stop - start:.1f} secs.")
             return
 
-        # remove empty, unused sections created earlier, based on the sections actually used by the new test cases
-        #  - iterate on added_sections and remove those that are not used by the new test cases
-        empty_sections = None
-        if added_sections:
-            if not added_test_cases:
-                empty_sections = added_sections
-            else:
-                empty_sections = [
-                    section
-                    for section in added_sections
-                    if section["section_id"] not in [case["section_id"] for case in added_test_cases]
-                ]
-            if len(empty_sections) > 0:
-                self.environment.log(
-                    "Removing unnecessary empty sections that may have been created earlier. ", new_line=False
-                )
-                _, error = self.api_request_handler.delete_sections(empty_sections)
-                if error:
-                    self.environment.elog("\n" + error)
-                    exit(1)
-                else:
-                    self.environment.log(f"Removed {len(empty_sections)} unused/empty section(s).")
+        if matched_case_ids is None:
+            self.remove_empty_sections(added_sections, added_test_cases)
 
         # Update existing cases with JUnit references if enabled
         case_update_results = None
         case_update_failed = []
         if hasattr(self.environment, "update_existing_cases") and self.environment.update_existing_cases == "yes":
             self.environment.log("Updating existing cases...")
-            case_update_results, case_update_failed = self.update_existing_cases_with_junit_refs(added_test_cases)
+            with metrics.stage("update_cases"):
+                case_update_results, case_update_failed = self.update_existing_cases_with_junit_refs(added_test_cases)
 
             if case_update_results.get("updated_cases"):
                 updated_count = len(case_update_results["updated_cases"])
@@ -142,7 +159,8 @@ class ResultsUploader(ProjectBasedClient):
                 self.environment.elog(f"Failed to update {len(case_update_results['failed_cases'])} case(s).")
 
         # Create/update test run
-        run_id, error_message = self.create_or_update_test_run()
+        with metrics.stage("run"):
+            run_id, error_message = coordinator.join_run() if coordinator else self.create_or_update_test_run()
         self.last_run_id = run_id
         # Store case update results for later reporting
         self.case_update_results = case_update_results
@@ -156,7 +174,30 @@ class ResultsUploader(ProjectBasedClient):
             self.environment.log("\n".join(revert_logs))
             exit(1)
 
-        added_results, error_message, results_amount = self.api_request_handler.add_results(run_id)
+        if matched_case_ids is None:
+            added_results, error_message, results_amount = self.api_request_handler.add_results(run_id)
+        else:
+            with ThreadPoolExecutor(max_workers=1) as case_creation:
+                added_cases_future = case_creation.submit(self._add_missing_test_cases_stage)
+                added_results, error_message, results_amount = self.api_request_handler.add_results(
+                    run_id, matched_case_ids
+                )
+                # Wait for the missing cases, before a failure is rolled back
+                added_test_cases, result_code = added_cases_future.result()
+            if result_code == -1:
+                revert_logs = self.rollback_changes(
+                    suite_id=suite_id,
+                    suite_added=suite_added,
+                    added_sections=added_sections,
+                    added_test_cases=added_test_cases,
+                    run_id=0 if run_id == self.environment.run_id else run_id,
+                )
+                self.environment.log("\n".join(revert_logs))
+                exit(1)
+            if not error_message:
+                self.remove_empty_sections(added_sections, added_test_cases)
+                error_message, added_amount = self._add_results_of_added_cases(run_id, matched_case_ids)
+                results_amount += added_amount
         if error_message:
             self.environment.elog(error_message)
             revert_logs = self.rollback_changes(
@@ -169,9 +210,13 @@ class ResultsUploader(ProjectBasedClient):
             self.environment.log("\n".join(revert_logs))
             exit(1)
 
-        if self.environment.close_run:
+        if coordinator:
+            with metrics.stage("close_run"):
+                error_message = coordinator.finish()
+        elif self.environment.close_run:
             self.environment.log("Closing test run. ", new_line=False)
-            response, error_message = self.api_request_handler.close_run(run_id)
+            with metrics.stage("close_run"):
+                response, error_message = self.api_request_handler.close_run(run_id)
         if error_message:
             self.environment.elog("\n" + error_message)
             exit(1)
@@ -180,12 +225,17 @@ class ResultsUploader(ProjectBasedClient):
         stop = time.time()
         if results_amount:
             self.environment.log(f"Submitted {results_amount} test results in {stop - start:.1f} secs.")
+        if metrics.bytes_saved:
+            self.environment.log(f"Request compression saved {format_bytes(metrics.bytes_saved)}.")
 
         # Exit with error if there were invalid users (after processing valid ones)
+        # or results rejected by TestRail (after adding all other results)
         try:
             has_invalid = getattr(self.environment, "_has_invalid_users", False)
-            if has_invalid is True:  # Explicitly check for True to avoid mock object issues
-                exit(1)
+            has_rejected = getattr(self.environment, "_has_rejected_results", False)
+            if has_invalid is True or has_rejected is True:  # Explicitly check for True to avoid mock object issues
+                if self.exit_on_rejected:
+                    exit(1)
         except (AttributeError, TypeError):
             # Skip exit if there are any issues with the attribute
             pass
@@ -220,16 +270,17 @@ class ResultsUploader(ProjectBasedClient):
         valid_user_ids = []
         invalid_users = []
 
+        user_ids, error_msg = self.api_request_handler.get_users_by_emails(emails)
+        if error_msg:
+            # Not a "user not found" error, it might be an API issue
+            self.environment.elog(f"Error: {error_msg}")
+            exit(1)
+
         for email in emails:
-            user_id, error_msg = self.api_request_handler.get_user_by_email(email)
-            if user_id is None:
-                invalid_users.append(email)
-                if "User not found" not in error_msg:
-                    # If it's not a "user not found" error, it might be an API issue
-                    self.environment.elog(f"Error: {error_msg}")
-                    exit(1)
+            if email in user_ids:
+                valid_user_ids.append(user_ids[email])
             else:
-                valid_user_ids.append(user_id)
+                invalid_users.append(email)
 
         # Handle invalid users
         if invalid_users:
@@ -358,6 +409,61 @@ class ResultsUploader(ProjectBasedClient):
 
         return update_results, failed_cases
 
+    def _add_missing_test_cases_stage(self) -> Tuple[list, int]:
+        with get_metrics().stage("cases"):
+            return self.add_missing_test_cases()
+
+    def _case_ids(self) -> Set[int]:
+        """IDs of the cases of the report that exist in TestRail"""
+        return {
+            test_case.case_id
+            for section in self.api_request_handler.suites_data_from_provider.testsections
+            for test_case in section.testcases
+            if test_case.case_id
+        }
+
+    def _add_results_of_added_cases(self, run_id: int, matched_case_ids: Set[int]) -> Tuple[str, int]:
+        """
+        Add the cases created while the results of the matched cases were added to the run, then add their results.
+
+        :returns: Tuple with error string and the number of added results.
+        """
+        added_case_ids = self._case_ids() - matched_case_ids
+        if not added_case_ids:
+            return "", 0
+        if not self.environment.run_include_all:
+            # Cases of the report are merged into the cases of the run
+            with get_metrics().stage("run"):
+                _, error_message = self.api_request_handler.update_run(run_id, self.run_name)
+            if error_message:
+                return error_message, 0
+        _, error_message, results_amount = self.api_request_handler.add_results(run_id, added_case_ids)
+        return error_message, results_amount
+
+    def remove_empty_sections(self, added_sections: List[Dict], added_test_cases: List[Dict]):
+        """
+        Remove empty, unused sections created earlier, based on the sections actually used by the new test cases.
+        Exits with result code 1 if the sections cannot be removed.
+        """
+        if not added_sections:
+            return
+        if not added_test_cases:
+            empty_sections = added_sections
+        else:
+            used_section_ids = {case["section_id"] for case in added_test_cases}
+            empty_sections = [section for section in added_sections if section["section_id"] not in used_section_ids]
+        if len(empty_sections) > 0:
+            self.environment.log(
+                "Removing unnecessary empty sections that may have been created earlier. ", new_line=False
+            )
+            with get_metrics().stage("delete_sections"):
+                _, error = self.api_request_handler.delete_sections(empty_sections)
+            if error:
+                self.environment.elog("\n" + error)
+                exit(1)
+            else:
+                self.environment.log(f"Removed {len(empty_sections)} unused/empty section(s).")
+
     def add_missing_sections(self, project_id: int) -> Tuple[List, int]:
         """
         Checks for missing sections in specified project. Add missing sections if user agrees to
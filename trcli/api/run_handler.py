@@ -393,6 +393,8 @@ class RunHandler:
         project_id: int,
         limit: int = 250,
         offset: int = 0,
+        is_completed: bool = None,
+        created_after: int = None,
     ) -> Tuple[dict, str]:
         """
         Retrieve test runs for a project with pagination.
@@ -401,6 +403,8 @@ class RunHandler:
         :param project_id: TestRail project ID
         :param limit: Maximum number of runs to return (default: 250)
         :param offset: Offset for pagination (default: 0)
+        :param is_completed: Only closed (True) or active (False) runs, all runs if None
+        :param created_after: Only runs created after this UNIX timestamp
         :returns: Tuple with (paginated_response_dict, error_message)
                   Response dict contains: runs, offset, limit, size, _links
         """
@@ -410,6 +414,10 @@ class RunHandler:
             params.append(f"limit={limit}")
         if offset > 0:
             params.append(f"offset={offset}")
+        if is_completed is not None:
+            params.append(f"is_completed={int(is_completed)}")
+        if created_after is not None:
+            params.append(f"created_after={created_after}")
 
         # Build URL
         query_string = "&".join(params) if params else ""
@@ -422,6 +430,63 @@ class RunHandler:
             return {}, response.error_message
         return response.response_text, ""
 
+    def get_run_case_ids(self, run_id: int) -> Tuple[List[int], str]:
+        """
+        Retrieve the IDs of the cases included in a test run
+
+        :param run_id: TestRail run ID
+        :returns: Tuple with (case IDs, error_message)
+        """
+        tests, error_message = self.__get_all_tests_in_run(run_id)
+        if error_message:
+            return [], error_message
+        return [test["case_id"] for test in tests], ""
+
+    def add_run_attachment(self, run_id: int, name: str, content: bytes) -> Tuple[dict, str]:
+        """
+        Attach a file to a test run
+
+        :param run_id: TestRail run ID
+        :param name: file name of the attachment
+        :param content: file content
+        :returns: Tuple with (attachment dict, error_message)
+        """
+        response = self.client.send_post(f"add_attachment_to_run/{run_id}", files={"attachment": (name, content)})
+        return response.response_text, response.error_message
+
+    def get_run_attachments(self, run_id: int) -> Tuple[List[dict], str]:
+        """
+        Retrieve all attachments of a test run (all pages)
+
+        :param run_id: TestRail run ID
+        :returns: Tuple with (attachment dicts, error_message)
+        """
+        attachments = []
+        offset = 0
+        while True:
+            url = f"get_attachments_for_run/{run_id}" + (f"&offset={offset}" if offset else "")
+            response = self.client.send_get(url)
+            if response.error_message:
+                return [], response.error_message
+            if isinstance(response.response_text, list):
+                # Older TestRail versions do not paginate attachments
+                return response.response_text, ""
+            page = response.response_text.get("attachments", [])
+            attachments.extend(page)
+            if not page or not (response.response_text.get("_links") or {}).get("next"):
+                return attachments, ""
+            offset += len(page)
+
+    def get_attachment(self, attachment_id) -> Tuple[dict, str]:
+        """
+        Retrieve the content of a JSON attachment
+
+        :param attachment_id: TestRail attachment ID
+        :returns: Tuple with (parsed attachment content, error_message)
+        """
+        response = self.client.send_get(f"get_attachment/{attachment_id}")
+        return response.response_text, response.error_message
+
     def add_plan(
         self,
         project_id: int,
@@ -0,0 +1,306 @@
+"""
+Shard Coordinator Module
+
+Coordinates parallel CI nodes (shards) uploading their reports into one test run (--shard-key, --shard-index,
+--shard-count). TestRail is the only state shared by the shards:
+- the run is identified by the shard key, stored in the run description; shard 1 creates the run and the other
+  shards poll the active runs of the project until it appears
+- each execution of shard 1 starts a new attempt of the run: all other attachments are named after the attempt, so
+  attachments left by an earlier execution with the same shard key (a re-run pipeline) are never taken for the
+  current one
+- each shard publishes the IDs of its cases as an attachment of the run for the latest attempt, attachments are only
+  ever added so concurrent shards cannot overwrite each other
+- missing sections and cases are created in shard order: a shard that has to create cases waits until the
+  shards before it published their cases and matches its cases again, so cases created by an earlier shard
+  are reused instead of being duplicated; shards without missing cases never wait for their turn
+- shard 1 adds the cases of all shards to the run in one update and marks the run ready, listing the executions
+  whose cases it added; a shard adds its own results once the run is ready with its cases, all shards concurrently
+- with --close-run, shard 1 closes the run once all other shards published that their results were added
+"""
+
+import json
+import time
+import uuid
+
+from beartype.typing import Callable, Dict, List, Optional, Set, Tuple
+
+from trcli.constants import FAULT_MAPPING
+from trcli.settings import SHARD_POLL_INTERVAL, SHARD_RUN_MAX_AGE, SHARD_WAIT_TIMEOUT
+
+ATTEMPT_ATTACHMENT = "trcli-shard-attempt-{attempt}.json"
+CASES_ATTACHMENT = "trcli-shard-{attempt}-{index}-cases.json"
+READY_ATTACHMENT = "trcli-shard-{attempt}-ready.json"
+DONE_ATTACHMENT = "trcli-shard-{attempt}-{index}-done.json"
+
+
+class ShardCoordinator:
+    """
+    Coordinates the upload of one shard with the other shards using the same shard key.
+
+    Example (within ResultsUploader.upload_results):
+        coordinator = ShardCoordinator(results_uploader)
+        coordinator.wait_for_turn()  # before creating missing sections and cases
+        run_id, error_message = coordinator.join_run()  # instead of create_or_update_test_run()
+        error_message = coordinator.finish()  # after adding the results
+    """
+
+    def __init__(self, results_uploader, interval: float = SHARD_POLL_INTERVAL):
+        """
+        Initialize the coordinator.
+
+        Args:
+            results_uploader: ResultsUploader of this shard, with project and suite resolved
+            interval: Seconds between two polls of TestRail while waiting for other shards
+        """
+        self.results_uploader = results_uploader
+        self.environment = results_uploader.environment
+        self.api_request_handler = results_uploader.api_request_handler
+        self.key = self.environment.shard_key
+        self.index = self.environment.shard_index
+        self.count = self.environment.shard_count
+        self.timeout = self.environment.shard_timeout or SHARD_WAIT_TIMEOUT
+        self.interval = interval
+        self.run_id: Optional[int] = self.environment.run_id
+        # Identifies this execution of the shard, the attempt of shard 1 is its execution ID
+        self.execution_id = uuid.uuid4().hex
+        self.attempt: Optional[str] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Shard 1 creates the run, adds the cases of all shards to it and closes it"""
+        return self.index == 1
+
+    @property
+    def marker(self) -> str:
+        return f"trcli shard key: {self.key}"
+
+    def wait_for_turn(self):
+        """
+        Wait until the shards before this one published their cases, before creating missing sections and cases.
+        Cached sections and cases are dropped, the caller has to match its cases again.
+        """
+        if self.is_leader:
+            return
+        self._wait_for_run()
+
+        def earlier_shards_published(attachments: List[Dict]) -> bool:
+            attempt = self._latest_attempt(attachments)
+            earlier_shards = {CASES_ATTACHMENT.format(attempt=attempt, index=index) for index in range(1, self.index)}
+            return attempt is not None and earlier_shards <= self._names(attachments)
+
+        self.environment.log(f"Waiting for shards 1-{self.index - 1} to create their cases.")
+        self._wait_for(earlier_shards_published, f"shards 1-{self.index - 1} to create their cases")
+        self.api_request_handler.clear_cases_cache()
+
+    def join_run(self) -> Tuple[Optional[int], str]:
+        """
+        Join the run of the shard key: shard 1 creates the run (or updates the run given with --run-id) and adds
+        the cases of all shards to it, the other shards publish their cases and wait until the run is ready.
+
+        Returns:
+            Tuple with the ID of the run and an error message
+        """
+        if self.is_leader:
+            if not self.run_id:
+                self.run_id = self._find_run()
+                if self.run_id and self.environment.run_description:
+                    # Updating the run replaces its description, the shard key has to be kept
+                    self.environment.run_description = f"{self.environment.run_description}\n{self.marker}"
+                elif not self.run_id:
+                    data_provider = self.api_request_handler.data_provider
+                    data_provider.run_description = "\n".join(
+                        filter(None, [data_provider.run_description, self.marker])
+                    )
+                self.environment.run_id = self.run_id
+            self.run_id, error_message = self.results_uploader.create_or_update_test_run()
+            if error_message:
+                return self.run_id, error_message
+            self.environment.run_id = self.run_id
+            self.attempt = self.execution_id
+            error_message = self._publish(ATTEMPT_ATTACHMENT.format(attempt=self.attempt), {})
+            if error_message:
+                return self.run_id, error_message
+            error_message = self._publish_cases()
+            if error_message:
+                return self.run_id, error_message
+            executions, error_message = self._add_shard_cases_to_run()
+            if error_message:
+                return self.run_id, error_message
+            error_message = self._publish(
+                READY_ATTACHMENT.format(attempt=self.attempt), {"shard_count": self.count, "executions": executions}
+            )
+        else:
+            self._wait_for_run()
+            self.environment.run_id = self.run_id
+            self.environment.log(f"Waiting for shard 1 to add the cases of all shards to run {self.run_id}.")
+            error_message = self._wait_for_ready()
+        return self.run_id, error_message
+
+    def finish(self) -> str:
+        """
+        Publish that the results of this shard were added, shard 1 closes the run (--close-run) once
+        all shards did.
+
+        Returns:
+            Error message
+        """
+        if not self.environment.close_run:
+            return ""
+        if not self.is_leader:
+            return self._publish(DONE_ATTACHMENT.format(attempt=self.attempt, index=self.index), {})
+        other_shards = {DONE_ATTACHMENT.format(attempt=self.attempt, index=index) for index in range(2, self.count + 1)}
+        self.environment.log("Waiting for all shards to add their results before closing the run.")
+        self._wait_for(lambda attachments: other_shards <= self._names(attachments), "all shards to add their results")
+        self.environment.log("Closing test run. ", new_line=False)
+        _, error_message = self.api_request_handler.close_run(self.run_id)
+        if not error_message:
+            self.environment.log("Run closed successfully.")
+        return error_message
+
+    def _add_shard_cases_to_run(self) -> Tuple[Dict[str, str], str]:
+        """
+        Add the cases published by all shards for this attempt to the run.
+
+        Returns:
+            Tuple with the execution IDs of the shards by shard index and an error message
+        """
+        all_shards = {
+            CASES_ATTACHMENT.format(attempt=self.attempt, index=index): index for index in range(1, self.count + 1)
+        }
+        self.environment.log(f"Waiting for {self.count} shard(s) to publish their cases.")
+        self._wait_for(
+            lambda attachments: set(all_shards) <= self._names(attachments), "all shards to publish their cases"
+        )
+        attachments, error_message = self.api_request_handler.run_handler.get_run_attachments(self.run_id)
+        if error_message:
+            return {}, error_message
+        case_ids: Set[int] = set()
+        executions: Dict[str, str] = {}
+        for attachment in attachments:
+            if attachment.get("name") in all_shards:
+                manifest, error_message = self.api_request_handler.run_handler.get_attachment(attachment["id"])
+                if error_message:
+                    return {}, error_message
+                case_ids.update(manifest.get("case_ids", []))
+                executions[str(all_shards[attachment["name"]])] = manifest.get("execution_id")
+        run_case_ids, error_message = self.api_request_handler.run_handler.get_run_case_ids(self.run_id)
+        if error_message:
+            return {}, error_message
+        if case_ids <= set(run_case_ids):
+            return executions, ""
+        self.environment.log(f"Adding the cases of {self.count} shard(s) to run {self.run_id}. ", new_line=False)
+        _, error_message = self.api_request_handler.update_run(
+            self.run_id, self.results_uploader.run_name, case_ids=sorted(case_ids | set(run_case_ids))
+        )
+        if not error_message:
+            self.environment.log("Done.")
+        return executions, error_message
+
+    def _wait_for_ready(self) -> str:
+        """
+        Publish the cases of this shard for the latest attempt of shard 1 and wait until the run is ready with them.
+        A shard started before shard 1 of its execution sees the attempt of an earlier execution first, whose ready
+        attachment does not list this execution, it publishes its cases again once shard 1 starts the next attempt.
+
+        Returns:
+            Error message
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            attachments = self._attachments()
+            attempt = self._latest_attempt(attachments)
+            if attempt is not None and attempt != self.attempt:
+                self.attempt = attempt
+                error_message = self._publish_cases()
+                if error_message:
+                    return error_message
+            ready_attachment = READY_ATTACHMENT.format(attempt=self.attempt)
+            for attachment in attachments:
+                if self.attempt is not None and attachment.get("name") == ready_attachment:
+                    ready, error_message = self.api_request_handler.run_handler.get_attachment(attachment["id"])
+                    if error_message:
+                        return error_message
+                    if (ready.get("executions") or {}).get(str(self.index)) == self.execution_id:
+                        return ""
+            self._sleep_until(deadline, "shard 1 to prepare the run")
+
+    def _find_run(self) -> Optional[int]:
+        """ID of the oldest active run with the shard key created within SHARD_RUN_MAX_AGE, None if there is none"""
+        project_id = self.results_uploader.project.project_id
+        created_after = int(time.time() - SHARD_RUN_MAX_AGE)
+        run_ids = []
+        offset = 0
+        while True:
+            response, error_message = self.api_request_handler.run_handler.get_runs(
+                project_id, offset=offset, is_completed=False, created_after=created_after
+            )
+            if error_message:
+                self.environment.elog(error_message)
+                exit(1)
+            runs = response if isinstance(response, list) else response.get("runs", [])
+            run_ids += [run["id"] for run in runs if self.marker in (run.get("description") or "").splitlines()]
+            if isinstance(response, list) or not runs or not (response.get("_links") or {}).get("next"):
+                return min(run_ids, default=None)
+            offset += len(runs)
+
+    def _wait_for_run(self):
+        if self.run_id:
+            return
+        self.environment.log(f"Waiting for shard 1 to create the run of shard key {self.key}.")
+        deadline = time.monotonic() + self.timeout
+        while not self.run_id:
+            self.run_id = self._find_run()
+            if not self.run_id:
+                self._sleep_until(deadline, "shard 1 to create the run")
+
+    def _wait_for(self, condition: Callable[[List[Dict]], bool], waiting_for: str):
+        """Poll the attachments of the run until condition is met by them"""
+        deadline = time.monotonic() + self.timeout
+        while not condition(self._attachments()):
+            self._sleep_until(deadline, waiting_for)
+
+    def _attachments(self) -> List[Dict]:
+        attachments, error_message = self.api_request_handler.run_handler.get_run_attachments(self.run_id)
+        if error_message:
+            self.environment.elog(error_message)
+            exit(1)
+        return attachments
+
+    @staticmethod
+    def _names(attachments: List[Dict]) -> Set[str]:
+        return {attachment.get("name") for attachment in attachments}
+
+    @staticmethod
+    def _latest_attempt(attachments: List[Dict]) -> Optional[str]:
+        """Attempt of the latest execution of shard 1 (attachments of the same second in listing order)"""
+        prefix, suffix = ATTEMPT_ATTACHMENT.split("{attempt}")
+        attempts = [
+            (attachment.get("created_on") or 0, position, attachment["name"][len(prefix) : -len(suffix)])
+            for position, attachment in enumerate(attachments)
+            if (attachment.get("name") or "").startswith(prefix) and attachment["name"].endswith(suffix)
+        ]
+        return max(attempts)[2] if attempts else None
+
+    def _sleep_until(self, deadline: float, waiting_for: str):
+        if time.monotonic() >= deadline:
+            self.environment.elog(
+                FAULT_MAPPING["shard_timeout"].format(timeout=self.timeout, waiting_for=waiting_for, shard_key=self.key)
+            )
+            exit(1)
+        time.sleep(self.interval)
+
+    def _publish(self, name: str, content: Dict) -> str:
+        _, error_message = self.api_request_handler.run_handler.add_run_attachment(
+            self.run_id, name, json.dumps(content).encode()
+        )
+        return error_message
+
+    def _publish_cases(self) -> str:
+        return self._publish(
+            CASES_ATTACHMENT.format(attempt=self.attempt, index=self.index),
+            {"case_ids": self._case_ids(), "execution_id": self.execution_id},
+        )
+
+    def _case_ids(self) -> List[int]:
+        suite = self.api_request_handler.suites_data_from_provider
+        return sorted({int(case) for section in suite.testsections for case in section.testcases if int(case) > 0})
@@ -0,0 +1,90 @@
+"""
+Single Flight Module
+
+Coalesces identical calls made concurrently. Uploads validate, match and fetch from many threads, and several
+threads often need the same resource at the same moment (the cases of a suite, get_case for a duplicate case ID).
+The first caller of a key runs the call, callers of the same key arriving while it runs wait for it and share its
+result (or its exception). Keys are only coalesced while their call runs, nothing is kept afterwards. Callers that
+modify their result pass a copy function, every caller of a shared result then gets a copy of its own.
+"""
+
+import threading
+
+from beartype.typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    """Call in progress, waited on by the callers of its key"""
+
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.waiters = 0
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time, concurrent callers of the key share the result.
+
+    Example:
+        flights = SingleFlight()
+        result, shared = flights.do("get_case/1", lambda: client.send_get("get_case/1"))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(
+        self, key: Hashable, call: Callable[[], Any], copy: Optional[Callable[[Any], Any]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run the call, or wait for the call of the same key already running.
+
+        A thread calling a key again from within its own call runs the call again instead of waiting for itself.
+
+        Args:
+            key: Key identifying the call (e.g. the request URI)
+            call: Function to run if no call of the key is running
+            copy: Function copying the result, if given each caller of a shared result gets its own copy (the
+                caller running the call too), the result of an unshared call is returned as is
+
+        Returns:
+            Tuple of (result, shared), shared is True if the result of another caller's call was returned
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leading = flight is None
+            if leading:
+                flight = self._flights[key] = _Flight()
+            elif flight.owner != threading.get_ident():
+                flight.waiters += 1
+        if not leading:
+            if flight.owner == threading.get_ident():
+                return call(), False
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # The result of the call is never handed out when it is copied, so copying it here is safe
+            return (flight.result if copy is None else copy(flight.result)), True
+
+        try:
+            flight.result = call()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        # No caller joins once the flight is removed, waiters copy the result of the call for themselves
+        if copy is not None and flight.waiters:
+            return copy(flight.result), False
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        """Number of calls currently running"""
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,127 @@
+"""
+User Directory Module
+
+Caches the email -> user ID mapping of a TestRail instance in ~/.trcli/users, so
+users given with --assign are resolved without API calls on following runs.
+Emails are matched case-insensitively and cached users expire after USER_CACHE_TTL.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from beartype.typing import Dict, List, Optional
+
+USER_CACHE_DIR = Path.home() / ".trcli" / "users"
+USER_CACHE_TTL = 86400  # 24 hours in seconds
+USER_CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class UserDirectory:
+    """
+    Email -> user ID mapping of a single TestRail host cached on disk.
+
+    Example:
+        directory = UserDirectory("https://example.testrail.io")
+        directory.load()
+        user_id = directory.get("John.Doe@example.com")
+        if user_id is None:
+            directory.add_users(<get_users response>)
+            directory.save()
+    """
+
+    def __init__(self, host: str, cache_dir: Optional[Path] = None):
+        """
+        Initialize an empty directory.
+
+        Args:
+            host: TestRail host the users belong to
+            cache_dir: Directory of cache files (default: USER_CACHE_DIR)
+        """
+        self.host = host
+        self.path = Path(cache_dir or USER_CACHE_DIR) / f"{hashlib.sha1(host.encode()).hexdigest()}.json"
+        self._users: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def load(self) -> bool:
+        """
+        Read cached users from disk, skipping expired ones.
+
+        Returns:
+            True if a cache for this host was loaded, False otherwise
+        """
+        try:
+            if not self.path.exists():
+                return False
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != USER_CACHE_VERSION or data.get("host") != self.host:
+                logger.debug(f"User cache {self.path} does not match, ignoring it")
+                return False
+            now = time.time()
+            self._users = {
+                email: user for email, user in data["users"].items() if now - user["cached_at"] < USER_CACHE_TTL
+            }
+            return True
+        except (json.JSONDecodeError, KeyError, TypeError, IOError, OSError) as e:
+            logger.debug(f"Failed to read user cache: {e}")
+            return False
+
+    def save(self) -> None:
+        """
+        Write cached users to disk.
+
+        Note:
+            The file is replaced atomically. Failures are logged but not raised.
+        """
+        data = {"version": USER_CACHE_VERSION, "host": self.host, "users": self._users}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+            logger.debug(f"User cache saved to {self.path}")
+        except (IOError, OSError) as e:
+            logger.debug(f"Failed to save user cache: {e}")
+
+    def get(self, email: str) -> Optional[int]:
+        """
+        Look up a user.
+
+        Args:
+            email: User email (case-insensitive)
+
+        Returns:
+            User ID or None if the user is not cached
+        """
+        user = self._users.get(email.strip().lower())
+        return user["id"] if user else None
+
+    def add(self, email: str, user_id: int) -> None:
+        """
+        Cache a single user.
+
+        Args:
+            email: User email
+            user_id: TestRail user ID
+        """
+        self._users[email.strip().lower()] = {"id": user_id, "cached_at": time.time()}
+
+    def add_users(self, users: List[dict]) -> None:
+        """
+        Cache users returned by get_users.
+
+        Args:
+            users: User objects with "id" and "email" fields
+        """
+        for user in users:
+            if user.get("email") and user.get("id") is not None:
+                self.add(user["email"], user["id"])
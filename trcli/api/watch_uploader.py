@@ -0,0 +1,150 @@
+"""
+Watch Uploader Module
+
+Uploads report files while the tests are still running. A directory is polled for new report
+files; every file is uploaded as soon as it was completely written:
+- files are uploaded to one test run with IncrementalUploader
+- a file is complete once its size and modification time did not change between two polls
+- watching stops when the sentinel file appears in the directory or on SIGINT/SIGTERM; the
+  remaining files are uploaded and the run is closed (--close-run) once, at the end
+"""
+
+import signal
+import threading
+from pathlib import Path
+
+from beartype.typing import Callable, Dict, List, Optional, Set, Tuple, Type
+
+from trcli.api.incremental_uploader import IncrementalUploader
+from trcli.cli import Environment
+from trcli.constants import FAULT_MAPPING
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.settings import WATCH_POLL_INTERVAL, WATCH_SENTINEL_FILE
+
+
+class WatchUploader(IncrementalUploader):
+    """
+    Uploads report files from a directory as they appear.
+
+    Example:
+        watcher = WatchUploader(environment, "reports", parse_file=parse_junit_file, parse_errors=(ParseError,))
+        run_id = watcher.watch()
+    """
+
+    def __init__(
+        self,
+        environment: Environment,
+        directory: str,
+        parse_file: Callable[[Path], List[TestRailSuite]],
+        parse_errors: Tuple[Type[Exception], ...] = (),
+        pattern: str = "*.xml",
+        interval: float = WATCH_POLL_INTERVAL,
+        sentinel: str = WATCH_SENTINEL_FILE,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            environment: Environment of the command
+            directory: Directory to watch
+            parse_file: Parses a report file into suites
+            parse_errors: Errors raised by parse_file for incomplete or invalid files
+            pattern: Glob pattern of the report files within the directory
+            interval: Seconds between two polls of the directory
+            sentinel: Name of the file signalling that no more report files will be written
+        """
+        super().__init__(environment)
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.interval = interval
+        self.sentinel = sentinel
+        self.uploaded_files: List[Path] = []
+        self.invalid_files: List[Path] = []
+        self._parse_file = parse_file
+        self._parse_errors = parse_errors
+        self._stopped = threading.Event()
+        self._uploaded: Set[Path] = set()
+        self._signatures: Dict[Path, Tuple[int, int]] = {}
+        self._invalid: Dict[Path, Tuple[int, int]] = {}
+
+    def stop(self, *args):
+        """Stop watching, remaining files are uploaded (can be used as a signal handler)"""
+        self._stopped.set()
+
+    def watch(self) -> Optional[int]:
+        """
+        Watch the directory until the sentinel file appears or stop() is called.
+        Exits with result code 1 if an upload failed, a file could not be parsed or results were rejected
+        (after all other files were uploaded).
+
+        Returns:
+            ID of the run the results were added to
+        """
+        if not self.directory.is_dir():
+            self.environment.elog(FAULT_MAPPING["watch_directory_not_found"].format(directory=self.directory))
+            exit(1)
+        previous_handlers = self._install_signal_handlers()
+        self.environment.log(
+            f"Watching {self.directory} for {self.pattern} files. "
+            f"Create {self.directory / self.sentinel} or stop trcli to finish the upload."
+        )
+        try:
+            with self:
+                while True:
+                    finished = self._stopped.is_set() or (self.directory / self.sentinel).exists()
+                    for path in self._ready_files(final=finished):
+                        self._upload_file(path, final=finished)
+                    if finished:
+                        break
+                    self._stopped.wait(self.interval)
+        finally:
+            self._restore_signal_handlers(previous_handlers)
+
+        self.environment.log(f"Finished watching {self.directory}: uploaded {len(self.uploaded_files)} file(s).")
+        return self.finish(failed=bool(self.invalid_files))
+
+    def _ready_files(self, final: bool) -> List[Path]:
+        """Files that were completely written, or all remaining files on the final poll"""
+        ready = []
+        for path in self.directory.glob(self.pattern):
+            if path in self._uploaded or path.name == self.sentinel or not path.is_file():
+                continue
+            stat = path.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._invalid.get(path) == signature and not final:
+                continue
+            previous = self._signatures.get(path)
+            self._signatures[path] = signature
+            if final or (previous == signature and stat.st_size > 0):
+                ready.append((stat.st_mtime_ns, path))
+        return [path for _, path in sorted(ready)]
+
+    def _upload_file(self, path: Path, final: bool):
+        try:
+            suites = self._parse_file(path)
+        except self._parse_errors:
+            # A file might still be written despite its stable size, it is retried once it changes
+            self._invalid[path] = self._signatures[path]
+            if final:
+                self.environment.elog(FAULT_MAPPING["watch_invalid_file"].format(file_path=path))
+                self.invalid_files.append(path)
+            else:
+                self.environment.vlog(f"Could not parse {path} yet, waiting for it to change.")
+            return
+        self._uploaded.add(path)
+        self.environment.log(f"Uploading results from {path.name}")
+        self.upload(suites)
+        self.uploaded_files.append(path)
+
+    def _install_signal_handlers(self) -> Dict:
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous_handlers = {}
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[signal_number] = signal.signal(signal_number, self.stop)
+        return previous_handlers
+
+    @staticmethod
+    def _restore_signal_handlers(previous_handlers: Dict):
+        for signal_number, handler in previous_handlers.items():
+            signal.signal(signal_number, handler)
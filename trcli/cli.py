@@ -18,11 +18,24 @@ from trcli.constants import (
     COMMAND_FAULT_MAPPING,
 )
 from trcli.data_classes.data_parsers import FieldsParser, QualityRatingParser
-from trcli.settings import DEFAULT_API_CALL_TIMEOUT, DEFAULT_BATCH_SIZE
+from trcli.settings import (
+    DEFAULT_API_CALL_TIMEOUT,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BATCH_MAX_BYTES,
+    DEFAULT_GZIP_THRESHOLD,
+    DEFAULT_GZIP_LEVEL,
+    DEFAULT_HEDGE_BUDGET,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+    DEFAULT_CIRCUIT_BREAKER_RESET,
+    DEFAULT_ATTACHMENT_MAX_SIZE,
+)
 
 # Import structured logging infrastructure
 from trcli.logging import get_logger
 from trcli.logging.config import LoggingConfig
+from trcli.logging.metrics import get_metrics
+from trcli.logging.tracing import get_tracer
 
 # Import version checker
 from trcli import __version__
@@ -52,6 +65,17 @@ class Environment:
         self.verify = None
         self.config = None
         self.batch_size = None
+        self.batch_max_bytes = None
+        self.batch_target_latency = None
+        self.gzip_requests = None
+        self.gzip_threshold = None
+        self.gzip_level = None
+        self.hedge_requests = None
+        self.hedge_percentile = None
+        self.hedge_budget = None
+        self.circuit_breaker = None
+        self.circuit_breaker_threshold = None
+        self.circuit_breaker_reset = None
         self.timeout = None
         self.suite_id = None
         self.suite_name = None
@@ -72,6 +96,8 @@ class Environment:
         self._case_fields = None
         self._result_fields = None
         self.allow_ms = False
+        self.aggregate_results = None
+        self.skip_unchanged_results = None
         self.run_assigned_to_id = None
         self.run_case_ids = None
         self.run_include_all = None
@@ -81,11 +107,24 @@ class Environment:
         self.json_output = None
         self.update_existing_cases = None
         self.update_strategy = None
+        self.watch = None
+        self.watch_interval = None
+        self.watch_sentinel = None
+        self.shard_key = None
+        self.shard_index = None
+        self.shard_count = None
+        self.shard_timeout = None
         self.proxy = None
         self.assign_failed_to = None  # Add proxy related attributes
         self.noproxy = None
         self.proxy_user = None
         self.parallel_pagination = None
+        self.bdd_index = None
+        self.mirror = None
+        self.detach_attachments = None
+        self.attachment_max_size = None
+        self.metrics_file = None
+        self.trace_file = None
 
         # Structured logger - lazy initialization
         self._logger = None
@@ -194,6 +233,32 @@ class Environment:
             # Silently fail if structured logging has issues
             pass
 
+    def report_metrics(self):
+        """Emits collected API performance metrics to the structured logger and optional Prometheus textfile."""
+        metrics = get_metrics()
+        if not metrics.has_data:
+            return
+        try:
+            metrics.emit(get_logger("trcli.metrics"))
+        except Exception:
+            # Silently fail if structured logging has issues
+            pass
+        if self.metrics_file:
+            error_message = metrics.write_prometheus(self.metrics_file)
+            if error_message:
+                self.elog(error_message)
+
+    def write_trace(self):
+        """Writes recorded trace spans to the file given with --trace-file."""
+        tracer = get_tracer()
+        if not self.trace_file or not tracer.enabled:
+            return
+        error_message = tracer.write(self.trace_file)
+        if error_message:
+            self.elog(error_message)
+        else:
+            self.vlog(f"Trace written to {self.trace_file}")
+
     def get_progress_bar(self, results_amount: int, prefix: str):
         disabled = True if self.silent else False
         return tqdm(
@@ -245,6 +310,26 @@ class Environment:
             else:
                 setattr(self, param, value)
 
+    @classmethod
+    def from_options(cls, cmd: str = "parse_junit", **options) -> "Environment":
+        """Creates an environment without running the command line, to use trcli as a library.
+        Options are resolved like on the command line (config file, TR_CLI_* environment variables, option defaults),
+        the given options take precedence, e.g.:
+            Environment.from_options(host="https://example.testrail.io", project="Demo", username="...", key="...")
+        Raises TypeError for unknown options."""
+        environment = cls(cmd)
+        unknown_options = [option for option in options if not hasattr(environment, option)]
+        if unknown_options:
+            raise TypeError(f"Unknown option(s): {', '.join(unknown_options)}")
+        config = options.pop("config", None)
+        context = cli.make_context("trcli", ["--config", str(config)] if config else [], obj=environment)
+        command_context = cli.get_command(context, cmd).make_context(cmd, [], parent=context, obj=environment)
+        environment.parse_config_file(context)
+        environment.set_parameters(command_context)
+        for option, value in options.items():
+            setattr(environment, option, value)
+        return environment
+
     def check_for_required_parameters(self):
         """Checks that all required parameters were set. If not error message would be printed and
         program will exit with exit code 1"""
@@ -388,6 +473,85 @@ class TRCLI(click.MultiCommand):
     metavar="",
     help="Configurable batch size.",
 )
+@click.option(
+    "--batch-max-bytes",
+    type=click.IntRange(min=1024),
+    default=DEFAULT_BATCH_MAX_BYTES,
+    show_default=str(DEFAULT_BATCH_MAX_BYTES),
+    metavar="",
+    help="Maximum request body size in bytes of a batch of results.",
+)
+@click.option(
+    "--batch-target-latency",
+    type=click.FloatRange(min=0, min_open=True),
+    metavar="",
+    help="Adapt the size of result batches to reach this response time in seconds "
+    "(--batch-size is used for the first batches).",
+)
+@click.option(
+    "--gzip-requests",
+    is_flag=True,
+    help="Send large request bodies gzip compressed (falls back to uncompressed if not supported by the server).",
+)
+@click.option(
+    "--gzip-threshold",
+    type=click.IntRange(min=0),
+    default=DEFAULT_GZIP_THRESHOLD,
+    show_default=str(DEFAULT_GZIP_THRESHOLD),
+    metavar="",
+    help="Minimum request body size in bytes compressed with --gzip-requests.",
+)
+@click.option(
+    "--gzip-level",
+    type=click.IntRange(min=1, max=9),
+    default=DEFAULT_GZIP_LEVEL,
+    show_default=str(DEFAULT_GZIP_LEVEL),
+    metavar="",
+    help="Compression level used with --gzip-requests.",
+)
+@click.option(
+    "--hedge-requests",
+    is_flag=True,
+    help="Send a duplicate GET request when a response takes longer than usual for its endpoint, "
+    "the first response is used.",
+)
+@click.option(
+    "--hedge-percentile",
+    type=click.FloatRange(min=50, max=99.9),
+    default=DEFAULT_HEDGE_PERCENTILE,
+    show_default=str(DEFAULT_HEDGE_PERCENTILE),
+    metavar="",
+    help="Latency percentile of the endpoint after which --hedge-requests sends a duplicate request.",
+)
+@click.option(
+    "--hedge-budget",
+    type=click.FloatRange(min=0, max=100),
+    default=DEFAULT_HEDGE_BUDGET,
+    show_default=str(DEFAULT_HEDGE_BUDGET),
+    metavar="",
+    help="Maximum duplicate requests sent by --hedge-requests, in percent of all GET requests.",
+)
+@click.option(
+    "--circuit-breaker",
+    is_flag=True,
+    help="Fail requests without sending them once TestRail stops responding, instead of retrying every request.",
+)
+@click.option(
+    "--circuit-breaker-threshold",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+    show_default=str(DEFAULT_CIRCUIT_BREAKER_THRESHOLD),
+    metavar="",
+    help="Consecutive failed requests (no response or server error) opening the --circuit-breaker.",
+)
+@click.option(
+    "--circuit-breaker-reset",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_CIRCUIT_BREAKER_RESET,
+    show_default=str(DEFAULT_CIRCUIT_BREAKER_RESET),
+    metavar="",
+    help="Seconds requests fail fast before a single request checks if TestRail responds again.",
+)
 @click.option(
     "-t",
     "--timeout",
@@ -429,6 +593,43 @@ class TRCLI(click.MultiCommand):
 @click.option(
     "--parallel-pagination", is_flag=True, help="Enable parallel pagination for faster case fetching (experimental)."
 )
+@click.option(
+    "--bdd-index",
+    is_flag=True,
+    help="Keep an index of BDD feature names in ~/.trcli to only fetch cases updated since the previous upload.",
+)
+@click.option(
+    "--mirror",
+    is_flag=True,
+    help="Keep projects, suites, sections and cases in a local SQLite mirror in ~/.trcli to only fetch cases "
+    "updated since the previous run (see 'trcli mirror sync').",
+)
+@click.option(
+    "--attachment-max-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_ATTACHMENT_MAX_SIZE,
+    show_default=str(DEFAULT_ATTACHMENT_MAX_SIZE),
+    metavar="",
+    help="Maximum attachment file size in bytes, larger files are skipped without uploading them.",
+)
+@click.option(
+    "--detach-attachments",
+    is_flag=True,
+    help="Upload attachments in a background process that keeps running after trcli exits "
+    "(see 'trcli attachments status/wait').",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    metavar="",
+    help="Write API performance metrics to a Prometheus textfile (e.g., /var/lib/node_exporter/trcli.prom).",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False),
+    metavar="",
+    help="Write upload stage and API request spans to a Chrome trace file (chrome://tracing, Perfetto).",
+)
 def cli(environment: Environment, context: click.core.Context, *args, **kwargs):
     """TestRail CLI"""
     if not sys.argv[1:]:
@@ -452,3 +653,9 @@ def cli(environment: Environment, context: click.core.Context, *args, **kwargs):
     except Exception as e:
         # Fallback to stderr if logging setup fails - don't block execution
         click.echo(f"Warning: Failed to initialize logging: {e}", file=sys.stderr)
+
+    # Emit API performance metrics and traces once the command finishes (including on exit)
+    if environment.trace_file:
+        get_tracer().enable()
+        context.call_on_close(environment.write_trace)
+    context.call_on_close(environment.report_metrics)
@@ -0,0 +1,144 @@
+import time
+
+import click
+
+from trcli.api import attachment_spool
+from trcli.api.attachment_spool import AttachmentSpool
+from trcli.cli import pass_environment, CONTEXT_SETTINGS, Environment
+from trcli.constants import FAULT_MAPPING
+
+WAIT_POLL_INTERVAL = 1.0
+
+
+def select_spools(environment: Environment, spool_id: str, unfinished_only: bool = False):
+    """Loads the spool with spool_id or all spools (optionally only the ones not finished yet)"""
+    spools = attachment_spool.list_spools()
+    if spool_id:
+        spools = [spool for spool in spools if spool.spool_id == spool_id]
+        if not spools:
+            environment.elog(f"Error: Attachment upload '{spool_id}' not found.")
+            raise SystemExit(1)
+    elif unfinished_only:
+        spools = [spool for spool in spools if spool.state() != AttachmentSpool.FINISHED]
+    return spools
+
+
+def describe_spool(spool: AttachmentSpool) -> str:
+    counts = spool.counts()
+    description = (
+        f"{spool.spool_id}: run {spool.data.get('run_id')}, {spool.state()}, "
+        f"uploaded {counts[AttachmentSpool.UPLOADED]}/{len(spool.tasks)}, failed {counts[AttachmentSpool.FAILED]}"
+    )
+    if counts[AttachmentSpool.DUPLICATE]:
+        description += f", skipped {counts[AttachmentSpool.DUPLICATE]} duplicate(s)"
+    return description
+
+
+def log_failed_uploads(environment: Environment, spool: AttachmentSpool):
+    for task in spool.tasks:
+        if task["status"] == AttachmentSpool.FAILED:
+            environment.elog(
+                f"  Failed to upload attachment '{task['file_path']}' for case {task['case_id']}: {task['error']}"
+            )
+
+
+@click.group(context_settings=CONTEXT_SETTINGS)
+@click.pass_context
+@pass_environment
+def cli(environment: Environment, context: click.Context, *args, **kwargs):
+    """Check on background attachment uploads (--detach-attachments)"""
+    environment.cmd = "attachments"
+    environment.set_parameters(context)
+
+
+@cli.command()
+@click.option("--spool-id", metavar="", help="Background upload to show (default: all uploads).")
+@click.pass_context
+@pass_environment
+def status(environment: Environment, context: click.Context, spool_id: str, *args, **kwargs):
+    """Show the state of background attachment uploads"""
+    spools = select_spools(environment, spool_id)
+    if not spools:
+        environment.log("No background attachment uploads found.")
+        return
+    for spool in spools:
+        environment.log(describe_spool(spool))
+        log_failed_uploads(environment, spool)
+        if spool.state() == AttachmentSpool.INTERRUPTED:
+            environment.elog(
+                f"  Upload was interrupted ({spool.log_path}), run 'trcli attachments resume' to continue it."
+            )
+
+
+@cli.command()
+@click.option("--spool-id", metavar="", help="Background upload to resume (default: all interrupted uploads).")
+@click.pass_context
+@pass_environment
+def resume(environment: Environment, context: click.Context, spool_id: str, *args, **kwargs):
+    """Restart interrupted background attachment uploads"""
+    if not environment.password and not environment.key:
+        environment.elog(FAULT_MAPPING["missing_password_and_key"])
+        raise SystemExit(1)
+    spools = [spool for spool in select_spools(environment, spool_id) if spool.state() == AttachmentSpool.INTERRUPTED]
+    if not spools:
+        environment.log("No interrupted background attachment uploads found.")
+        return
+    credentials = {"password": environment.password, "key": environment.key, "proxy_user": environment.proxy_user}
+    for spool in spools:
+        # Attachments already uploaded by the interrupted process are skipped
+        pending = spool.counts()[AttachmentSpool.PENDING]
+        try:
+            spool.start(credentials)
+        except OSError as e:
+            environment.elog(f"Error: Unable to resume attachment upload '{spool.spool_id}': {e}")
+            raise SystemExit(1)
+        environment.log(f"Resumed {spool.spool_id}: {pending} attachment(s) pending.")
+
+
+@cli.command()
+@click.option("--spool-id", metavar="", help="Background upload to wait for (default: all unfinished uploads).")
+@click.option(
+    "--wait-timeout",
+    type=click.FloatRange(min=0),
+    metavar="",
+    help="Maximum number of seconds to wait (default: no limit).",
+)
+@click.pass_context
+@pass_environment
+def wait(environment: Environment, context: click.Context, spool_id: str, wait_timeout: float, *args, **kwargs):
+    """Wait for background attachment uploads to finish"""
+    spools = select_spools(environment, spool_id, unfinished_only=True)
+    if not spools:
+        environment.log("No background attachment uploads in progress.")
+        return
+    deadline = time.monotonic() + wait_timeout if wait_timeout is not None else None
+    running = list(spools)
+    while True:
+        for spool in running:
+            spool.load()
+        running = [spool for spool in running if spool.state() == AttachmentSpool.RUNNING]
+        if not running:
+            break
+        uploaded = sum(spool.counts()[AttachmentSpool.UPLOADED] for spool in spools)
+        total = sum(len(spool.tasks) for spool in spools)
+        environment.log(f"\rWaiting for attachment uploads: {uploaded}/{total}", new_line=False)
+        if deadline is not None and time.monotonic() >= deadline:
+            environment.log("")
+            environment.elog("Error: Timed out waiting for attachment uploads.")
+            raise SystemExit(1)
+        time.sleep(WAIT_POLL_INTERVAL)
+    environment.log("")
+
+    failed = False
+    for spool in spools:
+        environment.log(describe_spool(spool))
+        log_failed_uploads(environment, spool)
+        if spool.state() == AttachmentSpool.INTERRUPTED:
+            environment.elog(
+                f"  Upload was interrupted ({spool.log_path}), run 'trcli attachments resume' to continue it."
+            )
+            failed = True
+        elif spool.counts()[AttachmentSpool.FAILED]:
+            failed = True
+    if failed:
+        raise SystemExit(1)
@@ -187,8 +187,11 @@ def list(
     filter_desc = ", ".join(filters) if filters else "no filters"
     environment.log(f"Retrieving cases for project ID {project_client.project.project_id} ({filter_desc})...")
 
-    # Retrieve cases using CaseHandler from ProjectBasedClient
-    response_data, error_message = project_client.api_request_handler.case_handler.get_cases(
+    # Retrieve cases using CaseHandler from ProjectBasedClient, or from the local mirror with --mirror
+    get_cases = project_client.api_request_handler.case_handler.get_cases
+    if environment.mirror is True:
+        get_cases = project_client.api_request_handler.get_mirrored_cases
+    response_data, error_message = get_cases(
         project_id=project_client.project.project_id,
         suite_id=suite_id,
         priority_id=priority_id,
@@ -5,8 +5,8 @@ from trcli.cli import pass_environment, Environment, CONTEXT_SETTINGS
 from trcli.constants import FAULT_MAPPING
 from trcli.api.api_client import APIClient
 from trcli.api.api_request_handler import ApiRequestHandler
+from trcli.api.project_based_client import api_client_kwargs
 from trcli.data_classes.dataclass_testrail import TestRailSuite
-import trcli
 
 
 @click.command(context_settings=CONTEXT_SETTINGS)
@@ -112,14 +112,7 @@ def cli(environment: Environment, context: click.Context, file: str, section_id:
         environment.log("Connecting to TestRail...")
 
         # Create APIClient
-        uploader_metadata = APIClient.build_uploader_metadata(version=trcli.__version__)
-        api_client = APIClient(
-            host_name=environment.host,
-            verify=not environment.insecure,
-            verbose_logging_function=environment.vlog,
-            logging_function=environment.log,
-            uploader_metadata=uploader_metadata,
-        )
+        api_client = APIClient(environment.host, **api_client_kwargs(environment))
 
         # Set credentials after initialization
         api_client.username = environment.username
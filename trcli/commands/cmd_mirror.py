@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import click
+
+from trcli.api.project_based_client import ProjectBasedClient
+from trcli.api.project_mirror import ProjectMirror
+from trcli.cli import pass_environment, CONTEXT_SETTINGS, Environment
+from trcli.constants import FAULT_MAPPING
+from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+
+def check_host(environment: Environment):
+    if not environment.host:
+        environment.elog(FAULT_MAPPING["missing_host"])
+        raise SystemExit(1)
+
+
+@click.group(context_settings=CONTEXT_SETTINGS)
+@click.pass_context
+@pass_environment
+def cli(environment: Environment, context: click.Context, *args, **kwargs):
+    """Manage the local mirror of TestRail projects (--mirror)"""
+    environment.cmd = "mirror"
+    environment.set_parameters(context)
+
+
+@cli.command()
+@click.option("--suite-id", type=click.IntRange(min=1), metavar="", help="Suite ID to sync (default: all suites).")
+@click.pass_context
+@pass_environment
+def sync(environment: Environment, context: click.Context, suite_id: int, *args, **kwargs):
+    """Sync the suites, sections and cases of a project to the local mirror"""
+    environment.check_for_required_parameters()
+    environment.mirror = True
+
+    project_client = ProjectBasedClient(
+        environment=environment,
+        suite=TestRailSuite(name=environment.suite_name, suite_id=environment.suite_id),
+    )
+    project_client.resolve_project()
+    project_id = project_client.project.project_id
+
+    environment.log(f"Syncing project ID {project_id} to the local mirror...")
+    counts, error_message = project_client.api_request_handler.sync_mirror(project_id, suite_id)
+    if error_message:
+        environment.elog(f"Error: Failed to sync the local mirror: {error_message}")
+        raise SystemExit(1)
+    environment.log(
+        f"Synced {counts['suites']} suite(s), {counts['sections']} section(s) and {counts['cases']} case(s) "
+        f"to {project_client.api_request_handler._mirror.path}."
+    )
+
+
+@cli.command()
+@click.pass_context
+@pass_environment
+def status(environment: Environment, context: click.Context, *args, **kwargs):
+    """Show the mirrored entities of the TestRail instance"""
+    check_host(environment)
+    mirror = ProjectMirror(environment.host)
+    syncs = mirror.status()
+    if not syncs:
+        environment.log(f"Nothing mirrored for {environment.host} yet, run 'trcli mirror sync'.")
+        return
+    environment.log(f"Local mirror {mirror.path} of {environment.host}:")
+    for sync in syncs:
+        scope = "".join(
+            f", {name} {sync[key]}" for name, key in (("project", "project_id"), ("suite", "suite_id")) if sync[key]
+        )
+        synced_at = datetime.fromtimestamp(sync["synced_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        environment.log(f"  {sync['entity']}{scope}: {sync['count']} mirrored, synced {synced_at}")
+
+
+@cli.command()
+@click.pass_context
+@pass_environment
+def clear(environment: Environment, context: click.Context, *args, **kwargs):
+    """Remove the mirrored entities of the TestRail instance"""
+    check_host(environment)
+    mirror = ProjectMirror(environment.host)
+    mirror.clear()
+    environment.log(f"Removed the mirrored entities of {environment.host} from {mirror.path}.")
@@ -6,6 +6,7 @@ from trcli.cli import pass_environment, Environment, CONTEXT_SETTINGS
 from trcli.commands.results_parser_helpers import bdd_parser_options, print_config
 from trcli.constants import FAULT_MAPPING, ProjectErrors
 from trcli.data_classes.validation_exception import ValidationException
+from trcli.logging.metrics import get_metrics
 from trcli.readers.cucumber_json import CucumberParser
 
 
@@ -46,17 +47,10 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
         # Setup API client and handler (needed for both modes)
         from trcli.api.api_request_handler import ApiRequestHandler
         from trcli.api.api_client import APIClient
-        import trcli
+        from trcli.api.project_based_client import api_client_kwargs
 
         environment.vlog("Initializing API client...")
-        uploader_metadata = APIClient.build_uploader_metadata(version=trcli.__version__)
-        api_client = APIClient(
-            host_name=environment.host,
-            verify=not environment.insecure,
-            verbose_logging_function=environment.vlog,
-            logging_function=environment.log,
-            uploader_metadata=uploader_metadata,
-        )
+        api_client = APIClient(environment.host, **api_client_kwargs(environment))
 
         # Set credentials
         api_client.username = environment.username
@@ -110,12 +104,13 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
         else:
             environment.vlog("Auto-creation enabled: Will create missing BDD test cases")
 
-        parsed_suites = parser.parse_file(
-            bdd_matching_mode=True,
-            project_id=resolved_project_id,
-            suite_id=environment.suite_id,
-            auto_create=auto_create,
-        )
+        with get_metrics().stage("parse"):
+            parsed_suites = parser.parse_file(
+                bdd_matching_mode=True,
+                project_id=resolved_project_id,
+                suite_id=environment.suite_id,
+                auto_create=auto_create,
+            )
 
         # Handle auto-creation of features in BDD matching mode
         # auto_creation_response != False means: -y flag OR no flag (default to auto-create)
@@ -131,10 +126,6 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
             if features_to_create:
                 environment.log(f"\n=== Auto-Creating {len(features_to_create)} Missing BDD Test Case(s) ===")
 
-                # Load Cucumber JSON to access raw feature data
-                with open(parser.filepath, "r", encoding="utf-8") as f:
-                    cucumber_data = json.load(f)
-
                 # Get BDD template ID
                 environment.log("Getting BDD template ID...")
                 bdd_template_id, error_message = api_handler.get_bdd_template_id(resolved_project_id)
@@ -148,7 +139,8 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
                 # Create each missing feature
                 created_case_ids = {}  # Map feature name -> case_id
 
-                for feature in cucumber_data:
+                # Read raw feature data from Cucumber JSON one feature at a time
+                for feature in parser.iter_features():
                     feature_name = feature.get("name", "Untitled Feature")
                     normalized_name = parser._normalize_title(feature_name)
 
@@ -233,12 +225,12 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
                 api_handler._cache.invalidate_pattern(f"get_cases/{resolved_project_id}")
 
                 # Re-parse with the newly created case IDs
+                # (same parser, a report read from stdin can only be read once)
                 environment.vlog("Re-parsing to match newly created cases...")
-                parser_for_results = CucumberParser(environment)
-                parser_for_results.set_api_handler(api_handler)
+                parser._bdd_case_cache.clear()
 
                 # Re-parse in BDD matching mode (cache will rebuild with new cases)
-                parsed_suites = parser_for_results.parse_file(
+                parsed_suites = parser.parse_file(
                     bdd_matching_mode=True,
                     project_id=resolved_project_id,
                     suite_id=environment.suite_id,
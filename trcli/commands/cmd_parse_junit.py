@@ -1,14 +1,21 @@
+from pathlib import Path
 from xml.etree.ElementTree import ParseError
 
 import click
+from beartype.typing import List
 from junitparser import JUnitXmlError
 
 from trcli import settings
+from trcli.api.incremental_uploader import IncrementalUploader
 from trcli.api.results_uploader import ResultsUploader
+from trcli.api.watch_uploader import WatchUploader
 from trcli.cli import pass_environment, Environment, CONTEXT_SETTINGS
 from trcli.commands.results_parser_helpers import results_parser_options, print_config
 from trcli.constants import FAULT_MAPPING
+from trcli.data_classes.dataclass_testrail import TestRailSuite
 from trcli.data_classes.validation_exception import ValidationException
+from trcli.logging.metrics import get_metrics
+from trcli.readers.file_parser import STDIN, read_ahead
 from trcli.readers.junit_xml import JunitParser
 
 
@@ -48,12 +55,49 @@ from trcli.readers.junit_xml import JunitParser
     metavar="",
     help="Strategy for combining incoming values with existing case field values, whether to append or replace (Note: only applies to references default: append).",
 )
+@click.option(
+    "--watch",
+    type=click.Path(file_okay=False),
+    metavar="",
+    help="Watch a directory and upload report files while the tests are still running. "
+    "In watch mode -f is the file name pattern within the directory (default: *.xml).",
+)
+@click.option(
+    "--watch-interval",
+    type=click.FloatRange(min=0.1),
+    default=settings.WATCH_POLL_INTERVAL,
+    metavar="",
+    help=f"Seconds between two polls of the watched directory (default: {settings.WATCH_POLL_INTERVAL}).",
+)
+@click.option(
+    "--watch-sentinel",
+    default=settings.WATCH_SENTINEL_FILE,
+    metavar="",
+    help=f"Name of the file that finishes watch mode when created in the watched directory "
+    f"(default: {settings.WATCH_SENTINEL_FILE}).",
+)
+@click.option(
+    "--shard-key",
+    metavar="",
+    help="Key of the run shared by parallel shards (e.g. the CI pipeline ID), requires --shard-index and --shard-count.",
+)
+@click.option("--shard-index", type=click.IntRange(min=1), metavar="", help="Index of this shard, 1 creates the run.")
+@click.option("--shard-count", type=click.IntRange(min=1), metavar="", help="Number of shards uploading to the run.")
+@click.option(
+    "--shard-timeout",
+    type=click.FloatRange(min=1),
+    default=settings.SHARD_WAIT_TIMEOUT,
+    metavar="",
+    help=f"Seconds to wait for the other shards (default: {settings.SHARD_WAIT_TIMEOUT}).",
+)
 @click.pass_context
 @pass_environment
 def cli(environment: Environment, context: click.Context, *args, **kwargs):
     """Parse JUnit report and upload results to TestRail"""
     environment.cmd = "parse_junit"
     environment.set_parameters(context)
+    if environment.watch and not environment.file:
+        environment.file = "*.xml"
     environment.check_for_required_parameters()
 
     if environment.test_run_ref is not None:
@@ -73,28 +117,43 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
             environment.elog(FAULT_MAPPING["multisuite_run_id_not_supported"])
             exit(1)
 
+        if environment.watch:
+            environment.elog(FAULT_MAPPING["watch_multisuite_not_supported"])
+            exit(1)
+
+    _check_shard_options(environment)
+
     settings.ALLOW_ELAPSED_MS = environment.allow_ms
     print_config(environment)
     try:
-        junit_parser = JunitParser(environment)
-        parsed_suites = junit_parser.parse_file()
-
-        # Check if any invalid quality ratings were found during parsing
-        if junit_parser.invalid_quality_ratings_found:
-            environment.elog(
-                "\nERROR: One or more test results have invalid quality_rating values that were rejected.\n"
-                "Cannot proceed with upload as quality_rating is required for tests that specify it.\n\n"
-                "Please fix the invalid quality ratings in your test report and try again.\n\n"
-                "Quality rating requirements:\n"
-                "  - Maximum 15 categories\n"
-                "  - Star values must be integers 0-5\n"
-                "  - At least one category must have a value >= 1\n"
-                "  - Must be valid JSON object format"
+        if environment.watch:
+            watch_uploader = WatchUploader(
+                environment,
+                environment.watch,
+                parse_file=lambda path: _parse_report(environment, path),
+                parse_errors=(JUnitXmlError, ParseError),
+                pattern=environment.file,
+                interval=environment.watch_interval,
+                sentinel=environment.watch_sentinel,
             )
-            exit(1)
-
-        run_id = None
-        case_update_results = {}
+            run_id = watch_uploader.watch()
+            parsed_suites = []
+            case_update_results = watch_uploader.case_update_results
+        elif environment.file == STDIN and environment.special_parser == "junit":
+            # Chunks are uploaded while the report is still being read from stdin
+            junit_parser = JunitParser(environment)
+            stdin_uploader = IncrementalUploader(environment)
+            with stdin_uploader:
+                for suites in read_ahead(junit_parser.iter_chunks()):
+                    _check_quality_ratings(environment, junit_parser)
+                    stdin_uploader.upload(suites)
+            run_id = stdin_uploader.finish()
+            parsed_suites = []
+            case_update_results = stdin_uploader.case_update_results
+        else:
+            parsed_suites = _parse_report(environment)
+            run_id = None
+            case_update_results = {}
 
         # Multisuite mode: use MultisuiteUploader for cross-suite plans
         if environment.special_parser == "multisuite":
@@ -145,6 +204,61 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
         exit(1)
 
 
+def _parse_report(environment: Environment, path: Path = None) -> List[TestRailSuite]:
+    """
+    Parse the report file given with -f (or the report file at path in watch mode).
+    Exits if the report contains invalid quality ratings.
+    """
+    if path is not None:
+        environment.file = str(path)
+    junit_parser = JunitParser(environment)
+    with get_metrics().stage("parse"):
+        parsed_suites = junit_parser.parse_file()
+    _check_quality_ratings(environment, junit_parser)
+    return parsed_suites
+
+
+def _check_shard_options(environment: Environment):
+    """Exits with result code 1 if the shard options are incomplete or combined with unsupported modes"""
+    shard_options = [environment.shard_key, environment.shard_index, environment.shard_count]
+    if not any(shard_options):
+        return
+    if not all(shard_options):
+        environment.elog(FAULT_MAPPING["shard_options_incomplete"])
+        exit(1)
+    if environment.shard_index > environment.shard_count:
+        environment.elog(FAULT_MAPPING["shard_index_out_of_range"].format(shard_count=environment.shard_count))
+        exit(1)
+    unsupported_options = {
+        "--watch": environment.watch,
+        "-f -": environment.file == STDIN,
+        "--plan-id": environment.plan_id,
+        "--special-parser multisuite": environment.special_parser == "multisuite",
+    }
+    for option, used in unsupported_options.items():
+        if used:
+            environment.elog(FAULT_MAPPING["shard_mode_not_supported"].format(option=option))
+            exit(1)
+
+
+def _check_quality_ratings(environment: Environment, junit_parser: JunitParser):
+    """
+    Exit if any invalid quality ratings were found during parsing.
+    """
+    if junit_parser.invalid_quality_ratings_found:
+        environment.elog(
+            "\nERROR: One or more test results have invalid quality_rating values that were rejected.\n"
+            "Cannot proceed with upload as quality_rating is required for tests that specify it.\n\n"
+            "Please fix the invalid quality ratings in your test report and try again.\n\n"
+            "Quality rating requirements:\n"
+            "  - Maximum 15 categories\n"
+            "  - Star values must be integers 0-5\n"
+            "  - At least one category must have a value >= 1\n"
+            "  - Must be valid JSON object format"
+        )
+        exit(1)
+
+
 def _validate_test_run_ref(test_run_ref: str) -> str:
     """
     Validate the test-run-ref input.
@@ -8,6 +8,7 @@ from trcli.cli import pass_environment, Environment, CONTEXT_SETTINGS
 from trcli.commands.results_parser_helpers import results_parser_options, print_config
 from trcli.constants import FAULT_MAPPING
 from trcli.data_classes.validation_exception import ValidationException
+from trcli.logging.metrics import get_metrics
 from trcli.readers.robot_xml import RobotParser
 
 
@@ -24,7 +25,8 @@ def cli(environment: Environment, context: click.Context, *args, **kwargs):
     print_config(environment)
     try:
         robot_parser = RobotParser(environment)
-        parsed_suites = robot_parser.parse_file()
+        with get_metrics().stage("parse"):
+            parsed_suites = robot_parser.parse_file()
 
         # Check if any invalid quality ratings were found during parsing
         if robot_parser.invalid_quality_ratings_found:
@@ -3,6 +3,7 @@ import click
 import json
 
 from trcli.api.api_client import APIClient
+from trcli.api.project_based_client import api_client_kwargs
 from trcli.api.result_handler import ResultHandler
 from trcli.cli import pass_environment, CONTEXT_SETTINGS, Environment
 
@@ -71,13 +72,7 @@ def list(
         raise SystemExit(1)
 
     # Create API client
-    api_client = APIClient(
-        host_name=environment.host,
-        verbose_logging_function=environment.vlog,
-        logging_function=environment.log,
-        verify=environment.verify,
-        timeout=environment.timeout,
-    )
+    api_client = APIClient(environment.host, **api_client_kwargs(environment))
 
     # Set credentials
     api_client.username = environment.username
@@ -277,13 +272,7 @@ def update(
             raise SystemExit(1)
 
     # Create API client
-    api_client = APIClient(
-        host_name=environment.host,
-        verbose_logging_function=environment.vlog,
-        logging_function=environment.log,
-        verify=environment.verify,
-        timeout=environment.timeout,
-    )
+    api_client = APIClient(environment.host, **api_client_kwargs(environment))
 
     # Set credentials
     api_client.username = environment.username
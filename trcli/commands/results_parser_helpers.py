@@ -35,7 +35,9 @@ def resolve_comma_separated_list(ctx, param, value):
 
 
 def results_parser_options(f):
-    @click.option("-f", "--file", type=click.Path(), metavar="", help="Filename and path.")
+    @click.option(
+        "-f", "--file", type=click.Path(), metavar="", help="Filename and path, - reads the report from stdin."
+    )
     @click.option("--close-run", is_flag=True, help="Close the newly created run")
     @click.option("--title", metavar="", help="Title of Test Run to be created or updated in TestRail.")
     @click.option(
@@ -104,6 +106,19 @@ def results_parser_options(f):
         "Usage: --result-fields custom_field_a:value1 --result-fields custom_field_b:3",
     )
     @click.option("--allow-ms", is_flag=True, help="Allows using milliseconds for elapsed times.")
+    @click.option(
+        "--aggregate-results",
+        metavar="",
+        type=click.Choice(["last", "worst", "merge"], case_sensitive=False),
+        help="Upload a single result for cases executed more than once (e.g. retried flaky tests): "
+        "last - last execution, worst - most severe status, "
+        "merge - status of the last execution with all attempts in the comment and summed elapsed time.",
+    )
+    @click.option(
+        "--skip-unchanged-results",
+        is_flag=True,
+        help="Only upload results that differ from the latest result of their case in the run (e.g. with --run-id).",
+    )
     @functools.wraps(f)
     def wrapper_common_options(*args, **kwargs):
         return f(*args, **kwargs)
@@ -114,7 +129,9 @@ def results_parser_options(f):
 def bdd_parser_options(f):
     """Options decorator for BDD/Cucumber parsers that don't need case-matcher or section-id"""
 
-    @click.option("-f", "--file", type=click.Path(), metavar="", help="Filename and path.")
+    @click.option(
+        "-f", "--file", type=click.Path(), metavar="", help="Filename and path, - reads the report from stdin."
+    )
     @click.option("--close-run", is_flag=True, help="Close the newly created run")
     @click.option("--title", metavar="", help="Title of Test Run to be created or updated in TestRail.")
     @click.option(
@@ -157,6 +174,19 @@ def bdd_parser_options(f):
         "Usage: --result-fields custom_field_a:value1 --result-fields custom_field_b:3",
     )
     @click.option("--allow-ms", is_flag=True, help="Allows using milliseconds for elapsed times.")
+    @click.option(
+        "--aggregate-results",
+        metavar="",
+        type=click.Choice(["last", "worst", "merge"], case_sensitive=False),
+        help="Upload a single result for cases executed more than once (e.g. retried flaky tests): "
+        "last - last execution, worst - most severe status, "
+        "merge - status of the last execution with all attempts in the comment and summed elapsed time.",
+    )
+    @click.option(
+        "--skip-unchanged-results",
+        is_flag=True,
+        help="Only upload results that differ from the latest result of their case in the run (e.g. with --run-id).",
+    )
     @functools.wraps(f)
     def wrapper_bdd_options(*args, **kwargs):
         return f(*args, **kwargs)
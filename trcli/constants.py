@@ -26,6 +26,8 @@ FAULT_MAPPING = dict(
     connection_error="Upload to TestRail failed due to a network error. Please make sure you have a "
     "valid network connection then try again.",
     host_issues="Please provide a valid TestRail server address.",
+    host_unavailable="Request not sent, your TestRail Instance did not respond to {failures} consecutive requests. "
+    "The next request is sent in {retry_in:.0f}s to check if it is available again.",
     yaml_file_parse_issue="Error occurred while parsing yaml file ({file_path}). "
     "Make sure that structure of a file is correct.\nWe expect only `key: value`, `---` and `...`. Please check README file for more details.",
     file_open_issue="Error occurred while opening the file ({file_path}). "
@@ -77,6 +79,20 @@ FAULT_MAPPING = dict(
     multisuite_cross_project_cases="WARNING: Skipped {count} test case(s) belonging to different project(s). Case IDs: {case_ids}",
     multisuite_plan_creation_failed="ERROR: Failed to create test plan: {error_message}",
     multisuite_fetch_case_failed="ERROR: Failed to fetch case information for case ID {case_id}: {error_message}",
+    watch_directory_not_found="Directory not found: {directory}. Please provide an existing directory with --watch.",
+    watch_multisuite_not_supported="ERROR: --watch cannot be used with --special-parser multisuite.",
+    watch_invalid_file="Skipping {file_path}: the file could not be parsed.",
+    live_run_not_opened="Unable to open the test run, see the errors above.",
+    live_run_not_open="Results can only be added to an open run, call open() first.",
+    live_run_missing_case_id="Result has no case ID, only results of existing cases can be added to a live run.",
+    live_run_cases_not_added="Unable to add the cases of {count} result(s) to the run, retrying with the next batch: "
+    "{error_message}",
+    live_run_results_not_added="{count} result(s) were not added, their cases could not be added to the run: "
+    "{error_message}",
+    shard_options_incomplete="--shard-key, --shard-index and --shard-count have to be used together.",
+    shard_index_out_of_range="--shard-index has to be between 1 and --shard-count ({shard_count}).",
+    shard_mode_not_supported="Shard coordination cannot be combined with {option}.",
+    shard_timeout="Timed out after {timeout:.0f}s waiting for {waiting_for} (shard key {shard_key}).",
 )
 
 COMMAND_FAULT_MAPPING = dict(
@@ -100,6 +116,8 @@ COMMAND_FAULT_MAPPING = dict(
     statuses=dict(**FAULT_MAPPING),
     casefields=dict(**FAULT_MAPPING),
     resultfields=dict(**FAULT_MAPPING),
+    attachments=dict(**FAULT_MAPPING),
+    mirror=dict(**FAULT_MAPPING),
 )
 
 PROMPT_MESSAGES = dict(
@@ -1,3 +1,5 @@
+import json
+
 from beartype.typing import List, Dict, Optional
 
 from serde.json import to_dict
@@ -5,6 +7,13 @@ from datetime import datetime, timezone
 
 from trcli.constants import OLD_SYSTEM_NAME_AUTOMATION_ID, UPDATED_SYSTEM_NAME_AUTOMATION_ID
 from trcli.data_classes.dataclass_testrail import TestRailSuite
+from trcli.data_providers.result_aggregator import aggregate_results
+from trcli.data_providers.result_delta import remove_unchanged_results
+
+
+def json_size(item) -> int:
+    """Size in bytes of item when sent as element of a JSON request body (including the separator)"""
+    return len(json.dumps(item)) + 2
 
 
 class ApiDataProvider:
@@ -19,11 +28,13 @@ class ApiDataProvider:
         run_description: str = None,
         result_fields: dict = None,
         parent_section_id: int = None,
+        result_aggregation: str = None,
     ):
         self.suites_input = suites_input
         self.case_fields = case_fields
         self.run_description = run_description
         self.result_fields = result_fields
+        self.result_aggregation = result_aggregation
         self.update_data([{"suite_id": self.suites_input.suite_id}])
         self.__update_parent_section(parent_section_id)
 
@@ -131,71 +142,80 @@ class ApiDataProvider:
             body["milestone_id"] = milestone_id
         return body
 
-    def add_results_for_cases(self, bulk_size, user_ids=None):
+    def add_results_for_cases(self, bulk_size, user_ids=None, max_bytes=None, latest_results=None, case_ids=None):
         """Return bodies for adding results for cases. Returns bodies for results that already have case ID.
+        When case_ids is provided, only results of these cases are returned.
 
         Splits results into separate batches:
         1. Results WITHOUT quality_rating (for Text template cases)
         2. Results WITH quality_rating (for AI Evaluation template cases)
 
         This is necessary because TestRail validates each batch and rejects mixed batches.
+        When max_bytes is provided, a batch is also closed before its JSON body would exceed max_bytes.
+        """
+        result_batches = []
+        for bodies in self.results_for_cases(user_ids, latest_results, case_ids):
+            result_bulks = ApiDataProvider.divide_list_into_bulks(bodies, bulk_size=bulk_size, max_bytes=max_bytes)
+            result_batches.extend([{"results": result_bulk} for result_bulk in result_bulks])
+
+        return result_batches
+
+    def results_for_cases(self, user_ids=None, latest_results=None, case_ids=None) -> List[List[Dict]]:
+        """Return result bodies for cases that already have case ID, grouped by template type.
+        Repeated executions of the same case are aggregated according to result_aggregation.
+        When latest_results (latest result by case ID) is provided, results matching the latest result
+        of their case are skipped. When case_ids is provided, only results of these cases are returned.
+
+        The first group contains results WITHOUT quality_rating (Text template cases),
+        the second one results WITH quality_rating (AI Evaluation template cases).
+        Empty groups are omitted. Results from different groups must not be sent in the same batch.
         """
         testcases = [sections.testcases for sections in self.suites_input.testsections]
 
+        results = []
+        for sublist in testcases:
+            for case in sublist:
+                if case.case_id is not None and (case_ids is None or case.case_id in case_ids):
+                    case.result.add_global_result_fields(self.result_fields)
+                    results.append(case.result.to_dict())
+        # Repeated executions of the same case are collapsed before failures are counted and assigned
+        aggregated_results = aggregate_results(results, self.result_aggregation)
+        self._aggregated_count = len(results) - len(aggregated_results)
+        self._unchanged_count = 0
+        if latest_results is not None:
+            changed_results = remove_unchanged_results(aggregated_results, latest_results)
+            self._unchanged_count = len(aggregated_results) - len(changed_results)
+            aggregated_results = changed_results
+
         bodies_without_quality_rating = []
         bodies_with_quality_rating = []
         user_index = 0
         assigned_count = 0
         total_failed_count = 0
 
-        for sublist in testcases:
-            for case in sublist:
-                if case.case_id is not None:
-                    case.result.add_global_result_fields(self.result_fields)
+        for result_dict in aggregated_results:
+            # Count failed tests
+            if result_dict.get("status_id") == 5:  # status_id 5 = Failed
+                total_failed_count += 1
 
-                    # Count failed tests
-                    if case.result.status_id == 5:  # status_id 5 = Failed
-                        total_failed_count += 1
+                # Assign failed tests to users in round-robin fashion if user_ids provided
+                if user_ids:
+                    result_dict["assignedto_id"] = user_ids[user_index % len(user_ids)]
+                    user_index += 1
+                    assigned_count += 1
 
-                        # Assign failed tests to users in round-robin fashion if user_ids provided
-                        if user_ids:
-                            case.result.assignedto_id = user_ids[user_index % len(user_ids)]
-                            user_index += 1
-                            assigned_count += 1
-
-                    result_dict = case.result.to_dict()
-
-                    # Split results based on presence of quality_rating
-                    # This prevents TestRail validation errors when mixing template types
-                    if "quality_rating" in result_dict and result_dict["quality_rating"] is not None:
-                        bodies_with_quality_rating.append(result_dict)
-                    else:
-                        bodies_without_quality_rating.append(result_dict)
+            # Split results based on presence of quality_rating
+            # This prevents TestRail validation errors when mixing template types
+            if "quality_rating" in result_dict and result_dict["quality_rating"] is not None:
+                bodies_with_quality_rating.append(result_dict)
+            else:
+                bodies_without_quality_rating.append(result_dict)
 
         # Store counts for logging (we'll access this from the api_request_handler)
         self._assigned_count = assigned_count if user_ids else 0
         self._total_failed_count = total_failed_count
 
-        # Create separate batches for results with and without quality_rating
-        result_batches = []
-
-        # Add batches for results WITHOUT quality_rating (Text template cases)
-        if bodies_without_quality_rating:
-            result_bulks_without = ApiDataProvider.divide_list_into_bulks(
-                bodies_without_quality_rating,
-                bulk_size=bulk_size,
-            )
-            result_batches.extend([{"results": result_bulk} for result_bulk in result_bulks_without])
-
-        # Add batches for results WITH quality_rating (AI Evaluation template cases)
-        if bodies_with_quality_rating:
-            result_bulks_with = ApiDataProvider.divide_list_into_bulks(
-                bodies_with_quality_rating,
-                bulk_size=bulk_size,
-            )
-            result_batches.extend([{"results": result_bulk} for result_bulk in result_bulks_with])
-
-        return result_batches
+        return [bodies for bodies in (bodies_without_quality_rating, bodies_with_quality_rating) if bodies]
 
     def update_data(
         self,
@@ -295,5 +315,21 @@ class ApiDataProvider:
                         case.section_id = case_updater["section_id"]
 
     @staticmethod
-    def divide_list_into_bulks(input_list: List, bulk_size: int) -> List:
-        return [input_list[i : i + bulk_size] for i in range(0, len(input_list), bulk_size)]
+    def divide_list_into_bulks(input_list: List, bulk_size: int, max_bytes: Optional[int] = None) -> List:
+        """Divide list into bulks of at most bulk_size items.
+        If max_bytes is provided, every bulk is also limited to max_bytes of JSON encoded items
+        (a single item bigger than max_bytes is still sent in its own bulk)."""
+        if not max_bytes:
+            return [input_list[i : i + bulk_size] for i in range(0, len(input_list), bulk_size)]
+        bulks = []
+        bulk, bulk_bytes = [], 0
+        for item in input_list:
+            item_bytes = json_size(item)
+            if bulk and (len(bulk) >= bulk_size or bulk_bytes + item_bytes > max_bytes):
+                bulks.append(bulk)
+                bulk, bulk_bytes = [], 0
+            bulk.append(item)
+            bulk_bytes += item_bytes
+        if bulk:
+            bulks.append(bulk)
+        return bulks
@@ -0,0 +1,125 @@
+"""
+Result Aggregator Module
+
+Collapses repeated executions of the same TestRail case (flaky test retries, parametrized
+reruns) into a single result before the results are sent with add_results_for_cases:
+- last:  the result of the last execution is uploaded
+- worst: the result with the most severe status is uploaded (the last one among equals)
+- merge: one result with the status of the last execution, a comment listing every attempt,
+         the summed elapsed time and the attachments and defects of all attempts
+
+Executions are matched by case ID, so aggregation runs after the cases were matched or created.
+"""
+
+from beartype.typing import Dict, List, Optional
+
+from trcli.data_classes.dataclass_testrail import TestRailResult
+
+AGGREGATION_LAST = "last"
+AGGREGATION_WORST = "worst"
+AGGREGATION_MERGE = "merge"
+AGGREGATION_MODES = (AGGREGATION_LAST, AGGREGATION_WORST, AGGREGATION_MERGE)
+
+STATUS_NAMES = {1: "passed", 2: "blocked", 3: "untested", 4: "retest", 5: "failed"}
+# Higher is worse; custom statuses rank between untested and retest
+STATUS_SEVERITY = {3: 0, 1: 1, 4: 3, 2: 4, 5: 5}
+CUSTOM_STATUS_SEVERITY = 2
+
+
+def status_name(status_id: Optional[int]) -> str:
+    return STATUS_NAMES.get(status_id, f"status {status_id}")
+
+
+def parse_elapsed(elapsed: Optional[str]) -> Optional[float]:
+    """
+    Parse an elapsed time formatted by TestRailResult (e.g. "5s" or "0.25s").
+
+    Args:
+        elapsed: Elapsed time of a result body
+
+    Returns:
+        Seconds or None if the value is missing or has another format
+    """
+    if not elapsed or not elapsed.endswith("s"):
+        return None
+    try:
+        return float(elapsed[:-1])
+    except ValueError:
+        return None
+
+
+def aggregate_results(results: List[Dict], mode: Optional[str]) -> List[Dict]:
+    """
+    Aggregate result bodies of repeated executions of the same case.
+
+    Args:
+        results: Result bodies (TestRailResult.to_dict()) in execution order
+        mode: One of AGGREGATION_MODES, any other value leaves the results unchanged
+
+    Returns:
+        Result bodies with a single result per case ID, in the order of the first execution of each case
+    """
+    if mode not in AGGREGATION_MODES:
+        return results
+    executions: Dict[int, List[Dict]] = {}
+    for result in results:
+        executions.setdefault(result["case_id"], []).append(result)
+    if len(executions) == len(results):
+        return results
+
+    aggregated = []
+    for attempts in executions.values():
+        if len(attempts) == 1:
+            aggregated.append(attempts[0])
+        elif mode == AGGREGATION_LAST:
+            aggregated.append(attempts[-1])
+        elif mode == AGGREGATION_WORST:
+            aggregated.append(_worst(attempts))
+        else:
+            aggregated.append(_merge(attempts))
+    return aggregated
+
+
+def _severity(result: Dict) -> int:
+    return STATUS_SEVERITY.get(result.get("status_id"), CUSTOM_STATUS_SEVERITY)
+
+
+def _worst(attempts: List[Dict]) -> Dict:
+    worst = attempts[0]
+    for attempt in attempts[1:]:
+        if _severity(attempt) >= _severity(worst):
+            worst = attempt
+    return worst
+
+
+def _merge(attempts: List[Dict]) -> Dict:
+    merged = dict(attempts[-1])
+
+    counts: Dict[str, int] = {}
+    for attempt in attempts:
+        name = status_name(attempt.get("status_id"))
+        counts[name] = counts.get(name, 0) + 1
+    summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+    sections = [f"Executed {len(attempts)} times: {summary}."]
+    for number, attempt in enumerate(attempts, start=1):
+        section = f"Attempt {number}/{len(attempts)} ({status_name(attempt.get('status_id'))})"
+        if attempt.get("comment"):
+            section += f":\n{attempt['comment']}"
+        sections.append(section)
+    merged["comment"] = "\n\n".join(sections)
+
+    elapsed = [parse_elapsed(attempt.get("elapsed")) for attempt in attempts]
+    if any(seconds is not None for seconds in elapsed):
+        total = TestRailResult.proper_format_for_elapsed(sum(seconds or 0 for seconds in elapsed))
+        if total is not None:
+            merged["elapsed"] = total
+
+    attachments = list(dict.fromkeys(path for attempt in attempts for path in attempt.get("attachments") or []))
+    if attachments:
+        merged["attachments"] = attachments
+    defects = dict.fromkeys(
+        defect.strip() for attempt in attempts for defect in (attempt.get("defects") or "").split(",") if defect.strip()
+    )
+    if defects:
+        merged["defects"] = ",".join(defects)
+    return merged
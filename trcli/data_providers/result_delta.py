@@ -0,0 +1,102 @@
+"""
+Result Delta Module
+
+Skips results that would not change a test of an existing run (--skip-unchanged-results). Partially rerun
+pipelines upload the same report to the same run again and again, most results being identical to the latest
+result already added to their test. A result is unchanged when every field of its body matches the latest result
+of the case in the run:
+- status, comment, elapsed time, defects, version and result fields (custom_*, quality rating) are compared
+- the case ID, the assignee and the attachments are not compared, attachments of an unchanged result were added
+  with the latest result already
+
+Values are normalized before comparing, as TestRail returns them in another format than they were sent
+(e.g. elapsed "65s" is returned as "1m 5s", dropdown values as integers).
+"""
+
+import re
+
+from beartype.typing import Any, Dict, List, Optional, Tuple
+
+IGNORED_FIELDS = ("case_id", "assignedto_id", "attachments")
+TIMESPAN_UNITS = {"w": 7 * 24 * 60 * 60, "d": 24 * 60 * 60, "h": 60 * 60, "m": 60, "s": 1}
+TIMESPAN_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([wdhms])")
+
+
+def parse_timespan(timespan: Any) -> Optional[float]:
+    """
+    Parse an elapsed time of a result body or a TestRail timespan (e.g. "65s", "1m 5s" or "0.25s").
+
+    Args:
+        timespan: Elapsed time as sent to or returned by TestRail
+
+    Returns:
+        Seconds rounded to milliseconds or None if the value is missing or has another format
+    """
+    if timespan is None:
+        return None
+    text = str(timespan).strip().lower()
+    parts = TIMESPAN_PATTERN.findall(text)
+    if not parts or TIMESPAN_PATTERN.sub("", text).strip():
+        return None
+    return round(sum(float(value) * TIMESPAN_UNITS[unit] for value, unit in parts), 3)
+
+
+def latest_results_by_case(tests: List[Dict], results: List[Dict]) -> Dict[int, Dict]:
+    """
+    Latest result of each case of a run.
+
+    Args:
+        tests: Tests of the run (get_tests)
+        results: Results of the run (get_results_for_run), in any order
+
+    Returns:
+        Latest result (highest result ID) by case ID, cases without result are omitted
+    """
+    case_ids = {test["id"]: test["case_id"] for test in tests}
+    latest: Dict[int, Dict] = {}
+    for result in results:
+        case_id = case_ids.get(result.get("test_id"))
+        if case_id is not None and (case_id not in latest or result["id"] > latest[case_id]["id"]):
+            latest[case_id] = result
+    return latest
+
+
+def remove_unchanged_results(results: List[Dict], latest_results: Dict[int, Dict]) -> List[Dict]:
+    """
+    Remove the result bodies matching the latest result of their case.
+
+    Args:
+        results: Result bodies (TestRailResult.to_dict())
+        latest_results: Latest result by case ID, from latest_results_by_case
+
+    Returns:
+        Result bodies that changed or have no previous result, in their original order
+    """
+    return [result for result in results if not is_unchanged(result, latest_results.get(result["case_id"]))]
+
+
+def is_unchanged(result: Dict, latest_result: Optional[Dict]) -> bool:
+    """True if every compared field of the result body matches the latest result of the case"""
+    if latest_result is None:
+        return False
+    return all(
+        _normalize(field, value) == _normalize(field, latest_result.get(field))
+        for field, value in result.items()
+        if field not in IGNORED_FIELDS
+    )
+
+
+def _normalize(field: str, value: Any) -> Tuple:
+    if field == "elapsed":
+        return (parse_timespan(value),)
+    if field == "defects":
+        return tuple(sorted(defect.strip() for defect in str(value or "").split(",") if defect.strip()))
+    if value is None or value == "":
+        return ()
+    if isinstance(value, bool):
+        return ("1" if value else "0",)
+    if isinstance(value, (list, tuple)):
+        return tuple(sorted(str(item) for item in value))
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(key, item)) for key, item in value.items()))
+    return (str(value).replace("\r\n", "\n").strip(),)
@@ -10,6 +10,7 @@ Provides:
 - Flexible configuration (file, env vars, CLI flags)
 - Credential sanitization
 - Correlation ID support
+- API performance metrics (NDJSON summary and Prometheus textfile)
 - Zero external dependencies
 
 Usage:
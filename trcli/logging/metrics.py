@@ -0,0 +1,461 @@
+"""
+Performance Metrics - Per-endpoint API telemetry for TRCLI
+
+Collects request counts, latency percentiles, retries, rate limit waits,
+coalesced and hedged GET requests, transferred bytes, bytes saved by request
+compression, throughput of streamed attachment uploads and per-stage wall
+time for a single CLI invocation.
+The collected data can be emitted as an NDJSON summary through the
+structured logger or written as a Prometheus textfile (node_exporter
+textfile collector format).
+
+Usage:
+    from trcli.logging.metrics import get_metrics
+
+    metrics = get_metrics()
+    with metrics.stage("results"):
+        ...
+    metrics.record_request("POST", "add_results_for_cases/12", 200, 0.35, 2048, 512)
+
+    metrics.emit(get_logger("trcli.metrics"))
+    metrics.write_prometheus("/var/lib/node_exporter/trcli.prom")
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from trcli.logging.structured_logger import StructuredLogger
+from trcli.logging.tracing import get_tracer
+
+PERCENTILES = (50, 95, 99)
+
+
+def endpoint_name(uri: str) -> str:
+    """
+    Reduce a request URI to its API endpoint name.
+
+    Identifiers and query parameters are stripped so that requests to the same
+    endpoint are aggregated together.
+
+    Args:
+        uri: Request URI (e.g. "get_cases/1&suite_id=2&offset=250")
+
+    Returns:
+        Endpoint name (e.g. "get_cases")
+
+    Example:
+        endpoint_name("/api/v2/add_results_for_cases/12")  # "add_results_for_cases"
+    """
+    uri = uri.split("/api/v2/", 1)[-1].lstrip("/")
+    return re.split(r"[/&?]", uri, maxsplit=1)[0] or "unknown"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Calculate a percentile using the nearest-rank method.
+
+    Args:
+        samples: Sorted list of samples
+        pct: Percentile to calculate (0-100)
+
+    Returns:
+        Percentile value or 0.0 for an empty sample list
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+def format_bytes(size: int) -> str:
+    """
+    Format a byte count for humans.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        Size with unit (e.g. "512 B", "1.5 KB", "12.3 MB")
+    """
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class _EndpointStats:
+    """Mutable counters for a single endpoint"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.coalesced_requests = 0
+        self.hedged_requests = 0
+        self.hedges_won = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.compressed_requests = 0
+        self.bytes_saved = 0
+        self.durations: List[float] = []
+        self.upload_throughputs: List[float] = []
+
+
+class MetricsCollector:
+    """
+    Thread-safe collector for API and pipeline performance metrics.
+
+    Example:
+        metrics = MetricsCollector()
+        metrics.record_request("GET", "get_cases/1", 200, 0.12, 0, 4096)
+        summary = metrics.summary()
+        # summary["endpoints"]["get_cases"]["latency_ms"]["p95"] -> 120.0
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._stages: Dict[str, float] = {}
+
+    def _endpoint(self, uri: str) -> _EndpointStats:
+        name = endpoint_name(uri)
+        if name not in self._endpoints:
+            self._endpoints[name] = _EndpointStats()
+        return self._endpoints[name]
+
+    def record_request(
+        self,
+        method: str,
+        uri: str,
+        status_code: int,
+        duration: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        """
+        Record a single HTTP request attempt.
+
+        Args:
+            method: HTTP method
+            uri: Request URI
+            status_code: Response status code (-1 if no response was received)
+            duration: Request duration in seconds (excluding retry sleeps)
+            bytes_sent: Size of the request body
+            bytes_received: Size of the response body
+        """
+        with self._lock:
+            stats = self._endpoint(uri)
+            stats.count += 1
+            if status_code == -1 or status_code >= 400:
+                stats.errors += 1
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            stats.durations.append(duration)
+
+    def record_retry(self, uri: str):
+        """Record a retried request attempt for the endpoint."""
+        with self._lock:
+            self._endpoint(uri).retries += 1
+
+    def record_rate_limit_wait(self, uri: str, seconds: float):
+        """Record time spent waiting after a 429 (Too Many Requests) response."""
+        with self._lock:
+            stats = self._endpoint(uri)
+            stats.rate_limit_waits += 1
+            stats.rate_limit_wait_seconds += seconds
+
+    def record_coalesced(self, uri: str):
+        """Record a GET request answered by an identical request already in flight instead of being sent."""
+        with self._lock:
+            self._endpoint(uri).coalesced_requests += 1
+
+    def record_hedge(self, uri: str, won: bool):
+        """
+        Record a duplicate GET request sent because the first request was slower than usual.
+
+        Args:
+            uri: Request URI
+            won: True if the duplicate request answered first
+        """
+        with self._lock:
+            stats = self._endpoint(uri)
+            stats.hedged_requests += 1
+            stats.hedges_won += int(won)
+
+    def latency_percentile(self, uri: str, pct: float, min_samples: int = 1, window: int = None) -> Optional[float]:
+        """
+        Latency percentile of the requests recorded for the endpoint of a URI.
+
+        Args:
+            uri: Request URI
+            pct: Percentile to calculate (0-100)
+            min_samples: Minimum number of recorded requests
+            window: Only use the latest requests recorded for the endpoint
+
+        Returns:
+            Latency in seconds or None if fewer requests were recorded
+        """
+        name = endpoint_name(uri)
+        with self._lock:
+            durations = self._endpoints[name].durations if name in self._endpoints else []
+            samples = durations[-window:] if window else list(durations)
+        if len(samples) < min_samples:
+            return None
+        return percentile(sorted(samples), pct)
+
+    def record_compression(self, uri: str, original_bytes: int, compressed_bytes: int):
+        """
+        Record a request body sent compressed.
+
+        Args:
+            uri: Request URI
+            original_bytes: Size of the uncompressed body
+            compressed_bytes: Size of the body that was sent
+        """
+        with self._lock:
+            stats = self._endpoint(uri)
+            stats.compressed_requests += 1
+            stats.bytes_saved += original_bytes - compressed_bytes
+
+    def record_upload(self, uri: str, size: int, duration: float):
+        """
+        Record a file upload streamed from disk.
+
+        Args:
+            uri: Request URI
+            size: Size of the uploaded request body in bytes
+            duration: Upload duration in seconds (including the server response)
+        """
+        with self._lock:
+            self._endpoint(uri).upload_throughputs.append(size / duration if duration > 0 else 0.0)
+
+    @property
+    def bytes_saved(self) -> int:
+        """Total number of request body bytes saved by compression."""
+        with self._lock:
+            return sum(stats.bytes_saved for stats in self._endpoints.values())
+
+    def record_stage(self, name: str, seconds: float):
+        """Add wall time to a pipeline stage. Repeated stages are accumulated."""
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager measuring the wall time of a pipeline stage.
+
+        The stage is also recorded as a trace span when tracing is enabled.
+
+        Example:
+            with metrics.stage("parse"):
+                suites = parser.parse_file()
+        """
+        start = time.perf_counter()
+        try:
+            with get_tracer().span(name, category="stage"):
+                yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    @property
+    def has_data(self) -> bool:
+        """True if any request or stage was recorded."""
+        with self._lock:
+            return bool(self._endpoints or self._stages)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Build a JSON serializable summary of the collected metrics.
+
+        Returns:
+            Dictionary with totals, per-endpoint statistics and stage timings
+        """
+        with self._lock:
+            endpoints = {}
+            for name, stats in sorted(self._endpoints.items()):
+                durations = sorted(stats.durations)
+                latency = {f"p{pct}": round(percentile(durations, pct) * 1000, 2) for pct in PERCENTILES}
+                latency["max"] = round(durations[-1] * 1000, 2) if durations else 0.0
+                latency["mean"] = round(sum(durations) / len(durations) * 1000, 2) if durations else 0.0
+                throughputs = sorted(stats.upload_throughputs)
+                throughput = {
+                    "p50": round(percentile(throughputs, 50) / 1024**2, 2),
+                    "min": round(throughputs[0] / 1024**2, 2) if throughputs else 0.0,
+                    "max": round(throughputs[-1] / 1024**2, 2) if throughputs else 0.0,
+                }
+                endpoints[name] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "rate_limit_waits": stats.rate_limit_waits,
+                    "rate_limit_wait_s": round(stats.rate_limit_wait_seconds, 3),
+                    "coalesced_requests": stats.coalesced_requests,
+                    "hedged_requests": stats.hedged_requests,
+                    "hedges_won": stats.hedges_won,
+                    "bytes_sent": stats.bytes_sent,
+                    "bytes_received": stats.bytes_received,
+                    "compressed_requests": stats.compressed_requests,
+                    "bytes_saved": stats.bytes_saved,
+                    "latency_ms": latency,
+                    "streamed_uploads": len(throughputs),
+                    "upload_throughput_mb_s": throughput,
+                }
+            stages = {name: round(seconds, 3) for name, seconds in self._stages.items()}
+
+        return {
+            "total_requests": sum(e["count"] for e in endpoints.values()),
+            "total_errors": sum(e["errors"] for e in endpoints.values()),
+            "total_retries": sum(e["retries"] for e in endpoints.values()),
+            "rate_limit_wait_s": round(sum(e["rate_limit_wait_s"] for e in endpoints.values()), 3),
+            "total_coalesced": sum(e["coalesced_requests"] for e in endpoints.values()),
+            "total_hedged": sum(e["hedged_requests"] for e in endpoints.values()),
+            "bytes_sent": sum(e["bytes_sent"] for e in endpoints.values()),
+            "bytes_received": sum(e["bytes_received"] for e in endpoints.values()),
+            "bytes_saved": sum(e["bytes_saved"] for e in endpoints.values()),
+            "endpoints": endpoints,
+            "stages": stages,
+        }
+
+    def emit(self, logger: StructuredLogger):
+        """
+        Emit the metrics summary as a single NDJSON entry.
+
+        Args:
+            logger: Structured logger to write the summary to
+        """
+        logger.info("API performance summary", **self.summary())
+
+    def to_prometheus(self) -> str:
+        """
+        Render the collected metrics in Prometheus text exposition format.
+
+        Returns:
+            Metrics text suitable for the node_exporter textfile collector
+        """
+        summary = self.summary()
+        with self._lock:
+            durations = {name: sorted(stats.durations) for name, stats in self._endpoints.items()}
+            throughputs = {
+                name: sorted(stats.upload_throughputs)
+                for name, stats in self._endpoints.items()
+                if stats.upload_throughputs
+            }
+
+        lines = []
+
+        def add_metric(name: str, metric_type: str, help_text: str, samples: List[str]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+
+        endpoints = summary["endpoints"]
+        counters = [
+            ("trcli_api_requests_total", "count", "Number of API requests sent to TestRail."),
+            ("trcli_api_request_errors_total", "errors", "Number of failed API requests."),
+            ("trcli_api_retries_total", "retries", "Number of retried API requests."),
+            ("trcli_api_rate_limit_waits_total", "rate_limit_waits", "Number of 429 responses waited on."),
+            ("trcli_api_rate_limit_wait_seconds_total", "rate_limit_wait_s", "Time spent waiting on 429 responses."),
+            (
+                "trcli_api_coalesced_requests_total",
+                "coalesced_requests",
+                "Number of GET requests answered by an identical request in flight.",
+            ),
+            ("trcli_api_hedged_requests_total", "hedged_requests", "Number of duplicate GET requests sent."),
+            ("trcli_api_hedges_won_total", "hedges_won", "Number of duplicate GET requests answering first."),
+            ("trcli_api_bytes_sent_total", "bytes_sent", "Request body bytes sent."),
+            ("trcli_api_bytes_received_total", "bytes_received", "Response body bytes received."),
+            ("trcli_api_bytes_saved_total", "bytes_saved", "Request body bytes saved by gzip compression."),
+        ]
+        for metric, field, help_text in counters:
+            add_metric(
+                metric,
+                "counter",
+                help_text,
+                [f'{metric}{{endpoint="{name}"}} {stats[field]}' for name, stats in endpoints.items()],
+            )
+
+        metric = "trcli_api_request_duration_seconds"
+        samples = []
+        for name, values in sorted(durations.items()):
+            for pct in PERCENTILES:
+                samples.append(f'{metric}{{endpoint="{name}",quantile="{pct / 100}"}} {percentile(values, pct):.6f}')
+            samples.append(f'{metric}_sum{{endpoint="{name}"}} {sum(values):.6f}')
+            samples.append(f'{metric}_count{{endpoint="{name}"}} {len(values)}')
+        add_metric(metric, "summary", "API request latency.", samples)
+
+        metric = "trcli_api_upload_throughput_bytes_per_second"
+        samples = []
+        for name, values in sorted(throughputs.items()):
+            for pct in PERCENTILES:
+                samples.append(f'{metric}{{endpoint="{name}",quantile="{pct / 100}"}} {percentile(values, pct):.0f}')
+            samples.append(f'{metric}_count{{endpoint="{name}"}} {len(values)}')
+        add_metric(metric, "summary", "Throughput of attachment uploads streamed from disk.", samples)
+
+        metric = "trcli_stage_duration_seconds"
+        add_metric(
+            metric,
+            "gauge",
+            "Wall time spent in each upload stage.",
+            [f'{metric}{{stage="{name}"}} {seconds}' for name, seconds in summary["stages"].items()],
+        )
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path: str) -> Optional[str]:
+        """
+        Write metrics to a Prometheus textfile.
+
+        The file is written atomically so collectors never read a partial file.
+
+        Args:
+            file_path: Destination path (should end with .prom for node_exporter)
+
+        Returns:
+            Error message or None if the file was written
+        """
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(os.path.abspath(file_path))
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, file_path)
+        except (IOError, OSError) as e:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return f"Could not write metrics file {file_path}: {e}"
+        return None
+
+    def reset(self):
+        """
+        Clear all collected metrics.
+
+        Useful for testing.
+        """
+        with self._lock:
+            self._endpoints = {}
+            self._stages = {}
+
+
+_metrics = MetricsCollector()
+
+
+def get_metrics() -> MetricsCollector:
+    """
+    Get the process-wide metrics collector.
+
+    Returns:
+        MetricsCollector instance shared by all API clients and uploaders
+    """
+    return _metrics
@@ -0,0 +1,197 @@
+"""
+Pipeline Tracing - Span-level traces for TRCLI uploads
+
+Records one span per upload stage and one child span per HTTP request and
+writes them in Chrome Trace Event format. The output can be loaded in
+chrome://tracing or https://ui.perfetto.dev, and converted to OTLP since
+every span carries its own span_id and the parent_id of the enclosing stage.
+
+Tracing is disabled by default and has no overhead until enabled.
+
+Usage:
+    from trcli.logging.tracing import get_tracer
+
+    tracer = get_tracer()
+    tracer.enable()
+
+    with tracer.span("results", category="stage"):
+        ...
+
+    tracer.write("trace.json")
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+
+class Tracer:
+    """
+    Thread-safe collector of trace spans.
+
+    Stages are expected to run sequentially (they are opened from the main
+    thread), so HTTP requests sent from worker threads are attributed to the
+    innermost stage that is currently open.
+
+    Example:
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("sections", category="stage"):
+            start = tracer.now()
+            ...
+            tracer.add_span("POST add_section", "http", start, tracer.now() - start, status=200)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._stages: List[int] = []
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter()
+        self.enabled = False
+
+    def enable(self):
+        """Start recording spans."""
+        self.enabled = True
+
+    @staticmethod
+    def now() -> float:
+        """Current timestamp in seconds suitable for add_span (monotonic clock)."""
+        return time.perf_counter()
+
+    @property
+    def current_stage_id(self) -> Optional[int]:
+        """Span id of the innermost open stage or None."""
+        with self._lock:
+            return self._stages[-1] if self._stages else None
+
+    def add_span(self, name: str, category: str, start: float, duration: float, **args) -> Optional[int]:
+        """
+        Record a completed span.
+
+        Args:
+            name: Span name
+            category: Span category (e.g. "stage", "http")
+            start: Start timestamp from Tracer.now()
+            duration: Duration in seconds
+            **args: Additional span attributes
+
+        Returns:
+            Span id or None if tracing is disabled
+        """
+        if not self.enabled:
+            return None
+        thread = threading.current_thread()
+        with self._lock:
+            span_id = args.pop("span_id", None) or next(self._ids)
+            if "parent_id" not in args and self._stages and self._stages[-1] != span_id:
+                args["parent_id"] = self._stages[-1]
+            self._thread_names.setdefault(thread.ident, thread.name)
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1_000_000, 3),
+                    "dur": round(duration * 1_000_000, 3),
+                    "pid": os.getpid(),
+                    "tid": thread.ident,
+                    "args": {"span_id": span_id, "thread_id": thread.ident, **args},
+                }
+            )
+        return span_id
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args):
+        """
+        Context manager recording a span around a block of code.
+
+        Spans with category "stage" become the parent of spans recorded while they are open.
+
+        Example:
+            with tracer.span("run"):
+                run_id, error = self.create_or_update_test_run()
+        """
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            span_id = next(self._ids)
+            if self._stages:
+                args.setdefault("parent_id", self._stages[-1])
+            if category == "stage":
+                self._stages.append(span_id)
+        start = self.now()
+        try:
+            yield
+        finally:
+            if category == "stage":
+                with self._lock:
+                    self._stages.remove(span_id)
+            self.add_span(name, category, start, self.now() - start, span_id=span_id, **args)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Build the trace in Chrome Trace Event (JSON object) format.
+
+        Returns:
+            Dictionary with traceEvents and displayTimeUnit
+        """
+        with self._lock:
+            events = sorted(self._events, key=lambda event: event["ts"])
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._thread_names.items()
+            ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, file_path: str) -> Optional[str]:
+        """
+        Write recorded spans to a trace file.
+
+        Args:
+            file_path: Destination path
+
+        Returns:
+            Error message or None if the file was written
+        """
+        try:
+            directory = os.path.dirname(os.path.abspath(file_path))
+            os.makedirs(directory, exist_ok=True)
+            with open(file_path, "w") as f:
+                json.dump(self.to_chrome_trace(), f)
+        except (IOError, OSError) as e:
+            return f"Could not write trace file {file_path}: {e}"
+        return None
+
+    def reset(self):
+        """
+        Disable tracing and clear all recorded spans.
+
+        Useful for testing.
+        """
+        with self._lock:
+            self._events = []
+            self._thread_names = {}
+            self._stages = []
+            self._ids = itertools.count(1)
+            self._origin = time.perf_counter()
+        self.enabled = False
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        Tracer instance shared by all API clients and uploaders
+    """
+    return _tracer
@@ -0,0 +1,166 @@
+"""
+Pytest plugin adding the results of a pytest session to a TestRail run while the tests are running
+(pytest --testrail), no JUnit report is written or parsed. Tests are matched to existing cases by the
+testrail marker or a case ID in the test name (the patterns of the name matcher, e.g. test_login_C123):
+
+    @pytest.mark.testrail("C123", "C124")
+    def test_login():
+        ...
+
+The TestRail connection is read from the trcli config file (--testrail-config) and the TR_CLI_*
+environment variables, the results are uploaded with trcli.api.live_run.LiveRun. With pytest-xdist the
+workers pass the case IDs of their tests to the controller with the test reports, and the controller adds
+the results of all workers to one run.
+"""
+
+import pytest
+from beartype.typing import Dict, List
+
+from trcli.data_classes.data_parsers import MatchersParser
+from trcli.data_classes.dataclass_testrail import TestRailResult
+
+# pytest outcomes to TestRail statuses, like skipped tests in JUnit reports
+STATUS_PASSED = 1
+STATUS_SKIPPED = 4
+STATUS_FAILED = 5
+
+# User property of the test reports of pytest-xdist workers holding the case IDs of the test
+CASE_IDS_PROPERTY = "testrail_case_ids"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("testrail", "TestRail results upload (trcli)")
+    group.addoption("--testrail", action="store_true", help="Add the test results to a TestRail run while testing.")
+    group.addoption("--testrail-config", metavar="PATH", help="trcli config file with host, project and credentials.")
+    group.addoption("--testrail-title", metavar="TITLE", help="Title of the test run to create.")
+    group.addoption("--testrail-run-id", metavar="ID", type=int, help="ID of an existing run to add the results to.")
+    group.addoption("--testrail-close-run", action="store_true", help="Close the run after the session.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "testrail(*case_ids): IDs of the TestRail cases covered by the test.")
+    if not config.getoption("testrail"):
+        return
+    if hasattr(config, "workerinput"):
+        # pytest-xdist worker, the controller opens the run
+        config.pluginmanager.register(CaseIdsForwarder(), "trcli-testrail-case-ids")
+    else:
+        config.pluginmanager.register(LiveRunReporter(config), "trcli-testrail-reporter")
+
+
+def case_ids_of(item) -> List[int]:
+    """Case IDs of a test item, from its testrail marker or its name"""
+    marker = item.get_closest_marker("testrail")
+    if marker:
+        return [int(str(case_id).strip().lstrip("Cc")) for case_id in marker.args]
+    case_id, _ = MatchersParser.parse_name_with_id(item.name)
+    if case_id is None:
+        return []
+    return case_id if isinstance(case_id, list) else [case_id]
+
+
+class CaseIdsForwarder:
+    """Adds the case IDs of the tests to their reports on pytest-xdist workers"""
+
+    def pytest_collection_modifyitems(self, items):
+        for item in items:
+            item.user_properties.append((CASE_IDS_PROPERTY, case_ids_of(item)))
+
+
+class LiveRunReporter:
+    """Collects the case IDs of the tests and adds a result per case after each test"""
+
+    def __init__(self, config):
+        # Imported when enabled only, importing the command line prints the version banner
+        from trcli.api.live_run import LiveRun
+        from trcli.cli import Environment
+
+        options = {
+            "config": config.getoption("testrail_config"),
+            "title": config.getoption("testrail_title"),
+            "run_id": config.getoption("testrail_run_id"),
+            "close_run": config.getoption("testrail_close_run") or None,
+        }
+        environment = Environment.from_options(**{key: value for key, value in options.items() if value is not None})
+        # Log output would be mixed with the output of the tests, errors are still shown
+        environment.silent = not environment.verbose
+        missing = [option for option in ("host", "project") if not getattr(environment, option)]
+        if not environment.run_id and not environment.title:
+            missing.append("title")
+        if missing:
+            raise pytest.UsageError(f"--testrail: missing TestRail option(s): {', '.join(missing)}")
+        self.live_run = LiveRun(environment)
+        self.case_ids: Dict[str, List[int]] = {}
+        self.outcomes: Dict[str, List] = {}
+        self.tests_without_case_id = 0
+        self.error = None
+
+    def pytest_collection_modifyitems(self, items):
+        for item in items:
+            case_ids = case_ids_of(item)
+            if case_ids:
+                self.case_ids[item.nodeid] = case_ids
+            else:
+                self.tests_without_case_id += 1
+
+    def pytest_collection_finish(self, session):
+        if not self.case_ids:
+            return
+        self._open(case_id for case_ids in self.case_ids.values() for case_id in case_ids)
+
+    def pytest_runtest_logreport(self, report):
+        if report.nodeid not in self.case_ids:
+            # Tests of pytest-xdist workers are not collected by the controller, their reports hold their case IDs
+            case_ids = dict(report.user_properties).get(CASE_IDS_PROPERTY)
+            if case_ids is None:
+                return
+            if not case_ids:
+                if report.when == "teardown":
+                    self.tests_without_case_id += 1
+                return
+            self.case_ids[report.nodeid] = case_ids
+            if self.live_run.run_id is None and self.error is None:
+                self._open(())
+        if self.live_run.run_id is None:
+            return
+        self.outcomes.setdefault(report.nodeid, []).append(report)
+        if report.when != "teardown":
+            return
+        reports = self.outcomes.pop(report.nodeid)
+        failed = [phase for phase in reports if phase.failed]
+        if failed:
+            status_id, comment = STATUS_FAILED, "\n".join(phase.longreprtext for phase in failed)
+        elif any(phase.skipped for phase in reports):
+            status_id = STATUS_SKIPPED
+            comment = next(phase.longreprtext for phase in reports if phase.skipped)
+        else:
+            status_id, comment = STATUS_PASSED, None
+        elapsed = sum(phase.duration for phase in reports)
+        for case_id in self.case_ids[report.nodeid]:
+            self.live_run.add_result(
+                TestRailResult(case_id=case_id, status_id=status_id, comment=comment, elapsed=elapsed)
+            )
+
+    def pytest_sessionfinish(self):
+        try:
+            self.live_run.close()
+        except Exception as exception:
+            self.error = str(exception)
+
+    def _open(self, case_ids):
+        try:
+            self.live_run.open(case_ids)
+        except Exception as exception:
+            self.error = str(exception)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.section("TestRail")
+        if self.live_run.run_id is not None:
+            terminalreporter.write_line(
+                f"{self.live_run.results_added} result(s) added to run {self.live_run.run_id}: "
+                f"{self.live_run.environment.host.rstrip('/')}/index.php?/runs/view/{self.live_run.run_id}"
+            )
+        if self.tests_without_case_id:
+            terminalreporter.write_line(f"{self.tests_without_case_id} test(s) without case ID were not uploaded.")
+        if self.error:
+            terminalreporter.write_line(f"Upload failed: {self.error}", red=True)
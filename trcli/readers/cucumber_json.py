@@ -1,7 +1,8 @@
+import codecs
 import json
 import glob
 from pathlib import Path
-from beartype.typing import List, Dict, Any, Optional, Tuple, Union
+from beartype.typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 
 from trcli.cli import Environment
 from trcli.data_classes.data_parsers import MatchersParser, TestRailCaseFieldsOptimizer
@@ -13,16 +14,25 @@ from trcli.data_classes.dataclass_testrail import (
     TestRailSeparatedStep,
 )
 from trcli.readers.file_parser import FileParser
+from trcli.readers.json_stream import iter_json_array, NotJsonArrayError
+
+# Embedded attachments (base64 screenshots, logs) are not used and are skipped while reading
+SKIPPED_KEYS = ("embeddings",)
 
 
 class CucumberParser(FileParser):
     """Parser for Cucumber JSON results format"""
 
+    supports_stdin = True
+
     def __init__(self, environment: Environment):
         super().__init__(environment)
+        self._stdin_features = None  # Features read from stdin, which can only be read once
         self.case_matcher = environment.case_matcher
-        self._bdd_case_cache = None  # Cache for BDD cases (populated on first use)
+        self._bdd_case_cache = {}  # case_id -> (case_data, error_message), see _prefetch_bdd_cases()
         self._api_handler = None  # Will be set when BDD matching mode is needed
+        self.features_count = 0
+        self.scenarios_count = 0
 
     @staticmethod
     def check_file(filepath: Union[str, Path]) -> Path:
@@ -30,6 +40,8 @@ class CucumberParser(FileParser):
         Check and process file path, supporting glob patterns for multiple files.
 
         If glob pattern matches multiple files, they are merged into a single Cucumber JSON report.
+        Files are merged one feature at a time and embeddings (e.g. base64 screenshots) are not
+        copied to the merged report.
 
         Args:
             filepath: File path or glob pattern (e.g., "reports/*.json", "cucumber.json")
@@ -51,29 +63,76 @@ class CucumberParser(FileParser):
             return Path().cwd().joinpath(files[0])
 
         # Multiple files - merge them into single Cucumber JSON report
-        merged_features = []
+        merged_report_path = Path().cwd().joinpath("Merged-Cucumber-report.json")
 
-        for file in files:
-            with open(file, "r", encoding="utf-8") as f:
-                features = json.load(f)
+        with open(merged_report_path, "w", encoding="utf-8") as merged_report:
+            merged_report.write("[")
+            first_feature = True
+            for file in files:
+                try:
+                    features = iter_json_array(file, skip_keys=SKIPPED_KEYS)
+                    for feature in features:
+                        merged_report.write("\n" if first_feature else ",\n")
+                        merged_report.write(json.dumps(feature, indent=2, ensure_ascii=False))
+                        first_feature = False
+                except NotJsonArrayError as e:
+                    # Validate Cucumber JSON format (must be array of features)
+                    raise ValueError(f"Invalid Cucumber JSON format in {file}: {e}")
+            merged_report.write("\n]\n")
 
-                # Validate Cucumber JSON format (must be array of features)
-                if not isinstance(features, list):
-                    raise ValueError(
-                        f"Invalid Cucumber JSON format in {file}: "
-                        f"Expected array of features, got {type(features).__name__}"
-                    )
+        return merged_report_path
 
-                # Merge features from this file
-                merged_features.extend(features)
+    def iter_features(self) -> Iterator[Dict[str, Any]]:
+        """Yield features from the Cucumber JSON file one at a time, without embeddings
 
-        # Write merged report
-        merged_report_path = Path().cwd().joinpath("Merged-Cucumber-report.json")
+        Features are read incrementally, so memory usage does not depend on the report size.
 
-        with open(merged_report_path, "w", encoding="utf-8") as f:
-            json.dump(merged_features, f, indent=2, ensure_ascii=False)
+        Raises:
+            ValueError: If the file is not a valid Cucumber JSON report (array of features)
+        """
+        try:
+            yield from self._read_features()
+        except NotJsonArrayError:
+            raise ValueError("Cucumber JSON must be an array of features")
 
-        return merged_report_path
+    def _read_features(self) -> Iterator[Dict[str, Any]]:
+        """Yield features from the file, or from stdin on the first call and from memory afterwards"""
+        if not self.from_stdin:
+            yield from iter_json_array(self.filepath, skip_keys=SKIPPED_KEYS)
+        elif self._stdin_features is not None:
+            yield from self._stdin_features
+        else:
+            features = []
+            for feature in iter_json_array(codecs.getreader("utf-8")(self.source), skip_keys=SKIPPED_KEYS):
+                features.append(feature)
+                yield feature
+            self._stdin_features = features
+
+    def iter_sections(
+        self,
+        bdd_matching_mode: bool = False,
+        project_id: Optional[int] = None,
+        suite_id: Optional[int] = None,
+        auto_create: bool = False,
+    ) -> Iterator[TestRailSection]:
+        """Yield TestRail sections as features are read from the Cucumber JSON file
+
+        Arguments are the same as for parse_file(). Number of read features and scenarios
+        is available in features_count and scenarios_count. In BDD matching mode the file is
+        read twice: matched cases are validated in one bulk pass before sections are built.
+        """
+        if bdd_matching_mode and self._api_handler is not None:
+            self._prefetch_bdd_cases(project_id, suite_id)
+        self.features_count = 0
+        self.scenarios_count = 0
+        for feature in self.iter_features():
+            self.features_count += 1
+            self.scenarios_count += sum(
+                1
+                for element in feature.get("elements", [])
+                if element.get("type", "") in ("scenario", "scenario_outline")
+            )
+            yield from self._parse_feature(feature, bdd_matching_mode, project_id, suite_id, auto_create)
 
     def parse_file(
         self,
@@ -100,33 +159,14 @@ class CucumberParser(FileParser):
             if not project_id or not suite_id:
                 raise ValueError("project_id and suite_id are required for BDD matching mode")
 
-        # Read and parse the JSON file
-        with open(self.filepath, "r", encoding="utf-8") as f:
-            cucumber_data = json.load(f)
-
-        # Cucumber JSON is typically an array of features
-        if not isinstance(cucumber_data, list):
-            raise ValueError("Cucumber JSON must be an array of features")
-
-        # Parse features into TestRail structure
-        sections = []
-        for feature in cucumber_data:
-            feature_sections = self._parse_feature(feature, bdd_matching_mode, project_id, suite_id, auto_create)
-            sections.extend(feature_sections)
+        # Parse features into TestRail structure (one feature at a time)
+        sections = list(self.iter_sections(bdd_matching_mode, project_id, suite_id, auto_create))
 
         # Generate appropriate message based on mode
         if bdd_matching_mode:
             # In BDD matching mode: count scenarios from original data
-            scenario_count = sum(
-                sum(
-                    1
-                    for element in feature.get("elements", [])
-                    if element.get("type", "") in ("scenario", "scenario_outline")
-                )
-                for feature in cucumber_data
-            )
-            feature_word = "feature file" if len(cucumber_data) == 1 else "feature files"
-            self.env.log(f"Processed {scenario_count} scenarios in {len(cucumber_data)} {feature_word}.")
+            feature_word = "feature file" if self.features_count == 1 else "feature files"
+            self.env.log(f"Processed {self.scenarios_count} scenarios in {self.features_count} {feature_word}.")
         else:
             # Standard mode: count test cases and sections
             cases_count = sum(len(section.testcases) for section in sections)
@@ -396,19 +436,16 @@ class CucumberParser(FileParser):
         Returns:
             Feature file content as string
         """
-        with open(self.filepath, "r", encoding="utf-8") as f:
-            cucumber_data = json.load(f)
-
-        if not isinstance(cucumber_data, list) or not cucumber_data:
-            return ""
-
         # Generate feature files (one per feature in JSON)
         feature_files = []
 
-        for feature in cucumber_data:
-            feature_content = self._generate_feature_content(feature)
-            if feature_content:
-                feature_files.append(feature_content)
+        try:
+            for feature in self._read_features():
+                feature_content = self._generate_feature_content(feature)
+                if feature_content:
+                    feature_files.append(feature_content)
+        except NotJsonArrayError:
+            return ""
 
         return "\n\n".join(feature_files)
 
@@ -785,9 +822,34 @@ class CucumberParser(FileParser):
 
         return None
 
+    def _prefetch_bdd_cases(self, project_id: int, suite_id: int):
+        """Fetch all cases matched by features in one concurrent pass
+
+        Resolves case IDs of all features (@C<id> feature tags, then feature name lookup)
+        and fetches them with ApiRequestHandler.get_cases_by_ids(), so validating features
+        in _parse_feature_as_bdd_case() does not need a get_case request per feature.
+
+        Args:
+            project_id: TestRail project ID
+            suite_id: TestRail suite ID
+        """
+        case_ids = []
+        for feature in self.iter_features():
+            case_id = self._extract_case_id_from_tags(self._extract_tags(feature.get("tags", [])), [])
+            if case_id is None:
+                case_id, _, _ = self._api_handler.find_bdd_case_by_name(
+                    feature_name=feature.get("name", "Untitled Feature"), project_id=project_id, suite_id=suite_id
+                )
+            if case_id and case_id != -1:
+                case_ids.append(case_id)
+        if case_ids:
+            self._bdd_case_cache.update(self._api_handler.get_cases_by_ids(case_ids))
+
     def _validate_bdd_case_exists(self, case_id: int) -> Tuple[bool, Optional[str]]:
         """Validate that case exists and is a BDD template case
 
+        Uses the case fetched by _prefetch_bdd_cases() if available.
+
         Args:
             case_id: TestRail case ID to validate
 
@@ -800,16 +862,18 @@ class CucumberParser(FileParser):
             return False, "API handler not set"
 
         try:
-            # Fetch case details from TestRail API (use api_handler's client)
-            response = self._api_handler.client.send_get(f"get_case/{case_id}")
+            if case_id in self._bdd_case_cache:
+                case_data, error_message = self._bdd_case_cache[case_id]
+            else:
+                # Fetch case details from TestRail API (use api_handler's client)
+                response = self._api_handler.client.send_get(f"get_case/{case_id}")
+                case_data, error_message = response.response_text, response.error_message
 
             # Check if request failed or returned no data
-            if response.error_message or not response.response_text:
-                error_msg = response.error_message if response.error_message else "Case not found"
+            if error_message or not case_data:
+                error_msg = error_message if error_message else "Case not found"
                 return False, f"Case C{case_id} not found: {error_msg}"
 
-            case_data = response.response_text
-
             # Resolve BDD case field name dynamically
             bdd_field_name = self._api_handler.get_bdd_case_field_name()
 
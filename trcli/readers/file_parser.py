@@ -1,19 +1,62 @@
+import sys
+import threading
 from pathlib import Path
 from abc import abstractmethod
-from beartype.typing import Union, List
+from queue import Queue
+from beartype.typing import BinaryIO, Iterator, Union, List, TypeVar
 
 from trcli.cli import Environment
 from trcli.data_classes.dataclass_testrail import TestRailSuite
 
 
+STDIN = "-"
+
+T = TypeVar("T")
+_END = object()
+
+
+def read_ahead(items: Iterator[T]) -> Iterator[T]:
+    """
+    Iterate items on a background thread, so the source (e.g. a pipe from the test runner)
+    keeps being drained while the caller is busy with the previous item.
+    Errors raised by the iteration are raised to the caller.
+    """
+    queue = Queue()
+
+    def produce():
+        try:
+            for item in items:
+                queue.put((item, None))
+            queue.put((_END, None))
+        except BaseException as error:
+            queue.put((_END, error))
+
+    threading.Thread(target=produce, name="trcli-read-ahead", daemon=True).start()
+    while True:
+        item, error = queue.get()
+        if error is not None:
+            raise error
+        if item is _END:
+            return
+        yield item
+
+
 class FileParser:
     """
     Each new parser should inherit from this class, to make file reading modular.
+    Parsers supporting stdin (-f -) set supports_stdin and read the report from self.source.
     """
 
+    supports_stdin = False
+
     def __init__(self, environment: Environment):
-        self.filepath = self.check_file(environment.file)
-        self.filename = self.filepath.name
+        self.from_stdin = self.supports_stdin and str(environment.file) == STDIN
+        if self.from_stdin:
+            self.filepath = Path(STDIN)
+            self.filename = "stdin"
+        else:
+            self.filepath = self.check_file(environment.file)
+            self.filename = self.filepath.name
         self.env = environment
         self._case_result_statuses = {}
 
@@ -22,6 +65,18 @@ class FileParser:
         if custom_statuses:
             self._case_result_statuses.update(custom_statuses)
 
+    @property
+    def source(self) -> Union[Path, BinaryIO]:
+        """Report file path, or a binary stream of stdin when reading from stdin"""
+        if not self.from_stdin:
+            return self.filepath
+        try:
+            # Separate stream on the stdin descriptor: a read_ahead() thread still blocked on it
+            # does not hold the lock of sys.stdin when the interpreter shuts down
+            return open(sys.stdin.fileno(), "rb", closefd=False)
+        except (AttributeError, OSError, ValueError):
+            return sys.stdin.buffer
+
     @staticmethod
     def check_file(filepath: Union[str, Path]) -> Path:
         filepath = Path(filepath)
@@ -0,0 +1,237 @@
+"""
+Incremental JSON array reader
+
+Reads the items of a top-level JSON array one at a time, so files much larger
+than the available memory can be processed as long as every single item fits.
+Values of selected keys (e.g. base64 "embeddings" in Cucumber reports) are
+skipped while reading and never loaded into memory.
+
+Usage:
+    from trcli.readers.json_stream import iter_json_array
+
+    for feature in iter_json_array("cucumber.json", skip_keys=("embeddings",)):
+        ...
+"""
+
+import json
+import re
+from pathlib import Path
+
+from beartype.typing import Any, Iterator, Iterable, Optional, TextIO, Tuple, Union
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Items not decoded from this many chunks are read with the (slower) scanner
+FAST_PATH_MAX_CHUNKS = 8
+STRUCTURAL_CHARACTERS = re.compile(r'["{}\[\]]')
+SCALAR = re.compile(r"[^\s,\]}]*")
+WHITESPACE = " \t\n\r"
+
+
+class NotJsonArrayError(ValueError):
+    """Raised when the top-level JSON value is not an array"""
+
+
+class _ArrayReader:
+    """
+    Scans JSON text chunk by chunk.
+
+    Items that fit into a few chunks and contain none of the skipped keys are decoded
+    directly from the buffer. Other items are scanned: only strings and brackets are
+    tracked, everything else is copied verbatim to the captured item text, which is then
+    decoded with json.loads. Consumed text is dropped on every read unless it belongs to
+    the item being captured.
+    """
+
+    def __init__(self, file: TextIO, skip_keys: Iterable[str], chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._skip_keys = set(skip_keys)
+        self._skip_tokens = {json.dumps(key) for key in self._skip_keys}
+        self._buffer = ""
+        self._pos = 0
+        self._mark: Optional[int] = None
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        data = self._file.read(self._chunk_size)
+        if not data:
+            return False
+        keep = self._pos if self._mark is None else min(self._mark, self._pos)
+        self._buffer = self._buffer[keep:] + data
+        self._pos -= keep
+        if self._mark is not None:
+            self._mark -= keep
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character ("" at the end of file)"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def advance(self):
+        self._pos += 1
+
+    def _skip_string(self):
+        """Moves past the string starting at the current position"""
+        self._pos += 1
+        while True:
+            end = self._buffer.find('"', self._pos)
+            if end == -1:
+                # An odd number of trailing backslashes escapes the first character of the next chunk
+                end = len(self._buffer)
+                self._pos = end - self._count_backslashes(end) % 2
+                if not self._fill():
+                    raise ValueError("Unterminated string in JSON file")
+                continue
+            self._pos = end + 1
+            if self._count_backslashes(end) % 2 == 0:
+                return
+
+    def _count_backslashes(self, end: int) -> int:
+        """Number of consecutive backslashes preceding position end"""
+        start = end
+        while start > 0 and self._buffer[start - 1] == "\\":
+            start -= 1
+        return end - start
+
+    def _skip_scalar(self):
+        while True:
+            end = SCALAR.match(self._buffer, self._pos).end()
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return
+
+    def _skip_container(self, on_key=None):
+        """
+        Moves past the object or array starting at the current position.
+
+        :param on_key: called after the ":" of every member whose key is one of skip_keys
+        """
+        depth = 0
+        while True:
+            match = STRUCTURAL_CHARACTERS.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON file")
+                continue
+            character = match.group()
+            self._pos = match.start()
+            if character == '"':
+                start = self._pos
+                self._skip_string()
+                if on_key is not None and self._buffer[start : self._pos] in self._skip_tokens:
+                    if self.peek() == ":":
+                        self.advance()
+                        on_key()
+                continue
+            self._pos += 1
+            depth += 1 if character in "{[" else -1
+            if depth == 0:
+                return
+
+    def _skip_value(self):
+        character = self.peek()
+        if character == '"':
+            self._skip_string()
+        elif character in ("{", "["):
+            self._skip_container()
+        else:
+            self._skip_scalar()
+
+    def _decode_buffered_item(self) -> Tuple[bool, Any]:
+        """Decodes the item at the current position if it is buffered and has no skipped keys"""
+        while True:
+            skipped_key_buffered = any(self._buffer.find(token, self._pos) != -1 for token in self._skip_tokens)
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if skipped_key_buffered or len(self._buffer) - self._pos > self._chunk_size * FAST_PATH_MAX_CHUNKS:
+                    return False, None
+                if not self._fill():
+                    return False, None
+                continue
+            if skipped_key_buffered and any(
+                self._buffer.find(token, self._pos, end) != -1 for token in self._skip_tokens
+            ):
+                return False, None
+            self._pos = end
+            return True, item
+
+    def read_item(self) -> Any:
+        """Reads the value starting at the current position"""
+        parts = []
+        character = self.peek()
+        if character in ("{", "["):
+            decoded, item = self._decode_buffered_item()
+            if decoded:
+                return item
+        self._mark = self._pos
+
+        def skip_member_value():
+            self.peek()
+            parts.append(self._buffer[self._mark : self._pos])
+            parts.append("null")
+            self._mark = None
+            self._skip_value()
+            self._mark = self._pos
+
+        if character == '"':
+            self._skip_string()
+        elif character in ("{", "["):
+            self._skip_container(on_key=skip_member_value if self._skip_tokens else None)
+        else:
+            self._skip_scalar()
+        parts.append(self._buffer[self._mark : self._pos])
+        self._mark = None
+        return json.loads("".join(parts), object_hook=self._drop_skipped_keys)
+
+    def _drop_skipped_keys(self, obj: dict) -> dict:
+        for key in self._skip_keys:
+            obj.pop(key, None)
+        return obj
+
+
+def iter_json_array(
+    file_path: Union[str, Path, TextIO], skip_keys: Iterable[str] = (), chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Yields items of the top-level JSON array stored in a file.
+
+    :param file_path: path to UTF-8 encoded JSON file, or a text stream (e.g. stdin) which is not closed
+    :param skip_keys: object keys (at any depth) whose values are skipped without loading them
+    :param chunk_size: number of characters read at once
+    :raises NotJsonArrayError: if the top-level value is not an array
+    :raises ValueError: if the file is not valid JSON
+    """
+    if hasattr(file_path, "read"):
+        yield from _iter_array_items(_ArrayReader(file_path, skip_keys, chunk_size))
+        return
+    with open(file_path, "r", encoding="utf-8") as f:
+        yield from _iter_array_items(_ArrayReader(f, skip_keys, chunk_size))
+
+
+def _iter_array_items(reader: _ArrayReader) -> Iterator[Any]:
+    character = reader.peek()
+    if character != "[":
+        kind = {"{": "object", '"': "string", "": "empty file"}.get(character, "value")
+        raise NotJsonArrayError(f"Expected JSON array, got {kind}")
+    reader.advance()
+    if reader.peek() == "]":
+        reader.advance()
+    else:
+        while True:
+            yield reader.read_item()
+            character = reader.peek()
+            reader.advance()
+            if character == "]":
+                break
+            if character != ",":
+                raise ValueError(f"Invalid JSON array: expected ',' or ']', got {character!r}")
+    if reader.peek() != "":
+        raise ValueError("Invalid JSON: unexpected data after the top-level array")
@@ -1,6 +1,7 @@
 import glob
 from pathlib import Path
-from beartype.typing import Union, List
+from time import monotonic
+from beartype.typing import Iterator, Union, List, Optional
 from unittest import TestCase, TestSuite
 from xml.etree import ElementTree as etree
 
@@ -23,6 +24,7 @@ from trcli.data_classes.dataclass_testrail import (
     TestRailSeparatedStep,
 )
 from trcli.readers.file_parser import FileParser
+from trcli.settings import STDIN_CHUNK_CASES, STDIN_CHUNK_SECONDS
 
 STEP_STATUSES = {"passed": 1, "untested": 3, "skipped": 4, "failed": 5}
 
@@ -43,12 +45,16 @@ class Property(Element):
 
 class JunitParser(FileParser):
 
+    supports_stdin = True
+
     def __init__(self, environment: Environment):
         super().__init__(environment)
         self._case_matcher = environment.case_matcher
         self._special = environment.special_parser
         self._case_result_statuses = {"passed": 1, "skipped": 4, "error": 5, "failure": 5}
         self.invalid_quality_ratings_found = False  # Track if any quality ratings were invalid
+        self._bdd_api_handler = None  # Created on first use in BDD mode
+        self._bdd_case_cache = {}  # case_id -> (case_data, error_message), see _prefetch_bdd_cases()
         self._update_with_custom_statuses()
 
     @classmethod
@@ -381,35 +387,34 @@ class JunitParser(FileParser):
     def _parse_sections(self, suite) -> List[TestRailSection]:
         sections = []
         processed_props = []
+        testsuites = [section for section in suite if isinstance(section, JUnitTestSuite) and len(section)]
+        bdd_case_ids = self._prefetch_bdd_cases(testsuites) if self._is_bdd_mode() else []
 
-        for section in suite:
-            if isinstance(section, JUnitTestSuite):
-                if not len(section):
-                    continue
-                """
-                TODO: Handle nested suites if needed (add sub_sections to data class TestRailSection)
-                inner_suites = section.testsuites()
-                sub_sections = self._parse_sections(inner_suites)
-                then sub_sections=sub_sections
-                """
-                properties = self._extract_section_properties(section, processed_props)
-
-                # BDD MODE: Group all scenarios under one test case
-                if self._is_bdd_mode():
-                    test_case = self._parse_bdd_feature_as_single_case(section)
-                    test_cases = [test_case] if test_case else []
-                # STANDARD MODE: One test case per JUnit testcase
-                else:
-                    test_cases = self._parse_test_cases(section)
-
-                self.env.log(f"Processed {len(test_cases)} test cases in section {section.name}.")
-                sections.append(
-                    TestRailSection(
-                        section.name,
-                        testcases=test_cases,
-                        properties=properties,
-                    )
+        for index, section in enumerate(testsuites):
+            """
+            TODO: Handle nested suites if needed (add sub_sections to data class TestRailSection)
+            inner_suites = section.testsuites()
+            sub_sections = self._parse_sections(inner_suites)
+            then sub_sections=sub_sections
+            """
+            properties = self._extract_section_properties(section, processed_props)
+
+            # BDD MODE: Group all scenarios under one test case
+            if self._is_bdd_mode():
+                test_case = self._parse_bdd_feature_as_single_case(section, bdd_case_ids[index])
+                test_cases = [test_case] if test_case else []
+            # STANDARD MODE: One test case per JUnit testcase
+            else:
+                test_cases = self._parse_test_cases(section)
+
+            self.env.log(f"Processed {len(test_cases)} test cases in section {section.name}.")
+            sections.append(
+                TestRailSection(
+                    section.name,
+                    testcases=test_cases,
+                    properties=properties,
                 )
+            )
 
         return sections
 
@@ -537,6 +542,40 @@ class JunitParser(FileParser):
 
         return case_id, []
 
+    def _get_bdd_api_handler(self):
+        """Get the API handler used for BDD validation (created once per parser)"""
+        if self._bdd_api_handler is None:
+            # Import here to avoid circular dependency
+            from trcli.api.project_based_client import ProjectBasedClient
+            from trcli.data_classes.dataclass_testrail import TestRailSuite
+
+            temp_suite = TestRailSuite(name="temp", suite_id=1)
+            project_client = ProjectBasedClient(environment=self.env, suite=temp_suite)
+            self._bdd_api_handler = project_client.api_request_handler
+        return self._bdd_api_handler
+
+    def _prefetch_bdd_cases(self, testsuites: list) -> List[tuple]:
+        """Extract case IDs of all features and fetch the cases in one concurrent pass
+
+        Fetched cases are used by _validate_bdd_case_exists(), so parsing features does
+        not need a get_case request per feature.
+
+        Args:
+            testsuites: JUnit testsuites (features)
+
+        Returns:
+            Result of _extract_and_validate_bdd_case_id() for every testsuite
+        """
+        extracted = [self._extract_and_validate_bdd_case_id(testsuite) for testsuite in testsuites]
+        case_ids = [case_id for case_id, validation_errors in extracted if case_id and not validation_errors]
+        if case_ids:
+            try:
+                self._bdd_case_cache.update(self._get_bdd_api_handler().get_cases_by_ids(case_ids))
+            except Exception as e:
+                # Cases not fetched here are validated one by one
+                self.env.vlog(f"BDD: Unable to fetch cases in bulk: {e}")
+        return extracted
+
     def _validate_bdd_case_exists(self, case_id: int, feature_name: str) -> tuple:
         """Validate that case exists in TestRail AND is a BDD test case
 
@@ -552,26 +591,22 @@ class JunitParser(FileParser):
             Tuple of (is_valid: bool, error_message: str, case_data: dict)
         """
         try:
-            # Import here to avoid circular dependency
-            from trcli.api.api_request_handler import ApiRequestHandler
-            from trcli.api.project_based_client import ProjectBasedClient
-            from trcli.data_classes.dataclass_testrail import TestRailSuite
-
-            # Get API client
-            temp_suite = TestRailSuite(name="temp", suite_id=1)
-            project_client = ProjectBasedClient(environment=self.env, suite=temp_suite)
-            api_handler = project_client.api_request_handler
+            api_handler = self._get_bdd_api_handler()
 
-            # Step 1: Get case from TestRail
-            response = api_handler.client.send_get(f"get_case/{case_id}")
+            # Step 1: Get case from TestRail (unless fetched by _prefetch_bdd_cases())
+            if case_id in self._bdd_case_cache:
+                case_data, error_message = self._bdd_case_cache[case_id]
+            else:
+                response = api_handler.client.send_get(f"get_case/{case_id}")
+                case_data, error_message = response.response_text, response.error_message
 
-            if response.error_message:
+            if error_message:
                 return (
                     False,
                     (
                         f"BDD Validation Error: Case C{case_id} does not exist in TestRail.\n"
                         f"Feature: '{feature_name}'\n"
-                        f"API Error: {response.error_message}\n\n"
+                        f"API Error: {error_message}\n\n"
                         f"Action Required:\n"
                         f"  1. Verify case C{case_id} exists in TestRail\n"
                         f"  2. Ensure you have permission to access this case\n"
@@ -581,8 +616,6 @@ class JunitParser(FileParser):
                     {},
                 )
 
-            case_data = response.response_text
-
             # Step 2: Validate it's a BDD test case
             # Resolve BDD case field name dynamically
             bdd_field_name = api_handler.get_bdd_case_field_name()
@@ -676,7 +709,9 @@ class JunitParser(FileParser):
 
         return "\n".join(lines)
 
-    def _parse_bdd_feature_as_single_case(self, testsuite) -> Union[TestRailCase, None]:
+    def _parse_bdd_feature_as_single_case(
+        self, testsuite, extracted_case_id: Optional[tuple] = None
+    ) -> Union[TestRailCase, None]:
         """Parse all scenarios in a testsuite as a single BDD test case
 
         Enhanced validation:
@@ -687,6 +722,7 @@ class JunitParser(FileParser):
 
         Args:
             testsuite: JUnit testsuite containing multiple scenarios
+            extracted_case_id: Result of _extract_and_validate_bdd_case_id() if already extracted
 
         Returns:
             Single TestRailCase with aggregated scenario results, or None if validation fails
@@ -694,7 +730,9 @@ class JunitParser(FileParser):
         feature_name = testsuite.name
 
         # Step 1: Extract and validate case ID consistency
-        case_id, validation_errors = self._extract_and_validate_bdd_case_id(testsuite)
+        if extracted_case_id is None:
+            extracted_case_id = self._extract_and_validate_bdd_case_id(testsuite)
+        case_id, validation_errors = extracted_case_id
 
         if validation_errors:
             for error in validation_errors:
@@ -791,12 +829,7 @@ class JunitParser(FileParser):
 
         # Step 6: Create aggregated result
         # Get API handler to resolve BDD result field name
-        from trcli.api.project_based_client import ProjectBasedClient
-        from trcli.data_classes.dataclass_testrail import TestRailSuite as TRSuite
-
-        temp_suite = TRSuite(name="temp", suite_id=1)
-        project_client = ProjectBasedClient(environment=self.env, suite=temp_suite)
-        bdd_result_field_name = project_client.api_request_handler.get_bdd_result_field_name()
+        bdd_result_field_name = self._get_bdd_api_handler().get_bdd_result_field_name()
 
         result = TestRailResult(
             case_id=case_id,
@@ -828,8 +861,57 @@ class JunitParser(FileParser):
 
     def parse_file(self) -> List[TestRailSuite]:
         self.env.log("Parsing JUnit report.")
-        suite = JUnitXml.fromfile(self.filepath, parse_func=self._add_root_element_to_tree)
+        suite = JUnitXml.fromfile(self.source, parse_func=self._add_root_element_to_tree)
+        return self._parse_report(suite)
+
+    def iter_chunks(
+        self, max_cases: int = STDIN_CHUNK_CASES, max_seconds: float = STDIN_CHUNK_SECONDS
+    ) -> Iterator[List[TestRailSuite]]:
+        """
+        Parse the report incrementally, yielding the suites of every chunk of top-level <testsuite> elements.
+        A chunk is complete once it holds max_cases test cases or max_seconds passed since the previous chunk.
+        Parsed elements are released, so memory usage does not depend on the report size. A report with a
+        single <testsuite> root is yielded as one chunk.
+        """
+        self.env.log("Parsing JUnit report incrementally.")
+        for root in self._iter_chunk_roots(max_cases, max_seconds):
+            yield self._parse_report(JUnitXml.fromroot(root))
+
+    def _iter_chunk_roots(self, max_cases: int, max_seconds: float) -> Iterator[etree.Element]:
+        root = None
+        depth = 0
+        chunk = []
+        chunk_cases = 0
+        chunks = 0
+        last_chunk = monotonic()
+        for event, element in etree.iterparse(self.source, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if root is None:
+                    root = element
+                    if root.tag not in ("testsuites", "testsuite"):
+                        raise JUnitXmlError("Invalid format.")
+                continue
+            depth -= 1
+            if depth == 1 and root.tag == "testsuites" and element.tag == "testsuite":
+                root.remove(element)
+                chunk.append(element)
+                chunk_cases += sum(1 for _ in element.iter("testcase"))
+                if chunk_cases >= max_cases or monotonic() - last_chunk >= max_seconds:
+                    yield self._chunk_root(root, chunk)
+                    chunk, chunk_cases, chunks, last_chunk = [], 0, chunks + 1, monotonic()
+        if root.tag == "testsuite":
+            yield self._chunk_root(etree.Element("testsuites"), [root])
+        elif chunk or not chunks:
+            yield self._chunk_root(root, chunk)
+
+    @staticmethod
+    def _chunk_root(root: etree.Element, testsuites: List[etree.Element]) -> etree.Element:
+        chunk_root = etree.Element(root.tag, root.attrib)
+        chunk_root.extend(testsuites)
+        return chunk_root
 
+    def _parse_report(self, suite: JUnitXml) -> List[TestRailSuite]:
         suites = self._split_sauce_report(suite) if self._special == "saucectl" else [suite]
         testrail_suites = []
 
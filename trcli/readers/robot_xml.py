@@ -24,6 +24,8 @@ from trcli.readers.file_parser import FileParser
 
 class RobotParser(FileParser):
 
+    supports_stdin = True
+
     def __init__(self, environment: Environment):
         super().__init__(environment)
         self.case_matcher = environment.case_matcher
@@ -81,7 +83,7 @@ class RobotParser(FileParser):
 
     def parse_file(self) -> List[TestRailSuite]:
         self.env.log(f"Parsing Robot Framework report.")
-        tree = ElementTree.parse(self.filepath)
+        tree = ElementTree.parse(self.source)
         root = tree.getroot()
         sections_list = []
         suite_elements = root.findall("suite")
@@ -91,7 +93,7 @@ class RobotParser(FileParser):
         self.env.log(f"Processed {cases_count} test cases in {len(sections_list)} sections.")
         testrail_suites = [
             TestRailSuite(
-                self.env.suite_name if self.env.suite_name else self.filepath.stem,
+                self.env.suite_name if self.env.suite_name else Path(self.filename).stem,
                 testsections=sections_list,
                 source=self.filename,
             )
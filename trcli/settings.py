@@ -1,8 +1,36 @@
 MAX_WORKERS_ADD_CASE = 10
 MAX_WORKERS_ADD_RESULTS = 20
+MAX_WORKERS_ADD_ATTACHMENTS = 10
+MAX_WORKERS_ATTACHMENT_PREFLIGHT = 8
 DEFAULT_API_CALL_RETRIES = 5
 DEFAULT_API_CALL_TIMEOUT = 60
 DEFAULT_BATCH_SIZE = 50
 ALLOW_ELAPSED_MS = False
 ENABLE_PARALLEL_PAGINATION = False
 MAX_WORKERS_PARALLEL_PAGINATION = 10
+MAX_WORKERS_GET_CASE = 10
+MAX_WORKERS_GET_USER = 10
+DEFAULT_BATCH_MAX_BYTES = 2 * 1024 * 1024
+MAX_ADAPTIVE_BATCH_SIZE = 500
+ADD_RESULTS_BATCH_RETRIES = 2
+MAX_REJECTED_RESULTS = 100
+DEFAULT_GZIP_THRESHOLD = 8 * 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_BUDGET = 5
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 1
+HEDGE_LATENCY_WINDOW = 500
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_RESET = 30
+DEFAULT_ATTACHMENT_MAX_SIZE = 256 * 1024 * 1024
+ATTACHMENT_CHUNK_SIZE = 1024 * 1024
+ATTACHMENT_INFLIGHT_BYTES = 8 * 1024 * 1024
+WATCH_POLL_INTERVAL = 5
+WATCH_SENTINEL_FILE = "trcli.done"
+STDIN_CHUNK_CASES = 1000
+STDIN_CHUNK_SECONDS = 30
+LIVE_RUN_FLUSH_INTERVAL = 10
+SHARD_POLL_INTERVAL = 5
+SHARD_WAIT_TIMEOUT = 1800
+SHARD_RUN_MAX_AGE = 24 * 60 * 60